@@ -1,5 +1,5 @@
 import logging
-from typing import Any, Optional, Tuple, Union
+from typing import Any, Literal, Optional, Tuple, Union
 
 import torch
 from pydantic import AliasChoices, Field, field_validator
@@ -64,7 +64,40 @@ class Settings(BaseSettings):
 
     # ---- Performance knobs ----
     bulk_nproc: int = Field(8, alias="APP_BULK_NPROC")
+    bulk_persistent_workers: bool = Field(
+        False,
+        alias="APP_BULK_PERSISTENT_WORKERS",
+        description="Keep a pool of worker processes (each with its own copy of the model) "
+                    "alive for bulk processing instead of sending the model to new processes for every request",
+    )
     torch_threads: int = Field(-1, alias="APP_TORCH_THREADS")
+    inference_executor: Literal["thread", "process"] = Field(
+        "thread",
+        alias="APP_INFERENCE_EXECUTOR",
+        description="The executor used to run inference off the event loop. "
+                    "Each process worker loads its own copy of the model, while the main process then loads none",
+    )
+    inference_workers: int = Field(1, alias="APP_INFERENCE_WORKERS",
+                                   description="The number of inference executor workers")
+    max_concurrent_requests: int = Field(
+        16,
+        alias="APP_MAX_CONCURRENT_REQUESTS",
+        description="The maximum number of process requests in flight (running or queued). "
+                    "Further requests are rejected with a 503 response. Set to 0 to disable the limit",
+    )
+    micro_batch_wait_ms: int = Field(
+        0,
+        alias="APP_MICRO_BATCH_WAIT_MS",
+        description="How long (in ms) to wait for other single document requests to batch together with. "
+                    "Only used with the thread inference executor. Set to 0 to disable micro-batching",
+    )
+    micro_batch_max_size: int = Field(32, alias="APP_MICRO_BATCH_MAX_SIZE",
+                                      description="The maximum number of documents in a micro-batch")
+    micro_batch_max_chars: int = Field(100_000, alias="APP_MICRO_BATCH_MAX_CHARS",
+                                       description="The maximum number of characters in a micro-batch")
+    overload_retry_after: int = Field(
+        1, alias="APP_OVERLOAD_RETRY_AFTER",
+        description="The Retry-After (in seconds) sent along with the 503 response when overloaded")
 
     # ---- Output formatting ----
     # e.g. "dict" | "list" | "json" (service currently uses "dict" default)
@@ -5,6 +5,7 @@ from typing import Annotated
 from fastapi import Depends
 
 from medcat_service.config import Settings
+from medcat_service.nlp_processor.inference_executor import InferenceExecutor
 from medcat_service.nlp_processor.medcat_processor import MedCatProcessor
 
 log = logging.getLogger(__name__)
@@ -24,3 +25,31 @@ def get_medcat_processor(settings: Annotated[Settings, Depends(get_settings)]) -
 
 
 MedCatProcessorDep = Annotated[MedCatProcessor, Depends(get_medcat_processor)]
+
+
+@lru_cache
+def get_inference_executor(settings: Annotated[Settings, Depends(get_settings)]) -> InferenceExecutor:
+    log.debug("Creating new Inference Executor using settings: %s", settings)
+    if settings.inference_executor == "process":
+        # NOTE: the worker processes load their own models, so none is loaded here
+        return InferenceExecutor(settings)
+    return InferenceExecutor(settings, get_medcat_processor(settings))
+
+
+InferenceExecutorDep = Annotated[InferenceExecutor, Depends(get_inference_executor)]
+
+
+def shutdown_dependencies() -> None:
+    """Shuts down the inference executor and the MedCAT processor (along with its background workers).
+
+    Only the ones that have already been created are shut down, so that no model is loaded just to be stopped.
+    """
+    settings = get_settings()
+    if get_inference_executor.cache_info().currsize:
+        log.info("Shutting down the inference executor")
+        get_inference_executor(settings).shutdown()
+        get_inference_executor.cache_clear()
+    if get_medcat_processor.cache_info().currsize:
+        log.info("Shutting down the MedCAT processor")
+        get_medcat_processor(settings).shutdown()
+        get_medcat_processor.cache_clear()
@@ -1,14 +1,24 @@
+from contextlib import asynccontextmanager
+
 import gradio as gr
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 
 from medcat_service.demo.gradio_demo import io
-from medcat_service.dependencies import get_settings
+from medcat_service.dependencies import get_settings, shutdown_dependencies
 from medcat_service.routers import admin, health, process
-from medcat_service.types import HealthCheckFailedException
+from medcat_service.types import HealthCheckFailedException, ServiceOverloadedException
 
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # NOTE: stops the background threads and worker processes so that they aren't leaked on shutdown / reload
+    shutdown_dependencies()
+
+
 app = FastAPI(
     title="MedCAT Service",
     summary="MedCAT Service",
@@ -22,6 +32,7 @@ app = FastAPI(
         "identifier": "Apache-2.0",
     },
     root_path=settings.app_root_path,
+    lifespan=lifespan,
 )
 
 app.include_router(admin.router)
@@ -36,6 +47,15 @@ async def healthcheck_failed_exception_handler(request: Request, exc: HealthChec
     return JSONResponse(status_code=503, content=exc.reason.model_dump())
 
 
+@app.exception_handler(ServiceOverloadedException)
+async def service_overloaded_exception_handler(request: Request, exc: ServiceOverloadedException):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": f"Service is overloaded: {exc.max_concurrent_requests} requests already in flight"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 if __name__ == "__main__":
     # Only run this when directly executing `python main.py` for local dev.
     import os
@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+from .inference_executor import InferenceExecutor
 from .medcat_processor import MedCatProcessor
 
-__all__ = ['MedCatProcessor']
+__all__ = ['MedCatProcessor', 'InferenceExecutor']
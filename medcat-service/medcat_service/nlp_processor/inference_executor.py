@@ -0,0 +1,216 @@
+#!/usr/bin/env python
+
+import asyncio
+import logging
+import multiprocessing as mp
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Union
+
+from medcat_service.config import Settings
+from medcat_service.nlp_processor.medcat_processor import MedCatProcessor
+from medcat_service.types import (
+    HealthCheckResponse,
+    MicroBatchingMetrics,
+    ProcessErrorsResult,
+    ProcessResult,
+    ServiceInfo,
+    ServiceOverloadedException,
+)
+
+log = logging.getLogger(__name__)
+
+
+# NOTE: the processor used within a process executor worker
+_WORKER_PROCESSOR: Optional[MedCatProcessor] = None
+
+
+def _init_worker_processor(settings: Settings) -> None:
+    global _WORKER_PROCESSOR
+    # NOTE: the worker shouldn't start its own pool of bulk workers. Nor should it micro-batch since it only
+    #       ever gets one request at a time.
+    _WORKER_PROCESSOR = MedCatProcessor(settings.model_copy(update={"bulk_persistent_workers": False,
+                                                                    "micro_batch_wait_ms": 0}))
+
+
+def _worker_status() -> tuple[HealthCheckResponse, ServiceInfo]:
+    assert _WORKER_PROCESSOR is not None, "Worker processor was not initialised"
+    return _WORKER_PROCESSOR.is_ready(), _WORKER_PROCESSOR.get_app_info()
+
+
+def _worker_process_content(content: dict, meta_anns_filters: Any) -> Union[ProcessResult, ProcessErrorsResult]:
+    assert _WORKER_PROCESSOR is not None, "Worker processor was not initialised"
+    return _WORKER_PROCESSOR.process_content(content, meta_anns_filters=meta_anns_filters)
+
+
+def _worker_process_content_bulk(content: list[dict]) -> list[ProcessResult]:
+    assert _WORKER_PROCESSOR is not None, "Worker processor was not initialised"
+    return list(_WORKER_PROCESSOR.process_content_bulk(content))
+
+
+class InferenceExecutor:
+    """
+    Runs the (CPU bound) inference off the event loop so that the service (including the health probes)
+    stays responsive while the model is busy.
+
+    The number of requests in flight (running or waiting for a worker) is bounded. Once the limit is reached,
+    new requests are rejected straight away (with a `ServiceOverloadedException`) rather than piling up latency.
+
+    With the thread executor, the given processor is used. With the process executor, each worker process loads
+    its own processor, so none is needed (nor loaded) in the main process. The readiness and the service info
+    are then those of the worker processes.
+    """
+
+    def __init__(self, settings: Settings, processor: Optional[MedCatProcessor] = None):
+        self.service_settings = settings
+        self.processor = processor
+        self._max_in_flight = settings.max_concurrent_requests
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._worker_status: Optional[Future] = None
+        self._executor = self._create_executor()
+
+    def _create_executor(self) -> Executor:
+        n_workers = max(self.service_settings.inference_workers, 1)
+        if self.service_settings.inference_executor == "process":
+            if self.service_settings.micro_batch_wait_ms > 0:
+                log.warning("Micro-batching is not used with the process inference executor "
+                            "since each worker process only gets one request at a time")
+            log.info("Starting %d inference worker processes", n_workers)
+            executor = ProcessPoolExecutor(max_workers=n_workers, mp_context=mp.get_context("spawn"),
+                                           initializer=_init_worker_processor,
+                                           initargs=(self.service_settings,))
+            # NOTE: this starts loading the model (in a worker) straight away
+            self._worker_status = executor.submit(_worker_status)
+            return executor
+        if self.processor is None:
+            raise ValueError("A processor is required for the thread inference executor")
+        # NOTE: threads share the same model
+        if self.processor.micro_batching_enabled:
+            # NOTE: the threads of micro-batched requests just wait for their batch to be processed
+            #       (in the batcher's own thread), so there need to be enough of them to fill a batch
+            n_workers = max(n_workers, self.service_settings.micro_batch_max_size)
+            if 0 < self._max_in_flight < self.service_settings.micro_batch_max_size:
+                log.warning("Micro-batches are limited to %d documents by the maximum number of concurrent "
+                            "requests", self._max_in_flight)
+        log.info("Starting %d inference worker threads", n_workers)
+        return ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix="medcat-inference")
+
+    def is_ready(self) -> HealthCheckResponse:
+        """Is the model ready to get entities from input text.
+
+        With the process executor, this is DOWN until a worker process has loaded the model.
+
+        Returns:
+            HealthCheckResponse: The readiness of the model.
+        """
+        if self._worker_status is None:
+            assert self.processor is not None
+            return self.processor.is_ready()
+        if not self._worker_status.done():
+            log.info("The inference worker processes are still loading the model")
+            return HealthCheckResponse(name="MedCAT", status="DOWN")
+        if self._worker_status.cancelled() or self._worker_status.exception() is not None:
+            log.warning("The inference worker processes failed to load the model")
+            return HealthCheckResponse(name="MedCAT", status="DOWN")
+        return self._worker_status.result()[0]
+
+    async def get_app_info(self) -> ServiceInfo:
+        """Returns general information about the application.
+
+        With the process executor, this waits for a worker process to have loaded the model.
+
+        Returns:
+            ServiceInfo: Application information.
+        """
+        if self._worker_status is None:
+            assert self.processor is not None
+            return self.processor.get_app_info()
+        _, app_info = await asyncio.wrap_future(self._worker_status)
+        return app_info
+
+    def get_micro_batching_metrics(self) -> MicroBatchingMetrics:
+        """Returns the metrics for the micro-batching of single document requests.
+
+        Returns:
+            MicroBatchingMetrics: The micro-batching metrics.
+        """
+        if isinstance(self._executor, ProcessPoolExecutor):
+            # NOTE: worker processes don't micro-batch
+            return MicroBatchingMetrics.disabled()
+        assert self.processor is not None
+        return self.processor.get_micro_batching_metrics()
+
+    @property
+    def in_flight(self) -> int:
+        """The number of requests currently running or waiting for a worker."""
+        return self._in_flight
+
+    def _acquire(self) -> None:
+        with self._lock:
+            if 0 < self._max_in_flight <= self._in_flight:
+                log.warning("Rejecting request: %d requests already in flight", self._in_flight)
+                raise ServiceOverloadedException(self._max_in_flight, self.service_settings.overload_retry_after)
+            self._in_flight += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    async def _run(self, func: Callable[..., Any], *args) -> Any:
+        self._acquire()
+        try:
+            future = self._executor.submit(func, *args)
+        except Exception:
+            self._release()
+            raise
+        # NOTE: released once the work is done rather than when the request is done
+        #       so that requests that were cancelled (e.g client disconnected) still count
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+    async def process_content(self, content: dict, meta_anns_filters: Any = None
+                              ) -> Union[ProcessResult, ProcessErrorsResult]:
+        """Processes a single document in the executor.
+
+        Args:
+            content (dict): Document to be processed, containing "text" field.
+            meta_anns_filters (List[Tuple[str, List[str]]]): Optional meta annotations filters.
+
+        Raises:
+            ServiceOverloadedException: If the maximum number of concurrent requests has been reached.
+
+        Returns:
+            Union[ProcessResult, ProcessErrorsResult]: The processing result.
+        """
+        if isinstance(self._executor, ProcessPoolExecutor):
+            return await self._run(_worker_process_content, content, meta_anns_filters)
+        return await self._run(self._process_content, content, meta_anns_filters)
+
+    async def process_content_bulk(self, content: list[dict]) -> list[ProcessResult]:
+        """Processes an array of documents in the executor.
+
+        Args:
+            content (list): List of documents to be processed, each containing "text" field.
+
+        Raises:
+            ServiceOverloadedException: If the maximum number of concurrent requests has been reached.
+
+        Returns:
+            list[ProcessResult]: The processing results.
+        """
+        if isinstance(self._executor, ProcessPoolExecutor):
+            return await self._run(_worker_process_content_bulk, content)
+        return await self._run(self._process_content_bulk, content)
+
+    def _process_content(self, content: dict, meta_anns_filters: Any) -> Union[ProcessResult, ProcessErrorsResult]:
+        assert self.processor is not None
+        return self.processor.process_content(content, meta_anns_filters=meta_anns_filters)
+
+    def _process_content_bulk(self, content: list[dict]) -> list[ProcessResult]:
+        assert self.processor is not None
+        return list(self.processor.process_content_bulk(content))
+
+    def shutdown(self) -> None:
+        """Shuts down the underlying executor."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
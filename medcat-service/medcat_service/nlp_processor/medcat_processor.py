@@ -3,6 +3,7 @@
 import logging
 import time
 from datetime import datetime, timezone
+from typing import Optional
 
 import numpy as np
 import torch
@@ -17,7 +18,15 @@ from medcat.config.config_rel_cat import ConfigRelCAT
 from medcat.vocab import Vocab
 
 from medcat_service.config import Settings
-from medcat_service.types import HealthCheckResponse, ModelCardInfo, ProcessErrorsResult, ProcessResult, ServiceInfo
+from medcat_service.nlp_processor.micro_batcher import MicroBatcher
+from medcat_service.types import (
+    HealthCheckResponse,
+    MicroBatchingMetrics,
+    ModelCardInfo,
+    ProcessErrorsResult,
+    ProcessResult,
+    ServiceInfo,
+)
 
 
 class MedCatProcessor:
@@ -65,9 +74,14 @@ class MedCatProcessor:
         self.log.info("Torch threads set to " + str(self.service_settings.torch_threads))
 
         self.cat: DeIdModel | CAT = self._create_cat()
+        self._micro_batcher: Optional[MicroBatcher] = None
 
         self._is_ready_flag = self._check_medcat_readiness()
 
+        if self._is_ready_flag:
+            self._start_bulk_workers()
+            self._start_micro_batcher()
+
     @staticmethod
     def _get_timestamp() -> str:
         """
@@ -88,6 +102,69 @@ class MedCatProcessor:
                 "MedCAT processor is not ready. Failed the readiness check", exc_info=e)
             return False
 
+    def _start_bulk_workers(self) -> None:
+        """Starts the persistent worker pool used for bulk processing (if enabled).
+
+        The workers load the model once at start up and are then reused across bulk requests.
+        """
+        if not self.service_settings.bulk_persistent_workers or self.service_settings.bulk_nproc <= 1:
+            return
+        cat = self.cat.cat if isinstance(self.cat, DeIdModel) else self.cat
+        # NOTE: the main process works on a batch as well
+        n_workers = self.service_settings.bulk_nproc - 1
+        # NOTE: the model pack on disk would not have the CUI filter applied,
+        #       so the in-memory model is sent to the workers in that case
+        model_pack_path = None
+        if self.service_settings.medcat_model_pack and not self.service_settings.model_cui_filter_path:
+            model_pack_path = self.service_settings.medcat_model_pack
+        self.log.info("Starting %d persistent bulk processing workers", n_workers)
+        cat.start_workers(n_workers, model_pack_path=model_pack_path)
+
+    def _start_micro_batcher(self) -> None:
+        """Starts the micro-batcher for single document requests (if enabled).
+        """
+        if self.service_settings.micro_batch_wait_ms <= 0 or not isinstance(self.cat, CAT):
+            return
+        self.log.info("Micro-batching single document requests for up to %d ms",
+                      self.service_settings.micro_batch_wait_ms)
+        self._micro_batcher = MicroBatcher(
+            self.cat.get_entities_batch,
+            max_wait_ms=self.service_settings.micro_batch_wait_ms,
+            max_batch_size=self.service_settings.micro_batch_max_size,
+            max_batch_chars=self.service_settings.micro_batch_max_chars)
+
+    @property
+    def micro_batching_enabled(self) -> bool:
+        """Whether single document requests are micro-batched."""
+        return self._micro_batcher is not None
+
+    def _get_entities(self, text: str) -> dict:
+        if self._micro_batcher is not None:
+            return self._micro_batcher.submit(text)
+        return self.cat.get_entities(text)
+
+    def get_micro_batching_metrics(self) -> MicroBatchingMetrics:
+        """Returns the metrics for the micro-batching of single document requests.
+
+        Returns:
+            MicroBatchingMetrics: The micro-batching metrics.
+        """
+        if self._micro_batcher is None:
+            return MicroBatchingMetrics.disabled()
+        return self._micro_batcher.get_metrics()
+
+    def shutdown(self) -> None:
+        """Stops the micro-batcher and the persistent bulk processing workers (if they were started).
+
+        Any later requests are processed directly by the model.
+        """
+        if self._micro_batcher is not None:
+            self.log.info("Stopping the micro-batcher")
+            self._micro_batcher.stop()
+            self._micro_batcher = None
+        cat = self.cat.cat if isinstance(self.cat, DeIdModel) else self.cat
+        cat.stop_workers()
+
     def is_ready(self) -> HealthCheckResponse:
         """
         Is the MedCAT processor ready to get entities from input text
@@ -170,7 +247,7 @@ class MedCatProcessor:
             text = self.cat.deid_text(text, redact=self.service_settings.deid_redact)
         else:
             if text is not None and len(text.strip()) > 0:
-                entities = self.cat.get_entities(text)
+                entities = self._get_entities(text)
             else:
                 entities = []
 
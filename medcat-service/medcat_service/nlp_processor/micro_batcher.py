@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+from medcat_service.types import MicroBatchingMetrics
+
+log = logging.getLogger(__name__)
+
+
+_Item = tuple[str, Future]
+
+
+class MicroBatcher:
+    """
+    Collects the texts of concurrent single document requests and runs them through the model as one batch.
+
+    The first text that arrives opens a batch. The batch is then closed once the wait window has passed or
+    once it has reached the maximum number of documents or characters, whichever happens first. The results
+    are then scattered back to the waiting requests.
+
+    Args:
+        process_batch (Callable[[list[str]], list[Any]]): Processes a batch of texts (in order).
+        max_wait_ms (int): How long (in ms) to wait for further texts after the first one.
+        max_batch_size (int): The maximum number of texts in a batch.
+        max_batch_chars (int): The maximum number of characters in a batch.
+            A single text longer than this is processed on its own.
+    """
+
+    def __init__(self, process_batch: Callable[[list[str]], list[Any]],
+                 max_wait_ms: int, max_batch_size: int, max_batch_chars: int):
+        self._process_batch = process_batch
+        self._max_wait = max_wait_ms / 1000
+        self._max_batch_size = max(max_batch_size, 1)
+        self._max_batch_chars = max_batch_chars
+        self._queue: queue.Queue[Optional[_Item]] = queue.Queue()
+        self._stop_lock = threading.Lock()
+        self._stopped = False
+        self._carry_over: Optional[_Item] = None
+        self._stats_lock = threading.Lock()
+        self._batch_sizes: Counter[int] = Counter()
+        self._characters = 0
+        self._thread = threading.Thread(target=self._run, name="medcat-micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, text: str) -> Any:
+        """Submits a text to be processed as part of a batch and waits for the result.
+
+        Args:
+            text (str): The text to process.
+
+        Raises:
+            RuntimeError: If the batcher has been stopped.
+
+        Returns:
+            Any: The result for this text.
+        """
+        future: Future = Future()
+        with self._stop_lock:
+            if self._stopped:
+                raise RuntimeError("The micro-batcher has been stopped")
+            self._queue.put((text, future))
+        return future.result()
+
+    def stop(self) -> None:
+        """Stops the batching thread once the texts submitted so far have been processed."""
+        with self._stop_lock:
+            if self._stopped:
+                return
+            self._stopped = True
+            self._queue.put(None)
+        self._thread.join()
+
+    def _collect_batch(self) -> Optional[list[_Item]]:
+        first = self._carry_over if self._carry_over is not None else self._queue.get()
+        self._carry_over = None
+        if first is None:
+            return None
+        batch = [first]
+        chars = len(first[0])
+        deadline = time.monotonic() + self._max_wait
+        while len(batch) < self._max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # stop once this batch is done
+                self._queue.put(None)
+                break
+            if chars + len(item[0]) > self._max_batch_chars:
+                # leave it for the next batch
+                self._carry_over = item
+                break
+            batch.append(item)
+            chars += len(item[0])
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect_batch()
+            if batch is None:
+                return
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: list[_Item]) -> None:
+        texts = [text for text, _ in batch]
+        try:
+            results = self._process_batch(texts)
+        except Exception as e:
+            log.error("Unable to process batch of %d documents", len(batch), exc_info=e)
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        if len(results) != len(batch):
+            # NOTE: there's no telling which result belongs to which text so none of them can be trusted
+            error = RuntimeError(f"Got {len(results)} results for a batch of {len(batch)} documents")
+            log.error("Unable to process batch of %d documents: %s", len(batch), error)
+            for _, future in batch:
+                future.set_exception(error)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+        with self._stats_lock:
+            self._batch_sizes[len(batch)] += 1
+            self._characters += sum(len(text) for text in texts)
+        log.debug("Processed a micro-batch of %d documents", len(batch))
+
+    def get_metrics(self) -> MicroBatchingMetrics:
+        """Gets the metrics on the batches processed so far.
+
+        Returns:
+            MicroBatchingMetrics: The batching metrics.
+        """
+        with self._stats_lock:
+            batches = sum(self._batch_sizes.values())
+            documents = sum(size * count for size, count in self._batch_sizes.items())
+            return MicroBatchingMetrics(
+                enabled=True,
+                batches=batches,
+                documents=documents,
+                characters=self._characters,
+                mean_batch_size=documents / batches if batches else 0.0,
+                max_batch_size=max(self._batch_sizes, default=0),
+                batch_size_counts=dict(sorted(self._batch_sizes.items())),
+            )
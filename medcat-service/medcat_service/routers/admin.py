@@ -1,14 +1,22 @@
 from fastapi import APIRouter
 
-from medcat_service.dependencies import MedCatProcessorDep
-from medcat_service.types import ServiceInfo
+from medcat_service.dependencies import InferenceExecutorDep
+from medcat_service.types import MicroBatchingMetrics, ServiceInfo
 
 router = APIRouter(tags=["admin"])
 
 
 @router.get("/api/info")
-def info(medcat_processor: MedCatProcessorDep) -> ServiceInfo:
+async def info(inference_executor: InferenceExecutorDep) -> ServiceInfo:
     """
     Returns basic information about the NLP Service
     """
-    return medcat_processor.get_app_info()
+    return await inference_executor.get_app_info()
+
+
+@router.get("/api/metrics/micro_batching")
+def micro_batching_metrics(inference_executor: InferenceExecutorDep) -> MicroBatchingMetrics:
+    """
+    Returns the sizes of the micro-batches that single document requests have been processed in
+    """
+    return inference_executor.get_micro_batching_metrics()
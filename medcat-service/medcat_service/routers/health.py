@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from medcat_service.dependencies import MedCatProcessorDep
+from medcat_service.dependencies import InferenceExecutorDep
 from medcat_service.types import HealthCheckFailedException, HealthCheckResponseContainer
 
 router = APIRouter(tags=["health"])
@@ -19,11 +19,11 @@ def liveness() -> HealthCheckResponseContainer:
 
 
 @router.get("/api/health/ready")
-def readiness(medcat_processor: MedCatProcessorDep) -> HealthCheckResponseContainer:
+def readiness(inference_executor: InferenceExecutorDep) -> HealthCheckResponseContainer:
     """
     Readiness API checks if the application is ready to start accepting traffic
     """
-    medcat_is_ready = medcat_processor.is_ready()
+    medcat_is_ready = inference_executor.is_ready()
 
     if medcat_is_ready.status == "UP":
         return HealthCheckResponseContainer(status="UP", checks=[medcat_is_ready])
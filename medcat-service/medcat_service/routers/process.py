@@ -5,8 +5,14 @@ from fastapi import APIRouter, Body
 from fastapi.exceptions import RequestValidationError
 from pydantic import ValidationError
 
-from medcat_service.dependencies import MedCatProcessorDep
-from medcat_service.types import BulkProcessAPIInput, BulkProcessAPIResponse, ProcessAPIInput, ProcessAPIResponse
+from medcat_service.dependencies import InferenceExecutorDep
+from medcat_service.types import (
+    BulkProcessAPIInput,
+    BulkProcessAPIResponse,
+    ProcessAPIInput,
+    ProcessAPIResponse,
+    ServiceOverloadedException,
+)
 
 log = logging.getLogger("API")
 
@@ -42,7 +48,7 @@ async def process(
             }
         ),
     ],
-    medcat_processor: MedCatProcessorDep,
+    inference_executor: InferenceExecutorDep,
 ) -> ProcessAPIResponse:
     """
     Returns the annotations extracted from a provided single document
@@ -60,23 +66,29 @@ async def process(
                 log.error("Invalid payload", exc_info=ve)
                 raise RequestValidationError(errors=ve.errors())
 
-        process_result = medcat_processor.process_content(content, meta_anns_filters=meta_filters)
-        app_info = medcat_processor.get_app_info()
+        process_result = await inference_executor.process_content(content, meta_anns_filters=meta_filters)
+        app_info = await inference_executor.get_app_info()
         return ProcessAPIResponse(result=process_result, medcat_info=app_info)
+    except ServiceOverloadedException:
+        raise
     except Exception as e:
         log.error("Unable to process data", exc_info=e)
         raise e
 
 
 @router.post("/api/process_bulk")
-async def process_bulk(payload: BulkProcessAPIInput, medcat_processor: MedCatProcessorDep) -> BulkProcessAPIResponse:
+async def process_bulk(
+    payload: BulkProcessAPIInput, inference_executor: InferenceExecutorDep
+) -> BulkProcessAPIResponse:
     """
     Returns the annotations extracted from the provided set of documents
     """
     try:
-        result = list(medcat_processor.process_content_bulk(payload.model_dump()["content"]))
-        app_info = medcat_processor.get_app_info()
+        result = await inference_executor.process_content_bulk(payload.model_dump()["content"])
+        app_info = await inference_executor.get_app_info()
         return BulkProcessAPIResponse(result=result, medcat_info=app_info)
+    except ServiceOverloadedException:
+        raise
     except Exception as e:
         log.error("Unable to process data", exc_info=e)
         raise e
@@ -2,18 +2,18 @@ import unittest
 
 from fastapi.testclient import TestClient
 
-from medcat_service.dependencies import get_medcat_processor
+from medcat_service.dependencies import get_inference_executor
 from medcat_service.main import app
 from medcat_service.test.common import setup_medcat_processor
 from medcat_service.types import HealthCheckResponse
 
 
-def override_processor():
-    class StubProcessor:
+def override_inference_executor():
+    class StubInferenceExecutor:
         def is_ready(self):
             return HealthCheckResponse(name="MedCAT", status="DOWN")
 
-    return StubProcessor()
+    return StubInferenceExecutor()
 
 
 class TestHealthApi(unittest.TestCase):
@@ -35,7 +35,7 @@ class TestHealthApi(unittest.TestCase):
         self.assertEqual(data, {"status": "UP", "checks": [{"name": "MedCAT", "status": "UP"}]})
 
     def testReadinessIsNotOk(self):
-        app.dependency_overrides[get_medcat_processor] = override_processor
+        app.dependency_overrides[get_inference_executor] = override_inference_executor
 
         response = self.client.get(self.ENDPOINT_HEALTH_READY)
 
@@ -0,0 +1,130 @@
+import asyncio
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+from medcat_service.config import Settings
+from medcat_service.nlp_processor import inference_executor
+from medcat_service.nlp_processor.inference_executor import InferenceExecutor
+from medcat_service.types import HealthCheckResponse, ServiceOverloadedException
+
+
+class BlockingProcessor:
+    """
+    Stands in for the MedCatProcessor and blocks until released
+    """
+
+    def __init__(self, micro_batching_enabled: bool = False):
+        self.micro_batching_enabled = micro_batching_enabled
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def process_content(self, content, *args, **kwargs):
+        self.started.set()
+        self.release.wait(timeout=10)
+        return content["text"]
+
+    def process_content_bulk(self, content):
+        for doc in content:
+            yield self.process_content(doc)
+
+
+class TestInferenceExecutor(unittest.TestCase):
+    def setUp(self):
+        self.processor = BlockingProcessor()
+        self.executor = InferenceExecutor(Settings(max_concurrent_requests=1), self.processor)
+
+    def tearDown(self):
+        self.processor.release.set()
+        self.executor.shutdown()
+
+    def test_runs_off_event_loop(self):
+        async def run():
+            task = asyncio.create_task(self.executor.process_content({"text": "text"}))
+            # the event loop is still responsive while the processor is busy
+            await asyncio.get_running_loop().run_in_executor(None, self.processor.started.wait, 10)
+            self.assertFalse(task.done())
+            self.processor.release.set()
+            return await task
+
+        self.assertEqual(asyncio.run(run()), "text")
+
+    def test_rejects_when_full(self):
+        async def run():
+            task = asyncio.create_task(self.executor.process_content({"text": "text"}))
+            await asyncio.sleep(0)
+            with self.assertRaises(ServiceOverloadedException):
+                await self.executor.process_content_bulk([{"text": "other"}])
+            self.processor.release.set()
+            await task
+
+        asyncio.run(run())
+        self.assertEqual(self.executor.in_flight, 0)
+
+
+class TestInferenceExecutorMicroBatching(unittest.TestCase):
+    SETTINGS = Settings(inference_workers=1, micro_batch_wait_ms=10, micro_batch_max_size=8)
+
+    def test_enough_threads_to_fill_batch(self):
+        executor = InferenceExecutor(self.SETTINGS, BlockingProcessor(micro_batching_enabled=True))
+        self.addCleanup(executor.shutdown)
+        self.assertEqual(executor._executor._max_workers, 8)
+
+    def test_no_extra_threads_without_micro_batching(self):
+        executor = InferenceExecutor(self.SETTINGS, BlockingProcessor())
+        self.addCleanup(executor.shutdown)
+        self.assertEqual(executor._executor._max_workers, 1)
+
+    def test_worker_process_does_not_micro_batch(self):
+        with patch.object(inference_executor, "MedCatProcessor") as processor_cls:
+            inference_executor._init_worker_processor(self.SETTINGS)
+        settings = processor_cls.call_args.args[0]
+        self.assertEqual(settings.micro_batch_wait_ms, 0)
+        self.assertFalse(settings.bulk_persistent_workers)
+
+
+
+class InlineProcessPoolExecutor(ThreadPoolExecutor):
+    """
+    Stands in for the ProcessPoolExecutor, running the workers (and their initializer) in threads instead
+    """
+
+    def __init__(self, max_workers, mp_context, initializer, initargs):
+        super().__init__(max_workers=max_workers, initializer=initializer, initargs=initargs)
+
+
+class TestProcessInferenceExecutor(unittest.TestCase):
+    def setUp(self):
+        self.worker_processor = MagicMock()
+        self.worker_processor.is_ready.return_value = HealthCheckResponse(name="MedCAT", status="UP")
+        self.worker_processor.process_content.side_effect = lambda content, **kwargs: content["text"]
+        patchers = [patch.object(inference_executor, "ProcessPoolExecutor", InlineProcessPoolExecutor),
+                    patch.object(inference_executor, "MedCatProcessor", return_value=self.worker_processor)]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.executor = InferenceExecutor(Settings(inference_executor="process"))
+        self.addCleanup(self.executor.shutdown)
+
+    def test_processes_in_workers(self):
+        self.assertEqual(asyncio.run(self.executor.process_content({"text": "text"})), "text")
+
+    def test_gets_status_from_workers(self):
+        self.assertEqual(asyncio.run(self.executor.get_app_info()), self.worker_processor.get_app_info.return_value)
+        self.assertEqual(self.executor.is_ready().status, "UP")
+
+    def test_not_ready_while_loading(self):
+        loaded = threading.Event()
+        self.worker_processor.is_ready.side_effect = lambda: loaded.wait(10)
+        executor = InferenceExecutor(Settings(inference_executor="process"))
+        self.addCleanup(executor.shutdown)
+        self.assertEqual(executor.is_ready().status, "DOWN")
+        loaded.set()
+
+    def test_does_not_micro_batch(self):
+        self.assertFalse(self.executor.get_micro_batching_metrics().enabled)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,5 @@
 import unittest
+from unittest.mock import patch
 
 from medcat_service.config import Settings
 from medcat_service.nlp_processor import MedCatProcessor
@@ -20,5 +21,24 @@ class TestMedCatProcessorReadiness(unittest.TestCase):
         self.assertFalse(result)
 
 
+class TestMedCatProcessorShutdown(unittest.TestCase):
+    def setUp(self):
+        setup_medcat_processor()
+        self.processor = MedCatProcessor(Settings(micro_batch_wait_ms=5))
+
+    def test_shutdown_stops_micro_batcher(self):
+        batcher = self.processor._micro_batcher
+        self.assertIsNotNone(batcher)
+        self.processor.shutdown()
+        self.assertIsNone(self.processor._micro_batcher)
+        self.assertFalse(batcher._thread.is_alive())
+        self.assertFalse(self.processor.get_micro_batching_metrics().enabled)
+
+    def test_shutdown_stops_bulk_workers(self):
+        with patch.object(self.processor.cat, "stop_workers") as stop_workers:
+            self.processor.shutdown()
+        stop_workers.assert_called_once_with()
+
+
 if __name__ == "__main__":
     unittest.main()
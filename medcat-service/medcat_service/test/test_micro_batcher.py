@@ -0,0 +1,92 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from medcat_service.nlp_processor.micro_batcher import MicroBatcher
+
+
+class TestMicroBatcher(unittest.TestCase):
+    def setUp(self):
+        self.batches = []
+        self.first_batch_started = threading.Event()
+        self.release = threading.Event()
+
+    def process_batch(self, texts):
+        self.batches.append(list(texts))
+        self.first_batch_started.set()
+        self.release.wait(timeout=10)
+        return [text.upper() for text in texts]
+
+    def _run_concurrently(self, batcher, texts):
+        with ThreadPoolExecutor(len(texts)) as ex:
+            first = ex.submit(batcher.submit, texts[0])
+            self.first_batch_started.wait(timeout=10)
+            # these will be waiting for the first batch to be done
+            rest = [ex.submit(batcher.submit, text) for text in texts[1:]]
+            self.release.set()
+            return [first.result()] + [fut.result() for fut in rest]
+
+    def test_scatters_results(self):
+        batcher = MicroBatcher(self.process_batch, max_wait_ms=50, max_batch_size=10, max_batch_chars=1000)
+        texts = [f"text {nr}" for nr in range(5)]
+        self.assertEqual(self._run_concurrently(batcher, texts), [text.upper() for text in texts])
+        batcher.stop()
+
+    def test_batches_waiting_requests(self):
+        batcher = MicroBatcher(self.process_batch, max_wait_ms=200, max_batch_size=10, max_batch_chars=1000)
+        self._run_concurrently(batcher, [f"text {nr}" for nr in range(5)])
+        batcher.stop()
+        self.assertEqual([len(batch) for batch in self.batches], [1, 4])
+        metrics = batcher.get_metrics()
+        self.assertEqual(metrics.batches, 2)
+        self.assertEqual(metrics.documents, 5)
+        self.assertEqual(metrics.batch_size_counts, {1: 1, 4: 1})
+
+    def test_respects_max_size(self):
+        batcher = MicroBatcher(self.process_batch, max_wait_ms=200, max_batch_size=2, max_batch_chars=1000)
+        self._run_concurrently(batcher, [f"text {nr}" for nr in range(5)])
+        batcher.stop()
+        self.assertTrue(all(len(batch) <= 2 for batch in self.batches))
+        self.assertEqual(sum(len(batch) for batch in self.batches), 5)
+
+    def test_respects_max_chars(self):
+        batcher = MicroBatcher(self.process_batch, max_wait_ms=200, max_batch_size=10, max_batch_chars=12)
+        self._run_concurrently(batcher, [f"text {nr}" for nr in range(5)])
+        batcher.stop()
+        self.assertTrue(all(sum(len(text) for text in batch) <= 12 for batch in self.batches))
+        self.assertEqual(sum(len(batch) for batch in self.batches), 5)
+
+    def test_fails_all_on_result_count_mismatch(self):
+        batcher = MicroBatcher(lambda texts: [text.upper() for text in texts[1:]],
+                               max_wait_ms=200, max_batch_size=10, max_batch_chars=1000)
+        with ThreadPoolExecutor(3) as ex:
+            futures = [ex.submit(batcher.submit, f"text {nr}") for nr in range(3)]
+            for fut in futures:
+                with self.assertRaises(RuntimeError):
+                    fut.result(timeout=10)
+        batcher.stop()
+        self.assertEqual(batcher.get_metrics().batches, 0)
+
+    def test_processes_submitted_before_stop(self):
+        batcher = MicroBatcher(self.process_batch, max_wait_ms=200, max_batch_size=10, max_batch_chars=1000)
+        with ThreadPoolExecutor(1) as ex:
+            fut = ex.submit(batcher.submit, "text")
+            self.first_batch_started.wait(timeout=10)
+            stopper = threading.Thread(target=batcher.stop)
+            stopper.start()
+            self.release.set()
+            self.assertEqual(fut.result(timeout=10), "TEXT")
+            stopper.join(timeout=10)
+        self.assertFalse(stopper.is_alive())
+
+    def test_rejects_after_stop(self):
+        batcher = MicroBatcher(self.process_batch, max_wait_ms=50, max_batch_size=10, max_batch_chars=1000)
+        batcher.stop()
+        with self.assertRaises(RuntimeError):
+            batcher.submit("text")
+        # stopping again is a no-op
+        batcher.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
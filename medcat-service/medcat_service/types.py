@@ -26,6 +26,12 @@ class HealthCheckFailedException(Exception):
         self.reason = reason
 
 
+class ServiceOverloadedException(Exception):
+    def __init__(self, max_concurrent_requests: int, retry_after: int):
+        self.max_concurrent_requests = max_concurrent_requests
+        self.retry_after = retry_after
+
+
 class NoProtectedBaseModel(BaseModel, protected_namespaces=()):
     pass
 
@@ -73,6 +79,24 @@ class BulkProcessAPIInput(BaseModel):
     content: List[ProcessAPIInputContent]
 
 
+class MicroBatchingMetrics(BaseModel):
+    enabled: bool
+    batches: int
+    documents: int
+    characters: int
+    mean_batch_size: float
+    max_batch_size: int
+    batch_size_counts: Dict[int, int]
+    """
+        # number of batches of each size, e.g. {1: 10, 4: 2}
+    """
+
+    @classmethod
+    def disabled(cls) -> "MicroBatchingMetrics":
+        return cls(enabled=False, batches=0, documents=0, characters=0,
+                   mean_batch_size=0.0, max_batch_size=0, batch_size_counts={})
+
+
 class ProcessResult(BaseModel):
     text: str
     # TODO: Any set as annotations has many different types
@@ -0,0 +1,13 @@
+"""Performance benchmarks for MedCAT.
+
+The benchmarks can be run from the command line. E.g:
+```
+python -m medcat.benchmarks --num-concepts 10000 --num-docs 200 \
+    --n-process 1 2 4 --output results.json
+```
+And later checked against a stored baseline:
+```
+python -m medcat.benchmarks --baseline results.json --threshold 0.1
+```
+Run with `--help` for all the options.
+"""
@@ -0,0 +1,107 @@
+from typing import Optional
+import argparse
+import logging
+import sys
+
+from medcat.cat import CAT
+from medcat.config import Config
+from medcat.benchmarks.synthetic import (
+    make_synthetic_cdb, make_synthetic_vocab, make_synthetic_corpus)
+from medcat.benchmarks.runner import run_benchmarks
+from medcat.benchmarks.compare import (
+    find_regressions, load_results, save_results)
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_cat(args: argparse.Namespace) -> CAT:
+    if args.model_pack:
+        logger.info("Loading model pack from %s", args.model_pack)
+        return CAT.load_model_pack(args.model_pack)
+    config = Config()
+    config.general.nlp.provider = args.nlp_provider
+    config.components.linking.train = False
+    logger.info("Building a synthetic CDB with %d concepts",
+                args.num_concepts)
+    cdb = make_synthetic_cdb(
+        config, num_concepts=args.num_concepts,
+        names_per_concept=args.names_per_concept,
+        vector_size=args.vector_size, seed=args.seed)
+    vocab = make_synthetic_vocab(cdb, vector_size=args.vector_size,
+                                 seed=args.seed)
+    return CAT(cdb, vocab)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m medcat.benchmarks",
+        description="Benchmark the throughput of a (synthetic) MedCAT model")
+    parser.add_argument(
+        '--model-pack', help='Benchmark this model pack instead of a '
+        'synthetic model', type=str, default=None)
+    parser.add_argument('--nlp-provider', type=str, default='regex',
+                        help='The tokenizer for the synthetic model')
+    parser.add_argument('--num-concepts', type=int, default=10_000)
+    parser.add_argument('--names-per-concept', type=int, default=3)
+    parser.add_argument('--vector-size', type=int, default=300)
+    parser.add_argument('--num-docs', type=int, default=200)
+    parser.add_argument('--words-per-doc', type=int, default=300)
+    parser.add_argument('--mention-rate', type=float, default=0.1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument(
+        '--n-process', type=int, nargs='+', default=[1],
+        help='The number of processes to benchmark '
+        'get_entities_multi_texts with')
+    parser.add_argument('--output', type=str, default=None,
+                        help='The JSON file to write the results to')
+    parser.add_argument('--baseline', type=str, default=None,
+                        help='The JSON file with the baseline results')
+    parser.add_argument(
+        '--threshold', type=float, default=0.1,
+        help='The allowed relative regression compared to the baseline')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args(argv)
+    logging.basicConfig(format="%(message)s")
+    logger.setLevel(logging.INFO)
+    if args.verbose:
+        logging.getLogger("medcat").setLevel(logging.INFO)
+
+    cat = get_cat(args)
+    texts = make_synthetic_corpus(
+        cat.cdb, num_docs=args.num_docs, words_per_doc=args.words_per_doc,
+        mention_rate=args.mention_rate, seed=args.seed)
+    settings = {key: val for key, val in vars(args).items()
+                if key not in ('output', 'baseline', 'threshold', 'verbose')}
+    results = run_benchmarks(cat, texts, n_processes=args.n_process,
+                             warmup=args.warmup, settings=settings)
+    stats = results.get_entities
+    logger.info("get_entities: %.1f docs/s, %.0f chars/s, "
+                "p50 %.2f ms, p99 %.2f ms", stats.docs_per_sec,
+                stats.chars_per_sec, stats.latency_p50_ms,
+                stats.latency_p99_ms)
+    for key, stats in results.multi_texts.items():
+        logger.info("get_entities_multi_texts (%s): %.1f docs/s, "
+                    "%.0f chars/s", key, stats.docs_per_sec,
+                    stats.chars_per_sec)
+    for comp_name, timing in results.components.items():
+        logger.info("%s: %.3f ms/doc (%.1f%%)", comp_name,
+                    timing.mean_ms_per_doc, timing.share * 100)
+    logger.info("Peak RSS: %s MB", results.peak_rss_mb)
+    if args.output:
+        save_results(results, args.output)
+        logger.info("Saved results to %s", args.output)
+    if args.baseline:
+        regressions = find_regressions(
+            results, load_results(args.baseline), threshold=args.threshold)
+        for regression in regressions:
+            logger.warning("Regression: %s", regression)
+        if regressions:
+            return 1
+        logger.info("No regressions compared to %s", args.baseline)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""Compare benchmark results against a (stored) baseline."""
+from typing import Optional, Union
+import json
+
+import pydantic
+
+from medcat.benchmarks.runner import BenchmarkResults
+
+
+class Regression(pydantic.BaseModel):
+    """A metric that has regressed compared to the baseline."""
+    metric: str
+    baseline: float
+    current: float
+    change: float
+    """The relative change in the (bad) direction (e.g 0.2 for 20%)."""
+
+    def __str__(self) -> str:
+        return (f"{self.metric}: {self.baseline:.4g} -> {self.current:.4g} "
+                f"({self.change:+.1%})")
+
+
+def _get_metrics(results: BenchmarkResults
+                 ) -> dict[str, tuple[Optional[float], bool]]:
+    """Get the comparable metrics.
+
+    Args:
+        results (BenchmarkResults): The results.
+
+    Returns:
+        dict[str, tuple[Optional[float], bool]]: The value of each metric
+            along with whether higher is better for it.
+    """
+    metrics: dict[str, tuple[Optional[float], bool]] = {}
+    stats_per_name = {"get_entities": results.get_entities}
+    stats_per_name.update({f"multi_texts[{key}]": stats
+                           for key, stats in results.multi_texts.items()})
+    for name, stats in stats_per_name.items():
+        metrics[f"{name}.docs_per_sec"] = (stats.docs_per_sec, True)
+        metrics[f"{name}.chars_per_sec"] = (stats.chars_per_sec, True)
+        metrics[f"{name}.latency_p50_ms"] = (stats.latency_p50_ms, False)
+        metrics[f"{name}.latency_p99_ms"] = (stats.latency_p99_ms, False)
+    for comp_name, timing in results.components.items():
+        metrics[f"components[{comp_name}].mean_ms_per_doc"] = (
+            timing.mean_ms_per_doc, False)
+    metrics["peak_rss_mb"] = (results.peak_rss_mb, False)
+    return metrics
+
+
+def find_regressions(current: BenchmarkResults, baseline: BenchmarkResults,
+                     threshold: float = 0.1) -> list[Regression]:
+    """Find the metrics that have regressed compared to the baseline.
+
+    Only metrics present in both sets of results are compared.
+
+    Args:
+        current (BenchmarkResults): The current results.
+        baseline (BenchmarkResults): The baseline results.
+        threshold (float): The allowed relative change in the bad direction
+            (e.g 0.1 allows for throughput to drop by 10% and latency to
+            rise by 10%). Defaults to 0.1.
+
+    Returns:
+        list[Regression]: The metrics that have regressed.
+    """
+    cur_metrics = _get_metrics(current)
+    regressions: list[Regression] = []
+    for metric, (base_val, higher_is_better) in _get_metrics(
+            baseline).items():
+        cur_val = cur_metrics.get(metric, (None, True))[0]
+        if base_val is None or cur_val is None or base_val <= 0:
+            continue
+        if higher_is_better:
+            change = (base_val - cur_val) / base_val
+        else:
+            change = (cur_val - base_val) / base_val
+        if change > threshold:
+            regressions.append(Regression(
+                metric=metric, baseline=base_val, current=cur_val,
+                change=change))
+    return regressions
+
+
+def load_results(path: str) -> BenchmarkResults:
+    """Load the benchmark results from a JSON file.
+
+    Args:
+        path (str): The file path.
+
+    Returns:
+        BenchmarkResults: The loaded results.
+    """
+    with open(path) as f:
+        return BenchmarkResults.model_validate(json.load(f))
+
+
+def save_results(results: BenchmarkResults, path: str,
+                 indent: Union[int, None] = 2) -> None:
+    """Save the benchmark results to a JSON file.
+
+    Args:
+        results (BenchmarkResults): The results.
+        path (str): The file path.
+        indent (Union[int, None]): The JSON indent. Defaults to 2.
+    """
+    with open(path, 'w') as f:
+        json.dump(results.model_dump(), f, indent=indent)
@@ -0,0 +1,249 @@
+"""Run the benchmarks and describe their results."""
+from typing import Optional, Iterable, Callable
+from collections import defaultdict
+import platform
+import sys
+import time
+import logging
+
+import numpy as np
+import pydantic
+
+from medcat.cat import CAT
+from medcat.tokenizing.tokens import MutableDocument
+
+
+logger = logging.getLogger(__name__)
+
+
+TOKENIZER_NAME = "tokenizer"
+
+
+class ThroughputStats(pydantic.BaseModel):
+    """The throughput (and latency) for processing a number of texts."""
+    num_docs: int
+    num_chars: int
+    total_seconds: float
+    docs_per_sec: float
+    chars_per_sec: float
+    latency_p50_ms: Optional[float] = None
+    """The median per document latency (if measured)."""
+    latency_p99_ms: Optional[float] = None
+    """The 99th percentile per document latency (if measured)."""
+
+    @classmethod
+    def from_timings(cls, texts: list[str], total_seconds: float,
+                     per_doc_seconds: Optional[list[float]] = None
+                     ) -> 'ThroughputStats':
+        """Calculate the stats based on the timings.
+
+        Args:
+            texts (list[str]): The texts that were processed.
+            total_seconds (float): The total time taken.
+            per_doc_seconds (Optional[list[float]]): The time taken per
+                document (if measured). Defaults to None.
+
+        Returns:
+            ThroughputStats: The resulting stats.
+        """
+        num_chars = sum(len(text) for text in texts)
+        total_seconds = max(total_seconds, 1e-9)
+        if per_doc_seconds:
+            p50, p99 = np.percentile(per_doc_seconds, [50, 99]) * 1000
+            latency_p50_ms, latency_p99_ms = float(p50), float(p99)
+        else:
+            latency_p50_ms = latency_p99_ms = None
+        return cls(num_docs=len(texts), num_chars=num_chars,
+                   total_seconds=total_seconds,
+                   docs_per_sec=len(texts) / total_seconds,
+                   chars_per_sec=num_chars / total_seconds,
+                   latency_p50_ms=latency_p50_ms,
+                   latency_p99_ms=latency_p99_ms)
+
+
+class ComponentTiming(pydantic.BaseModel):
+    """The time spent within a specific component of the pipeline."""
+    total_seconds: float
+    mean_ms_per_doc: float
+    share: float
+    """The share of the total pipeline time spent in this component."""
+
+
+class BenchmarkResults(pydantic.BaseModel):
+    """The results of a benchmark run."""
+    settings: dict
+    environment: dict
+    get_entities: ThroughputStats
+    multi_texts: dict[str, ThroughputStats]
+    """The `get_entities_multi_texts` results keyed by `n_process=<n>`."""
+    components: dict[str, ComponentTiming]
+    """The per-component breakdown keyed by the component's full name."""
+    peak_rss_mb: Optional[float]
+    """The peak resident set size of the benchmarking process."""
+    peak_children_rss_mb: Optional[float]
+    """The peak resident set size among the (finished) child processes."""
+
+
+def get_peak_rss_mb(children: bool = False) -> Optional[float]:
+    """Get the peak resident set size (RSS) in megabytes.
+
+    Args:
+        children (bool): Whether to get the peak RSS of (terminated and
+            waited for) child processes instead. Defaults to False.
+
+    Returns:
+        Optional[float]: The peak RSS, or None if not available on this
+            platform.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    max_rss = resource.getrusage(who).ru_maxrss
+    # NOTE: this is in bytes on macOS and in kilobytes elsewhere
+    if sys.platform == "darwin":
+        return max_rss / 1024 ** 2
+    return max_rss / 1024
+
+
+def _time_calls(func: Callable[[str], object], texts: Iterable[str]
+                ) -> list[float]:
+    timings: list[float] = []
+    for text in texts:
+        start = time.perf_counter()
+        func(text)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def benchmark_get_entities(cat: CAT, texts: list[str],
+                           warmup: int = 5) -> ThroughputStats:
+    """Benchmark `CAT.get_entities` one document at a time.
+
+    Args:
+        cat (CAT): The model.
+        texts (list[str]): The texts.
+        warmup (int): The number of (untimed) warmup calls. Defaults to 5.
+
+    Returns:
+        ThroughputStats: The throughput and latency.
+    """
+    _time_calls(cat.get_entities, texts[:warmup])
+    timings = _time_calls(cat.get_entities, texts)
+    return ThroughputStats.from_timings(texts, sum(timings), timings)
+
+
+def benchmark_multi_texts(cat: CAT, texts: list[str], n_process: int,
+                          batch_size: int = -1,
+                          batch_size_chars: int = 1_000_000,
+                          warmup: int = 5) -> ThroughputStats:
+    """Benchmark `CAT.get_entities_multi_texts`.
+
+    Args:
+        cat (CAT): The model.
+        texts (list[str]): The texts.
+        n_process (int): The number of processes to use.
+        batch_size (int): The batch size. Defaults to -1.
+        batch_size_chars (int): The batch size in characters.
+            Defaults to 1 000 000.
+        warmup (int): The number of texts in the (untimed) warmup call.
+            Defaults to 5.
+
+    Returns:
+        ThroughputStats: The throughput.
+    """
+    if warmup > 0:
+        # NOTE: the first call may include some (lazy) imports
+        for _ in cat.get_entities_multi_texts(texts[:warmup],
+                                              n_process=n_process):
+            pass
+    start = time.perf_counter()
+    for _ in cat.get_entities_multi_texts(
+            texts, n_process=n_process, batch_size=batch_size,
+            batch_size_chars=batch_size_chars):
+        pass
+    return ThroughputStats.from_timings(texts, time.perf_counter() - start)
+
+
+def benchmark_components(cat: CAT, texts: list[str]
+                         ) -> dict[str, ComponentTiming]:
+    """Get the per-component breakdown of the time spent in the pipeline.
+
+    This runs each document through the tokenizer, the core components
+    and the addons (the same way `Pipeline.get_doc` does), timing each.
+
+    Args:
+        cat (CAT): The model.
+        texts (list[str]): The texts.
+
+    Returns:
+        dict[str, ComponentTiming]: The timings per component (in
+            pipeline order).
+    """
+    cat._ensure_not_training()
+    pipe = cat.pipe
+    totals: dict[str, float] = defaultdict(float)
+    for text in texts:
+        start = time.perf_counter()
+        doc: MutableDocument = pipe.tokenizer(text)
+        totals[TOKENIZER_NAME] += time.perf_counter() - start
+        for comp in pipe.iter_all_components():
+            start = time.perf_counter()
+            doc = comp(doc)
+            totals[str(comp.full_name)] += time.perf_counter() - start
+    overall = max(sum(totals.values()), 1e-9)
+    return {name: ComponentTiming(
+        total_seconds=total,
+        mean_ms_per_doc=total * 1000 / max(len(texts), 1),
+        share=total / overall) for name, total in totals.items()}
+
+
+def get_environment() -> dict:
+    """Get the description of the environment the benchmark is ran in.
+
+    Returns:
+        dict: The environment description.
+    """
+    from medcat import __version__
+    return {
+        "medcat_version": __version__,
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+    }
+
+
+def run_benchmarks(cat: CAT, texts: list[str],
+                   n_processes: Iterable[int] = (1, ),
+                   warmup: int = 5,
+                   settings: Optional[dict] = None) -> BenchmarkResults:
+    """Run all the benchmarks.
+
+    Args:
+        cat (CAT): The model.
+        texts (list[str]): The texts to process.
+        n_processes (Iterable[int]): The number of processes to benchmark
+            `get_entities_multi_texts` with. Defaults to (1, ).
+        warmup (int): The number of warmup calls. Defaults to 5.
+        settings (Optional[dict]): The settings (e.g synthetic model size)
+            to include in the results. Defaults to None.
+
+    Returns:
+        BenchmarkResults: The results.
+    """
+    logger.info("Benchmarking get_entities for %d texts", len(texts))
+    get_ents = benchmark_get_entities(cat, texts, warmup=warmup)
+    logger.info("Benchmarking the per-component breakdown")
+    components = benchmark_components(cat, texts)
+    multi_texts: dict[str, ThroughputStats] = {}
+    for n_process in n_processes:
+        logger.info("Benchmarking get_entities_multi_texts with "
+                    "n_process=%d", n_process)
+        multi_texts[f"n_process={n_process}"] = benchmark_multi_texts(
+            cat, texts, n_process, warmup=warmup)
+    return BenchmarkResults(
+        settings=settings or {}, environment=get_environment(),
+        get_entities=get_ents, multi_texts=multi_texts,
+        components=components, peak_rss_mb=get_peak_rss_mb(),
+        peak_children_rss_mb=get_peak_rss_mb(children=True))
@@ -0,0 +1,198 @@
+"""Synthetic models and data for benchmarking.
+
+The data generated here are not meant to be realistic in terms of
+content. But they are meant to be realistic in terms of size and shape
+(i.e number of concepts, names per concept, name lengths, ambiguity and
+the density of mentions in text) so that the performance of the
+pipeline can be tracked over time without needing access to a
+(licensed) model.
+"""
+from typing import Optional
+import random
+
+import numpy as np
+
+from medcat.cdb import CDB
+from medcat.config import Config
+from medcat.preprocessors.cleaners import NameDescriptor
+from medcat.vocab import Vocab
+
+
+_CONSONANTS = "bcdfghjklmnprstvz"
+_VOWELS = "aeiou"
+
+_FILLER_WORDS = [
+    "the", "patient", "was", "seen", "in", "clinic", "today", "with",
+    "a", "history", "of", "and", "no", "evidence", "for", "on",
+    "examination", "reports", "denies", "recent", "mild", "severe",
+    "left", "right", "plan", "to", "review", "started", "treatment",
+    "follow", "up", "weeks", "bloods", "showed", "normal", "noted",
+    "likely", "secondary", "ongoing", "symptoms", "since", "admission",
+]
+
+
+def _make_word(rnd: random.Random, min_syllables: int = 2,
+               max_syllables: int = 4) -> str:
+    return "".join(rnd.choice(_CONSONANTS) + rnd.choice(_VOWELS)
+                   for _ in range(rnd.randint(min_syllables, max_syllables)))
+
+
+def make_name_words(num_words: int, seed: int = 0) -> list[str]:
+    """Make the (unique) words used within the synthetic concept names.
+
+    Args:
+        num_words (int): The number of words to make.
+        seed (int): The random seed. Defaults to 0.
+
+    Returns:
+        list[str]: The words.
+    """
+    rnd = random.Random(seed)
+    words: set[str] = set()
+    filler = set(_FILLER_WORDS)
+    while len(words) < num_words:
+        word = _make_word(rnd)
+        if word not in filler:
+            words.add(word)
+    return sorted(words)
+
+
+def make_synthetic_cdb(config: Config,
+                       num_concepts: int = 10_000,
+                       names_per_concept: int = 3,
+                       max_words_per_name: int = 4,
+                       ambiguity: float = 0.05,
+                       vector_size: int = 300,
+                       seed: int = 0) -> CDB:
+    """Make a synthetic CDB.
+
+    The concepts get some random (trained) context vectors so that the
+    linker does the same work as it would for a real (trained) model.
+
+    Args:
+        config (Config): The config to use.
+        num_concepts (int): The number of concepts. Defaults to 10 000.
+        names_per_concept (int): The number of names per concept.
+            Defaults to 3.
+        max_words_per_name (int): The maximum number of words in a name.
+            Defaults to 4.
+        ambiguity (float): The fraction of names that are shared with
+            another concept. Defaults to 0.05.
+        vector_size (int): The size of the context vectors. This should
+            match the size of the word vectors in the vocab.
+            Defaults to 300.
+        seed (int): The random seed. Defaults to 0.
+
+    Returns:
+        CDB: The synthetic CDB.
+    """
+    rnd = random.Random(seed)
+    np_rnd = np.random.default_rng(seed)
+    sep = config.general.separator
+    words = make_name_words(
+        max(100, num_concepts * names_per_concept // 2), seed=seed)
+    cdb = CDB(config)
+    ctx_types = list(config.components.linking.context_vector_sizes)
+    all_names: list[str] = []
+    for cui_nr in range(num_concepts):
+        cui = f"C{cui_nr:08d}"
+        names: dict[str, NameDescriptor] = {}
+        for _ in range(names_per_concept):
+            if all_names and rnd.random() < ambiguity:
+                name = rnd.choice(all_names)
+                tokens = name.split(sep)
+            else:
+                tokens = rnd.sample(words, rnd.randint(1, max_words_per_name))
+                name = sep.join(tokens)
+            names[name] = NameDescriptor(
+                tokens=tokens,
+                snames={sep.join(tokens[:i + 1]) for i in range(len(tokens))},
+                raw_name=" ".join(tokens), is_upper=False)
+        all_names.extend(names)
+        cdb.add_names(cui, names)
+        cui_info = cdb.cui2info[cui]
+        cui_info['preferred_name'] = next(iter(names.values())).raw_name
+        cui_info['count_train'] = 100
+        cui_info['context_vectors'] = {
+            ctx_type: np_rnd.standard_normal(vector_size).astype(np.float32)
+            for ctx_type in ctx_types}
+    return cdb
+
+
+def make_synthetic_vocab(cdb: CDB, vector_size: int = 300,
+                         num_extra_words: int = 1_000,
+                         seed: int = 0) -> Vocab:
+    """Make a synthetic vocab.
+
+    This includes all the words used in the CDB names, the filler words
+    used in the synthetic corpus, as well as the specified number of
+    additional random words.
+
+    Args:
+        cdb (CDB): The CDB whose name tokens to include.
+        vector_size (int): The size of the word vectors. Defaults to 300.
+        num_extra_words (int): The number of extra words. Defaults to 1 000.
+        seed (int): The random seed. Defaults to 0.
+
+    Returns:
+        Vocab: The synthetic vocab.
+    """
+    rnd = random.Random(seed)
+    np_rnd = np.random.default_rng(seed)
+    words = set(cdb.token_counts) | set(_FILLER_WORDS)
+    while len(words) < len(cdb.token_counts) + len(_FILLER_WORDS) + (
+            num_extra_words):
+        words.add(_make_word(rnd))
+    vocab = Vocab()
+    for word in sorted(words):
+        vocab.add_word(
+            word, cnt=rnd.randint(10, 10_000),
+            vec=np_rnd.standard_normal(vector_size).astype(np.float32))
+    return vocab
+
+
+def make_synthetic_corpus(cdb: CDB, num_docs: int = 100,
+                          words_per_doc: int = 300,
+                          mention_rate: float = 0.1,
+                          seed: int = 0,
+                          names: Optional[list[str]] = None) -> list[str]:
+    """Make a synthetic corpus of clinical-like notes.
+
+    Each document is made up of filler words with mentions of CDB names
+    mixed in.
+
+    Args:
+        cdb (CDB): The CDB whose names to mention.
+        num_docs (int): The number of documents. Defaults to 100.
+        words_per_doc (int): The (approximate) number of words per
+            document. Defaults to 300.
+        mention_rate (float): The fraction of words that start a
+            concept mention. Defaults to 0.1.
+        seed (int): The random seed. Defaults to 0.
+        names (Optional[list[str]]): The names to use. Defaults to all
+            names in the CDB.
+
+    Returns:
+        list[str]: The documents.
+    """
+    rnd = random.Random(seed)
+    sep = cdb.config.general.separator
+    if names is None:
+        names = sorted(cdb.name2info)
+    raw_names = [name.replace(sep, " ") for name in names]
+    docs: list[str] = []
+    for _ in range(num_docs):
+        parts: list[str] = []
+        sentence_len = 0
+        for _ in range(words_per_doc):
+            if raw_names and rnd.random() < mention_rate:
+                parts.append(rnd.choice(raw_names))
+            else:
+                parts.append(rnd.choice(_FILLER_WORDS))
+            sentence_len += 1
+            if sentence_len > rnd.randint(8, 20):
+                parts[-1] += rnd.choice((".", ".", ",", ";"))
+                sentence_len = 0
+        doc = " ".join(parts)
+        docs.append(doc[0].upper() + doc[1:] + ".")
+    return docs
@@ -1,9 +1,10 @@
 from typing import Optional, Union, Any, overload, Literal, Iterable, Iterator
-from typing import cast, Type, TypeVar
+from typing import cast, Type, TypeVar, Callable
 import os
 import json
 from datetime import date
 from concurrent.futures import ProcessPoolExecutor, as_completed, Future
+import multiprocessing as mp
 import itertools
 from contextlib import contextmanager
 from collections import deque
@@ -71,6 +72,7 @@ class CAT(AbstractSerialisable):
             self.config.merge_config(config_dict)
 
         self._trainer: Optional[Trainer] = None
+        self._worker_pool: Optional[CATWorkerPool] = None
         self._pipeline = self._recreate_pipe(model_load_path, addon_config_dict)
         self.usage_monitor = UsageMonitor(
             self._get_hash, self.config.general.usage_monitor)
@@ -102,6 +104,7 @@ class CAT(AbstractSerialisable):
             '_pipeline',  # need to recreate regardless
             'config',  # will be loaded along with CDB
             'usage_monitor',  # will be created at startup
+            '_worker_pool',  # runtime only
         ]
 
     def __call__(self, text: str) -> Optional[MutableDocument]:
@@ -172,10 +175,38 @@ class CAT(AbstractSerialisable):
             return {}
         return self._doc_to_out(doc, only_cui=only_cui)
 
-    def _mp_worker_func(
-            self,
-            texts_and_indices: list[tuple[str, str, bool]]
-            ) -> list[tuple[str, Union[dict, Entities, OnlyCUIEntities]]]:
+    def get_entities_batch(self,
+                           texts: Iterable[str],
+                           only_cui: bool = False,
+                           ) -> list[Union[dict, Entities, OnlyCUIEntities]]:
+        """Get the entities recognised and linked within a batch of texts.
+
+        This runs the entire batch through each component of the pipeline
+        at once (see `Pipeline.get_docs`) which allows the components that
+        support it to process the batch together.
+
+        Args:
+            texts (Iterable[str]): The texts to use.
+            only_cui (bool, optional): Whether to only output the CUIs
+                rather than the entire context. Defaults to False.
+
+        Returns:
+            list[Union[dict, Entities, OnlyCUIEntities]]: The entities found
+                and linked within each text (in input order).
+        """
+        self._ensure_not_training()
+        docs = self._get_docs(texts)
+        return [self._doc_to_out(doc, only_cui=only_cui) for doc in docs]
+
+    def _get_docs(self, texts: Iterable[str]) -> list[MutableDocument]:
+        docs = self._pipeline.get_docs(texts)
+        if self.usage_monitor.should_monitor:
+            for doc in docs:
+                self.usage_monitor.log_inference(
+                    len(doc.base.text), len(doc.linked_ents))
+        return docs
+
+    def _init_addon_data_paths(self) -> None:
         # NOTE: this is needed for subprocess as otherwise they wouldn't have
         #       any of these set
         # NOTE: these need to by dynamic in case the extra's aren't included
@@ -195,9 +226,23 @@ class CAT(AbstractSerialisable):
                 addon._init_data_paths(self._pipeline.tokenizer)
             elif has_rel_cat and isinstance(addon, RelCATAddon):
                 addon._rel_cat._init_data_paths()
+
+    def _get_entities_for_batch(
+            self,
+            texts_and_indices: list[tuple[str, str, bool]]
+            ) -> list[tuple[str, Union[dict, Entities, OnlyCUIEntities]]]:
+        self._ensure_not_training()
+        docs = self._get_docs(text for text, _, _ in texts_and_indices)
         return [
-            (text_index, self.get_entities(text, only_cui=only_cui))
-            for text, text_index, only_cui in texts_and_indices]
+            (text_index, self._doc_to_out(doc, only_cui=only_cui))
+            for doc, (_, text_index, only_cui) in zip(docs, texts_and_indices)]
+
+    def _mp_worker_func(
+            self,
+            texts_and_indices: list[tuple[str, str, bool]]
+            ) -> list[tuple[str, Union[dict, Entities, OnlyCUIEntities]]]:
+        self._init_addon_data_paths()
+        return self._get_entities_for_batch(texts_and_indices)
 
     def _generate_batches_by_char_length(
             self,
@@ -274,14 +319,19 @@ class CAT(AbstractSerialisable):
             batch_iter: Iterator[list[tuple[str, str, bool]]],
             external_processes: int,
             saver: Optional[BatchAnnotationSaver],
+            worker_func: Optional[Callable[
+                [list[tuple[str, str, bool]]],
+                list[tuple[str, Union[dict, Entities, OnlyCUIEntities]]]
+            ]] = None,
             ) -> Iterator[tuple[str, Union[dict, Entities, OnlyCUIEntities]]]:
+        if worker_func is None:
+            worker_func = self._mp_worker_func
         futures: list[Future] = []
         # submit batches, one for each external processes
         for _ in range(external_processes):
             try:
                 batch = next(batch_iter)
-                futures.append(
-                    executor.submit(self._mp_worker_func, batch))
+                futures.append(executor.submit(worker_func, batch))
             except StopIteration:
                 break
         if not futures:
@@ -386,6 +436,10 @@ class CAT(AbstractSerialisable):
         and data will be processed on those as well as the main process in
         parallel.
 
+        If a persistent worker pool has been started (see `start_workers`),
+        the batches are dispatched to the pool's workers (as well as the main
+        process) instead and `n_process` is ignored.
+
         Args:
             texts (Union[Iterable[str], Iterable[tuple[str, str]]]):
                 The input text. Either an iterable of raw text or one
@@ -437,6 +491,13 @@ class CAT(AbstractSerialisable):
             batch_iter: Iterator[list[tuple[str, str, bool]]],
             saver: Optional[BatchAnnotationSaver],
             ) -> Iterator[tuple[str, Union[dict, Entities, OnlyCUIEntities]]]:
+        if self._worker_pool is not None:
+            yield from self._multiprocess_with_pool(
+                self._worker_pool, batch_iter, saver)
+            if saver:
+                # save remainder
+                saver._save_cache()
+            return
         if n_process == 1:
             # just do in series
             for batch in batch_iter:
@@ -491,6 +552,88 @@ class CAT(AbstractSerialisable):
                 except OutOfDataException:
                     break
 
+    def _multiprocess_with_pool(
+            self, pool: 'CATWorkerPool',
+            batch_iter: Iterator[list[tuple[str, str, bool]]],
+            saver: Optional[BatchAnnotationSaver],
+            ) -> Iterator[tuple[str, Union[dict, Entities, OnlyCUIEntities]]]:
+        while True:
+            try:
+                yield from self._mp_one_batch_per_process(
+                    pool._executor, batch_iter, pool.n_workers, saver=saver,
+                    worker_func=_pool_worker_func)
+            except OutOfDataException:
+                break
+
+    def start_workers(self, n_workers: int,
+                      model_pack_path: Optional[str] = None
+                      ) -> 'CATWorkerPool':
+        """Start a persistent pool of worker processes.
+
+        Each worker gets its own copy of the model exactly once (at start up).
+        After that, only the batches of texts and the resulting entities are
+        sent between the processes. While the pool is running, it is used by
+        `get_entities_multi_texts` and `save_entities_multi_texts`.
+
+        If the model pack path is specified, each worker loads the model
+        off disk. Otherwise, this CAT instance is pickled and sent to each
+        worker once. The model pack at the path is expected to correspond to
+        this instance.
+
+        Args:
+            n_workers (int): The number of worker processes to start.
+            model_pack_path (Optional[str]): The model pack path (zip or
+                folder) to load the model from within workers.
+                Defaults to None.
+
+        Raises:
+            WorkerPoolError: If a worker pool is already running.
+
+        Returns:
+            CATWorkerPool: The running worker pool.
+        """
+        if self._worker_pool is not None:
+            raise WorkerPoolError(
+                "A worker pool is already running. Stop it (`stop_workers`) "
+                "before starting a new one.")
+        if model_pack_path is not None and model_pack_path.endswith(".zip"):
+            # NOTE: unpack in the main process so that the workers
+            #       don't race each other to do it
+            model_pack_path = self.attempt_unpack(model_pack_path)
+        self._worker_pool = CATWorkerPool(
+            self, n_workers, model_pack_path=model_pack_path,
+            force_spawn=self.FORCE_SPAWN_MP)
+        return self._worker_pool
+
+    def stop_workers(self) -> None:
+        """Stop the persistent worker pool (if one is running)."""
+        if self._worker_pool is None:
+            return
+        self._worker_pool.shutdown()
+        self._worker_pool = None
+
+    @contextmanager
+    def worker_pool(self, n_workers: int,
+                    model_pack_path: Optional[str] = None
+                    ) -> Iterator['CATWorkerPool']:
+        """Run a persistent pool of worker processes within a context.
+
+        See `start_workers` for details.
+
+        Args:
+            n_workers (int): The number of worker processes to start.
+            model_pack_path (Optional[str]): The model pack path to load the
+                model from within workers. Defaults to None.
+
+        Yields:
+            CATWorkerPool: The running worker pool.
+        """
+        pool = self.start_workers(n_workers, model_pack_path)
+        try:
+            yield pool
+        finally:
+            self.stop_workers()
+
     def _get_entity(self, ent: MutableEntity,
                     doc_tokens: list[str],
                     cui: str) -> Entity:
@@ -1031,3 +1174,85 @@ class CAT(AbstractSerialisable):
 
 class OutOfDataException(ValueError):
     pass
+
+
+class WorkerPoolError(ValueError):
+
+    def __init__(self, *args):
+        super().__init__(*args)
+
+
+# NOTE: the model used within a worker process of a `CATWorkerPool`
+_WORKER_CAT: Optional[CAT] = None
+
+
+def _init_pool_worker(cat: Optional[CAT],
+                      model_pack_path: Optional[str]) -> None:
+    global _WORKER_CAT
+    if model_pack_path is not None:
+        cat = CAT.load_model_pack(model_pack_path)
+    if cat is None:
+        raise WorkerPoolError(
+            "Need either a CAT or a model pack path for a pool worker")
+    cat._init_addon_data_paths()
+    _WORKER_CAT = cat
+
+
+def _pool_worker_ready() -> bool:
+    return _WORKER_CAT is not None
+
+
+def _pool_worker_func(
+        texts_and_indices: list[tuple[str, str, bool]]
+        ) -> list[tuple[str, Union[dict, Entities, OnlyCUIEntities]]]:
+    if _WORKER_CAT is None:
+        raise WorkerPoolError("The pool worker has not been initialised")
+    return _WORKER_CAT._get_entities_for_batch(texts_and_indices)
+
+
+class CATWorkerPool:
+    """A persistent pool of worker processes for multi-text inference.
+
+    Each worker holds its own copy of the model which is either loaded
+    off disk or unpickled from the CAT it was started with. This only
+    happens once per worker (at start up). After that, only batches of
+    texts and the resulting entities cross the process boundary.
+
+    The workers are started (and the model loaded within them) eagerly
+    so that the model is ready by the time the pool is used.
+
+    Args:
+        cat (CAT): The model to use.
+        n_workers (int): The number of worker processes.
+        model_pack_path (Optional[str]): The (unpacked) model pack path
+            to load the model from within workers. Defaults to None.
+        force_spawn (bool): Whether to use the 'spawn' start method.
+            Defaults to True.
+    """
+
+    def __init__(self, cat: CAT, n_workers: int,
+                 model_pack_path: Optional[str] = None,
+                 force_spawn: bool = True) -> None:
+        if n_workers < 1:
+            raise WorkerPoolError(
+                f"Need at least 1 worker for a worker pool, got {n_workers}")
+        self.n_workers = n_workers
+        self.model_pack_path = model_pack_path
+        mp_context = mp.get_context("spawn") if force_spawn else None
+        self._executor = ProcessPoolExecutor(
+            max_workers=n_workers, mp_context=mp_context,
+            initializer=_init_pool_worker,
+            initargs=(None if model_pack_path else cat, model_pack_path))
+        logger.info("Starting %d pool workers", n_workers)
+        # NOTE: the CAT is pickled when each process gets spawned, so
+        #       the usage monitor flushing needs to be avoided for that
+        with cat._no_usage_monitor_exit_flushing():
+            ready = [self._executor.submit(_pool_worker_ready)
+                     for _ in range(n_workers)]
+            for future in ready:
+                future.result()
+
+    def shutdown(self) -> None:
+        """Shut down the workers."""
+        logger.info("Shutting down %d pool workers", self.n_workers)
+        self._executor.shutdown(wait=True)
@@ -1,4 +1,5 @@
-from typing import Iterable, Any, Collection, Union, Literal, Sequence
+from typing import (Iterable, Any, Collection, Union, Literal, Sequence,
+                    Optional)
 import os
 
 from medcat.storage.serialisables import AbstractSerialisable
@@ -34,19 +35,111 @@ class CDB(AbstractSerialisable):
         self.token_counts: dict[str, int] = {}
         self.addl_info: dict[str, Any] = {}
         self._subnames: set[str] = set()
+        # NOTE: the number of concepts each subname belongs to
+        #       this is only built when (and if) concepts are removed
+        self._subname_refs: Optional[dict[str, int]] = None
+        # NOTE: whether the subnames are known to be complete
+        #       until then, they are not updated incrementally
+        self._subnames_built = False
         self.is_dirty = False
         self.has_changed_names = False
+        # NOTE: these are persisted so that components saved alongside
+        #       the CDB can tell whether they are still up to date upon load
+        self._names_version = 0
+        self._names_removed_version = 0
+        self._token_counts_version = 0
 
     @classmethod
     def get_init_attrs(cls) -> list[str]:
         return ['config']
 
+    @classmethod
+    def ignore_attrs(cls) -> list[str]:
+        return ['_subname_refs', '_subnames_built']
+
+    @property
+    def token_counts_version(self) -> int:
+        """The number of times the token counts have been changed.
+
+        This allows components that depend on the token counts to
+        know when they (may) need to update.
+        """
+        return self._token_counts_version
+
+    @property
+    def names_version(self) -> int:
+        """The number of times names have been added to or removed from the
+        CDB.
+
+        This allows components that depend on the names to know when they
+        (may) need to update. Unlike `has_changed_names`, this is never
+        reset, so any number of components can keep track of it.
+        """
+        return self._names_version
+
+    @property
+    def names_removed_version(self) -> int:
+        """The number of times names have been removed from the CDB.
+
+        This allows components that can add new names incrementally to
+        know when they (may) need to rebuild altogether.
+        """
+        return self._names_removed_version
+
+    def _on_names_removed(self) -> None:
+        self.has_changed_names = True
+        self._names_version += 1
+        self._names_removed_version += 1
+
     def _reset_subnames(self):
         logger.info("Resetting subnames")
         self._subnames.clear()
         for info in self.cui2info.values():
             self._subnames.update(info['subnames'])
-        self.has_changed_names = False
+        self._subname_refs = None
+        self._subnames_built = True
+
+    def _ensure_subnames(self) -> None:
+        if self._subnames_built:
+            return
+        # NOTE: the subnames may have been loaded from disk (or set
+        #       elsewhere) in which case they are only rebuilt if they
+        #       seem to be missing (e.g they were cleared before saving)
+        if len(self._subnames) < len(self.name2info):
+            self._reset_subnames()
+        else:
+            self._subnames_built = True
+
+    def _get_subname_refs(self) -> dict[str, int]:
+        if self._subname_refs is None:
+            logger.info("Counting subname references")
+            refs: dict[str, int] = {}
+            for info in self.cui2info.values():
+                for sname in info['subnames']:
+                    refs[sname] = refs.get(sname, 0) + 1
+            self._subname_refs = refs
+        return self._subname_refs
+
+    def _add_subnames(self, subnames: Iterable[str]) -> None:
+        # NOTE: expects subnames that are new to the concept
+        self._ensure_subnames()
+        self._subnames.update(subnames)
+        refs = self._subname_refs
+        if refs is not None:
+            for sname in subnames:
+                refs[sname] = refs.get(sname, 0) + 1
+
+    def _remove_subnames(self, subnames: Iterable[str]) -> None:
+        # NOTE: expects subnames of a concept that is being removed
+        self._ensure_subnames()
+        refs = self._get_subname_refs()
+        for sname in subnames:
+            num_refs = refs.get(sname, 0) - 1
+            if num_refs > 0:
+                refs[sname] = num_refs
+            else:
+                refs.pop(sname, None)
+                self._subnames.discard(sname)
 
     def has_subname(self, name: str) -> bool:
         """Whether the CDB has the specified subname.
@@ -57,9 +150,10 @@ class CDB(AbstractSerialisable):
         Returns:
             bool: Whether the subname is present in this CDB.
         """
-        if (self.has_changed_names or
-                len(self._subnames) < len(self.name2info)):
-            self._reset_subnames()
+        # NOTE: the subnames are kept up to date as names are added
+        #       and removed, so this only builds them if needed
+        if not self._subnames_built:
+            self._ensure_subnames()
         return name in self._subnames
 
     def get_name(self, cui: str) -> str:
@@ -149,10 +243,13 @@ class CDB(AbstractSerialisable):
         for name, in_name_info in names.items():
             # add name and synonyms
             cui_info['names'].add(name)
-            cui_info['subnames'].update(in_name_info.snames)
+            new_snames = set(in_name_info.snames).difference(
+                cui_info['subnames'])
+            cui_info['subnames'].update(new_snames)
 
             if name not in self.name2info:
                 self.name2info[name] = get_new_name_info(name=name)
+                self._names_version += 1
             # Add whether concept is uppercase
             name_info = self.name2info[name]
             name_info['is_upper'] = in_name_info.is_upper
@@ -170,7 +267,8 @@ class CDB(AbstractSerialisable):
                     self.token_counts[token] += 1
                 else:
                     self.token_counts[token] = 1
-            self._subnames.update(cui_info['subnames'])
+            self._token_counts_version += 1
+            self._add_subnames(new_snames)
             self.is_dirty = True
 
     def _add_full_build(self, cui: str, names: dict[str, NameDescriptor],
@@ -287,7 +385,6 @@ class CDB(AbstractSerialisable):
             reset_cui_training(cui_info)
         for name_info in self.name2info.values():
             name_info['count_train'] = 0
-        self._subnames.clear()
         # clear config entries as well
         self.config.meta.unsup_trained.clear()
         self.config.meta.sup_trained.clear()
@@ -342,6 +439,10 @@ class CDB(AbstractSerialisable):
                 # NOTE: already warned above
                 continue
             new_cui2info[cui] = self.cui2info[cui]
+        # remove the subnames of the concepts that are filtered out
+        for cui, ci in self.cui2info.items():
+            if cui not in new_cui2info:
+                self._remove_subnames(ci['subnames'])
 
         for name in names_to_keep:
             # NOTE: should all be in name2info since got from cui2info
@@ -350,22 +451,22 @@ class CDB(AbstractSerialisable):
         # set filtered dicts
         self.cui2info = new_cui2info
         self.name2info = new_name2info
-        # redo all subnames
-        self._reset_subnames()
         self.is_dirty = True
+        self._on_names_removed()
 
     def remove_cuis_bulk(self, cuis: Sequence[str]) -> None:
         for cui in cuis:
             self._remove_cui(cui)
-        # reset subnames once
-        self._reset_subnames()
+        self.is_dirty = True
 
     def _remove_cui(self, cui: str) -> None:
-        # NOTE: remove CUI without doing a subname reset
         if cui not in self.cui2info:
             logger.warning(
                 "Trying remove CUI '%s' which does not exist in CDB", cui)
             return
+        # NOTE: need to remove subnames before the concept is removed
+        #       in case the references haven't been counted yet
+        self._remove_subnames(self.cui2info[cui]['subnames'])
         ci = self.cui2info.pop(cui)
         for name in ci['names']:
             ni = self.name2info[name]
@@ -373,6 +474,7 @@ class CDB(AbstractSerialisable):
             # if name name corresponds to no CUIs
             if not ni['per_cui_status']:
                 del self.name2info[name]
+                self._on_names_removed()
 
     def remove_cui(self, cui: str) -> None:
         """This function takes a CUI and removes it the CDB.
@@ -385,8 +487,6 @@ class CDB(AbstractSerialisable):
             cui (str): The CUI to remove.
         """
         self._remove_cui(cui)
-        # need to reset subnames
-        self._reset_subnames()
         self.is_dirty = True
 
     def _remove_names(self, cui: str, names: Iterable[str]) -> None:
@@ -433,7 +533,7 @@ class CDB(AbstractSerialisable):
                         elif cuis2status[_cui] == 'P':
                             cuis2status[_cui] = 'PD'
         self.is_dirty = True
-        self.has_changed_names = True
+        self._on_names_removed()
 
     def __eq__(self, other: Any) -> bool:
         if not isinstance(other, CDB):
@@ -460,12 +560,16 @@ class CDB(AbstractSerialisable):
             if (ct := ni['count_train'])
         }
 
+    def _num_subnames(self) -> int:
+        self._ensure_subnames()
+        return len(self._subnames)
+
     def get_hash(self) -> str:
         hasher = Hasher()
         # only length for number of cuis/names/subnames
         hasher.update(len(self.cui2info))
         hasher.update(len(self.name2info))
-        hasher.update(len(self._subnames))
+        hasher.update(self._num_subnames())
         # the entirety of trained stuff
         hasher.update(self.get_cui2count_train())
         hasher.update(self.get_name2count_train())
@@ -0,0 +1,422 @@
+from typing import Any, Iterator, Mapping, Optional, cast
+from types import MappingProxyType
+import sys
+
+import numpy as np
+
+from medcat.cdb.cdb import CDB
+from medcat.cdb.concepts import CUIInfo, NameInfo
+from medcat.cdb.concepts import get_new_cui_info, get_new_name_info
+from medcat.config import Config
+
+
+# the optional parts of the CUI info that are stored as is (if present)
+_CUI_EXTRAS = ('description', 'original_names', 'tags', 'group',
+               'in_other_ontology')
+
+
+def _to_csr(groups: list[list[int]], dtype: type = np.int32
+            ) -> tuple[np.ndarray, np.ndarray]:
+    ptr = np.zeros(len(groups) + 1, dtype=np.int64)
+    ptr[1:] = np.cumsum([len(group) for group in groups])
+    ids = np.fromiter((el for group in groups for el in group),
+                      dtype=dtype, count=int(ptr[-1]))
+    return ptr, ids
+
+
+class CompactConceptStore:
+    """The array backed storage for the concepts and names of a CDB.
+
+    This holds:
+    - Interned string tables for CUIs, names (and subnames), type IDs
+      and statuses
+    - CSR-style (pointer and ID array) mappings for the CUI to names,
+      CUI to subnames, CUI to type IDs and name to CUIs relationships
+    - A byte array for the status of each name-CUI pair
+    - Arrays for the per CUI and per name training data
+    - A matrix per context type with the context vectors of the CUIs
+
+    The string to ID maps are not serialised, but are rebuilt upon load.
+
+    Args:
+        cui2info (Mapping[str, CUIInfo]): The CUI to info map to compact.
+        name2info (Mapping[str, NameInfo]): The name to info map to compact.
+    """
+
+    def __init__(self, cui2info: Mapping[str, CUIInfo],
+                 name2info: Mapping[str, NameInfo]) -> None:
+        self.cuis = [sys.intern(cui) for cui in cui2info]
+        self.names = [sys.intern(name) for name in name2info]
+        # NOTE: the names make up the start of the string table
+        #       with the subnames and preferred names following
+        strings = list(self.names)
+        str2id = {name: ind for ind, name in enumerate(strings)}
+        cui2id = {cui: ind for ind, cui in enumerate(self.cuis)}
+        type_ids: list[str] = []
+        type2id: dict[str, int] = {}
+        self.statuses: list[str] = []
+        status2id: dict[str, int] = {}
+
+        def _str_id(val: str) -> int:
+            if val not in str2id:
+                str2id[val] = len(strings)
+                strings.append(sys.intern(val))
+            return str2id[val]
+
+        def _type_id(val: str) -> int:
+            if val not in type2id:
+                type2id[val] = len(type_ids)
+                type_ids.append(sys.intern(val))
+            return type2id[val]
+
+        def _status_id(val: str) -> int:
+            if val not in status2id:
+                status2id[val] = len(self.statuses)
+                self.statuses.append(val)
+            return status2id[val]
+
+        cui_names: list[list[int]] = []
+        cui_subnames: list[list[int]] = []
+        cui_types: list[list[int]] = []
+        pref_names = np.full(len(self.cuis), -1, dtype=np.int32)
+        self.cui_count_train = np.zeros(len(self.cuis), dtype=np.int64)
+        self.cui_average_confidence = np.zeros(len(self.cuis),
+                                               dtype=np.float64)
+        self.cui_extras: dict[int, dict[str, Any]] = {}
+        raw_cvs: dict[str, dict[int, np.ndarray]] = {}
+        for ind, info in enumerate(cui2info.values()):
+            # NOTE: a CUI may have names that are no longer in name2info
+            cui_names.append(sorted(_str_id(name) for name in info['names']))
+            cui_subnames.append(sorted(_str_id(sname)
+                                       for sname in info['subnames']))
+            cui_types.append([_type_id(tid) for tid in info['type_ids']])
+            if info['preferred_name']:
+                pref_names[ind] = _str_id(info['preferred_name'])
+            self.cui_count_train[ind] = info['count_train']
+            self.cui_average_confidence[ind] = info['average_confidence']
+            extras = {key: info[key] for key in _CUI_EXTRAS  # type: ignore
+                      if info[key] is not None}  # type: ignore
+            if extras:
+                self.cui_extras[ind] = extras
+            for ct, vec in (info['context_vectors'] or {}).items():
+                raw_cvs.setdefault(ct, {})[ind] = vec
+        self.cui_names_ptr, self.cui_names = _to_csr(cui_names)
+        self.cui_subnames_ptr, self.cui_subnames = _to_csr(cui_subnames)
+        self.cui_types_ptr, self.cui_types = _to_csr(cui_types)
+        self.cui_pref_names = pref_names
+
+        name_cuis: list[list[int]] = []
+        name_statuses: list[list[int]] = []
+        self.name_is_upper = np.zeros(len(self.names), dtype=bool)
+        self.name_count_train = np.zeros(len(self.names), dtype=np.int64)
+        for ind, ninfo in enumerate(name2info.values()):
+            pcs = ninfo['per_cui_status']
+            name_cuis.append([cui2id[cui] for cui in pcs])
+            name_statuses.append([_status_id(status)
+                                  for status in pcs.values()])
+            self.name_is_upper[ind] = ninfo['is_upper']
+            self.name_count_train[ind] = ninfo['count_train']
+        self.name_cuis_ptr, self.name_cuis = _to_csr(name_cuis)
+        _, self.name_cui_statuses = _to_csr(name_statuses, dtype=np.uint8)
+
+        self.is_subname = np.zeros(len(strings), dtype=bool)
+        self.is_subname[self.cui_subnames] = True
+        self.strings = strings
+        self.type_ids = type_ids
+
+        self.context_vectors: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        for ct, ind2vec in raw_cvs.items():
+            dims = len(next(iter(ind2vec.values())))
+            mat = np.zeros((len(self.cuis), dims), dtype=np.float32)
+            has = np.zeros(len(self.cuis), dtype=bool)
+            for ind, vec in ind2vec.items():
+                mat[ind] = vec
+                has[ind] = True
+            self.context_vectors[ct] = (mat, has)
+        self._init_lookups()
+
+    def _init_lookups(self) -> None:
+        self.str2id = {val: ind for ind, val in enumerate(self.strings)}
+        self.cui2id = {cui: ind for ind, cui in enumerate(self.cuis)}
+        # NOTE: the cached context vectors per CUI
+        self._cv_cache: dict[int, dict[str, np.ndarray]] = {}
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = self.__dict__.copy()
+        for key in ('str2id', 'cui2id', '_cv_cache'):
+            del state[key]
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._init_lookups()
+
+    def get_name_id(self, name: str) -> int:
+        """Get the index of the name (or -1 if there's no such name).
+
+        Args:
+            name (str): The name.
+
+        Returns:
+            int: The index of the name, or -1 if not present.
+        """
+        sid = self.str2id.get(name, -1)
+        # NOTE: the names are at the start of the string table
+        return sid if sid < len(self.names) else -1
+
+    def has_subname(self, name: str) -> bool:
+        sid = self.str2id.get(name, -1)
+        return sid >= 0 and bool(self.is_subname[sid])
+
+    @property
+    def num_subnames(self) -> int:
+        return int(self.is_subname.sum())
+
+    def _strs(self, ptr: np.ndarray, ids: np.ndarray, ind: int,
+              table: list[str]) -> frozenset[str]:
+        return frozenset(table[sid] for sid in ids[ptr[ind]:ptr[ind + 1]])
+
+    def get_cui_part(self, ind: int, key: str) -> Any:
+        if key == 'cui':
+            return self.cuis[ind]
+        elif key == 'preferred_name':
+            sid = self.cui_pref_names[ind]
+            return self.strings[sid] if sid >= 0 else ''
+        elif key == 'names':
+            return self._strs(self.cui_names_ptr, self.cui_names, ind,
+                              self.strings)
+        elif key == 'subnames':
+            return self._strs(self.cui_subnames_ptr, self.cui_subnames, ind,
+                              self.strings)
+        elif key == 'type_ids':
+            return self._strs(self.cui_types_ptr, self.cui_types, ind,
+                              self.type_ids)
+        elif key == 'count_train':
+            return int(self.cui_count_train[ind])
+        elif key == 'average_confidence':
+            return float(self.cui_average_confidence[ind])
+        elif key == 'context_vectors':
+            return self._get_context_vectors(ind)
+        elif key in _CUI_EXTRAS:
+            return self.cui_extras.get(ind, {}).get(key, None)
+        raise KeyError(key)
+
+    def _get_context_vectors(self, ind: int
+                             ) -> Optional[dict[str, np.ndarray]]:
+        # NOTE: cached so that the same (identical) vectors are returned
+        #       every time which allows consumers to cache derived data
+        if ind in self._cv_cache:
+            return self._cv_cache[ind] or None
+        cvs = {ct: mat[ind] for ct, (mat, has) in self.context_vectors.items()
+               if has[ind]}
+        self._cv_cache[ind] = cvs
+        return cvs or None
+
+    def get_name_part(self, ind: int, key: str) -> Any:
+        if key == 'name':
+            return self.names[ind]
+        elif key == 'per_cui_status':
+            start, end = self.name_cuis_ptr[ind], self.name_cuis_ptr[ind + 1]
+            return MappingProxyType({
+                self.cuis[cid]: self.statuses[sid] for cid, sid in zip(
+                    self.name_cuis[start:end],
+                    self.name_cui_statuses[start:end])})
+        elif key == 'is_upper':
+            return bool(self.name_is_upper[ind])
+        elif key == 'count_train':
+            return int(self.name_count_train[ind])
+        raise KeyError(key)
+
+
+class _InfoView(Mapping[str, Any]):
+    _keys: tuple[str, ...]
+
+    def __init__(self, store: CompactConceptStore, ind: int) -> None:
+        self._store = store
+        self._ind = ind
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)})"
+
+
+class _CUIInfoView(_InfoView):
+    _keys = tuple(get_new_cui_info('', '').keys())
+
+    def __getitem__(self, key: str) -> Any:
+        return self._store.get_cui_part(self._ind, key)
+
+
+class _NameInfoView(_InfoView):
+    _keys = tuple(get_new_name_info('').keys())
+
+    def __getitem__(self, key: str) -> Any:
+        return self._store.get_name_part(self._ind, key)
+
+
+class CompactCUIInfoMap(Mapping[str, CUIInfo]):
+    """A read-only CUI to info mapping backed by a compact store.
+
+    The CUI info is read from the underlying arrays upon access.
+    Sets (i.e names, subnames and type IDs) are provided as frozen sets.
+
+    Args:
+        store (CompactConceptStore): The underlying store.
+    """
+
+    def __init__(self, store: CompactConceptStore) -> None:
+        self._store = store
+
+    def __getitem__(self, cui: str) -> CUIInfo:
+        return cast(CUIInfo, _CUIInfoView(self._store,
+                                          self._store.cui2id[cui]))
+
+    def __contains__(self, cui: object) -> bool:
+        return cui in self._store.cui2id
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store.cuis)
+
+    def __len__(self) -> int:
+        return len(self._store.cuis)
+
+
+class CompactNameInfoMap(Mapping[str, NameInfo]):
+    """A read-only name to info mapping backed by a compact store.
+
+    The name info is read from the underlying arrays upon access.
+    The per CUI status is provided as a read-only mapping.
+
+    Args:
+        store (CompactConceptStore): The underlying store.
+    """
+
+    def __init__(self, store: CompactConceptStore) -> None:
+        self._store = store
+
+    def __getitem__(self, name: str) -> NameInfo:
+        ind = self._store.get_name_id(name)
+        if ind < 0:
+            raise KeyError(name)
+        return cast(NameInfo, _NameInfoView(self._store, ind))
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self._store.get_name_id(name) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store.names)
+
+    def __len__(self) -> int:
+        return len(self._store.names)
+
+
+class CompactCDBIsReadOnlyError(ValueError):
+
+    def __init__(self, *args):
+        super().__init__(*args)
+
+
+class CompactCDB(CDB):
+    """A frozen, inference only, CDB with a compact memory layout.
+
+    The concepts and names are held in a `CompactConceptStore` (i.e in
+    interned string tables and numpy arrays) rather than in a dict of
+    dicts and sets per concept and name. They are exposed through the same
+    `cui2info` and `name2info` mapping interfaces as in a regular CDB.
+
+    The concepts and names can not be changed. This means that the CDB can
+    not be trained. If one needs to change the CDB, they can use `to_cdb`
+    to get a regular CDB and `from_cdb` to get the compact version back.
+
+    Args:
+        config (Config): The config.
+    """
+
+    def __init__(self, config: Config) -> None:
+        super().__init__(config)
+        self._set_store(CompactConceptStore({}, {}))
+
+    def _set_store(self, store: CompactConceptStore) -> None:
+        self.cui2info = CompactCUIInfoMap(store)  # type: ignore
+        self.name2info = CompactNameInfoMap(store)  # type: ignore
+
+    @property
+    def _store(self) -> CompactConceptStore:
+        return cast(CompactCUIInfoMap, self.cui2info)._store
+
+    @classmethod
+    def from_cdb(cls, cdb: CDB) -> 'CompactCDB':
+        """Create a compact CDB based on a regular CDB.
+
+        NOTE: The config, type info, token counts and additional info
+              are shared with the original CDB.
+
+        Args:
+            cdb (CDB): The regular CDB.
+
+        Returns:
+            CompactCDB: The compact CDB.
+        """
+        compact = cls(cdb.config)
+        compact._set_store(CompactConceptStore(cdb.cui2info, cdb.name2info))
+        compact.type_id2info = cdb.type_id2info
+        compact.token_counts = cdb.token_counts
+        compact.addl_info = cdb.addl_info
+        return compact
+
+    def to_cdb(self) -> CDB:
+        """Convert to a regular (mutable) CDB.
+
+        Returns:
+            CDB: The regular CDB.
+        """
+        cdb = CDB(self.config)
+        for cui, ci in self.cui2info.items():
+            cvs = ci['context_vectors']
+            cdb.cui2info[cui] = get_new_cui_info(
+                cui=cui, preferred_name=ci['preferred_name'],
+                names=set(ci['names']), subnames=set(ci['subnames']),
+                type_ids=set(ci['type_ids']),
+                count_train=ci['count_train'],
+                context_vectors=({ct: np.array(vec)
+                                  for ct, vec in cvs.items()}
+                                 if cvs else None),
+                average_confidence=ci['average_confidence'],
+                **{key: ci[key] for key in _CUI_EXTRAS})  # type: ignore
+        for name, ni in self.name2info.items():
+            cdb.name2info[name] = get_new_name_info(
+                name=name, per_cui_status=dict(ni['per_cui_status']),
+                is_upper=ni['is_upper'], count_train=ni['count_train'])
+        cdb.type_id2info = self.type_id2info
+        cdb.token_counts = self.token_counts
+        cdb.addl_info = self.addl_info
+        cdb._reset_subnames()
+        return cdb
+
+    def _reset_subnames(self):
+        # NOTE: the subnames are a part of the compact store
+        self.has_changed_names = False
+
+    def has_subname(self, name: str) -> bool:
+        return self._store.has_subname(name)
+
+    def _num_subnames(self) -> int:
+        return self._store.num_subnames
+
+    def _is_read_only(self, *args, **kwargs) -> None:
+        raise CompactCDBIsReadOnlyError(
+            "The concepts and names of a CompactCDB cannot be changed. "
+            "Use `CompactCDB.to_cdb` to get a mutable CDB.")
+
+    add_names = _is_read_only  # type: ignore
+    _add_concept = _is_read_only  # type: ignore
+    reset_training = _is_read_only  # type: ignore
+    filter_by_cui = _is_read_only  # type: ignore
+    remove_cuis_bulk = _is_read_only  # type: ignore
+    remove_cui = _is_read_only  # type: ignore
+    _remove_names = _is_read_only  # type: ignore
@@ -1,6 +1,6 @@
 import logging
 import os
-from typing import Optional, Union, overload
+from typing import Optional, Union, overload, cast
 from transformers.models.bert.tokenization_bert_fast import BertTokenizerFast
 
 from medcat.components.addons.meta_cat.mctokenizers.tokenizers import (
@@ -57,6 +57,10 @@ class TokenizerWrapperBERT(TokenizerWrapperBase):
             raise Exception("Unsupported input type, supported: text/list, "
                             f"but got: {type(text)}")
 
+    def _to_str(self) -> str:
+        hf_tokenizer = cast(BertTokenizerFast, self.ensure_tokenizer())
+        return hf_tokenizer.backend_tokenizer.to_str()
+
     def save(self, dir_path: str) -> None:
         self.hf_tokenizers = self.ensure_tokenizer()
         path = os.path.join(dir_path, self.name)
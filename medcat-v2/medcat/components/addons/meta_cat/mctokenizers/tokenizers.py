@@ -3,6 +3,7 @@ from typing import Optional, Union, overload
 from tokenizers import Tokenizer
 
 from medcat.config.config_meta_cat import ConfigMetaCAT
+from medcat.utils.hasher import Hasher
 
 
 FAKE_TOKENIZER_PATH = "#\n/fake-path-not-exist#/"
@@ -14,6 +15,7 @@ class TokenizerWrapperBase(ABC):
 
     def __init__(self, hf_tokenizer: Optional[Tokenizer] = None) -> None:
         self.hf_tokenizers = hf_tokenizer
+        self._fingerprint: Optional[tuple[Tokenizer, str]] = None
 
     @overload
     def __call__(self, text: str) -> dict: ...
@@ -42,6 +44,29 @@ class TokenizerWrapperBase(ABC):
     @abstractmethod
     def get_pad_id(self) -> Union[Optional[int], list[int]]: ...
 
+    def _to_str(self) -> str:
+        # the full (JSON) state of the tokenizer: vocab, merges, settings
+        return self.ensure_tokenizer().to_str()
+
+    def get_fingerprint(self) -> str:
+        """Get the fingerprint of the tokenizer.
+
+        Tokenizers with the same fingerprint produce the same tokens for
+        the same text. This allows multiple MetaCAT models to share the
+        tokens of a document.
+
+        Returns:
+            str: The fingerprint.
+        """
+        hf_tokenizer = self.ensure_tokenizer()
+        cached = getattr(self, '_fingerprint', None)
+        if cached is None or cached[0] is not hf_tokenizer:
+            hasher = Hasher()
+            hasher.update(self.name)
+            hasher.update(self._to_str())
+            cached = self._fingerprint = (hf_tokenizer, hasher.hexdigest())
+        return cached[1]
+
     def ensure_tokenizer(self) -> Tokenizer:
         if self.hf_tokenizers is None:
             raise ValueError("The tokenizer is not loaded yet")
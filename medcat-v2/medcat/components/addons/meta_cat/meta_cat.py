@@ -18,6 +18,9 @@ from medcat.components.addons.meta_cat.ml_utils import (
     predict, train_model, set_all_seeds, eval_model, EvalModelResults)
 from medcat.components.addons.meta_cat.data_utils import (
     prepare_from_json, encode_category_values, prepare_for_oversampled_data)
+from medcat.components.addons.meta_cat.quantisation import (
+    quantise_model, check_parity, save_quantised_model, load_quantised_model,
+    ParityResults, ParityCheckFailed, UnknownInferenceBackend)
 from medcat.components.addons.addons import AddonComponent
 from medcat.components.addons.meta_cat.mctokenizers.tokenizers import (
     TokenizerWrapperBase, init_tokenizer, load_tokenizer)
@@ -44,6 +47,13 @@ _META_ANNS_PATH = 'meta_cat_meta_anns'
 _SHARE_TOKENS_PATH = 'meta_cat_share_tokens'
 
 
+class _SharedTokens(TypedDict):
+    input_ids: list[int]
+    offset_mapping: list[tuple[int, int]]
+    # by (cntx_left, cntx_right, replace_center, entities)
+    samples: dict[tuple, tuple[dict, list]]
+
+
 class MedCATTrainerExportDocument(TypedDict):
     name: str
     confidence: float
@@ -123,6 +133,10 @@ class MetaCATAddon(AddonComponent):
     def __call__(self, doc: MutableDocument) -> MutableDocument:
         return self.mc(doc)
 
+    def __call_batch__(self, docs: list[MutableDocument]
+                       ) -> list[MutableDocument]:
+        return self.mc.__call_batch__(docs)
+
     def load(self, folder_path: str) -> 'MetaCAT':
         mc_path, tokenizer_folder = self._get_meta_cat_and_tokenizer_paths(
             folder_path)
@@ -156,12 +170,17 @@ class MetaCATAddon(AddonComponent):
                 folder_path, 'bert_config.json')
             self._mc.model.bert_config.to_json_file(  # type: ignore
                 model_config_save_path)
+        if self.mc._quantised_model is not None:
+            save_quantised_model(
+                self.mc._quantised_model, folder_path,
+                self.config.train.last_train_on, self.mc._quantised_parity)
 
     def _init_data_paths(self, base_tokenizer: BaseTokenizer):
         # a dictionary like {category_name: value, ...}
         base_tokenizer.get_entity_class().register_addon_path(
             _META_ANNS_PATH, def_val=None, force=True)
-        # Used for sharing pre-processed data/tokens
+        # Used for sharing pre-processed data/tokens between models
+        # see MetaCAT._get_samples
         base_tokenizer.get_doc_class().register_addon_path(
             _SHARE_TOKENS_PATH, def_val=None, force=True)
 
@@ -299,7 +318,8 @@ class MetaCAT(AbstractSerialisable):
 
     @classmethod
     def ignore_attrs(cls) -> list[str]:
-        return ['model', 'save_dir_path']
+        return ['model', 'save_dir_path', '_quantised_model',
+                '_quantised_parity']
 
     @classmethod
     def include_properties(cls) -> list[str]:
@@ -332,6 +352,8 @@ class MetaCAT(AbstractSerialisable):
         self.model = self.get_model(embeddings=self.embeddings)
         if _model_state_dict:
             self.model.load_state_dict(_model_state_dict)
+        self._quantised_model: Optional[nn.Module] = None
+        self._quantised_parity: Optional[ParityResults] = None
 
     def _reset_tokenizer_info(self):
         # Set it in the config
@@ -629,6 +651,9 @@ class MetaCAT(AbstractSerialisable):
                           overwrite=overwrite)
 
         self.config.train.last_train_on = datetime.now().timestamp()
+        # the quantised model (if any) is now outdated
+        self._quantised_model = None
+        self._quantised_parity = None
         return report
 
     def eval(self, json_path: str) -> EvalModelResults:
@@ -646,6 +671,16 @@ class MetaCAT(AbstractSerialisable):
             AssertionError: If self.tokenizer
             Exception: If the category name does not exist
         """
+        data = self._prepare_eval_data(json_path)
+
+        # Run evaluation
+        assert self.tokenizer is not None
+        result = eval_model(self.model, data, config=self.config,
+                            tokenizer=self.tokenizer)
+
+        return result
+
+    def _prepare_eval_data(self, json_path: str) -> list:
         g_config = self.config.general
         t_config = self.config.train
 
@@ -672,13 +707,79 @@ class MetaCAT(AbstractSerialisable):
         category_value2id = g_config.category_value2id
         data, _, _ = encode_category_values(
             data, existing_category_value2id=category_value2id)
+        return data
 
-        # Run evaluation
-        assert self.tokenizer is not None
-        result = eval_model(self.model, data, config=self.config,
-                            tokenizer=self.tokenizer)
+    def quantise(self, json_path: Optional[str] = None,
+                 min_agreement: float = 0.99,
+                 max_confidence_delta: float = 0.1
+                 ) -> Optional[ParityResults]:
+        """Quantise the model for CPU inference.
 
-        return result
+        The linear and LSTM layers of the model are dynamically quantised
+        to int8 (see `quantisation.quantise_model`). The quantised model
+        is used for inference if `config.general.inference_backend` is
+        'quantised'. It is saved along with the MetaCAT.
+
+        If a json file is provided, the predictions of the quantised model
+        are checked against those of the eager model on its annotations.
+
+        Args:
+            json_path (Optional[str]):
+                The MedCATtrainer export to check parity on.
+                Defaults to None.
+            min_agreement (float):
+                The minimum fraction of the predictions that need to agree.
+                Defaults to 0.99.
+            max_confidence_delta (float):
+                The maximum difference in the confidence of a prediction.
+                Defaults to 0.1.
+
+        Raises:
+            MisconfiguredMetaCATException: If the device is not the CPU.
+            ParityCheckFailed: If the quantised model does not match the
+                eager model closely enough.
+
+        Returns:
+            Optional[ParityResults]: The parity check results, if checked.
+        """
+        self._ensure_cpu()
+        quantised = quantise_model(self.model)
+        parity: Optional[ParityResults] = None
+        if json_path is not None:
+            data = self._prepare_eval_data(json_path)
+            parity = check_parity(self.model, quantised, data, self.config)
+            if (parity['agreement'] < min_agreement or
+                    parity['max_confidence_delta'] > max_confidence_delta):
+                raise ParityCheckFailed(
+                    parity, min_agreement, max_confidence_delta)
+        self._quantised_model = quantised
+        self._quantised_parity = parity
+        return parity
+
+    def _ensure_cpu(self) -> None:
+        if self.config.general.device != 'cpu':
+            raise MisconfiguredMetaCATException(
+                "The quantised MetaCAT model is only available on the CPU. "
+                f"Got device '{self.config.general.device}'")
+
+    def _get_inference_model(self) -> nn.Module:
+        backend = self.config.general.inference_backend
+        if backend == 'eager':
+            return self.model
+        elif backend != 'quantised':
+            raise UnknownInferenceBackend(backend)
+        self._ensure_cpu()
+        if self._quantised_model is None:
+            loaded = None
+            if self.save_dir_path is not None:
+                loaded = load_quantised_model(
+                    self.model, self.save_dir_path,
+                    self.config.train.last_train_on)
+            if loaded is None:
+                self.quantise()
+            else:
+                self._quantised_model, self._quantised_parity = loaded
+        return cast(nn.Module, self._quantised_model)
 
     def get_ents(self, doc: MutableDocument) -> Iterable[MutableEntity]:
         # TODO - use span groups?
@@ -794,34 +895,61 @@ class MetaCAT(AbstractSerialisable):
         if len(docs) > 0:
             yield docs
 
-    def _set_meta_anns(self,
-                       doc: MutableDocument,
-                       id2category_value: dict
-                       ) -> MutableDocument:
-        config = self.config
-        data: list
-        if (not config.general.save_and_reuse_tokens or
-                doc.get_addon_data(_SHARE_TOKENS_PATH) is None):
-            if config.general.lowercase:
+    def _get_samples(self, doc: MutableDocument) -> tuple[dict, list]:
+        """Get the samples for the entities in the document.
+
+        The (subword) tokens and the samples are shared between the MetaCAT
+        models in the pipeline through the document. The tokens are keyed
+        by the tokenizer fingerprint and whether the text is lower cased.
+        The samples are additionally keyed by the context settings and the
+        entities. So models only reuse what they would have created
+        themselves.
+
+        Args:
+            doc (MutableDocument): The document.
+
+        Returns:
+            tuple[dict, list]: Entity id to index mapping and the samples.
+        """
+        general = self.config.general
+        assert self.tokenizer is not None
+        shared: Optional[dict[tuple, _SharedTokens]] = doc.get_addon_data(
+            _SHARE_TOKENS_PATH)
+        if shared is None:
+            shared = {}
+            doc.set_addon_data(_SHARE_TOKENS_PATH, shared)
+        tokens_key = (self.tokenizer.get_fingerprint(), general.lowercase)
+        tokens = shared.get(tokens_key)
+        if tokens is None:
+            if general.lowercase:
                 all_text = doc.base.text.lower()
             else:
                 all_text = doc.base.text
-            assert self.tokenizer is not None
             all_text_processed = self.tokenizer(all_text)
-            ent_id2ind, data = self.prepare_document(
-                doc, input_ids=all_text_processed['input_ids'],
-                offset_mapping=all_text_processed['offset_mapping'],
-                lowercase=config.general.lowercase)
-        else:
-            # This means another model has already processed the data
-            # and we can just use it. This is a
-            # dangerous option - as it assumes the other model has the
-            # same tokenizer and context size.
-            data = []
-            data.extend(doc.get_addon_data(_SHARE_TOKENS_PATH)[0])
-        predictions, confidences = predict(
-            self.model, data, config)
-
+            tokens = shared[tokens_key] = {
+                'input_ids': all_text_processed['input_ids'],
+                'offset_mapping': all_text_processed['offset_mapping'],
+                'samples': {},
+            }
+        samples_key = (
+            general.cntx_left, general.cntx_right, general.replace_center,
+            tuple((ent.id, ent.base.start_char_index, ent.base.end_char_index)
+                  for ent in self.get_ents(doc)))
+        samples = tokens['samples'].get(samples_key)
+        if samples is None:
+            samples = tokens['samples'][samples_key] = self.prepare_document(
+                doc, input_ids=tokens['input_ids'],
+                offset_mapping=tokens['offset_mapping'],
+                lowercase=general.lowercase)
+        return samples
+
+    def _set_predictions(self, doc: MutableDocument,
+                         id2category_value: dict,
+                         ent_id2ind: dict,
+                         predictions: Union[list[int], numpy.ndarray],
+                         confidences: Union[list[float], numpy.ndarray],
+                         ) -> MutableDocument:
+        config = self.config
         ents = self.get_ents(doc)
 
         for ent in ents:
@@ -846,6 +974,16 @@ class MetaCAT(AbstractSerialisable):
                 }
         return doc
 
+    def _set_meta_anns(self,
+                       doc: MutableDocument,
+                       id2category_value: dict
+                       ) -> MutableDocument:
+        ent_id2ind, data = self._get_samples(doc)
+        predictions, confidences = predict(
+            self._get_inference_model(), data, self.config)
+        return self._set_predictions(
+            doc, id2category_value, ent_id2ind, predictions, confidences)
+
     # Override
     def __call__(self, doc: MutableDocument) -> MutableDocument:
         """Process one document, used in the spacy pipeline for sequential
@@ -863,6 +1001,36 @@ class MetaCAT(AbstractSerialisable):
         self._set_meta_anns(doc, id2category_value)
         return doc
 
+    def __call_batch__(self, docs: list[MutableDocument]
+                       ) -> list[MutableDocument]:
+        """Process a batch of documents.
+
+        The samples of all the documents are gathered and run through
+        the model together. They are bucketed by length (see
+        `ml_utils.predict`) and the predictions are then set on the
+        entities of each document.
+
+        Args:
+            docs (list[MutableDocument]): The documents.
+
+        Returns:
+            list[MutableDocument]: The same documents.
+        """
+        id2category_value = {
+            v: k for k, v in self.config.general.category_value2id.items()}
+        per_doc_samples = [self._get_samples(doc) for doc in docs]
+        all_data = [sample for _, data in per_doc_samples for sample in data]
+        predictions, confidences = predict(
+            self._get_inference_model(), all_data, self.config)
+        offset = 0
+        for doc, (ent_id2ind, data) in zip(docs, per_doc_samples):
+            end = offset + len(data)
+            self._set_predictions(
+                doc, id2category_value, ent_id2ind,
+                predictions[offset:end], confidences[offset:end])
+            offset = end
+        return docs
+
     @overload
     def get_model_card(self, as_dict: Literal[True]) -> dict:
         pass
@@ -83,6 +83,11 @@ def predict(model: nn.Module, data: list[tuple[list[int], int, Optional[int]]],
             config: ConfigMetaCAT) -> tuple[list[int], list[float]]:
     """Predict on data used in the meta_cat.pipe
 
+    The data is sorted by length and split into batches of (at most)
+    `config.general.batch_size_eval` samples. Each batch is only padded
+    to its longest sample. The predictions are returned in the original
+    order. The data can therefore be gathered from many documents at once.
+
     Args:
         model (nn.Module):
             The model.
@@ -106,14 +111,16 @@ def predict(model: nn.Module, data: list[tuple[list[int], int, Optional[int]]],
     model.eval()
     model.to(device)
 
+    order = sorted(range(len(data)), key=lambda ind: len(data[ind][0]))
+    sorted_data = [data[ind] for ind in order]
     num_batches = math.ceil(len(data) / batch_size)
     all_logits = []
 
     with torch.no_grad():
         for i in range(num_batches):
+            batch = sorted_data[i * batch_size: (i + 1) * batch_size]
             x, cpos, attention_masks, _ = create_batch_piped_data(
-                data, i * batch_size, (i + 1) * batch_size,
-                device=device, pad_id=pad_id)
+                batch, 0, len(batch), device=device, pad_id=pad_id)
 
             logits = model(x, center_positions=cpos,
                            attention_mask=attention_masks,
@@ -125,7 +132,10 @@ def predict(model: nn.Module, data: list[tuple[list[int], int, Optional[int]]],
 
     # Can be that there are not logits, data is empty
     if all_logits:
-        logits = np.concatenate(all_logits, axis=0)
+        logits = np.empty((len(data), all_logits[0].shape[1]),
+                          dtype=all_logits[0].dtype)
+        # scatter back to the original order
+        logits[order] = np.concatenate(all_logits, axis=0)
         predictions = np.argmax(logits, axis=1)
         confidences = np.max(softmax(logits, axis=1), axis=1)
 
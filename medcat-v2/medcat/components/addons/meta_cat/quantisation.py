@@ -0,0 +1,154 @@
+"""Quantised CPU inference for MetaCAT models.
+
+The linear and LSTM layers of a (trained) model are dynamically quantised
+to int8. That is, their weights are stored as int8 and the activations
+are quantised on the fly. This generally speeds up inference on the CPU
+at the cost of a (small) difference in the outputs. The quantised model
+can be checked against the original (eager) model (see `check_parity`)
+and saved next to the original model.
+"""
+from typing import Optional, Any, TypedDict
+import copy
+import os
+import logging
+
+import numpy as np
+import torch
+from torch import nn
+
+from medcat.config.config_meta_cat import ConfigMetaCAT
+from medcat.components.addons.meta_cat.ml_utils import predict
+
+
+logger = logging.getLogger(__name__)
+
+
+INFERENCE_BACKENDS = ('eager', 'quantised')
+QUANTISED_MODEL_FILE = 'quantised_model.pt'
+QUANTISED_LAYERS: set[type[nn.Module]] = {nn.Linear, nn.LSTM}
+
+
+class ParityResults(TypedDict):
+    num_samples: int
+    """The number of samples compared."""
+    agreement: float
+    """The fraction of the samples with the same prediction."""
+    max_confidence_delta: float
+    """The largest difference in the confidence of the predictions."""
+
+
+def quantise_model(model: nn.Module) -> nn.Module:
+    """Dynamically quantise the linear and LSTM layers of the model.
+
+    The original model is left as is.
+
+    Args:
+        model (nn.Module): The (eager) model.
+
+    Returns:
+        nn.Module: The quantised model (on the CPU and in eval mode).
+    """
+    model = copy.deepcopy(model).to('cpu').eval()
+    return torch.ao.quantization.quantize_dynamic(
+        model, QUANTISED_LAYERS, dtype=torch.qint8)
+
+
+def check_parity(eager: nn.Module, quantised: nn.Module,
+                 data: list[tuple[list[int], int, Optional[int]]],
+                 config: ConfigMetaCAT) -> ParityResults:
+    """Compare the predictions of the quantised model to the eager one.
+
+    Args:
+        eager (nn.Module): The eager model.
+        quantised (nn.Module): The quantised model.
+        data (list[tuple[list[int], int, Optional[int]]]):
+            The samples in the format used by `ml_utils.predict`.
+        config (ConfigMetaCAT): The config.
+
+    Returns:
+        ParityResults: The results of the comparison.
+    """
+    if not data:
+        return {'num_samples': 0, 'agreement': 1.0,
+                'max_confidence_delta': 0.0}
+    exp_preds, exp_confs = predict(eager, data, config)
+    got_preds, got_confs = predict(quantised, data, config)
+    return {
+        'num_samples': len(data),
+        'agreement': float(np.mean(
+            np.asarray(exp_preds) == np.asarray(got_preds))),
+        'max_confidence_delta': float(np.max(np.abs(
+            np.asarray(exp_confs) - np.asarray(got_confs)))),
+    }
+
+
+def save_quantised_model(model: nn.Module, folder_path: str,
+                         last_train_on: Optional[float],
+                         parity: Optional[ParityResults]) -> None:
+    """Save the quantised model in the (MetaCAT) folder.
+
+    Args:
+        model (nn.Module): The quantised model.
+        folder_path (str): The folder to save in.
+        last_train_on (Optional[float]): When the eager model was last
+            trained. Used to avoid loading an outdated quantised model.
+        parity (Optional[ParityResults]): The parity check results, if any.
+    """
+    torch.save({
+        'state_dict': model.state_dict(),
+        'last_train_on': last_train_on,
+        'parity': parity,
+    }, os.path.join(folder_path, QUANTISED_MODEL_FILE))
+
+
+def load_quantised_model(eager: nn.Module, folder_path: str,
+                         last_train_on: Optional[float]
+                         ) -> Optional[tuple[nn.Module,
+                                             Optional[ParityResults]]]:
+    """Load the quantised model from the (MetaCAT) folder.
+
+    Args:
+        eager (nn.Module): The eager model (used for the architecture).
+        folder_path (str): The folder to load from.
+        last_train_on (Optional[float]): When the eager model was last
+            trained.
+
+    Returns:
+        Optional[tuple[nn.Module, Optional[ParityResults]]]:
+            The quantised model and its parity check results, or None if
+            no (up to date) quantised model was saved.
+    """
+    path = os.path.join(folder_path, QUANTISED_MODEL_FILE)
+    if not os.path.exists(path):
+        return None
+    # NOTE: the packed (quantised) parameters cannot be loaded with
+    #       `weights_only`. The file is part of the model pack which
+    #       is trusted anyway.
+    saved: dict[str, Any] = torch.load(path, map_location='cpu',
+                                       weights_only=False)
+    if saved['last_train_on'] != last_train_on:
+        logger.warning(
+            "The quantised MetaCAT model at '%s' was created for a "
+            "differently trained model. Quantising the model again.", path)
+        return None
+    model = quantise_model(eager)
+    model.load_state_dict(saved['state_dict'])
+    return model, saved['parity']
+
+
+class UnknownInferenceBackend(ValueError):
+
+    def __init__(self, backend: str) -> None:
+        super().__init__(f"Unknown MetaCAT inference backend: '{backend}'. "
+                         f"Available: {', '.join(INFERENCE_BACKENDS)}")
+
+
+class ParityCheckFailed(ValueError):
+
+    def __init__(self, results: ParityResults, min_agreement: float,
+                 max_confidence_delta: float) -> None:
+        super().__init__(
+            f"The quantised model does not match the eager one: {results} "
+            f"(expected agreement of at least {min_agreement} and maximum "
+            f"confidence delta of {max_confidence_delta})")
+        self.results = results
@@ -120,6 +120,10 @@ class RelCATAddon(AddonComponent):
     def __call__(self, doc: MutableDocument):
         return self._rel_cat(doc)
 
+    def __call_batch__(self, docs: list[MutableDocument]
+                       ) -> list[MutableDocument]:
+        return list(self._rel_cat.pipe(docs))
+
 
 class BalancedBatchSampler(Sampler):
 
@@ -433,6 +437,8 @@ class RelCAT:
                 rc_cnf.train.nclasses)
 
         rc_cnf.general.labels2idx.update(train_rel_data.dataset["labels2idx"])
+        rc_cnf.general.allowed_type_pairs = RelData.get_allowed_type_pairs(
+            train_rel_data.dataset["output_relations"])
         rc_cnf.general.idx2labels = {
             int(v): k for k, v in rc_cnf.general.labels2idx.items()}
 
@@ -778,6 +784,19 @@ class RelCAT:
 
     def pipe(self, stream: Iterable[MutableDocument], *args, **kwargs
              ) -> Iterator[MutableDocument]:
+        """Predict the relations for a stream of documents.
+
+        The candidate entity pairs of multiple documents are pooled (see
+        `config.general.pipe_batch_size_in_pairs`) and run through the
+        model in shared batches. The documents are yielded in order once
+        the relations for all of their pairs have been predicted.
+
+        Args:
+            stream (Iterable[MutableDocument]): The documents.
+
+        Yields:
+            MutableDocument: The documents with the relations.
+        """
         rc_cnf = self.component.relcat_config
 
         predict_rel_dataset = RelData(
@@ -786,79 +805,95 @@ class RelCAT:
 
         self.component.model = self.component.model.to(self.device)
 
+        docs: list[tuple[MutableDocument, list[list]]] = []
+        num_pairs = 0
         for doc_id, doc in enumerate(stream, 0):
-            predict_rel_dataset.dataset, _ = self._create_test_train_datasets(
-                data=predict_rel_dataset.create_base_relations_from_doc(
-                    doc, doc_id=str(doc_id)),
-                split_sets=False)
-
-            predict_dataloader = DataLoader(
-                dataset=predict_rel_dataset, shuffle=False,
-                batch_size=rc_cnf.train.batch_size,
-                num_workers=0, collate_fn=self.component.padding_seq,
-                pin_memory=rc_cnf.general.pin_memory)
+            doc_rels = predict_rel_dataset.create_base_relations_from_doc(
+                doc, doc_id=str(doc_id))["output_relations"]
+            logger.debug("total relations for doc %d: %d",
+                         doc_id, len(doc_rels))
+            docs.append((doc, doc_rels))
+            num_pairs += len(doc_rels)
+            if num_pairs >= rc_cnf.general.pipe_batch_size_in_pairs:
+                yield from self._predict_docs(docs, predict_rel_dataset)
+                docs, num_pairs = [], 0
+        if docs:
+            yield from self._predict_docs(docs, predict_rel_dataset)
+
+    def _predict_docs(self, docs: list[tuple[MutableDocument, list[list]]],
+                      rel_dataset: RelData) -> Iterator[MutableDocument]:
+        rc_cnf = self.component.relcat_config
+        predictions = self._predict_relations(
+            [rel for _, doc_rels in docs for rel in doc_rels], rel_dataset)
+        offset = 0
+        for doc, doc_rels in docs:
+            # NOTE: copy since the registered default is shared
+            relations: list = list(doc.get_addon_data("relations"))
+            for rel, (label_id, confidence) in zip(
+                    doc_rels, predictions[offset: offset + len(doc_rels)]):
+                relations.append({
+                    "relation": rc_cnf.general.idx2labels[label_id],
+                    "label_id": label_id,
+                    "ent1_text": rel[2],
+                    "ent2_text": rel[3],
+                    "confidence": float("{:.3f}".format(confidence)),
+                    "start_ent_pos": "",
+                    "end_ent_pos": "",
+                    "start_entity_id": rel[8],
+                    "end_entity_id": rel[9]
+                })
+            offset += len(doc_rels)
+            doc.set_addon_data("relations", relations)
+            yield doc
 
-            total_rel_found = len(
-                predict_rel_dataset.dataset["output_relations"])
-            rel_idx = -1
-
-            logger.info("total relations for doc: " + str(total_rel_found))
-            logger.info("processing...")
-
-            pbar = tqdm(total=total_rel_found)
-
-            for i, data in enumerate(predict_dataloader):
-                with torch.no_grad():
-                    token_ids, e1_e2_start, labels, _, _ = data
-
-                    attention_mask = (
-                        token_ids != self.component.pad_id
-                        ).float().to(self.device)
-                    token_type_ids = torch.zeros(
-                        *token_ids.shape[:2]).long().to(self.device)
-
-                    (model_output,
-                     pred_classification_logits) = self.component.model(
-                        token_ids, token_type_ids=token_type_ids,
-                        attention_mask=attention_mask,
-                        e1_e2_start=e1_e2_start)
-
-                    for i, pred_rel_logits in enumerate(
-                            pred_classification_logits):
-                        rel_idx += 1
-
-                        confidence = torch.softmax(
-                            pred_rel_logits, dim=0).max(0)
-                        predicted_label_id = int(confidence[1].item())
-
-                        relations: list = doc.get_addon_data(  # type: ignore
-                            "relations")
-                        relations.append(
-                            {
-                                "relation": rc_cnf.general.idx2labels[
-                                    predicted_label_id],
-                                "label_id": predicted_label_id,
-                                "ent1_text": predict_rel_dataset.dataset[
-                                    "output_relations"][rel_idx][
-                                    2],
-                                "ent2_text": predict_rel_dataset.dataset[
-                                    "output_relations"][rel_idx][
-                                    3],
-                                "confidence": float("{:.3f}".format(
-                                    confidence[0])),
-                                "start_ent_pos": "",
-                                "end_ent_pos": "",
-                                "start_entity_id":
-                                    predict_rel_dataset.dataset[
-                                        "output_relations"][rel_idx][8],
-                                "end_entity_id":
-                                    predict_rel_dataset.dataset[
-                                        "output_relations"][rel_idx][9]
-                            })
-                    pbar.update(len(token_ids))
-            pbar.close()
+    def _predict_relations(self, rels: list[list], rel_dataset: RelData
+                           ) -> list[tuple[int, float]]:
+        """Predict the label (and confidence) for each relation.
 
-            yield doc
+        The relations are sorted by length (longest first) so that each
+        batch is padded as little as possible. The padding (collate)
+        function sorts each batch the same way so its order is kept.
+
+        Args:
+            rels (list[list]): The relation rows.
+            rel_dataset (RelData): The dataset to use.
+
+        Returns:
+            list[tuple[int, float]]: The label ID and the confidence for
+                each relation (in the original order).
+        """
+        order = sorted(range(len(rels)), key=lambda ind: len(rels[ind][0]),
+                       reverse=True)
+        rel_dataset.dataset = {
+            "output_relations": [rels[ind] for ind in order]}
+        predict_dataloader = DataLoader(
+            dataset=rel_dataset, shuffle=False,
+            batch_size=self.component.relcat_config.train.batch_size,
+            num_workers=0, collate_fn=self.component.padding_seq,
+            pin_memory=self.component.relcat_config.general.pin_memory)
+
+        predictions: list[tuple[int, float]] = [(-1, 0.0)] * len(rels)
+        sorted_idx = 0
+        with torch.no_grad():
+            for token_ids, e1_e2_start, _, _, _ in predict_dataloader:
+                attention_mask = (
+                    token_ids != self.component.pad_id
+                    ).float().to(self.device)
+                token_type_ids = torch.zeros(
+                    *token_ids.shape[:2]).long().to(self.device)
+
+                _, pred_classification_logits = self.component.model(
+                    token_ids, token_type_ids=token_type_ids,
+                    attention_mask=attention_mask,
+                    e1_e2_start=e1_e2_start)
+
+                confidences, label_ids = torch.softmax(
+                    pred_classification_logits, dim=1).max(1)
+                for confidence, label_id in zip(confidences.tolist(),
+                                                label_ids.tolist()):
+                    predictions[order[sorted_idx]] = (label_id, confidence)
+                    sorted_idx += 1
+        return predictions
 
     def predict_text_with_anns(self, text: str, annotations: list[dict]
                                ) -> MutableDocument:
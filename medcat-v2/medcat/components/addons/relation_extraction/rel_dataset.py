@@ -1,4 +1,6 @@
 from ast import literal_eval
+from bisect import bisect_right
+from itertools import product
 from typing import Any, Iterable, Union, Optional, cast
 import random
 import logging
@@ -379,12 +381,7 @@ class RelData(Dataset):
             self, entity: MutableEntity,
             doc_length_tokens: int, tokenized_text_data: dict[str, Any]
             ) -> tuple[list[str], tuple[int, int], tuple[int, int]]:
-        ci = self.cdb.cui2info.get(entity.cui, None)
-        type_ids = list(
-            ci["type_ids"] if ci is not None else [])
-        type_names = [
-            self.cdb.addl_info["type_id2name"].get(tui, '')
-            for tui in type_ids]
+        type_names = self._get_types(entity)
 
         start_char_pos = entity.base.start_char_index
         end_char_pos = entity.base.end_char_index
@@ -407,7 +404,9 @@ class RelData(Dataset):
             self, doc_text: str, doc_id: str,
             ent1_token: MutableEntity, ent2_token: MutableEntity,
             tokenized_text_data: dict[str, Any],
-            chars_to_exclude: str, doc_length_tokens: int
+            chars_to_exclude: str, doc_length_tokens: int,
+            ent1_info: Optional[tuple] = None,
+            ent2_info: Optional[tuple] = None,
             ) -> Optional[list]:
 
         tmp_ent1 = ent1_token
@@ -417,18 +416,22 @@ class RelData(Dataset):
             tmp_ent1 = ent1_token
             ent1_token = ent2_token
             ent2_token = tmp_ent1
+            ent1_info, ent2_info = ent2_info, ent1_info
+
+        if ent1_info is None:
+            ent1_info = self._get_token_type_and_start_end(
+                ent1_token, doc_length_tokens, tokenized_text_data)
+        if ent2_info is None:
+            ent2_info = self._get_token_type_and_start_end(
+                ent2_token, doc_length_tokens, tokenized_text_data)
 
         (ent1_types,
          (ent1_start_char_pos, ent1_end_char_pos),
-         (ent1_token_start_pos,
-          ent1_token_end_pos)) = self._get_token_type_and_start_end(
-             ent1_token, doc_length_tokens, tokenized_text_data)
+         (ent1_token_start_pos, ent1_token_end_pos)) = ent1_info
 
         (ent2_types,
          (ent2_start_char_pos, ent2_end_char_pos),
-         (ent2_token_start_pos,
-          ent2_token_end_pos)) = self._get_token_type_and_start_end(
-             ent2_token, doc_length_tokens, tokenized_text_data)
+         (ent2_token_start_pos, ent2_token_end_pos)) = ent2_info
 
         tkn1_str = str(ent1_token)
         tkn2_str = str(ent2_token)
@@ -483,22 +486,91 @@ class RelData(Dataset):
 
         relation_instances: list[list] = []
 
-        # last two can be a pair
-        for ent1_idx in range(0, len(_ents) - 2):
-            ent1_token = _ents[ent1_idx]
-
-            if ((bt := ent1_token.base.text) not in chars_to_exclude and
-                    bt not in
-                    self.tokenizer.hf_tokenizers.all_special_tokens):
-                for ent2_idx in range((ent1_idx + 1), len(_ents) - 1):
-                    relation = self._create_base_relation_for_ents(
-                        doc_text, doc_id, ent1_token, _ents[ent2_idx],
-                        tokenized_text_data, chars_to_exclude,
-                        doc_length_tokens)
-                    if relation is not None:
-                        relation_instances.append(relation)
+        # NOTE: the token positions and types of each entity are only
+        #       calculated once rather than for every pair it is in
+        ent_infos: dict[int, tuple] = {}
+
+        def get_info(ent_idx: int) -> tuple:
+            if ent_idx not in ent_infos:
+                ent_infos[ent_idx] = self._get_token_type_and_start_end(
+                    _ents[ent_idx], doc_length_tokens, tokenized_text_data)
+            return ent_infos[ent_idx]
+
+        for ent1_idx, ent2_idx in self._get_candidate_pairs(
+                _ents, doc_id, chars_to_exclude):
+            relation = self._create_base_relation_for_ents(
+                doc_text, doc_id, _ents[ent1_idx], _ents[ent2_idx],
+                tokenized_text_data, chars_to_exclude,
+                doc_length_tokens, get_info(ent1_idx), get_info(ent2_idx))
+            if relation is not None:
+                relation_instances.append(relation)
         return relation_instances
 
+    def _get_types(self, entity: MutableEntity) -> list[str]:
+        ci = self.cdb.cui2info.get(entity.cui, None)
+        return [self.cdb.addl_info["type_id2name"].get(tui, '')
+                for tui in (ci["type_ids"] if ci is not None else [])]
+
+    def _get_candidate_pairs(self, ents: list[MutableEntity], doc_id: str,
+                             chars_to_exclude: str) -> list[tuple[int, int]]:
+        """Get the (indices of the) pairs of entities to create relations for.
+
+        Pairs that are further apart than the window size (in characters)
+        would be rejected by `_create_relation_validation` anyway, so they
+        are pruned before any tokenization. If pruning by type pairs is
+        enabled, the pairs with types that never had a relation in the
+        training data are pruned as well. Finally, at most
+        `config.general.max_pairs_per_doc` of the closest pairs are kept.
+
+        Args:
+            ents (list[MutableEntity]): The entities in the document.
+            doc_id (str): The document ID.
+            chars_to_exclude (str): The entity texts to exclude.
+
+        Returns:
+            list[tuple[int, int]]: The pairs of entity indices.
+        """
+        cnf = self.config.general
+        starts = [ent.base.start_char_index for ent in ents]
+        is_sorted = all(prev <= cur for prev, cur in zip(starts, starts[1:]))
+        allowed_type_pairs: Optional[set[tuple[str, str]]] = None
+        types: list[list[str]] = []
+        if cnf.prune_by_type_pairs and cnf.allowed_type_pairs:
+            allowed_type_pairs = set(map(tuple, cnf.allowed_type_pairs))
+            types = [self._get_types(ent) for ent in ents]
+        pairs: list[tuple[int, int]] = []
+        # last two can be a pair
+        for ent1_idx in range(0, len(ents) - 2):
+            if ((bt := ents[ent1_idx].base.text) in chars_to_exclude or
+                    bt in self.tokenizer.hf_tokenizers.all_special_tokens):
+                continue
+            end_idx = len(ents) - 1
+            if is_sorted:
+                end_idx = bisect_right(
+                    starts, starts[ent1_idx] + cnf.window_size,
+                    ent1_idx + 1, end_idx)
+            for ent2_idx in range(ent1_idx + 1, end_idx):
+                if abs(starts[ent2_idx] - starts[ent1_idx]) > cnf.window_size:
+                    continue
+                if allowed_type_pairs is not None:
+                    first, second = ((ent1_idx, ent2_idx)
+                                     if starts[ent1_idx] <= starts[ent2_idx]
+                                     else (ent2_idx, ent1_idx))
+                    # NOTE: entities without types are kept
+                    if (types[first] and types[second] and
+                            allowed_type_pairs.isdisjoint(
+                                product(types[first], types[second]))):
+                        continue
+                pairs.append((ent1_idx, ent2_idx))
+        if 0 <= cnf.max_pairs_per_doc < len(pairs):
+            logger.warning(
+                "Document %s has %d candidate entity pairs. Only keeping the "
+                "%d closest ones", doc_id, len(pairs), cnf.max_pairs_per_doc)
+            pairs = sorted(sorted(
+                pairs, key=lambda pair: abs(starts[pair[1]] - starts[pair[0]])
+            )[:cnf.max_pairs_per_doc])
+        return pairs
+
     def create_base_relations_from_doc(
             self, doc: Union[MutableDocument, str], doc_id: str,
             ent1_ent2_tokens_start_pos: Union[list, tuple] = (-1, -1)) -> dict:
@@ -906,6 +978,27 @@ class RelData(Dataset):
         return (len(config_labels2idx.keys()), config_labels2idx,
                 config_idx2labels,)
 
+    @classmethod
+    def get_allowed_type_pairs(cls, relations: list[list]
+                               ) -> list[tuple[str, str]]:
+        """Get the pairs of entity types that have a relation.
+
+        The 'Other' relations (see `create_addl_rels`) are not considered.
+
+        Args:
+            relations (list[list]): The relation rows (see
+                `create_base_relations_from_doc` for the columns).
+
+        Returns:
+            list[tuple[str, str]]: The (ent1, ent2) type pairs.
+        """
+        type_pairs: set[tuple[str, str]] = set()
+        for rel in relations:
+            if str(rel[4]).startswith("Other") or not rel[6] or not rel[7]:
+                continue
+            type_pairs.update(product(rel[6], rel[7]))
+        return sorted(type_pairs)
+
     def __len__(self) -> int:
         """
         Returns:
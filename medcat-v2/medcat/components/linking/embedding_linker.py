@@ -1,17 +1,22 @@
 from medcat.cdb import CDB
 from medcat.config.config import Config, ComponentConfig, EmbeddingLinking
 from medcat.components.types import CoreComponentType, AbstractCoreComponent
+from medcat.components.linking.name_index import NameIndex, create_name_index
+from medcat.components.linking.quantisation import quantise, score_rows, to_dtype
+from medcat.storage.serialisers import ExternalArray
 from medcat.tokenizing.tokens import MutableEntity, MutableDocument
 from medcat.tokenizing.tokenizers import BaseTokenizer
-from typing import Optional, Iterator, Set
+from typing import Optional, Iterator, Set, Callable
 from medcat.vocab import Vocab
 from torch import Tensor
 from transformers import AutoTokenizer, AutoModel
 from medcat.utils.postprocessing import create_main_ann
 from tqdm import tqdm
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 import torch.nn.functional as F
+import numpy as np
 import torch
+import hashlib
 import logging
 import math
 
@@ -35,12 +40,23 @@ class Linker(AbstractCoreComponent):
         self.max_length = self.cnf_l.max_token_length
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
-        self._name_keys = list(self.cdb.name2info)
-        self._cui_keys = list(self.cdb.cui2info)
-
         # these only need to be populated when called for embedding or inference
         self._names_context_matrix = None
         self._cui_context_matrix = None
+        # the per-row scales of the matrices (only if stored as int8)
+        self._names_context_scales: Optional[Tensor] = None
+        self._cui_context_scales: Optional[Tensor] = None
+        self._name_index: Optional[NameIndex] = None
+        self._name_index_key: tuple = ()
+
+        # the context embeddings of the current document (by text) and
+        # the embeddings of the detected spans across documents (LRU)
+        # see: _get_context_vectors
+        self._doc_contexts: dict[str, Tensor] = {}
+        self._span_cache: OrderedDict[str, Tensor] = OrderedDict()
+        self._span_cache_state: tuple = ()
+        self.cache_hits = 0
+        self.cache_misses = 0
 
         # used for filters and name embedding, and if the name contains a valid cui 
         # see: _set_filters
@@ -64,6 +80,18 @@ class Linker(AbstractCoreComponent):
                 f"{self.cnf_l.prefer_primary_name}."
             )
 
+        self._build_index_maps()
+
+    def _build_index_maps(self) -> None:
+        """Build the maps between names / cuis and the rows of the embedding
+        matrices. If the embeddings have been created, the rows are in the order
+        of the embedded keys. Otherwise, they're in the order of the CDB."""
+        self._name_keys = list(
+            self.cdb.addl_info.get("name_embedding_keys", self.cdb.name2info)
+        )
+        self._cui_keys = list(
+            self.cdb.addl_info.get("cui_embedding_keys", self.cdb.cui2info)
+        )
         self._cui_to_idx = {cui: idx for idx, cui in enumerate(self._cui_keys)}
         self._name_to_idx = {name: idx for idx, name in enumerate(self._name_keys)}
         self._name_to_cui_idxs = [
@@ -72,6 +100,9 @@ class Linker(AbstractCoreComponent):
                 for cui in self.cdb.name2info[name].get("per_cui_status", {}).keys()
                 if cui in self._cui_to_idx
             ]
+            # NOTE: names removed from the CDB since embedding have no cuis
+            if name in self.cdb.name2info
+            else []
             for name in self._name_keys
         ]
 
@@ -98,8 +129,237 @@ class Linker(AbstractCoreComponent):
         else:
             self.cnf_l.embedding_model_name = embedding_model_name
         self._load_transformers(embedding_model_name)
+        self._name_keys = list(self.cdb.name2info)
+        self._cui_keys = list(self.cdb.cui2info)
         self._embed_cui_names(embedding_model_name)
         self._embed_names(embedding_model_name)
+        for kind, keys, get_text in self._get_embedded_kinds():
+            self.cdb.addl_info[f"{kind}_embedding_keys"] = keys
+            self.cdb.addl_info[f"{kind}_embedding_fingerprints"] = torch.tensor(
+                [self._get_fingerprint(get_text(key)) for key in keys],
+                dtype=torch.long,
+            )
+        self._reset_after_embedding()
+        self._build_name_index(use_saved=False)
+        self.cdb.is_dirty = False
+
+    def refresh_embeddings(self) -> None:
+        """Refresh the embeddings after the CDB has changed.
+
+        Only the names and cuis that were added or changed (based on their
+        fingerprints) since they were last embedded are embedded. The rows of
+        removed names and cuis are dropped from the embedding matrices.
+        If the embeddings were created without fingerprints, everything is
+        embedded again (see `create_embeddings`).
+        """
+        if not all(
+            f"{kind}_{part}" in self.cdb.addl_info
+            for kind in ("name", "cui")
+            for part in ("embeddings", "embedding_keys", "embedding_fingerprints")
+        ):
+            logger.info("No embedding fingerprints found, embedding everything")
+            self.create_embeddings()
+            return
+        changed = False
+        reuse_centroids = False
+        for kind, keys, get_text in self._get_embedded_kinds():
+            converted = self._convert_embeddings(kind)
+            num_removed, num_embedded = self._refresh_embeddings(kind, keys, get_text)
+            changed = changed or converted or bool(num_removed or num_embedded)
+            if kind == "name":
+                # NOTE: unless all the names were (re)embedded, keep the
+                #       centroids of the (IVF) name index, if any, but
+                #       reassign the names to them
+                reuse_centroids = num_embedded < len(keys)
+        if changed:
+            self._reset_after_embedding()
+            state = self.cdb.addl_info.get("name_index", {})
+            self.cdb.addl_info["name_index"] = {
+                key: val
+                for key, val in state.items()
+                if key not in ("list_ids", "list_offsets")
+            }
+            self._build_name_index(use_saved=reuse_centroids)
+        self.cdb.is_dirty = False
+
+    def _get_embedded_kinds(self) -> list[tuple[str, list[str], Callable[[str], str]]]:
+        return [
+            ("name", list(self.cdb.name2info), self._get_name_text),
+            ("cui", list(self.cdb.cui2info), self._get_cui_text),
+        ]
+
+    def _refresh_embeddings(
+        self, kind: str, keys: list[str], get_text: Callable[[str], str]
+    ) -> tuple[int, int]:
+        """Refresh the embeddings of one kind (names or cuis).
+        Args:
+            kind (str): The kind of embeddings ("name" or "cui").
+            keys (list[str]): The current names or cuis.
+            get_text (Callable[[str], str]): The text to embed for a key.
+        Returns:
+            tuple[int, int]: The number of removed and (re)embedded rows.
+        """
+        addl_info = self.cdb.addl_info
+        old_keys: list[str] = addl_info[f"{kind}_embedding_keys"]
+        old_fingerprints: list[int] = addl_info[
+            f"{kind}_embedding_fingerprints"
+        ].tolist()
+        fingerprints = {key: self._get_fingerprint(get_text(key)) for key in keys}
+        keep_rows = [
+            row
+            for row, (key, fingerprint) in enumerate(zip(old_keys, old_fingerprints))
+            if fingerprints.get(key) == fingerprint
+        ]
+        kept_keys = [old_keys[row] for row in keep_rows]
+        kept = set(kept_keys)
+        to_embed = [key for key in keys if key not in kept]
+        if len(keep_rows) == len(old_keys) and not to_embed:
+            return 0, 0
+        logger.info(
+            "Refreshing %s embeddings: removing %d and embedding %d",
+            kind,
+            len(old_keys) - len(keep_rows),
+            len(to_embed),
+        )
+        data, scales = self._get_embeddings(kind)
+        if len(keep_rows) != len(old_keys):
+            keep = torch.tensor(keep_rows, dtype=torch.long)
+            data = data[keep]
+            scales = None if scales is None else scales[keep]
+        if to_embed:
+            self._load_transformers(self.cnf_l.embedding_model_name)
+            new_embeddings = self._embed_in_batches(
+                [get_text(key) for key in to_embed], f"Embedding new {kind}s"
+            )
+            new_data, new_scales = quantise(
+                new_embeddings, self.cnf_l.embedding_dtype
+            )
+            data = torch.cat([data, new_data], dim=0)
+            if scales is not None and new_scales is not None:
+                scales = torch.cat([scales, new_scales], dim=0)
+        self._set_embeddings(kind, data, scales)
+        addl_info[f"{kind}_embedding_keys"] = kept_keys + to_embed
+        addl_info[f"{kind}_embedding_fingerprints"] = torch.tensor(
+            [old_fingerprints[row] for row in keep_rows]
+            + [fingerprints[key] for key in to_embed],
+            dtype=torch.long,
+        )
+        return len(old_keys) - len(keep_rows), len(to_embed)
+
+    def _get_embeddings(self, kind: str) -> tuple[Tensor, Optional[Tensor]]:
+        """Get the stored embeddings of one kind (names or cuis).
+        These are numpy arrays (memory mapped upon load) that are used as is.
+        Embeddings stored as tensors (by older versions) are supported as well.
+        Args:
+            kind (str): The kind of embeddings ("name" or "cui").
+        Returns:
+            tuple[Tensor, Optional[Tensor]]: The embeddings and their per-row
+            scales (only if stored as int8).
+        """
+        data = self.cdb.addl_info[f"{kind}_embeddings"]
+        scales = self.cdb.addl_info.get(f"{kind}_embedding_scales")
+        if isinstance(data, np.ndarray):
+            data = torch.from_numpy(np.asarray(data))
+        if isinstance(scales, np.ndarray):
+            scales = torch.from_numpy(np.asarray(scales))
+        return data, scales
+
+    def _set_embeddings(
+        self, kind: str, data: Tensor, scales: Optional[Tensor] = None
+    ) -> None:
+        """Store the embeddings of one kind (names or cuis) in the CDB.
+        They are stored (as numpy arrays) in the configured embedding dtype.
+        The arrays are marked to be saved as separate (memory mapped) files
+        by the dill serialiser.
+        Args:
+            kind (str): The kind of embeddings ("name" or "cui").
+            data (Tensor): The embeddings.
+            scales (Optional[Tensor]): The per-row scales if the embeddings
+            are int8. Defaults to None.
+        """
+        data, scales = to_dtype(data, scales, self.cnf_l.embedding_dtype)
+        self.cdb.addl_info[f"{kind}_embeddings"] = data.cpu().numpy().view(
+            ExternalArray
+        )
+        if scales is None:
+            self.cdb.addl_info.pop(f"{kind}_embedding_scales", None)
+        else:
+            self.cdb.addl_info[f"{kind}_embedding_scales"] = (
+                scales.cpu().numpy().view(ExternalArray)
+            )
+
+    def _convert_embeddings(self, kind: str) -> bool:
+        """Convert the stored embeddings to the configured embedding dtype.
+        Args:
+            kind (str): The kind of embeddings ("name" or "cui").
+        Returns:
+            bool: Whether the embeddings were converted.
+        """
+        stored = self.cdb.addl_info[f"{kind}_embeddings"]
+        data, scales = self._get_embeddings(kind)
+        if isinstance(stored, np.ndarray) and (
+            to_dtype(data, scales, self.cnf_l.embedding_dtype)[0] is data
+        ):
+            return False
+        logger.info(
+            "Converting the %s embeddings to %s", kind, self.cnf_l.embedding_dtype
+        )
+        self._set_embeddings(kind, data, scales)
+        return True
+
+    def _reset_after_embedding(self) -> None:
+        # the maps, matrices and filters need to reflect the new embeddings
+        self._build_index_maps()
+        self._names_context_matrix = None
+        self._cui_context_matrix = None
+        self._names_context_scales = None
+        self._cui_context_scales = None
+        self._last_include_set = None
+        self._last_exclude_set = None
+
+    def _get_fingerprint(self, text: str) -> int:
+        """Get the fingerprint of the text to be embedded.
+        This also depends on the embedding model and the max length.
+        Args:
+            text (str): The text to be embedded.
+        Returns:
+            int: The (64 bit) fingerprint.
+        """
+        to_hash = f"{self.cnf_l.embedding_model_name}\0{self.max_length}\0{text}"
+        digest = hashlib.blake2b(to_hash.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "little", signed=True)
+
+    def _get_name_text(self, name: str) -> str:
+        # removing ~ from names, as it is used to indicate a space in the CDB
+        return name.replace(self.config.general.separator, " ")
+
+    def _get_cui_text(self, cui: str) -> str:
+        # Use the longest name (ties broken by the name itself)
+        longest_name = max(
+            self.cdb.cui2info[cui]["names"], key=lambda name: (len(name), name)
+        )
+        return self._get_name_text(longest_name)
+
+    def _embed_in_batches(self, texts: list[str], desc: str) -> Tensor:
+        """Embed the texts in batches. Because there can be 3+ million names.
+        Args:
+            texts (list[str]): The texts to embed.
+            desc (str): The description for the progress bar.
+        Returns:
+            Tensor: The embeddings (on the cpu).
+        """
+        total_batches = math.ceil(len(texts) / self.cnf_l.embedding_batch_size)
+        all_embeddings = []
+        for batch in tqdm(
+            self._batch_data(texts, self.cnf_l.embedding_batch_size),
+            total=total_batches,
+            desc=desc,
+        ):
+            with torch.no_grad():
+                embeddings = self._embed(batch, self.device)
+                all_embeddings.append(embeddings.cpu())
+        # cat all batches into one tensor
+        return torch.cat(all_embeddings, dim=0)
 
     def _embed_cui_names(
         self,
@@ -122,28 +382,12 @@ class Linker(AbstractCoreComponent):
             self.cnf_l.embedding_model_name = embedding_model_name
 
         # Use the longest name
-        cui_names = [
-            max(self.cdb.cui2info[cui]["names"], key=len) for cui in self._cui_keys
-        ]
-        # embed each name in batches. Because there can be 3+ million names
-        total_batches = math.ceil(len(cui_names) / self.cnf_l.embedding_batch_size)
-        all_embeddings = []
-        for names in tqdm(
-            self._batch_data(cui_names, self.cnf_l.embedding_batch_size),
-            total=total_batches,
-            desc="Embedding cuis' preferred names",
-        ):
-            with torch.no_grad():
-                # removing ~ from names, as it is used to indicate a space in the CDB
-                names_to_embed = [
-                    name.replace(self.config.general.separator, " ") for name in names
-                ]
-                embeddings = self._embed(names_to_embed, self.device)
-                all_embeddings.append(embeddings.cpu())
-        # cat all batches into one tensor
-        all_embeddings_matrix = torch.cat(all_embeddings, dim=0)
-        self.cdb.addl_info["cui_embeddings"] = all_embeddings_matrix
-        logger.debug("Embedding cui names done, total: %d", len(names))
+        cui_names = [self._get_cui_text(cui) for cui in self._cui_keys]
+        all_embeddings_matrix = self._embed_in_batches(
+            cui_names, "Embedding cuis' preferred names"
+        )
+        self._set_embeddings("cui", all_embeddings_matrix)
+        logger.debug("Embedding cui names done, total: %d", len(cui_names))
 
     def _embed_names(self, embedding_model_name: str) -> None:
         """Obtain embeddings for all names in the CDB using the specified
@@ -157,24 +401,9 @@ class Linker(AbstractCoreComponent):
             logger.debug("Using the same model for embedding names.")
         else:
             self.cnf_l.embedding_model_name = embedding_model_name
-        names = self._name_keys
-        # embed each name in batches. Because there can be 3+ million names
-        total_batches = math.ceil(len(names) / self.cnf_l.embedding_batch_size)
-        all_embeddings = []
-        for names in tqdm(
-            self._batch_data(names, self.cnf_l.embedding_batch_size),
-            total=total_batches,
-            desc="Embedding names",
-        ):
-            with torch.no_grad():
-                # removing ~ from names, as it is used to indicate a space in the CDB
-                names_to_embed = [
-                    name.replace(self.config.general.separator, " ") for name in names
-                ]
-                embeddings = self._embed(names_to_embed, self.device)
-                all_embeddings.append(embeddings.cpu())
-        all_embeddings_matrix = torch.cat(all_embeddings, dim=0)
-        self.cdb.addl_info["name_embeddings"] = all_embeddings_matrix
+        names = [self._get_name_text(name) for name in self._name_keys]
+        all_embeddings_matrix = self._embed_in_batches(names, "Embedding names")
+        self._set_embeddings("name", all_embeddings_matrix)
         logger.debug("Embedding names done, total: %d", len(names))
 
     def get_type(self) -> CoreComponentType:
@@ -258,17 +487,49 @@ class Linker(AbstractCoreComponent):
         """Get context vectors for all detected concepts based on their 
         surrounding text.
 
+        Each distinct text is only embedded once per document. The embeddings
+        of the detected spans (size 0) are also cached across documents.
+
         Args:
             doc (BaseDocument): The document look in.
-            size (int): The size of the entity.
+            entities (list[MutableEntity]): The entities.
+            size (int): The size of the context window.
         Returns:
-            tuple[list[BaseToken], list[BaseToken], list[BaseToken]]:
-                The tokens on the left, centre, and right."""
-        texts = []
-        for entity in entities:
-            text = self._get_context(entity, doc, size)
-            texts.append(text)
-        return self._embed(texts, self.device)
+            Tensor: The context vectors (one per entity)."""
+        texts = [self._get_context(entity, doc, size) for entity in entities]
+        vectors: dict[str, Tensor] = {}
+        for text in texts:
+            if text in vectors:
+                continue
+            vector = self._doc_contexts.get(text)
+            if vector is None and size == 0:
+                vector = self._span_cache.get(text)
+                if vector is not None:
+                    self._span_cache.move_to_end(text)
+                    self.cache_hits += 1
+            if vector is not None:
+                vectors[text] = vector
+        # NOTE: dicts keep the order, so this embeds the distinct texts
+        to_embed = [text for text in dict.fromkeys(texts) if text not in vectors]
+        if to_embed:
+            if size == 0:
+                self.cache_misses += len(to_embed)
+            for text, vector in zip(to_embed, self._embed(to_embed, self.device)):
+                vectors[text] = vector
+                self._doc_contexts[text] = vector
+                if size == 0 and self.cnf_l.context_cache_size > 0:
+                    # NOTE: clone so that the cache doesn't keep the batch
+                    self._span_cache[text] = vector.clone()
+                    if len(self._span_cache) > self.cnf_l.context_cache_size:
+                        self._span_cache.popitem(last=False)
+        return torch.stack([vectors[text] for text in texts])
+
+    def _get_span_cache_state(self) -> tuple:
+        return (self.cnf_l.embedding_model_name, self.max_length, str(self.device))
+
+    def clear_cache(self) -> None:
+        """Clear the cache of the embeddings of the detected spans."""
+        self._span_cache.clear()
 
     def _set_filters(self) -> None:
         include_set = self.cnf_l.filters.cuis
@@ -321,7 +582,8 @@ class Linker(AbstractCoreComponent):
         # checking if a name has at least 1 cui related to it.
         _has_cuis_all = torch.tensor(
             [
-                bool(self.cdb.name2info[name]["per_cui_status"])
+                name in self.cdb.name2info
+                and bool(self.cdb.name2info[name]["per_cui_status"])
                 for name in self._name_keys
             ],
             device=self.device,
@@ -333,20 +595,19 @@ class Linker(AbstractCoreComponent):
 
 
     def _disambiguate_by_cui(
-        self, cui_candidates: list[str], scores: Tensor
+        self, cui_candidates: list[str], context_vector: Tensor
     ) -> tuple[str, float]:
         """Disambiguate a detected concept by a list of potential cuis
         Args:
             cuis (list[str]): Potential cuis
-            cui_to_idx (dict[str, int]): Mapping of cui to relevant idx position
-            scores (Tensor): Scores for the detected cui2info concepts similarity
-            cui_keys (list[str]): idx_to_cui inverse
+            context_vector (Tensor): The context vector of the detected concept
         Returns:
             tuple[str, float]:
                 The CUI and its similarity
         """
         cui_idxs = [self._cui_to_idx[cui] for cui in cui_candidates]
-        candidate_scores = scores[cui_idxs]
+        # only score the candidates rather than all cuis
+        candidate_scores = self._score_cuis(cui_idxs, context_vector)
         candidate_idx = int(torch.argmax(candidate_scores).item())
         best_idx = cui_idxs[candidate_idx]
 
@@ -369,12 +630,8 @@ class Linker(AbstractCoreComponent):
             doc, entities, self.cnf_l.context_window_size
         )
 
-        # score all detected contexts vs all names
-        names_scores = detected_context_vectors @ self.names_context_matrix.T
-        cui_scores = detected_context_vectors @ self.cui_context_matrix.T
-        sorted_indices = torch.argsort(names_scores, dim=1, descending=True)
-
-        for i, entity in enumerate(entities):
+        all_link_candidates = []
+        for entity in entities:
             link_candidates = entity.link_candidates
             if self.config.components.linking.filter_before_disamb:
                 link_candidates = [
@@ -382,10 +639,31 @@ class Linker(AbstractCoreComponent):
                     for cui in link_candidates
                     if self.cnf_l.filters.check_filters(cui)
                 ]
+            all_link_candidates.append(link_candidates)
+
+        # find the most similar valid name for entities without candidates
+        to_search = [
+            i for i, link_candidates in enumerate(all_link_candidates)
+            if not link_candidates
+        ]
+        top_names: dict[int, tuple[float, int]] = {}
+        if to_search:
+            top_scores, top_indices = self.name_index.search(
+                detected_context_vectors[to_search], 1, self._valid_names
+            )
+            for i, score, name_idx in zip(
+                to_search, top_scores[:, 0].tolist(), top_indices[:, 0].tolist()
+            ):
+                top_names[i] = (score, name_idx)
+
+        for i, (entity, link_candidates) in enumerate(
+            zip(entities, all_link_candidates)
+        ):
+            context_vector = detected_context_vectors[i]
             if len(link_candidates) == 1:
                 best_idx = self._cui_to_idx[link_candidates[0]]
                 predicted_cui = link_candidates[0]
-                similarity = names_scores[i, best_idx].item()
+                similarity = self._score_cuis([best_idx], context_vector)[0].item()
             elif len(link_candidates) > 1:
                 name_to_cuis = defaultdict(list)
                 for cui in link_candidates:
@@ -393,34 +671,27 @@ class Linker(AbstractCoreComponent):
                         name_to_cuis[name].append(cui)
 
                 name_idxs = [self._name_to_idx[name] for name in name_to_cuis]
-                indexed_scores = names_scores[i, name_idxs]
+                # only score the names of the candidates rather than all names
+                indexed_scores = self._score_names(name_idxs, context_vector)
 
                 best_local_pos = int(torch.argmax(indexed_scores).item())
                 best_global_idx = name_idxs[best_local_pos]
-                similarity = names_scores[i, best_global_idx].item()
+                similarity = indexed_scores[best_local_pos].item()
                 best_name = self._name_keys[best_global_idx]
                 cuis = name_to_cuis[best_name]
                 if len(cuis) == 1:
                     predicted_cui = cuis[0]
                 else:
-                    predicted_cui, _ = self._disambiguate_by_cui(cuis, cui_scores[i, :])
+                    predicted_cui, _ = self._disambiguate_by_cui(cuis, context_vector)
             else:
-                row_sorted = sorted_indices[i]  # sorted candidate indices for entity i
-
-                # Find the first candidate in this row with CUIs
-                first_true_pos = int(
-                    torch.nonzero(self._valid_names[row_sorted], as_tuple=True)[0][
-                        0
-                    ].item()
-                )
-
-                # Get global index + name
-                top_name_idx = int(row_sorted[first_true_pos].item())
-                similarity = names_scores[i, top_name_idx].item()
+                similarity, top_name_idx = top_names[i]
+                if top_name_idx == -1:
+                    # no valid names (e.g due to filters)
+                    continue
                 detected_name = self._name_keys[top_name_idx]
                 cuis = list(self.cdb.name2info[detected_name]["per_cui_status"].keys())
 
-                predicted_cui, _ = self._disambiguate_by_cui(cuis, cui_scores[i, :])
+                predicted_cui, _ = self._disambiguate_by_cui(cuis, context_vector)
             if not self.cnf_l.filters.check_filters(predicted_cui):
                 continue
             if self._check_similarity(
@@ -452,15 +723,43 @@ class Linker(AbstractCoreComponent):
             ]
 
     def _build_context_matrices(self) -> None:
+        # NOTE: on the cpu, stored embeddings of the configured dtype are
+        #       used as is (i.e memory mapped), without any copies
         if "name_embeddings" in self.cdb.addl_info:
-            self._names_context_matrix = (
-                self.cdb.addl_info["name_embeddings"].half().to(self.device)
+            self._names_context_matrix, self._names_context_scales = (
+                self._get_context_matrix("name")
             )
         if "cui_embeddings" in self.cdb.addl_info:
-            self._cui_context_matrix = (
-                self.cdb.addl_info["cui_embeddings"].half().to(self.device)
+            self._cui_context_matrix, self._cui_context_scales = (
+                self._get_context_matrix("cui")
             )
 
+    def _get_context_matrix(self, kind: str) -> tuple[Tensor, Optional[Tensor]]:
+        data, scales = to_dtype(
+            *self._get_embeddings(kind), self.cnf_l.embedding_dtype
+        )
+        return data.to(self.device), None if scales is None else scales.to(
+            self.device
+        )
+
+    def _score_names(self, name_idxs: list[int], context_vector: Tensor) -> Tensor:
+        rows = self.names_context_matrix[name_idxs]
+        scales = self._names_context_scales
+        return score_rows(
+            context_vector.unsqueeze(0),
+            rows,
+            None if scales is None else scales[name_idxs],
+        )[0]
+
+    def _score_cuis(self, cui_idxs: list[int], context_vector: Tensor) -> Tensor:
+        rows = self.cui_context_matrix[cui_idxs]
+        scales = self._cui_context_scales
+        return score_rows(
+            context_vector.unsqueeze(0),
+            rows,
+            None if scales is None else scales[cui_idxs],
+        )[0]
+
     def _generate_link_candidates(
         self, doc: MutableDocument, entities: list[MutableEntity]
     ) -> None:
@@ -468,32 +767,28 @@ class Linker(AbstractCoreComponent):
         on context vectors with size 0. Compare to names to get the most
         similar name in the cdb to the detected concept."""
         detected_context_vectors = self._get_context_vectors(doc, entities, 0)
+        threshold = self.cnf_l.short_similarity_threshold
 
-        # score all detected contexts vs all names
-        names_scores = detected_context_vectors @ self.names_context_matrix.T
-        sorted_indices = torch.argsort(names_scores, dim=1, descending=True)
+        # find the most similar valid names (via filtering and contain
+        # at least 1 cui) for all detected contexts
+        if threshold > 0:
+            # thresholded selection
+            k = self.cnf_l.max_candidate_names
+        else:
+            # just take the single best valid candidate
+            k = 1
+        top_scores, top_indices = self.name_index.search(
+            detected_context_vectors, k, self._valid_names
+        )
 
         for i, entity in enumerate(entities):
-            row_sorted = sorted_indices[i]
             cuis: set[str] = set()
-
-            # scores for this entity row
-            row_scores = names_scores[i, row_sorted]
-            # valid names via filtering and contain at least 1 cui
-            valid_mask = self._valid_names[row_sorted]
-
-            if self.cnf_l.short_similarity_threshold > 0:
-                # thresholded selection
-                above_thresh_mask = row_scores >= self.cnf_l.short_similarity_threshold
-                selected_mask = valid_mask & above_thresh_mask
-                valid_positions = torch.nonzero(selected_mask, as_tuple=True)[0]
-            else:
-                # just take the single best valid candidate
-                first_valid = torch.nonzero(valid_mask, as_tuple=True)[0][:1]
-                valid_positions = first_valid
-
-            for pos in valid_positions.tolist():
-                top_name_idx = int(row_sorted[pos].item())
+            for score, top_name_idx in zip(
+                top_scores[i].tolist(), top_indices[i].tolist()
+            ):
+                if top_name_idx == -1 or (threshold > 0 and score < threshold):
+                    # the rest are invalid or below the threshold
+                    break
                 detected_name = self._name_keys[top_name_idx]
                 cuis.update(self.cdb.name2info[detected_name]["per_cui_status"].keys())
 
@@ -550,10 +845,16 @@ class Linker(AbstractCoreComponent):
             )
             logging.warning(
                 "If you have added new concepts or changes, "
-                "please re-embed the CDB names and cuis before linking."
+                "please refresh the embeddings (`refresh_embeddings`) "
+                "before linking. This only embeds the new or changed "
+                "names and cuis."
             )
 
         self._load_transformers(self.cnf_l.embedding_model_name)
+        span_cache_state = self._get_span_cache_state()
+        if span_cache_state != self._span_cache_state:
+            self.clear_cache()
+            self._span_cache_state = span_cache_state
         if self.cnf_l.train:
             logger.warning(
                 "Attemping to train an embedding linker. This is not required."
@@ -566,10 +867,16 @@ class Linker(AbstractCoreComponent):
 
         self._set_filters()
 
-        with torch.no_grad():
-            le, to_infer = self._pre_inference(doc)
-            for entities in self._batch_data(to_infer, self.cnf_l.linking_batch_size):
-                le.extend(list(self._inference(doc, entities)))
+        try:
+            with torch.no_grad():
+                le, to_infer = self._pre_inference(doc)
+                for entities in self._batch_data(
+                    to_infer, self.cnf_l.linking_batch_size
+                ):
+                    le.extend(list(self._inference(doc, entities)))
+        finally:
+            # the (non-span) contexts are specific to the document
+            self._doc_contexts.clear()
 
         doc.ner_ents.clear()
         doc.ner_ents.extend(le)
@@ -583,6 +890,43 @@ class Linker(AbstractCoreComponent):
             self._build_context_matrices()
         return self._names_context_matrix
 
+    def _get_name_index_key(self) -> tuple:
+        return (
+            self.cnf_l.name_index,
+            self.cnf_l.name_index_block_size,
+            self.cnf_l.ivf_num_lists,
+            self.cnf_l.ivf_num_probes,
+        )
+
+    def _build_name_index(self, use_saved: bool = True) -> None:
+        """Build (or load) the name index used to find the most similar names.
+        The index state is saved in the CDB along with the embeddings.
+        Args:
+            use_saved (bool): Whether to use the index state saved in the CDB
+            (if it matches the names). Defaults to True.
+        """
+        names_matrix = self.names_context_matrix
+        self._name_index = create_name_index(
+            names_matrix,
+            self.cnf_l.name_index,
+            block_size=self.cnf_l.name_index_block_size,
+            num_lists=self.cnf_l.ivf_num_lists,
+            num_probes=self.cnf_l.ivf_num_probes,
+            state=self.cdb.addl_info.get("name_index") if use_saved else None,
+            scales=self._names_context_scales,
+        )
+        self._name_index_key = self._get_name_index_key()
+        self.cdb.addl_info["name_index"] = self._name_index.get_state()
+
+    @property
+    def name_index(self) -> NameIndex:
+        if (
+            self._name_index is None
+            or self._name_index_key != self._get_name_index_key()
+        ):
+            self._build_name_index()
+        return self._name_index
+
     @property
     def cui_context_matrix(self):
         if self._cui_context_matrix is None:
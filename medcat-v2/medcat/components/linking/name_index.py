@@ -0,0 +1,338 @@
+"""Top-k similarity search over the name embeddings of the embedding linker.
+
+The embedding linker needs the most similar (valid) names for each
+detected entity. Sorting the similarities to every name in the CDB is
+O(N log N) per entity, with N in the millions for large CDBs. The indices
+here only keep track of the top k names instead.
+
+The `ExactNameIndex` scores every name (in blocks) and keeps the running
+top k. The `IVFNameIndex` (inverted file index) clusters the names and only
+scores the names in the clusters closest to the query. This is
+approximate, but a lot faster on large CDBs.
+
+Both work on the stored form of the names (float16, or int8 with per-row
+scales, see `quantisation`).
+"""
+from typing import Protocol, Optional, Any, runtime_checkable
+import logging
+import math
+
+import torch
+from torch import Tensor
+
+from medcat.components.linking.quantisation import score_rows, dequantise
+
+
+logger = logging.getLogger(__name__)
+
+
+@runtime_checkable
+class NameIndex(Protocol):
+    """The index used to find the names most similar to a context vector."""
+
+    def search(self, queries: Tensor, k: int, valid_mask: Tensor
+               ) -> tuple[Tensor, Tensor]:
+        """Find the top k valid names for each query.
+
+        Args:
+            queries (Tensor): The (normalised) query vectors (B x D).
+            k (int): The number of names to find.
+            valid_mask (Tensor): The boolean mask of names that are
+                allowed to be returned (N).
+
+        Returns:
+            tuple[Tensor, Tensor]: The scores and the indices of the names
+                (both B x k), in descending order of score. If fewer than
+                k valid names are found, the rest of the scores are -inf
+                and the indices are -1.
+        """
+        pass
+
+    def get_state(self) -> dict[str, Any]:
+        """Get the state of the index to be saved.
+
+        Returns:
+            dict[str, Any]: The state.
+        """
+        pass
+
+
+def _merge_top_k(scores: Tensor, indices: Tensor, new_scores: Tensor,
+                 new_indices: Tensor, k: int) -> tuple[Tensor, Tensor]:
+    all_scores = torch.cat([scores, new_scores], dim=1)
+    all_indices = torch.cat([indices, new_indices], dim=1)
+    top_scores, top_pos = torch.topk(
+        all_scores, min(k, all_scores.shape[1]), dim=1)
+    return top_scores, torch.gather(all_indices, 1, top_pos)
+
+
+def _pad_top_k(scores: Tensor, indices: Tensor, k: int
+               ) -> tuple[Tensor, Tensor]:
+    indices = indices.masked_fill(torch.isinf(scores), -1)
+    missing = k - scores.shape[1]
+    if missing > 0:
+        scores = torch.cat([scores, scores.new_full(
+            (scores.shape[0], missing), -math.inf)], dim=1)
+        indices = torch.cat([indices, indices.new_full(
+            (indices.shape[0], missing), -1)], dim=1)
+    return scores, indices
+
+
+class ExactNameIndex:
+    """Exact top-k search over all the names.
+
+    The names are scored in blocks so that the full (B x N) similarity
+    matrix never needs to be sorted (or even held in memory).
+
+    Args:
+        names_matrix (Tensor): The name embeddings (N x D).
+        block_size (int): The number of names scored at once.
+        scales (Optional[Tensor]): The per-name scales (N) if the names
+            are stored as int8. Defaults to None.
+    """
+
+    def __init__(self, names_matrix: Tensor, block_size: int = 65536,
+                 scales: Optional[Tensor] = None) -> None:
+        self.names_matrix = names_matrix
+        self.block_size = block_size
+        self.scales = scales
+
+    def search(self, queries: Tensor, k: int, valid_mask: Tensor
+               ) -> tuple[Tensor, Tensor]:
+        num_queries = queries.shape[0]
+        scores = torch.empty((num_queries, 0), device=queries.device)
+        indices = torch.empty((num_queries, 0), dtype=torch.long,
+                              device=queries.device)
+        for start in range(0, self.names_matrix.shape[0], self.block_size):
+            end = start + self.block_size
+            block_scores = score_rows(
+                queries, self.names_matrix[start:end],
+                None if self.scales is None else self.scales[start:end])
+            block_scores.masked_fill_(~valid_mask[start:end], -math.inf)
+            block_top, block_pos = torch.topk(
+                block_scores, min(k, block_scores.shape[1]), dim=1)
+            scores, indices = _merge_top_k(
+                scores, indices, block_top, block_pos + start, k)
+        return _pad_top_k(scores, indices, k)
+
+    def get_state(self) -> dict[str, Any]:
+        return {'type': 'exact'}
+
+
+class IVFNameIndex:
+    """Approximate top-k search using an inverted file index.
+
+    The names are clustered (spherical k-means) into `num_lists` lists.
+    At search time, only the names in the `num_probes` lists with the
+    closest centroids are scored. If none of those names are valid
+    (e.g due to the filters), all the names are scored instead.
+
+    Args:
+        names_matrix (Tensor): The name embeddings (N x D).
+        centroids (Tensor): The list centroids (L x D).
+        list_offsets (Tensor): The start of each list in `list_ids` (L + 1).
+        list_ids (Tensor): The name indices, grouped by list (N).
+        num_probes (int): The number of lists to score per query.
+        block_size (int): The block size for the exact fallback.
+        scales (Optional[Tensor]): The per-name scales (N) if the names
+            are stored as int8. Defaults to None.
+    """
+
+    def __init__(self, names_matrix: Tensor, centroids: Tensor,
+                 list_offsets: Tensor, list_ids: Tensor,
+                 num_probes: int = 16, block_size: int = 65536,
+                 scales: Optional[Tensor] = None) -> None:
+        self.names_matrix = names_matrix
+        self.scales = scales
+        self.centroids = centroids.to(
+            names_matrix.device, _get_centroid_dtype(names_matrix))
+        self.list_offsets = list_offsets.tolist()
+        self.list_ids = list_ids.to(names_matrix.device)
+        self.num_probes = num_probes
+        self._exact = ExactNameIndex(names_matrix, block_size, scales)
+
+    @property
+    def num_lists(self) -> int:
+        return self.centroids.shape[0]
+
+    @classmethod
+    def build(cls, names_matrix: Tensor, num_lists: int = 0,
+              num_probes: int = 16, block_size: int = 65536,
+              num_iterations: int = 10, max_train_size: int = 256,
+              seed: int = 0, centroids: Optional[Tensor] = None,
+              scales: Optional[Tensor] = None) -> 'IVFNameIndex':
+        """Build the index for the name embeddings.
+
+        Args:
+            names_matrix (Tensor): The name embeddings (N x D).
+            num_lists (int): The number of lists (clusters). If 0, the
+                square root of the number of names is used.
+            num_probes (int): The number of lists to score per query.
+            block_size (int): The block size used when assigning names to
+                lists as well as for the exact fallback.
+            num_iterations (int): The number of k-means iterations.
+            max_train_size (int): The maximum number of names per list
+                used for training the centroids.
+            seed (int): The random seed for sampling the training names.
+            centroids (Optional[Tensor]): Existing centroids to use. If
+                specified, the names are only (re)assigned to these lists
+                and no training is done. Defaults to None.
+            scales (Optional[Tensor]): The per-name scales (N) if the names
+                are stored as int8. Defaults to None.
+
+        Returns:
+            IVFNameIndex: The index.
+        """
+        num_names = names_matrix.shape[0]
+        if centroids is not None:
+            logger.info("Assigning %d names to the %d lists of an IVF name "
+                        "index", num_names, centroids.shape[0])
+            return cls._assign(names_matrix, centroids.float(), num_probes,
+                               block_size, scales)
+        if num_lists <= 0:
+            num_lists = max(1, int(math.sqrt(num_names)))
+        num_lists = min(num_lists, num_names)
+        logger.info("Building an IVF name index with %d lists for %d names",
+                    num_lists, num_names)
+        generator = torch.Generator().manual_seed(seed)
+        train_size = min(num_names, num_lists * max_train_size)
+        train_ids = torch.randperm(num_names, generator=generator)
+        train_ids = train_ids[:train_size].to(names_matrix.device)
+        train = dequantise(names_matrix[train_ids],
+                           None if scales is None else scales[train_ids])
+        centroids = train[:num_lists].clone()
+        for _ in range(num_iterations):
+            assignment = torch.argmax(train @ centroids.T, dim=1)
+            new_centroids = torch.zeros_like(centroids)
+            new_centroids.index_add_(0, assignment, train)
+            counts = torch.bincount(assignment, minlength=num_lists)
+            # NOTE: empty lists keep their previous centroid
+            empty = counts == 0
+            new_centroids[empty] = centroids[empty]
+            centroids = torch.nn.functional.normalize(new_centroids, dim=1)
+        return cls._assign(names_matrix, centroids, num_probes, block_size,
+                           scales)
+
+    @classmethod
+    def _assign(cls, names_matrix: Tensor, centroids: Tensor,
+                num_probes: int, block_size: int,
+                scales: Optional[Tensor]) -> 'IVFNameIndex':
+        num_names = names_matrix.shape[0]
+        num_lists = centroids.shape[0]
+        centroids = centroids.to(names_matrix.device)
+        assignments = []
+        for start in range(0, num_names, block_size):
+            # NOTE: the (positive) per-name scales of int8 names do not
+            #       change the closest centroid
+            block = names_matrix[start: start + block_size].float()
+            assignments.append(torch.argmax(block @ centroids.T, dim=1))
+        assignment = torch.cat(assignments)
+        list_ids = torch.argsort(assignment, stable=True)
+        counts = torch.bincount(assignment, minlength=num_lists).cpu()
+        list_offsets = torch.cat([torch.zeros(1, dtype=torch.long),
+                                  torch.cumsum(counts, dim=0)])
+        return cls(names_matrix, centroids, list_offsets, list_ids,
+                   num_probes, block_size, scales)
+
+    def _get_candidates(self, centroid_scores: Tensor) -> Tensor:
+        probes = torch.topk(centroid_scores,
+                            min(self.num_probes, self.num_lists)).indices
+        return torch.cat([
+            self.list_ids[self.list_offsets[lst]: self.list_offsets[lst + 1]]
+            for lst in probes.tolist()])
+
+    def search(self, queries: Tensor, k: int, valid_mask: Tensor
+               ) -> tuple[Tensor, Tensor]:
+        all_centroid_scores = score_rows(queries, self.centroids, None)
+        all_scores, all_indices = [], []
+        for query, centroid_scores in zip(queries, all_centroid_scores):
+            candidates = self._get_candidates(centroid_scores)
+            candidates = candidates[valid_mask[candidates]]
+            if not len(candidates):
+                scores, indices = self._exact.search(
+                    query.unsqueeze(0), k, valid_mask)
+            else:
+                cand_scores = score_rows(
+                    query.unsqueeze(0), self.names_matrix[candidates],
+                    None if self.scales is None
+                    else self.scales[candidates])[0]
+                top_scores, top_pos = torch.topk(
+                    cand_scores, min(k, len(candidates)))
+                scores, indices = _pad_top_k(
+                    top_scores.unsqueeze(0),
+                    candidates[top_pos].unsqueeze(0), k)
+            all_scores.append(scores)
+            all_indices.append(indices)
+        return torch.cat(all_scores), torch.cat(all_indices)
+
+    def get_state(self) -> dict[str, Any]:
+        return {
+            'type': 'ivf',
+            'num_names': self.names_matrix.shape[0],
+            'centroids': self.centroids.cpu(),
+            'list_offsets': torch.tensor(self.list_offsets),
+            'list_ids': self.list_ids.cpu(),
+        }
+
+
+def create_name_index(names_matrix: Tensor, index_type: str,
+                      block_size: int = 65536, num_lists: int = 0,
+                      num_probes: int = 16,
+                      state: Optional[dict[str, Any]] = None,
+                      scales: Optional[Tensor] = None) -> NameIndex:
+    """Create (or load) the name index of the specified type.
+
+    Args:
+        names_matrix (Tensor): The name embeddings (N x D).
+        index_type (str): The type of index ("exact" or "ivf").
+        block_size (int): The block size for exact scoring.
+        num_lists (int): The number of lists for the IVF index. If 0, the
+            square root of the number of names is used.
+        num_probes (int): The number of lists to score for the IVF index.
+        state (Optional[dict[str, Any]]): The saved state of an index.
+            This is used if it matches the index type and the names. If
+            it only has the centroids (or the number of names differs),
+            the names are reassigned to the existing centroids.
+            Defaults to None.
+        scales (Optional[Tensor]): The per-name scales (N) if the names
+            are stored as int8. Defaults to None.
+
+    Raises:
+        UnknownNameIndexType: If the index type is not known.
+
+    Returns:
+        NameIndex: The index.
+    """
+    if index_type == 'exact' or not names_matrix.shape[0]:
+        return ExactNameIndex(names_matrix, block_size, scales)
+    elif index_type != 'ivf':
+        raise UnknownNameIndexType(index_type)
+    if (state is None or state.get('type') != 'ivf' or
+            state['centroids'].shape[1] != names_matrix.shape[1] or
+            (num_lists > 0 and state['centroids'].shape[0] != num_lists)):
+        return IVFNameIndex.build(names_matrix, num_lists, num_probes,
+                                  block_size, scales=scales)
+    if ('list_ids' in state and
+            state['num_names'] == names_matrix.shape[0]):
+        return IVFNameIndex(
+            names_matrix, state['centroids'], state['list_offsets'],
+            state['list_ids'], num_probes, block_size, scales)
+    # NOTE: the names have changed, but the centroids can be reused
+    return IVFNameIndex.build(names_matrix, num_probes=num_probes,
+                              block_size=block_size,
+                              centroids=state['centroids'], scales=scales)
+
+
+def _get_centroid_dtype(names_matrix: Tensor) -> torch.dtype:
+    # NOTE: centroids are kept in the precision of the names unless the
+    #       names are quantised
+    if names_matrix.is_floating_point():
+        return names_matrix.dtype
+    return torch.float32
+
+
+class UnknownNameIndexType(ValueError):
+
+    def __init__(self, index_type: str) -> None:
+        super().__init__(f"Unknown name index type: '{index_type}'. "
+                         "Available: 'exact', 'ivf'")
@@ -0,0 +1,104 @@
+"""Compact storage of the embedding linker matrices.
+
+The name and CUI embeddings are stored either as float16 or as int8 with a
+(float32) scale per row. In the latter case, a row of the original matrix
+is approximately `data[row] * scales[row]`. The similarities are computed
+from the stored form directly (see `score_rows`) so the full precision
+matrices never need to be kept in memory.
+"""
+from typing import Optional
+
+import torch
+from torch import Tensor
+
+
+EMBEDDING_DTYPES = ('float16', 'int8')
+
+
+def quantise(matrix: Tensor, dtype: str
+             ) -> tuple[Tensor, Optional[Tensor]]:
+    """Convert the (floating point) matrix to the specified storage type.
+
+    Args:
+        matrix (Tensor): The matrix (N x D).
+        dtype (str): The storage type ("float16" or "int8").
+
+    Raises:
+        UnknownEmbeddingDtype: If the storage type is not known.
+
+    Returns:
+        tuple[Tensor, Optional[Tensor]]: The stored matrix and the per-row
+            scales (only for int8).
+    """
+    if dtype == 'float16':
+        return matrix.half(), None
+    elif dtype != 'int8':
+        raise UnknownEmbeddingDtype(dtype)
+    matrix = matrix.float()
+    scales = matrix.abs().amax(dim=1) / 127
+    # NOTE: all-zero rows keep their zeros
+    scales = torch.where(scales > 0, scales, torch.ones_like(scales))
+    data = torch.round(matrix / scales.unsqueeze(1)).clamp_(-127, 127)
+    return data.to(torch.int8), scales
+
+
+def dequantise(data: Tensor, scales: Optional[Tensor]) -> Tensor:
+    """Get the (float32) matrix back from its stored form.
+
+    Args:
+        data (Tensor): The stored matrix (N x D).
+        scales (Optional[Tensor]): The per-row scales (N), if any.
+
+    Returns:
+        Tensor: The float32 matrix.
+    """
+    if scales is None:
+        return data.float()
+    return data.float() * scales.unsqueeze(1)
+
+
+def to_dtype(data: Tensor, scales: Optional[Tensor], dtype: str
+             ) -> tuple[Tensor, Optional[Tensor]]:
+    """Convert a stored matrix to a (potentially) different storage type.
+
+    Args:
+        data (Tensor): The stored matrix (N x D).
+        scales (Optional[Tensor]): The per-row scales (N), if any.
+        dtype (str): The storage type ("float16" or "int8").
+
+    Returns:
+        tuple[Tensor, Optional[Tensor]]: The matrix and the scales in the
+            specified storage type. These are the same objects if the
+            matrix is already stored as such.
+    """
+    if dtype == 'int8' and data.dtype == torch.int8 and scales is not None:
+        return data, scales
+    if dtype == 'float16' and data.dtype == torch.float16 and scales is None:
+        return data, scales
+    return quantise(dequantise(data, scales), dtype)
+
+
+def score_rows(queries: Tensor, rows: Tensor, scales: Optional[Tensor]
+               ) -> Tensor:
+    """Score the (normalised) queries against the stored rows.
+
+    Args:
+        queries (Tensor): The queries (B x D).
+        rows (Tensor): The stored rows (n x D).
+        scales (Optional[Tensor]): The scales of the rows (n), if any.
+
+    Returns:
+        Tensor: The float32 similarities (B x n).
+    """
+    if scales is None:
+        return (queries.to(rows.dtype) @ rows.T).float()
+    # NOTE: the scales can be applied after the product since they are
+    #       per row
+    return (queries.float() @ rows.float().T) * scales
+
+
+class UnknownEmbeddingDtype(ValueError):
+
+    def __init__(self, dtype: str) -> None:
+        super().__init__(f"Unknown embedding dtype: '{dtype}'. "
+                         f"Available: {', '.join(EMBEDDING_DTYPES)}")
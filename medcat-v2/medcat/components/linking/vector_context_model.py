@@ -54,6 +54,11 @@ class ContextModel(AbstractSerialisable):
         self.name_separator = name_separator
         self._disamb_preprocessors = (  # copy if default/empty
             disamb_preprocessors or disamb_preprocessors.copy())
+        self._cv_index = ContextVectorIndex(self.cui2info)
+
+    @classmethod
+    def ignore_attrs(cls) -> list[str]:
+        return ['_cv_index']
 
     def get_context_tokens(self, entity: MutableEntity, doc: MutableDocument,
                            size: int,
@@ -258,8 +263,9 @@ class ContextModel(AbstractSerialisable):
 
         if cuis:    # Maybe none are left after filtering
             # Calculate similarity for each cui
-            similarities = [float(self._similarity(cui, vectors))
-                            for cui in cuis]
+            similarities = self._cv_index.get_similarities(
+                cuis, vectors, self.config.context_vector_weights,
+                self.config.train_count_threshold).tolist()
             # DEBUG
             logger.debug("Similarities: %s", list(zip(cuis, similarities)))
 
@@ -407,6 +413,133 @@ class ContextModel(AbstractSerialisable):
                                    lr, negative=True)
 
 
+class ContextVectorIndex:
+    """Packed context vectors for scoring many CUIs at once.
+
+    The context vectors of the CUIs are packed into a contiguous
+    float32 matrix per context type. Each row is normalised to unit
+    length at the time it is written. Rows are created lazily (i.e
+    upon first lookup of a CUI) and kept track of in a CUI to row map.
+
+    Each row remembers the (exact) vectors it was built from. Upon lookup
+    the row is checked against the CUI's current context vectors and
+    rewritten if they've been changed (e.g during training). This works
+    since training replaces the vectors rather than changing them in place.
+
+    Args:
+        cui2info (dict[str, CUIInfo]): The CUI to info mapping.
+        init_capacity (int): The initial number of rows. Defaults to 1024.
+    """
+
+    def __init__(self, cui2info: dict[str, CUIInfo],
+                 init_capacity: int = 1024) -> None:
+        self.cui2info = cui2info
+        self._capacity = init_capacity
+        self._cui2row: dict[str, int] = {}
+        self._row_vectors: list[dict[str, np.ndarray]] = []
+        self._matrices: dict[str, np.ndarray] = {}
+        self._has_type: dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._row_vectors)
+
+    def __eq__(self, other: object) -> bool:
+        # NOTE: this is just a cache for the context vectors in cui2info
+        #       so its state does not affect equality of the context model
+        return isinstance(other, ContextVectorIndex)
+
+    def _grow(self) -> None:
+        self._capacity *= 2
+        for ct, mat in self._matrices.items():
+            new_mat = np.zeros((self._capacity, mat.shape[1]),
+                               dtype=np.float32)
+            new_mat[:mat.shape[0]] = mat
+            self._matrices[ct] = new_mat
+            new_has = np.zeros(self._capacity, dtype=bool)
+            new_has[:mat.shape[0]] = self._has_type[ct]
+            self._has_type[ct] = new_has
+
+    def _write_row(self, row: int, cui_vectors: dict[str, np.ndarray]
+                   ) -> None:
+        for has in self._has_type.values():
+            has[row] = False
+        for ct, vec in cui_vectors.items():
+            if ct not in self._matrices:
+                self._matrices[ct] = np.zeros((self._capacity, len(vec)),
+                                              dtype=np.float32)
+                self._has_type[ct] = np.zeros(self._capacity, dtype=bool)
+            self._matrices[ct][row] = unitvec(vec)
+            self._has_type[ct][row] = True
+        # NOTE: a (shallow) copy so changes to the dict itself are noticed
+        self._row_vectors[row] = dict(cui_vectors)
+
+    def _is_current(self, row: int, cui_vectors: dict[str, np.ndarray]
+                    ) -> bool:
+        row_vectors = self._row_vectors[row]
+        if len(row_vectors) != len(cui_vectors):
+            return False
+        return all(cui_vectors.get(ct) is vec
+                   for ct, vec in row_vectors.items())
+
+    def get_row(self, cui: str) -> int:
+        """Get the (up to date) row for the CUI.
+
+        Args:
+            cui (str): The CUI.
+
+        Returns:
+            int: The row index, or -1 if the CUI has no context vectors.
+        """
+        cui_vectors = self.cui2info[cui]['context_vectors']
+        if not cui_vectors:
+            return -1
+        row = self._cui2row.get(cui, -1)
+        if row == -1:
+            row = len(self._row_vectors)
+            if row >= self._capacity:
+                self._grow()
+            self._row_vectors.append({})
+            self._cui2row[cui] = row
+            self._write_row(row, cui_vectors)
+        elif not self._is_current(row, cui_vectors):
+            self._write_row(row, cui_vectors)
+        return row
+
+    def get_similarities(self, cuis: list[str],
+                         vectors: dict[str, np.ndarray],
+                         weights: dict[str, float],
+                         train_threshold: int) -> np.ndarray:
+        """Get the similarities of the CUIs' context to the given context.
+
+        This is equivalent to calling `ContextModel._similarity` for each
+        CUI, but does one gathered matrix-vector product per context type.
+
+        Args:
+            cuis (list[str]): The CUIs to score.
+            vectors (dict[str, np.ndarray]): The context vectors.
+            weights (dict[str, float]): The weight for each context type.
+            train_threshold (int): The minimum number of training examples
+                for a CUI to be scored.
+
+        Returns:
+            np.ndarray: The similarity of each CUI (-1 for CUIs that are
+                untrained or have no context vectors).
+        """
+        rows = np.array([self.get_row(cui) for cui in cuis], dtype=np.int64)
+        counts = np.array([self.cui2info[cui]['count_train'] for cui in cuis])
+        valid = (rows >= 0) & (counts >= train_threshold)
+        rows[~valid] = 0
+        sims = np.zeros(len(cuis), dtype=np.float64)
+        for ct, weight in weights.items():
+            if ct not in vectors or ct not in self._matrices:
+                continue
+            doc_vec = unitvec(vectors[ct]).astype(np.float32)
+            cur_sims = self._matrices[ct][rows] @ doc_vec
+            sims += weight * np.where(self._has_type[ct][rows], cur_sims, 0)
+        sims[~valid] = -1
+        return sims
+
+
 class PerDocumentTokenCache(dict[MutableToken, bool]):
 
     def __getitem__(self, key: MutableToken):
@@ -1,5 +1,8 @@
 from typing import Optional
 
+import os
+import json
+import pickle
 import logging
 from medcat.tokenizing.tokens import MutableDocument
 from medcat.components.types import CoreComponentType, AbstractCoreComponent
@@ -9,6 +12,7 @@ from medcat.tokenizing.tokenizers import BaseTokenizer
 from medcat.vocab import Vocab
 from medcat.cdb import CDB
 from medcat.config.config import ComponentConfig
+from medcat.storage.serialisables import AbstractManualSerialisable
 import medcat
 
 
@@ -18,22 +22,50 @@ _EXTRA_NAME = "dict-ner"
 # NOTE: need to do this before below import for more useful error
 ensure_optional_extras_installed(medcat.__name__, _EXTRA_NAME)
 
-from ahocorasick import Automaton # noqa
+from ahocorasick import Automaton, load as load_automaton # noqa
 
 
 logger = logging.getLogger(__name__)
 
 
-class NER(AbstractCoreComponent):
+class NER(AbstractManualSerialisable, AbstractCoreComponent):
+    """The dictionary (Aho-Corasick automaton) based NER.
+
+    The automaton is saved alongside the component so that it does not
+    need to be rebuilt upon load. It is rebuilt if the CDB names have
+    changed since it was built (based on the CDB's names version).
+
+    Args:
+        tokenizer (BaseTokenizer): The tokenizer.
+        cdb (CDB): The CDB.
+        automaton (Optional[Automaton]): The (loaded) automaton. If not
+            specified, the automaton is built from the CDB names.
+            Defaults to None.
+    """
     name = 'cat_dict_ner'
+    AUTOMATON_FILE = 'automaton.pickle'
+    AUTOMATON_INFO_FILE = 'automaton_info.json'
 
     def __init__(self, tokenizer: BaseTokenizer,
-                 cdb: CDB) -> None:
+                 cdb: CDB, automaton: Optional[Automaton] = None) -> None:
         self.tokenizer = tokenizer
         self.cdb = cdb
         self.config = self.cdb.config
-        self.automaton = Automaton()
-        self._rebuild_automaton()
+        self._automaton_info: dict = {}
+        if automaton is not None:
+            self.automaton = automaton
+            self._automaton_info = self._get_automaton_info()
+        else:
+            self.automaton = Automaton()
+            self._rebuild_automaton()
+
+    def _get_automaton_info(self) -> dict:
+        return {
+            'names_version': self.cdb.names_version,
+            'num_names': len(self.cdb.name2info),
+            'separator': self.config.general.separator,
+            'min_name_len': self.config.components.ner.min_name_len,
+        }
 
     def _rebuild_automaton(self):
         # NOTE: every time the CDB changes (is dirtied)
@@ -56,6 +88,8 @@ class NER(AbstractCoreComponent):
                      "allowed length (%d)", ignored_min_len,
                      self.config.components.ner.min_name_len)
         self.automaton.make_automaton()
+        # NOTE: the automaton now reflects the current names
+        self._automaton_info = self._get_automaton_info()
 
     def get_type(self) -> CoreComponentType:
         return CoreComponentType.ner
@@ -74,25 +108,17 @@ class NER(AbstractCoreComponent):
             doc (MutableDocument):
                 Spacy document with detected entities.
         """
-        if self.cdb.has_changed_names:
-            self.cdb._reset_subnames()
+        if self._automaton_info != self._get_automaton_info():
             self._rebuild_automaton()
         text = doc.base.text.lower()
         for end_idx, raw_name in self.automaton.iter(text):
             start_idx = end_idx - len(raw_name) + 1
-            cur_tokens = doc.get_tokens(start_idx, end_idx)
-            if not isinstance(cur_tokens, list):
-                # NOTE: this shouldn't really happen since
-                #       there should be no entities defined
-                #       before the NER step.
-                #       But we will (at least for now) still handler this
-                cur_tokens = list(cur_tokens)
+            cur_tokens = doc.get_aligned_tokens(start_idx, end_idx)
             if not cur_tokens:
-                # NOTE: the most likely reason for this is when matching
-                #       a substring (e.g an abreviation in a longer word).
-                #       In that case, no spacy tokens will match. But we
-                #       don't really want to catch `mi` (for myocardial
-                #       infarction) in "family".
+                # NOTE: this happens when the match starts or ends in the
+                #       middle of a token (e.g an abreviation in a longer
+                #       word). We don't really want to catch `mi` (for
+                #       myocardial infarction) in "family".
                 continue
             preprocessed_name = raw_name.replace(
                 ' ', self.config.general.separator)
@@ -105,3 +131,33 @@ class NER(AbstractCoreComponent):
             cls, cnf: ComponentConfig, tokenizer: BaseTokenizer,
             cdb: CDB, vocab: Vocab, model_load_path: Optional[str]) -> 'NER':
         return cls(tokenizer, cdb)
+
+    # for ManualSerialisable:
+
+    def serialise_to(self, folder_path: str) -> None:
+        os.makedirs(folder_path, exist_ok=True)
+        self.automaton.save(
+            os.path.join(folder_path, self.AUTOMATON_FILE), pickle.dumps)
+        with open(os.path.join(folder_path, self.AUTOMATON_INFO_FILE),
+                  'w') as f:
+            # NOTE: the info the automaton was built with
+            json.dump(self._automaton_info, f)
+
+    @classmethod
+    def deserialise_from(cls, folder_path: str, **init_kwargs) -> 'NER':
+        tokenizer: BaseTokenizer = init_kwargs['tokenizer']
+        cdb: CDB = init_kwargs['cdb']
+        automaton_path = os.path.join(folder_path, cls.AUTOMATON_FILE)
+        info_path = os.path.join(folder_path, cls.AUTOMATON_INFO_FILE)
+        if not os.path.exists(automaton_path) or not os.path.exists(
+                info_path):
+            return cls(tokenizer, cdb)
+        with open(info_path) as f:
+            info = json.load(f)
+        ner = cls(tokenizer, cdb, automaton=load_automaton(
+            automaton_path, pickle.loads))
+        if info != ner._automaton_info:
+            logger.warning("The saved NER automaton does not match the CDB "
+                           "or config - rebuilding")
+            ner._rebuild_automaton()
+        return ner
@@ -0,0 +1,148 @@
+from typing import Iterable, Optional
+
+from medcat.cdb import CDB
+
+
+class _TrieNode:
+    __slots__ = ('children', 'is_subname', 'is_name')
+
+    def __init__(self) -> None:
+        self.children: Optional[dict[str, '_TrieNode']] = None
+        self.is_subname = False
+        self.is_name = False
+
+
+class SubnameTrie:
+    """A token level prefix trie of the (sub)names in a CDB.
+
+    Each edge corresponds to a part of a name (split by the separator).
+    So walking the trie token by token is equivalent to concatenating
+    the token texts with the separator and checking whether the result
+    is a subname / name in the CDB. But without the string allocation and
+    hashing at every step.
+
+    Args:
+        subnames (Iterable[str]): The subnames to include.
+        names (Iterable[str]): The names to mark.
+        separator (str): The separator used within the names.
+    """
+
+    def __init__(self, subnames: Iterable[str], names: Iterable[str],
+                 separator: str) -> None:
+        self.separator = separator
+        self.root = _TrieNode()
+        self.num_subnames = 0
+        for subname in subnames:
+            self.add_subname(subname)
+        for name in names:
+            self.add_name(name)
+
+    def add_subname(self, subname: str) -> None:
+        """Add a subname to the trie.
+
+        Args:
+            subname (str): The subname.
+        """
+        node = self._add(subname)
+        if not node.is_subname:
+            node.is_subname = True
+            self.num_subnames += 1
+
+    def add_name(self, name: str) -> None:
+        """Mark a name in the trie.
+
+        The name is only marked if it is (already) in the trie.
+
+        Args:
+            name (str): The name.
+        """
+        node = self.walk(self.root, name)
+        if node is not None:
+            node.is_name = True
+
+    def _add(self, subname: str) -> _TrieNode:
+        node = self.root
+        for part in subname.split(self.separator):
+            if node.children is None:
+                node.children = {}
+            child = node.children.get(part)
+            if child is None:
+                child = node.children[part] = _TrieNode()
+            node = child
+        return node
+
+    def walk(self, node: Optional[_TrieNode], text: str
+             ) -> Optional[_TrieNode]:
+        """Walk down the trie from the specified node.
+
+        Args:
+            node (Optional[_TrieNode]): The node to start from.
+            text (str): The text to walk (may include separators).
+
+        Returns:
+            Optional[_TrieNode]: The node reached, or None if there's no path.
+        """
+        if node is None:
+            return None
+        if self.separator not in text:
+            return node.children.get(text) if node.children else None
+        for part in text.split(self.separator):
+            if not node.children:
+                return None
+            node = node.children.get(part)
+            if node is None:
+                return None
+        return node
+
+    def walk_parts(self, node: Optional[_TrieNode], parts: Iterable[str]
+                   ) -> Optional[_TrieNode]:
+        """Walk down the trie by the (already split) parts.
+
+        Args:
+            node (Optional[_TrieNode]): The node to start from.
+            parts (Iterable[str]): The parts of the name.
+
+        Returns:
+            Optional[_TrieNode]: The node reached, or None if there's no path.
+        """
+        for part in parts:
+            if node is None or not node.children:
+                return None
+            node = node.children.get(part)
+        return node
+
+    @classmethod
+    def from_cdb(cls, cdb: CDB) -> 'SubnameTrie':
+        """Build the trie based on the subnames and names in the CDB.
+
+        Args:
+            cdb (CDB): The CDB.
+
+        Returns:
+            SubnameTrie: The trie.
+        """
+        subnames: set[str] = set()
+        for info in cdb.cui2info.values():
+            subnames.update(info['subnames'])
+        return cls(subnames, cdb.name2info.keys(),
+                   cdb.config.general.separator)
+
+    def add_from_cdb(self, cdb: CDB, names: Iterable[str]) -> None:
+        """Add the specified (new) names in the CDB to the trie.
+
+        The subnames of the concepts the names belong to are added
+        along with them.
+
+        Args:
+            cdb (CDB): The CDB.
+            names (Iterable[str]): The names to add.
+        """
+        names = list(names)
+        cuis: set[str] = set()
+        for name in names:
+            cuis.update(cdb.name2info[name]['per_cui_status'])
+        for cui in cuis:
+            for subname in cdb.cui2info[cui]['subnames']:
+                self.add_subname(subname)
+        for name in names:
+            self.add_name(name)
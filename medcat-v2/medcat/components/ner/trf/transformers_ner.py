@@ -8,6 +8,7 @@ from typing import Iterable, Iterator, Optional, Union, Callable
 from typing import cast
 import inspect
 from functools import partial
+from bisect import bisect_right
 
 from medcat.cdb.cdb import CDB
 from medcat.components.addons.meta_cat.ml_utils import set_all_seeds
@@ -109,6 +110,10 @@ class TransformersNER(AbstractCoreComponent):
     def __call__(self, doc: MutableDocument) -> MutableDocument:
         return self._component(doc)
 
+    def __call_batch__(self, docs: list[MutableDocument]
+                       ) -> list[MutableDocument]:
+        return list(self._component.pipe(docs))
+
     # for manual serialisability
 
     def get_folder_name(self) -> str:
@@ -710,26 +715,20 @@ class TransformersNERComponent:
         batch_size_chars = self.config.general.pipe_batch_size_in_chars
         yield from self._process(stream, batch_size_chars)  # type: ignore
 
-    def _process_doc(self, doc: MutableDocument):
-        aggr_strat = self.config.general.ner_aggregation_strategy
-        res = self.ner_pipe(doc.base.text,
-                            aggregation_strategy=aggr_strat)
+    def _process_doc(self, doc: MutableDocument, res: list[dict]):
         doc.ner_ents = []  # type: ignore
+        # the (ordered) end char of each token
+        token_ends = [word.base.char_index + len(word.base.text)
+                      for word in doc]
         for r in res:
-            inds = []
-            for ind, word in enumerate(doc):
-                end_char = word.base.char_index + len(word.base.text)
-                if end_char <= r['end'] and end_char > r['start']:
-                    inds.append(ind)
-                # To not loop through everything
-                if end_char > r['end']:
-                    break
-            if not inds:
+            # the tokens that end within the predicted span
+            start_ind = bisect_right(token_ends, r['start'])
+            end_ind = bisect_right(token_ends, r['end'])
+            if start_ind >= end_ind:
                 continue
 
             entity: MutableEntity = self.base_tokenizer.create_entity(
-                doc, min(inds), max(inds) + 1,
-                label=r['entity_group'])
+                doc, start_ind, end_ind, label=r['entity_group'])
             entity.cui = r['entity_group']
             entity.context_similarity = r['score']
             entity.id = len(doc.ner_ents)
@@ -743,12 +742,21 @@ class TransformersNERComponent:
                  batch_size_chars: int) -> Iterator[Optional[MutableDocument]]:
         if not hasattr(self, "ner_pipe"):
             self.create_eval_pipeline()
+        aggr_strat = self.config.general.ner_aggregation_strategy
         for docs in self.batch_generator(
                 stream, batch_size_chars):  # type: ignore
-            # For now we will process the documents one by one, should be
-            # improved in the future to use batching
-            for doc in docs:
-                self._process_doc(doc)
+            # NOTE: The HF pipeline splits the longer texts into overlapping
+            #       windows (see `chunking_overlap_window`) and batches the
+            #       windows of all the documents. The texts are sorted by
+            #       length so that less padding is needed.
+            order = sorted(range(len(docs)),
+                           key=lambda ind: len(docs[ind].base.text))
+            results = self.ner_pipe(
+                [docs[ind].base.text for ind in order],
+                aggregation_strategy=aggr_strat,
+                batch_size=self.config.general.pipe_batch_size)
+            for ind, res in zip(order, results):
+                self._process_doc(docs[ind], res)
             yield from docs
 
     # Override
@@ -1,9 +1,11 @@
 from typing import Optional
+from itertools import islice
 
 import logging
 from medcat.tokenizing.tokens import MutableDocument
 from medcat.components.types import CoreComponentType, AbstractCoreComponent
 from medcat.components.ner.vocab_based_annotator import maybe_annotate_name
+from medcat.components.ner.subname_trie import SubnameTrie
 from medcat.tokenizing.tokenizers import BaseTokenizer
 from medcat.vocab import Vocab
 from medcat.cdb import CDB
@@ -21,6 +23,50 @@ class NER(AbstractCoreComponent):
         self.tokenizer = tokenizer
         self.cdb = cdb
         self.config = self.cdb.config
+        self._trie: Optional[SubnameTrie] = None
+        # the number of names and subnames in the CDB the trie is for
+        self._trie_key: tuple[int, int] = (-1, -1)
+        # the CDB's names removed version the trie is for
+        self._trie_removed_version = -1
+
+    def _get_trie(self) -> SubnameTrie:
+        """Get the subname trie, updating it if the CDB names changed.
+
+        Names added to the CDB (e.g during training) are added to the
+        existing trie. It is only rebuilt if names were removed.
+
+        Returns:
+            SubnameTrie: The up to date trie.
+        """
+        cdb = self.cdb
+        if cdb.names_removed_version != self._trie_removed_version:
+            # NOTE: removed names need to be removed from the trie
+            self._trie_removed_version = cdb.names_removed_version
+            self._trie = None
+        trie_key = (len(cdb.name2info), cdb._num_subnames())
+        if self._trie is not None and trie_key != self._trie_key:
+            self._update_trie(self._trie, trie_key)
+        if self._trie is None:
+            logger.debug("(Re)building the subname trie")
+            self._trie = SubnameTrie.from_cdb(cdb)
+        self._trie_key = trie_key
+        return self._trie
+
+    def _update_trie(self, trie: SubnameTrie,
+                     trie_key: tuple[int, int]) -> None:
+        num_names, num_subnames = self._trie_key
+        num_new_names = trie_key[0] - num_names
+        if num_new_names < 0:
+            self._trie = None
+            return
+        # NOTE: names are only ever added to the end of name2info
+        #       (removing names bumps `names_removed_version`)
+        new_names = islice(reversed(self.cdb.name2info), num_new_names)
+        prev_num_subnames = trie.num_subnames
+        trie.add_from_cdb(self.cdb, new_names)
+        if trie.num_subnames - prev_num_subnames != trie_key[1] - num_subnames:
+            # NOTE: new subnames for existing names
+            self._trie = None
 
     def get_type(self) -> CoreComponentType:
         return CoreComponentType.ner
@@ -39,34 +85,32 @@ class NER(AbstractCoreComponent):
             doc (MutableDocument):
                 Spacy document with detected entities.
         """
+        trie = self._get_trie()
         max_skip_tokens = self.config.components.ner.max_skip_tokens
+        try_reverse = self.config.components.ner.try_reverse_word_order
         _sep = self.config.general.separator
         # Just take the tokens we need
         _doc = [tkn for tkn in doc if not tkn.to_skip]
         for i, tkn in enumerate(_doc):
-            tkn = _doc[i]
             tkns = [tkn]
-            # name_versions = [tkn.lower_, tkn._.norm]
-            # name_versions = [tkn.norm, tkn.base.lower]
-            name_versions = tkn.base.text_versions
             name = ""
-
-            for name_version in name_versions:
-                if self.cdb.has_subname(name_version):
-                    if name:
-                        name = name + _sep + name_version
-                    else:
-                        name = name_version
+            node = None
+            for name_version in tkn.base.text_versions:
+                _node = trie.walk(trie.root, name_version)
+                if _node is not None and _node.is_subname:
+                    name, node = name_version, _node
                     break
-            # if name is in CDB
-            if name in self.cdb.name2info and not tkn.base.is_stop:
-                maybe_annotate_name(self.tokenizer, name, tkns, doc,
-                                    self.cdb, self.config)
             # if name is not a subname CDB (explicitly)
-            if not name:
+            if node is None:
                 # There has to be at least something appended to the name
                 # to go forward
                 continue
+            # if name is in CDB
+            if node.is_name and not tkn.base.is_stop:
+                maybe_annotate_name(self.tokenizer, name, tkns, doc,
+                                    self.cdb, self.config)
+            # the parts of the name for (potentially) reversing word order
+            name_parts = name.split(_sep)
             # if name is a part of a concept
             # we start adding onto it to get a match
             for j in range(i + 1, len(_doc)):
@@ -76,31 +120,33 @@ class NER(AbstractCoreComponent):
                     break
                 tkn = _doc[j]
                 tkns.append(tkn)
-                # name_versions = [tkn.norm, tkn.base.lower]
-                name_versions = tkn.base.text_versions
 
                 name_changed = False
                 name_reverse = None
-                for name_version in name_versions:
-                    _name = name + _sep + name_version
-                    if self.cdb.has_subname(_name):
+                reverse_node = None
+                for name_version in tkn.base.text_versions:
+                    _node = trie.walk(node, name_version)
+                    if _node is not None and _node.is_subname:
                         # Append the name and break
-                        name = _name
+                        name = name + _sep + name_version
+                        name_parts.extend(name_version.split(_sep))
+                        node = _node
                         name_changed = True
                         break
 
-                    if self.config.components.ner.try_reverse_word_order:
-                        _name_reverse = name_version + _sep + name
-                        if self.cdb.has_subname(_name_reverse):
-                            # Append the name and break
-                            name_reverse = _name_reverse
+                    if try_reverse:
+                        _node = trie.walk_parts(
+                            trie.walk(trie.root, name_version), name_parts)
+                        if _node is not None and _node.is_subname:
+                            name_reverse = name_version + _sep + name
+                            reverse_node = _node
 
                 if name_changed:
-                    if name in self.cdb.name2info:
+                    if node.is_name:
                         maybe_annotate_name(self.tokenizer, name, tkns, doc,
                                             self.cdb, self.config)
-                elif name_reverse is not None:
-                    if name_reverse in self.cdb.name2info:
+                elif reverse_node is not None and name_reverse is not None:
+                    if reverse_node.is_name:
                         maybe_annotate_name(self.tokenizer, name_reverse, tkns,
                                             doc, self.cdb, self.config)
                 else:
@@ -1,12 +1,21 @@
 from typing import Optional, Iterable, Iterator, Union, overload, Literal
+from collections import OrderedDict
+import os
 import re
+import logging
 
-from medcat.tokenizing.tokens import MutableDocument
+from medcat.tokenizing.tokens import MutableDocument, MutableToken
 from medcat.tokenizing.tokenizers import BaseTokenizer
 from medcat.config.config import Config, ComponentConfig
 from medcat.vocab import Vocab
 from medcat.cdb import CDB
 from medcat.components.types import CoreComponentType, AbstractCoreComponent
+from medcat.components.normalizing.symspell import (
+    DeletionIndex, get_letters, is_one_edit, get_one_edit_sources)
+from medcat.storage.serialisables import AbstractManualSerialisable
+
+
+logger = logging.getLogger(__name__)
 
 
 CONTAINS_NUMBER = re.compile('[0-9]+')
@@ -15,10 +24,17 @@ CONTAINS_NUMBER = re.compile('[0-9]+')
 class BasicSpellChecker:
 
     def __init__(self, cdb_vocab: dict[str, int], config: Config,
-                 data_vocab: Optional[Vocab] = None):
+                 data_vocab: Optional[Vocab] = None,
+                 index: Optional[DeletionIndex] = None,
+                 cdb: Optional[CDB] = None):
         self.vocab = cdb_vocab
         self.config = config
         self.data_vocab = data_vocab
+        self._index = index
+        # NOTE: used to track changes in the token counts (if available)
+        self._cdb = cdb
+        self._fixes: OrderedDict[str, Optional[str]] = OrderedDict()
+        self._fixes_key: tuple = ()
 
     def P(self, word: str) -> float:
         """Probability of `word`.
@@ -48,38 +64,98 @@ class BasicSpellChecker:
     def fix(self, word: str) -> Optional[str]:
         """Most probable spelling correction for word.
 
+        The (recently) fixed words are cached.
+
         Args:
             word (str): The word.
 
         Returns:
             Optional[str]: Fixed word, or None if no fixes were applied.
         """
-        fix = max(self.candidates(word), key=self.P)
-        if fix != word:
-            return fix
-        else:
-            return None
+        cache_key = (len(self.vocab),
+                     self._cdb.token_counts_version if self._cdb else None,
+                     self.config.general.spell_check_deep,
+                     self.config.general.diacritics)
+        if cache_key != self._fixes_key:
+            self._fixes.clear()
+            self._fixes_key = cache_key
+        if word in self._fixes:
+            self._fixes.move_to_end(word)
+            return self._fixes[word]
+        # NOTE: ties in probability are broken by the word itself
+        fix: Optional[str] = max(self.candidates(word),
+                                 key=lambda cand: (self.P(cand), cand))
+        if fix == word:
+            fix = None
+        self._fixes[word] = fix
+        if len(self._fixes) > self.config.general.spell_check_cache_size:
+            self._fixes.popitem(last=False)
+        return fix
+
+    def clear_cache(self) -> None:
+        """Clear the cache of (recently) fixed words."""
+        self._fixes.clear()
+
+    def get_index(self) -> DeletionIndex:
+        """Get the deletion index for the vocab.
+
+        The index is built upon first use and rebuilt if the vocab
+        or the required edit distance changes. When the vocab is the
+        CDB's token counts, the index is keyed on their version, so that
+        any change to them (also while the index was saved) is noticed.
+
+        Returns:
+            DeletionIndex: The deletion index.
+        """
+        max_distance = 2 if self.config.general.spell_check_deep else 1
+        version = self._cdb.token_counts_version if self._cdb else None
+        if (self._index is None or
+                self._index.max_distance != max_distance or
+                self._index.version != version or
+                self._index.num_words != len(self.vocab)):
+            logger.info("Building the spell checker deletion index for "
+                        "%d words", len(self.vocab))
+            self._index = DeletionIndex(self.vocab, max_distance,
+                                        version=version)
+        return self._index
 
     def candidates(self, word: str) -> Iterable[str]:
         """Generate possible spelling corrections for word.
 
+        The candidates are found using the deletion index and then
+        verified to be the appropriate number of edits away.
+        This is equivalent to (but a lot faster than) checking
+        which of the `edits1` (and `edits2` if `spell_check_deep`
+        is enabled) are known.
+
         Args:
             word (str): The word.
 
         Returns:
             Iterable[str]: The list of candidate words.
         """
+        if word in self.vocab:
+            return {word}
+        letters = get_letters(self.config.general.diacritics)
+        found = [cand for cand in self.get_index().lookup(word)
+                 if cand in self.vocab]
+        one_away = {cand for cand in found
+                    if is_one_edit(word, cand, letters)}
+        if one_away:
+            return one_away
         if self.config.general.spell_check_deep:
             # This will check a two letter edit distance
-            return (self.known([word]) or
-                    self.known(self.edits1(word)) or
-                    self.known(self.edits2(word)) or
-                    [word])
-        else:
-            # Will check only one letter edit distance
-            return (self.known([word]) or
-                    self.known(self.edits1(word)) or
-                    [word])
+            # NOTE: Since none of the candidates are a single edit away,
+            #       the characters removed by the second edit must have
+            #       been in the original word.
+            edits1 = self.edits1(word) if found else set()
+            chars = ''.join(set(word))
+            two_away = {cand for cand in found
+                        if not edits1.isdisjoint(
+                            get_one_edit_sources(cand, chars, letters))}
+            if two_away:
+                return two_away
+        return [word]
 
     def known(self, words: Iterable[str]) -> set[str]:
         """The subset of `words` that appear in the dictionary of WORDS.
@@ -124,10 +200,7 @@ class BasicSpellChecker:
     @classmethod
     def raw_edits1(cls, word: str, use_diacritics: bool = False,
                    return_ordered: bool = False) -> Union[set[str], list[str]]:
-        letters = 'abcdefghijklmnopqrstuvwxyz'
-
-        if use_diacritics:
-            letters += 'àáâãäåæçèéêëìíîïðñòóôõöøùúûüýþÿ'
+        letters = get_letters(use_diacritics)
 
         splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
         deletes: list[str] = []
@@ -171,54 +244,122 @@ class BasicSpellChecker:
         raise ValueError("No implementation")
 
 
-class TokenNormalizer(AbstractCoreComponent):
-    """Will normalize all tokens in a spacy document.    """
+class TokenNormalizer(AbstractManualSerialisable, AbstractCoreComponent):
+    """Will normalize all tokens in a spacy document.
+
+    The normalisation (and spell checking) results are cached across
+    documents based on the token's lower case text, tag and lemma.
+    The cache is cleared if the token counts or the relevant config
+    change.
+
+    The spell checker's deletion index (if built) is saved alongside the
+    component so that it does not need to be rebuilt upon load.
+
+    Args:
+        nlp (BaseTokenizer): The tokenizer.
+        config (Config): The config.
+        cdb_vocab (dict[str, int]): The token counts.
+        data_vocab (Optional[Vocab]): The data vocab. Defaults to None.
+        spell_check_index (Optional[DeletionIndex]): The (loaded) spell
+            checker index. Defaults to None.
+        cdb (Optional[CDB]): The CDB the token counts belong to. This is
+            used to track changes in the token counts. Defaults to None.
+    """
     name = 'token_normalizer'
 
     # Override
     def __init__(self, nlp: BaseTokenizer, config: Config,
                  cdb_vocab: dict[str, int],
-                 data_vocab: Optional[Vocab] = None):
+                 data_vocab: Optional[Vocab] = None,
+                 spell_check_index: Optional[DeletionIndex] = None,
+                 cdb: Optional[CDB] = None):
         self.config = config
-        self.spell_checker = BasicSpellChecker(cdb_vocab, config, data_vocab)
+        self.spell_checker = BasicSpellChecker(
+            cdb_vocab, config, data_vocab, index=spell_check_index, cdb=cdb)
         self.nlp = nlp
+        self._cdb = cdb
+        self._cache: OrderedDict[tuple, tuple[str, bool]] = OrderedDict()
+        self._cache_state: tuple = ()
+        self.cache_hits = 0
+        self.cache_misses = 0
 
     def get_type(self) -> CoreComponentType:
         return CoreComponentType.token_normalizing
 
-    # Override
-    def __call__(self, doc: MutableDocument):
-        # avoid accessing all these in loop
-        spell_check_limit = self.config.general.spell_check_len_limit
+    def _get_cache_state(self) -> tuple:
+        general = self.config.general
+        preprocessing = self.config.preprocessing
+        vocab = self.spell_checker.vocab
+        return (id(vocab), len(vocab),
+                self._cdb.token_counts_version if self._cdb else None,
+                preprocessing.min_len_normalize,
+                frozenset(preprocessing.do_not_normalize),
+                general.spell_check, general.spell_check_deep,
+                general.spell_check_len_limit, general.diacritics)
+
+    def clear_cache(self) -> None:
+        """Clear the normalisation and spell checking caches."""
+        self._cache.clear()
+        self.spell_checker.clear_cache()
+
+    def _normalize(self, token: MutableToken) -> tuple[str, bool]:
         min_len_normalizer = self.config.preprocessing.min_len_normalize
         do_not_normalize = self.config.preprocessing.do_not_normalize
-        perform_spell_check = self.config.general.spell_check
+        to_skip = False
+        if len(token.base.lower) < min_len_normalizer:
+            norm = token.base.lower
+        elif (do_not_normalize and
+                token.tag is not None and
+                token.tag in do_not_normalize):
+            norm = token.base.lower
+        elif token.lemma == '-PRON-':
+            norm = token.lemma
+            to_skip = True
+        else:
+            norm = token.lemma.lower()
+
+        if self.config.general.spell_check:
+            # Fix the token if necessary
+            if (len(token.base.text) >=
+                    self.config.general.spell_check_len_limit and
+                    not token.is_punctuation and self.spell_checker and
+                    token.base.lower not in self.spell_checker and
+                    not CONTAINS_NUMBER.search(token.base.lower)):
+                fix = self.spell_checker.fix(token.base.lower)
+                if fix is not None:
+                    tmp = self.nlp(fix)[0]
+                    if len(token.base.lower) < min_len_normalizer:
+                        norm = tmp.base.lower
+                    else:
+                        norm = tmp.lemma.lower()
+        return norm, to_skip
+
+    # Override
+    def __call__(self, doc: MutableDocument):
+        cache_state = self._get_cache_state()
+        if cache_state != self._cache_state:
+            self.clear_cache()
+            self._cache_state = cache_state
+        cache = self._cache
+        max_cache_size = self.config.preprocessing.normalizing_cache_size
         for token in doc:
-            if len(token.base.lower) < min_len_normalizer:
-                token.norm = token.base.lower
-            elif (do_not_normalize and
-                    token.tag is not None and
-                    token.tag in do_not_normalize):
-                token.norm = token.base.lower
-            elif token.lemma == '-PRON-':
-                token.norm = token.lemma
-                token.to_skip = True
+            # NOTE: punctuation (as determined by the tagger) is not
+            #       spell checked, so it needs to be part of the key
+            key = (token.base.lower, token.tag, token.lemma,
+                   token.is_punctuation)
+            cached = cache.get(key)
+            if cached is not None:
+                cache.move_to_end(key)
+                self.cache_hits += 1
             else:
-                token.norm = token.lemma.lower()
-
-            if perform_spell_check:
-                # Fix the token if necessary
-                if (len(token.base.text) >= spell_check_limit and
-                        not token.is_punctuation and self.spell_checker and
-                        token.base.lower not in self.spell_checker and
-                        not CONTAINS_NUMBER.search(token.base.lower)):
-                    fix = self.spell_checker.fix(token.base.lower)
-                    if fix is not None:
-                        tmp = self.nlp(fix)[0]
-                        if len(token.base.lower) < min_len_normalizer:
-                            token.norm = tmp.base.lower
-                        else:
-                            token.norm = tmp.lemma.lower()
+                cached = self._normalize(token)
+                cache[key] = cached
+                if len(cache) > max_cache_size:
+                    cache.popitem(last=False)
+                self.cache_misses += 1
+            token.norm, to_skip = cached
+            if to_skip:
+                token.to_skip = True
         return doc
 
     @classmethod
@@ -226,4 +367,21 @@ class TokenNormalizer(AbstractCoreComponent):
             cls, cnf: ComponentConfig, tokenizer: BaseTokenizer,
             cdb: CDB, vocab: Vocab, model_load_path: Optional[str]
             ) -> 'TokenNormalizer':
-        return cls(tokenizer, cdb.config, cdb.token_counts, vocab)
+        return cls(tokenizer, cdb.config, cdb.token_counts, vocab, cdb=cdb)
+
+    # for ManualSerialisable:
+
+    def serialise_to(self, folder_path: str) -> None:
+        os.makedirs(folder_path, exist_ok=True)
+        if self.config.general.spell_check:
+            self.spell_checker.get_index().save(folder_path)
+
+    @classmethod
+    def deserialise_from(cls, folder_path: str, **init_kwargs
+                         ) -> 'TokenNormalizer':
+        cdb: CDB = init_kwargs['cdb']
+        # NOTE: if the index is stale, it will be rebuilt upon use
+        return cls(init_kwargs['tokenizer'], cdb.config, cdb.token_counts,
+                   init_kwargs['vocab'],
+                   spell_check_index=DeletionIndex.load(folder_path),
+                   cdb=cdb)
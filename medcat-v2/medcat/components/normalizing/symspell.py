@@ -0,0 +1,245 @@
+"""A symmetric delete (SymSpell style) index for spelling correction.
+
+Instead of generating every edit of a (misspelt) word and looking each up
+in the vocabulary, the index maps every string that can be obtained by
+deleting (up to `max_distance`) characters from (the prefix of) each known
+word to those words. At lookup time, the same deletes are generated for
+the query word and the words they map to are the (superset of) candidates
+within the edit distance. These candidates then need to be verified.
+"""
+from typing import Iterable, Optional
+import os
+import json
+
+
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+DIACRITICS = 'àáâãäåæçèéêëìíîïðñòóôõöøùúûüýþÿ'
+
+
+def get_letters(use_diacritics: bool) -> str:
+    """Get the letters used for replacing and inserting characters.
+
+    Args:
+        use_diacritics (bool): Whether to include diacritics.
+
+    Returns:
+        str: The letters.
+    """
+    if use_diacritics:
+        return LETTERS + DIACRITICS
+    return LETTERS
+
+
+def get_deletes(word: str, max_distance: int) -> set[str]:
+    """Get all the strings obtainable by deleting characters from the word.
+
+    This includes the word itself.
+
+    Args:
+        word (str): The word.
+        max_distance (int): The maximum number of characters to delete.
+
+    Returns:
+        set[str]: The strings with (up to) `max_distance` deletes.
+    """
+    deletes = {word}
+    cur_level = [word]
+    for _ in range(max_distance):
+        next_level: list[str] = []
+        for cur in cur_level:
+            for i in range(len(cur)):
+                deleted = cur[:i] + cur[i + 1:]
+                if deleted not in deletes:
+                    deletes.add(deleted)
+                    next_level.append(deleted)
+        cur_level = next_level
+    return deletes
+
+
+def is_one_edit(word: str, other: str, letters: str) -> bool:
+    """Check whether the other word is a single edit away from the word.
+
+    The edits are the same as those used by `BasicSpellChecker.raw_edits1`.
+    That is to say, a deletion of any character, a transposition of
+    adjacent characters, a replacement with a letter, or an insertion of
+    a letter.
+
+    Args:
+        word (str): The original word.
+        other (str): The (potentially) edited word.
+        letters (str): The letters allowed for replacements and inserts.
+
+    Returns:
+        bool: Whether the other word is a single edit away.
+    """
+    len_word, len_other = len(word), len(other)
+    if abs(len_word - len_other) > 1:
+        return False
+    # the first index where the two differ
+    i = 0
+    for i in range(min(len_word, len_other) + 1):
+        if i == len_word or i == len_other or word[i] != other[i]:
+            break
+    if len_word == len_other + 1:
+        # deletion
+        return word[i + 1:] == other[i:]
+    elif len_other == len_word + 1:
+        # insertion
+        return other[i] in letters and other[i + 1:] == word[i:]
+    elif i == len_word:
+        # identical - can replace a letter with itself or
+        #             transpose identical adjacent characters
+        return (any(char in letters for char in word) or
+                any(a == b for a, b in zip(word, word[1:])))
+    elif word[i + 1:] == other[i + 1:]:
+        # replacement
+        return other[i] in letters
+    # transposition
+    return (i + 1 < len_word and word[i] == other[i + 1] and
+            word[i + 1] == other[i] and word[i + 2:] == other[i + 2:])
+
+
+def get_one_edit_sources(other: str, chars: str, letters: str) -> set[str]:
+    """Get the words that the other word is a single edit away from.
+
+    That is to say, the words for which `is_one_edit(word, other, letters)`
+    holds. In order to keep this finite, the characters removed by the
+    edit (i.e deleted or replaced) are restricted to the specified ones.
+
+    Args:
+        other (str): The edited word.
+        chars (str): The characters that may have been removed.
+        letters (str): The letters allowed for replacements and inserts.
+
+    Returns:
+        set[str]: The source words.
+    """
+    sources: set[str] = set()
+    for i in range(len(other) + 1):
+        left, right = other[:i], other[i:]
+        # deleting a character
+        sources.update(left + char + right for char in chars)
+        if right and right[0] in letters:
+            # inserting or replacing a letter
+            sources.add(left + right[1:])
+            sources.update(left + char + right[1:] for char in chars)
+        if len(right) > 1:
+            sources.add(left + right[1] + right[0] + right[2:])
+    return sources
+
+
+class DeletionIndex:
+    """The symmetric delete index for a set of words.
+
+    Only the first `prefix_length` characters of each word are used to
+    generate the deletes. This keeps the index (and the time it takes to
+    build it) small. In order to still find every word within the edit
+    distance, the query word's prefixes of lengths within `max_distance`
+    of the prefix length are used at lookup time.
+
+    Args:
+        words (Iterable[str]): The words to index.
+        max_distance (int): The maximum edit distance to index for.
+        prefix_length (int): The prefix length to index. Defaults to 7.
+        version (Optional[int]): The version of the words (e.g the CDB's
+            token counts version) the index was built for. This is saved
+            along with the index. Defaults to None.
+    """
+    WORDS_FILE = 'spell_check_words.json'
+    DELETES_FILE = 'spell_check_deletes.json'
+
+    def __init__(self, words: Iterable[str], max_distance: int,
+                 prefix_length: int = 7,
+                 version: Optional[int] = None) -> None:
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.version = version
+        self._words: list[str] = list(words)
+        self._deletes: dict[str, list[int]] = {}
+        for word_index, word in enumerate(self._words):
+            for deleted in get_deletes(word[:prefix_length], max_distance):
+                if deleted in self._deletes:
+                    self._deletes[deleted].append(word_index)
+                else:
+                    self._deletes[deleted] = [word_index]
+
+    @property
+    def num_words(self) -> int:
+        return len(self._words)
+
+    def _get_query_deletes(self, word: str) -> set[str]:
+        deletes = get_deletes(word, self.max_distance)
+        if len(word) <= self.prefix_length:
+            return deletes
+        # the indexed prefix of a word within the edit distance may
+        # correspond to a (slightly) shorter or longer prefix of this word
+        for length in range(self.prefix_length - self.max_distance,
+                            self.prefix_length + self.max_distance + 1):
+            if length < len(word):
+                deletes.update(get_deletes(word[:length], self.max_distance))
+        return deletes
+
+    def lookup(self, word: str) -> set[str]:
+        """Get the (unverified) candidates for the word.
+
+        The result includes all the indexed words that are within
+        `max_distance` edits (deletions, insertions, replacements or
+        adjacent transpositions) of the word. But it may also include
+        words that are further away.
+
+        Args:
+            word (str): The word to look up.
+
+        Returns:
+            set[str]: The candidate words.
+        """
+        candidates: set[str] = set()
+        for deleted in self._get_query_deletes(word):
+            word_indices = self._deletes.get(deleted)
+            if word_indices is None:
+                continue
+            candidates.update(self._words[index] for index in word_indices)
+        max_dist = self.max_distance
+        return {cand for cand in candidates
+                if abs(len(cand) - len(word)) <= max_dist}
+
+    def save(self, folder_path: str) -> None:
+        """Save the index to a folder.
+
+        Args:
+            folder_path (str): The folder to save the index to.
+        """
+        with open(os.path.join(folder_path, self.WORDS_FILE), 'w') as f:
+            json.dump({'max_distance': self.max_distance,
+                       'prefix_length': self.prefix_length,
+                       'version': self.version,
+                       'words': self._words}, f)
+        with open(os.path.join(folder_path, self.DELETES_FILE), 'w') as f:
+            json.dump(self._deletes, f)
+
+    @classmethod
+    def load(cls, folder_path: str) -> Optional['DeletionIndex']:
+        """Load the index from a folder.
+
+        Args:
+            folder_path (str): The folder to load the index from.
+
+        Returns:
+            Optional[DeletionIndex]: The index, or None if the folder
+                does not have one.
+        """
+        words_path = os.path.join(folder_path, cls.WORDS_FILE)
+        deletes_path = os.path.join(folder_path, cls.DELETES_FILE)
+        if not os.path.exists(words_path) or not os.path.exists(deletes_path):
+            return None
+        with open(words_path) as f:
+            data = json.load(f)
+        with open(deletes_path) as f:
+            deletes = json.load(f)
+        index = cls.__new__(cls)
+        index.max_distance = data['max_distance']
+        index.prefix_length = data['prefix_length']
+        index.version = data.get('version')
+        index._words = data['words']
+        index._deletes = deletes
+        return index
@@ -80,6 +80,27 @@ class AbstractCoreComponent(CoreComponent):
         return True
 
 
+@runtime_checkable
+class BatchableComponent(Protocol):
+    """A component that is able to process a batch of documents at once.
+
+    Components that do not implement this are run one document at a time
+    when processing a batch of documents.
+    """
+
+    def __call_batch__(self, docs: list[MutableDocument]
+                       ) -> list[MutableDocument]:
+        """Process a batch of documents.
+
+        Args:
+            docs (list[MutableDocument]): The documents to process.
+
+        Returns:
+            list[MutableDocument]: The processed documents (in the same order).
+        """
+        pass
+
+
 @runtime_checkable
 class HashableComponet(Protocol):
 
@@ -175,6 +175,17 @@ class NLPConfig(SerialisableBaseModel):
 
     NB! For these changes to take effect, the pipe would need to be recreated.
     """
+    batch_size: int = 50
+    """The number of texts the tokenizer processes at once when tokenizing
+    multiple texts (if the tokenizer supports batching)."""
+    n_process: int = 1
+    """The number of processes the tokenizer uses when tokenizing multiple
+    texts (if the tokenizer supports it).
+
+    NB! This should generally be left at 1 when using multiple processes
+    for the entire pipeline (e.g `CAT.get_entities_multi_texts` with
+    `n_process` > 1).
+    """
 
     # NOTE: this will allow for more config entries
     #       since we don't know what other implementations may require
@@ -237,6 +248,8 @@ class General(SerialisableBaseModel):
     this can slow down things drastically."""
     spell_check_len_limit: int = 7
     """Spelling will not be checked for words with length less than this"""
+    spell_check_cache_size: int = 10_000
+    """The number of (recent) spelling corrections to cache"""
     show_nested_entities: bool = False
     """If set to True functions like get_entities and get_json will return
     nested_entities and overlaps"""
@@ -433,6 +446,33 @@ class EmbeddingLinking(Linking):
     you want to trust them or not."""
     use_similarity_threshold: bool = True
     """Do we have a similarity threshold we care about?"""
+    name_index: str = "exact"
+    """The index used to find the names most similar to a detected entity.
+    Either "exact" (scores all the names, in blocks) or "ivf" (an inverted
+    file index that only scores the names in the clusters closest to the
+    entity). The IVF index is approximate, but a lot faster for large CDBs.
+    It is built along with the embeddings and saved in the CDB."""
+    name_index_block_size: int = 65536
+    """The number of names scored at once by the name index."""
+    ivf_num_lists: int = 0
+    """The number of lists (clusters) in the IVF name index. If 0, the
+    square root of the number of names is used."""
+    ivf_num_probes: int = 16
+    """The number of lists (clusters) scored per entity by the IVF name
+    index. Higher values are more accurate but slower."""
+    max_candidate_names: int = 128
+    """The maximum number of names (above the short_similarity_threshold)
+    used to generate the link candidates for an entity."""
+    context_cache_size: int = 10_000
+    """The number of (distinct) detected spans whose embeddings are cached
+    across documents. Identical context texts within a document are only
+    embedded once regardless."""
+    embedding_dtype: str = "float16"
+    """How the name and cui embeddings are stored (and scored). Either
+    "float16" or "int8" (with a scale per row, a quarter of the size of
+    float32). They are saved as separate (memory mapped) arrays rather
+    than within the CDB's pickled data. Existing embeddings are converted
+    upon `refresh_embeddings`."""
 
 class Preprocessing(SerialisableBaseModel):
     """The preprocessing part of the config"""
@@ -452,6 +492,9 @@ class Preprocessing(SerialisableBaseModel):
     min_len_normalize: int = 5
     """Nothing below this length will ever be normalized (input tokens or
     concept names), normalized means lemmatized in this case"""
+    normalizing_cache_size: int = 100_000
+    """The number of (distinct) tokens whose normalisation results are
+    cached (across documents) by the token normalizer"""
     stopwords: Optional[set] = None
     """If None the default set of stowords from spacy will be used.
     This must be a Set.
@@ -77,6 +77,16 @@ class General(DirtiableBaseModel):
     """If set the center (concept) will be replaced with this string"""
     batch_size_eval: int = 5000
     """Number of annotations to be meta-annotated at once in eval"""
+    inference_backend: str = 'eager'
+    """The backend used for inference (not for training).
+
+    Choose from:
+        - 'eager': The model as is.
+        - 'quantised': The model with its linear and LSTM layers
+                       dynamically quantised to int8. Only available on
+                       the CPU. Generally faster, but the predictions
+                       may differ slightly (see `MetaCAT.quantise`).
+    """
     tokenizer_name: str = 'bbpe'
     """
     Tokenizer name used with MetaCAT.
@@ -88,11 +98,12 @@ class General(DirtiableBaseModel):
     NB! For these changes to take effect, the pipe would need to be recreated.
     """
     save_and_reuse_tokens: bool = False
-    """This is a dangerous option, if not sure ALWAYS set to False. If set,
-    it will try to share the pre-calculated context tokens between MetaCAT
-    models when serving. It will ignore differences in tokenizer and context
-    size, so you need to be sure that the models for which this is turned on
-    have the same tokenizer and context size, during a deployment."""
+    """No longer used.
+
+    The tokens (and samples) of a document are always shared between the
+    MetaCAT models in the pipeline. But only between models with the same
+    tokenizer (fingerprint), lowercasing and context settings. So there
+    is no need to opt in."""
     pipe_batch_size_in_chars: int = 20000000
     """How many characters are piped at once into the meta_cat class"""
     span_group: Optional[str] = None
@@ -29,6 +29,21 @@ class General(SerialisableBaseModel):
     """Max acceptable dinstance between entities (in characters),
     care when using this as it can produce sentences that
     are over 512 tokens (limit is given by tokenizer)"""
+    max_pairs_per_doc: int = 10_000
+    """The maximum number of candidate entity pairs to predict relations for
+    in one document. Documents with many entities can produce a (quadratic)
+    number of pairs. If there are more pairs, only the closest ones are
+    kept. Set to -1 for no limit."""
+    prune_by_type_pairs: bool = False
+    """If True, only entity pairs whose types (in order of appearance) had a
+    relation in the training data (see `allowed_type_pairs`) are
+    considered when predicting. Entities without types are always kept."""
+    allowed_type_pairs: list[tuple[str, str]] = []
+    """The (ent1, ent2) pairs of type names that had a (non 'Other') relation
+    in the training data. Calculated automatically during training."""
+    pipe_batch_size_in_pairs: int = 1000
+    """How many candidate entity pairs (from multiple documents) are pooled
+    before they are run through the model when predicting."""
 
     limit_samples_per_class: int = -1
     """Number of samples per class, this limit is applied for train samples,
@@ -3,10 +3,11 @@ import logging
 import os
 
 from medcat.utils.defaults import COMPONENTS_FOLDER
-from medcat.tokenizing.tokenizers import BaseTokenizer, create_tokenizer
+from medcat.tokenizing.tokenizers import (
+    BaseTokenizer, BatchableTokenizer, create_tokenizer)
 from medcat.components.types import (
     CoreComponentType, create_core_component, CoreComponent, BaseComponent,
-    AbstractCoreComponent)
+    AbstractCoreComponent, BatchableComponent)
 from medcat.components.addons.addons import AddonComponent, create_addon
 from medcat.tokenizing.tokens import (MutableDocument, MutableEntity,
                                       MutableToken)
@@ -316,6 +317,47 @@ class Pipeline:
             doc = addon(doc)
         return doc
 
+    def get_docs(self, texts: Iterable[str]) -> list[MutableDocument]:
+        """Get the documents for a batch of texts.
+
+        Each component (and addon) is run over the entire batch at once.
+        Components that support batching (see `BatchableComponent`) get
+        the whole batch in one call. Other components are run for each
+        document separately. Similarly, tokenizers that support batching
+        (see `BatchableTokenizer`) tokenize the texts in batches.
+
+        Args:
+            texts (Iterable[str]): The input texts.
+
+        Returns:
+            list[MutableDocument]: The resulting documents (in input order).
+        """
+        docs = self._tokenize_all(texts)
+        if not docs:
+            return docs
+        for comp in self._components:
+            logger.info("Running component %s for a batch of %d documents",
+                        comp.full_name, len(docs))
+            docs = self._run_on_batch(comp, docs)
+        for addon in self._addons:
+            docs = self._run_on_batch(addon, docs)
+        return docs
+
+    def _tokenize_all(self, texts: Iterable[str]) -> list[MutableDocument]:
+        if isinstance(self._tokenizer, BatchableTokenizer):
+            nlp_cnf = self.config.general.nlp
+            return list(self._tokenizer.pipe(
+                texts, batch_size=nlp_cnf.batch_size,
+                n_process=nlp_cnf.n_process))
+        return [self._tokenizer(text) for text in texts]
+
+    @staticmethod
+    def _run_on_batch(component: BaseComponent, docs: list[MutableDocument]
+                      ) -> list[MutableDocument]:
+        if isinstance(component, BatchableComponent):
+            return component.__call_batch__(docs)
+        return [component(doc) for doc in docs]
+
     def entity_from_tokens(self, tokens: list[MutableToken]) -> MutableEntity:
         """Get the entity from the list of tokens.
 
@@ -0,0 +1,292 @@
+from typing import Any, Callable, Optional
+import importlib
+import json
+import os
+
+import numpy as np
+
+from medcat.storage.serialisers import Serialiser, AvailableSerialisers
+from medcat.storage.jsonserialiser import (
+    TypeRegistry, TypeHandler, TypeBasedHandler, NumpyArrayHandler,
+    SetHandler, DateTimeHandler, DataClassHandler)
+
+
+_TYPE_KEY = TypeRegistry._type_key
+_DATA_KEY = TypeRegistry._data_key
+
+# NOTE: only instances of classes within these packages get (re)created
+#       based on their state. Anything else needs to be of a known type.
+_ALLOWED_STATE_PACKAGES = ("medcat.", )
+
+
+class NumpySerialiser(Serialiser):
+    """The serialiser that keeps arrays as raw `.npy` files.
+
+    The raw attributes are written as JSON, using the type handlers of
+    the JSON serialiser along with a few more (for tuples, frozensets,
+    dicts with non-string keys, numpy scalars and instances of MedCAT
+    classes). The numpy arrays are grouped by their
+    dtype and shape and each group is stacked into a single matrix that
+    is written next to it as a `.npy` file. So the number of files does
+    not depend on the number of arrays (e.g one context vector per
+    concept and context type). Groups smaller than
+    `MIN_EXTERNAL_ARRAY_BYTES` are kept within the JSON instead.
+
+    Upon load, the matrices are memory mapped (copy-on-write) rather than
+    read in and each array is a (row) view into its matrix. So large
+    arrays (e.g context vectors or vocab vectors) are only paged in when
+    (and if) they are used. Processes loading the same model also share
+    these pages.
+
+    NOTE: The arrays are written as files (rather than a folder) since
+          any sub-folders are treated as serialisable parts.
+    """
+    ser_type = AvailableSerialisers.numpy
+    MIN_EXTERNAL_ARRAY_BYTES = 1 << 20
+
+    def serialise(self, raw_parts: dict[str, Any], target_file: str) -> None:
+        arrays = _ArrayGroups()
+        encoded = _encode(raw_parts, arrays)
+        group_nr = 0
+        for tags, arrs in arrays.groups.values():
+            if (sum(arr.nbytes for arr in arrs) < self.MIN_EXTERNAL_ARRAY_BYTES
+                    and arrs[0].dtype.kind in _INLINE_KINDS):
+                for tag, arr in zip(tags, arrs):
+                    tag.update(_tagged(_INLINE_ARRAYS.type_name,
+                                       _INLINE_ARRAYS.encode(arr)))
+                continue
+            self._save_stacked(target_file, group_nr, arrs)
+            for row, tag in enumerate(tags):
+                tag.update(_tagged(_STACKED_ARRAY, [group_nr, row]))
+            group_nr += 1
+        self._remove_stale_arrays(target_file, group_nr)
+        with open(target_file, 'w') as f:
+            json.dump(encoded, f)
+
+    def _save_stacked(self, target_file: str, group_nr: int,
+                      arrs: list[np.ndarray]) -> None:
+        path = self._array_path(target_file, group_nr)
+        # NOTE: see the note in `Serialiser._save_array`
+        temp_path = path + '.tmp'
+        stacked = np.lib.format.open_memmap(
+            temp_path, mode='w+', dtype=arrs[0].dtype,
+            shape=(len(arrs), ) + arrs[0].shape)
+        for row, arr in enumerate(arrs):
+            stacked[row] = arr
+        stacked.flush()
+        del stacked
+        os.replace(temp_path, path)
+
+    def deserialise(self, target_file: str) -> dict[str, Any]:
+        with open(target_file) as f:
+            encoded = json.load(f)
+        loaded: dict[int, np.ndarray] = {}
+
+        def load_array(group_nr: int, row: int) -> np.ndarray:
+            if group_nr not in loaded:
+                loaded[group_nr] = self._load_array(target_file, group_nr)
+            return loaded[group_nr][row]
+        return _decode(encoded, load_array)
+
+
+# NOTE: the kinds of arrays whose elements can be written as JSON:
+#       bool, (unsigned) int and float
+_INLINE_KINDS = "biuf"
+_INLINE_ARRAYS = NumpyArrayHandler()
+_STACKED_ARRAY = "stacked_ndarray"
+
+
+class _ArrayGroups:
+    """The arrays to be serialised, grouped by their dtype and shape.
+
+    Each array gets a (JSON) tag that is filled in once it is known
+    whether the group is written as a file or within the JSON.
+    """
+
+    def __init__(self) -> None:
+        self.groups: dict[tuple[str, tuple[int, ...]],
+                          tuple[list[dict[str, Any]], list[np.ndarray]]] = {}
+        self._tags: dict[int, dict[str, Any]] = {}
+
+    def add(self, arr: np.ndarray) -> dict[str, Any]:
+        # NOTE: the same array is only written once
+        if id(arr) not in self._tags:
+            tags, arrs = self.groups.setdefault(
+                (arr.dtype.str, arr.shape), ([], []))
+            tag: dict[str, Any] = {}
+            tags.append(tag)
+            arrs.append(arr)
+            self._tags[id(arr)] = tag
+        return self._tags[id(arr)]
+
+
+def _tagged(type_name: str, data: Any) -> dict[str, Any]:
+    return {_TYPE_KEY: type_name, _DATA_KEY: data}
+
+
+def _cls_path(cls: type) -> str:
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+def _get_cls(cls_path: str) -> type:
+    if not cls_path.startswith(_ALLOWED_STATE_PACKAGES):
+        raise TypeError(f"Unsupported type: {cls_path}")
+    module_name, cls_name = cls_path.rsplit('.', 1)
+    module = importlib.import_module(module_name)
+    return getattr(module, cls_name)
+
+
+def _get_state(obj: Any) -> Any:
+    if hasattr(obj, '__getstate__'):
+        return obj.__getstate__()
+    # NOTE: before python 3.11 there's no default `__getstate__`,
+    #       so the default state (of python 3.11+) is created here
+    slots_state: dict[str, Any] = {}
+    for cls in type(obj).__mro__:
+        slots = cls.__dict__.get('__slots__', ())
+        for attr_name in ((slots, ) if isinstance(slots, str) else slots):
+            if (attr_name not in ('__dict__', '__weakref__') and
+                    hasattr(obj, attr_name)):
+                slots_state[attr_name] = getattr(obj, attr_name)
+    dict_state = getattr(obj, '__dict__', None)
+    return (dict_state, slots_state) if slots_state else dict_state
+
+
+# NOTE: the handlers below (along with the ones of the JSON serialiser)
+#       return data that may still contain arrays and other tagged
+#       objects. It gets encoded (and decoded) recursively.
+
+class TupleHandler(TypeBasedHandler[tuple]):
+    type_name = "tuple"
+    type_cls = tuple
+
+    def encode(self, obj: tuple) -> Any:
+        return list(obj)
+
+    def decode(self, obj: Any) -> tuple:
+        return tuple(obj)
+
+
+class FrozenSetHandler(TypeBasedHandler[frozenset]):
+    type_name = "frozenset"
+    type_cls = frozenset
+
+    def encode(self, obj: frozenset) -> Any:
+        return list(obj)
+
+    def decode(self, obj: Any) -> frozenset:
+        return frozenset(obj)
+
+
+class NumpyScalarHandler(TypeBasedHandler[np.generic]):
+    type_name = "npscalar"
+    type_cls = np.generic
+
+    def encode(self, obj: np.generic) -> Any:
+        return [obj.item(), obj.dtype.str]
+
+    def decode(self, obj: Any) -> np.generic:
+        value, dtype = obj
+        return np.dtype(dtype).type(value)
+
+
+class ItemsDictHandler(TypeHandler[dict]):
+    """Handles dicts that can't be written as JSON objects.
+
+    I.e dicts with non-string keys or ones that look like a type tag.
+    """
+    type_name = "dict"
+    type_cls = dict
+
+    def should_encode(self, obj: Any) -> bool:
+        return isinstance(obj, dict) and (
+            _TYPE_KEY in obj or
+            not all(isinstance(key, str) for key in obj))
+
+    def encode(self, obj: dict) -> Any:
+        return [[key, val] for key, val in obj.items()]
+
+    def decode(self, obj: Any) -> dict:
+        return {key: val for key, val in obj}
+
+
+class StateHandler(TypeHandler[Any]):
+    """Handles instances of MedCAT classes based on their state.
+
+    Classes with `__slots__` are supported as well. Their (default)
+    state is a tuple of the `__dict__` (if any) and the slot values.
+    """
+    type_name = "state"
+    type_cls = object  # NOTE: shouldn't be used
+    _cls_key = "cls"
+    _state_key = "state"
+
+    def should_encode(self, obj: Any) -> bool:
+        return _cls_path(type(obj)).startswith(_ALLOWED_STATE_PACKAGES)
+
+    def encode(self, obj: Any) -> Any:
+        return {self._cls_key: _cls_path(type(obj)),
+                self._state_key: _get_state(obj)}
+
+    def decode(self, obj: Any) -> Any:
+        cls = _get_cls(obj[self._cls_key])
+        inst = cls.__new__(cls)
+        state = obj[self._state_key]
+        if hasattr(inst, '__setstate__'):
+            inst.__setstate__(state)
+            return inst
+        slots_state: Optional[dict[str, Any]] = None
+        if isinstance(state, tuple):
+            state, slots_state = state
+        if state:
+            inst.__dict__.update(state)
+        for attr_name, value in (slots_state or {}).items():
+            setattr(inst, attr_name, value)
+        return inst
+
+
+_registry = TypeRegistry()
+# NOTE: the order matters since the first suitable handler is used
+_registry.register(NumpyScalarHandler())
+_registry.register(TupleHandler())
+_registry.register(SetHandler())
+_registry.register(FrozenSetHandler())
+_registry.register(ItemsDictHandler())
+_registry.register(DateTimeHandler())
+_registry.register(DataClassHandler())
+_registry.register(StateHandler())
+
+
+def _encode(obj: Any, arrays: _ArrayGroups) -> Any:
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+    elif isinstance(obj, np.ndarray) and obj.dtype != object:
+        return arrays.add(obj)
+    elif isinstance(obj, list):
+        return [_encode(val, arrays) for val in obj]
+    for handler in _registry.handlers.values():
+        if handler.should_encode(obj):
+            return _tagged(handler.type_name,
+                           _encode(handler.encode(obj), arrays))
+    if isinstance(obj, dict):
+        return {key: _encode(val, arrays) for key, val in obj.items()}
+    raise TypeError(f"Unable to serialise object of type {type(obj)}")
+
+
+def _decode(obj: Any, load_array: Callable[[int, int], np.ndarray]
+            ) -> Any:
+    if isinstance(obj, list):
+        return [_decode(val, load_array) for val in obj]
+    elif not isinstance(obj, dict):
+        return obj
+    elif _TYPE_KEY not in obj:
+        return {key: _decode(val, load_array) for key, val in obj.items()}
+    type_name, data = obj[_TYPE_KEY], obj[_DATA_KEY]
+    if type_name == _STACKED_ARRAY:
+        return load_array(*data)
+    elif type_name == _INLINE_ARRAYS.type_name:
+        return _INLINE_ARRAYS.decode(data)
+    elif type_name in _registry.handlers:
+        return _registry.handlers[type_name].decode(
+            _decode(data, load_array))
+    raise TypeError(f"Unknown serialised type: {type_name}")
@@ -6,8 +6,11 @@ from importlib import import_module
 import logging
 import re
 import importlib
+import pickle
+import json
 
 import dill as _dill
+import numpy as np
 
 from medcat.storage.serialisables import Serialisable, ManualSerialisable
 from medcat.storage.serialisables import get_all_serialisable_members
@@ -31,6 +34,8 @@ class Serialiser(ABC):
     This class is responsible for both serialising and deserialising.
     """
     RAW_FILE = 'raw_dict.dat'
+    ARRAY_SUFFIX = '.npy'
+    mmap_mode = 'c'
 
     @property
     @abstractmethod
@@ -60,6 +65,34 @@ class Serialiser(ABC):
         """
         pass
 
+    def _array_path(self, target_file: str, arr_nr: int) -> str:
+        return f"{target_file}.arr{arr_nr}{self.ARRAY_SUFFIX}"
+
+    def _save_array(self, target_file: str, arr_nr: int,
+                    arr: np.ndarray) -> None:
+        path = self._array_path(target_file, arr_nr)
+        # NOTE: write to a temporary file and replace since the existing
+        #       file may be memory mapped (e.g when saving a loaded model
+        #       to the same folder)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            np.save(f, arr, allow_pickle=False)
+        os.replace(temp_path, path)
+
+    def _load_array(self, target_file: str, arr_nr: int) -> np.ndarray:
+        return np.load(self._array_path(target_file, arr_nr),
+                       mmap_mode=self.mmap_mode, allow_pickle=False)
+
+    def _remove_stale_arrays(self, target_file: str, num_arrays: int) -> None:
+        # NOTE: array files left over from an earlier save to the same folder
+        folder, file_name = os.path.split(target_file)
+        array_file_re = re.compile(re.escape(file_name) + r"\.arr(\d+)" +
+                                   re.escape(self.ARRAY_SUFFIX))
+        for other_name in os.listdir(folder or '.'):
+            matched = array_file_re.fullmatch(other_name)
+            if matched is not None and int(matched.group(1)) >= num_arrays:
+                os.remove(os.path.join(folder, other_name))
+
     @classmethod
     def get_ser_type_file(cls, folder: str) -> str:
         return os.path.join(folder, SER_TYPE_FILE)
@@ -235,6 +268,7 @@ class AvailableSerialisers(Enum):
     """Describes the available serialisers."""
     dill = auto()
     json = auto()
+    numpy = auto()
 
     def write_to(self, file_path: str) -> None:
         with open(file_path, 'w') as f:
@@ -246,17 +280,94 @@ class AvailableSerialisers(Enum):
             return cls[f.read().strip()]
 
 
+class ExternalArray(np.ndarray):
+    """A numpy array that the dill serialiser does not pickle.
+
+    These (e.g the embedding matrices of the embedding linker) are written
+    next to the raw file as `.npy` files instead and memory mapped
+    (copy-on-write) upon load. So they are only paged in when used and the
+    pages are shared between the processes that load the same model.
+    Any other array is pickled along with the rest of the raw attributes.
+
+    An array is marked by viewing it as this type (i.e
+    `arr.view(ExternalArray)`). The arrays loaded are marked as well.
+    """
+
+
 class DillSerialiser(Serialiser):
-    """The dill based serialiser."""
+    """The dill based serialiser.
+
+    Arrays marked as `ExternalArray` are written as separate files. Their
+    number and format version are written next to the raw file as well
+    (see `EXTERNAL_ARRAYS_SUFFIX`) so that the format is known upon load.
+    NOTE: Versions of MedCAT that predate these are unable to load
+          models with such arrays.
+    """
     ser_type = AvailableSerialisers.dill
+    EXTERNAL_ARRAYS_SUFFIX = '.arrays.json'
+    EXTERNAL_ARRAYS_FORMAT = 1
+    _ARRAY_PID = 'ndarray'
+
+    def _external_arrays_path(self, target_file: str) -> str:
+        return target_file + self.EXTERNAL_ARRAYS_SUFFIX
 
     def serialise(self, raw_parts: dict[str, Any], target_file: str) -> None:
+        # NOTE: the persistent ID is asked for before the pickler looks for
+        #       objects it has already written, so keep track of them here
+        #       (along with the arrays so that their IDs stay unique)
+        saved: dict[int, tuple[int, np.ndarray]] = {}
+
+        def persistent_id(obj: Any) -> Optional[tuple[str, int]]:
+            if type(obj) is not ExternalArray or obj.dtype.hasobject:
+                return None
+            if id(obj) not in saved:
+                self._save_array(target_file, len(saved), obj)
+                saved[id(obj)] = (len(saved), obj)
+            return self._ARRAY_PID, saved[id(obj)][0]
         with open(target_file, 'wb') as f:
-            _dill.dump(raw_parts, f)
+            pickler = _dill.Pickler(f)
+            pickler.persistent_id = persistent_id
+            pickler.dump(raw_parts)
+        self._remove_stale_arrays(target_file, len(saved))
+        arrays_path = self._external_arrays_path(target_file)
+        if saved:
+            with open(arrays_path, 'w') as f:
+                json.dump({"format": self.EXTERNAL_ARRAYS_FORMAT,
+                           "num_arrays": len(saved)}, f)
+        elif os.path.exists(arrays_path):
+            os.remove(arrays_path)
+
+    def _check_external_arrays(self, target_file: str) -> None:
+        arrays_path = self._external_arrays_path(target_file)
+        if not os.path.exists(arrays_path):
+            raise pickle.UnpicklingError(
+                f"Missing the description of the arrays: {arrays_path}")
+        with open(arrays_path) as f:
+            arr_format = json.load(f)["format"]
+        if arr_format > self.EXTERNAL_ARRAYS_FORMAT:
+            raise pickle.UnpicklingError(
+                f"Unsupported format of arrays ({arr_format}) in "
+                f"{arrays_path}. Supported up to "
+                f"{self.EXTERNAL_ARRAYS_FORMAT}")
 
     def deserialise(self, target_file: str) -> dict[str, Any]:
+        loaded: dict[int, np.ndarray] = {}
+
+        def persistent_load(pid: tuple[str, int]) -> np.ndarray:
+            pid_type, arr_nr = pid
+            if pid_type != self._ARRAY_PID:
+                raise pickle.UnpicklingError(
+                    f"Unknown persistent id: {pid_type}")
+            if not loaded:
+                self._check_external_arrays(target_file)
+            if arr_nr not in loaded:
+                loaded[arr_nr] = self._load_array(
+                    target_file, arr_nr).view(ExternalArray)
+            return loaded[arr_nr]
         with open(target_file, 'rb') as f:
-            return RemappingUnpickler(f).load()
+            unpickler = RemappingUnpickler(f)
+            unpickler.persistent_load = persistent_load
+            return unpickler.load()
 
 
 _DEF_SER = AvailableSerialisers.dill
@@ -284,6 +395,9 @@ def get_serialiser(
     elif serialiser_type is AvailableSerialisers.json:
         from medcat.storage.jsonserialiser import JsonSerialiser
         return JsonSerialiser()
+    elif serialiser_type is AvailableSerialisers.numpy:
+        from medcat.storage.numpyserialiser import NumpySerialiser
+        return NumpySerialiser()
     raise ValueError("Unknown or unimplemented serialsier type: "
                      f"{serialiser_type}")
 
@@ -1,6 +1,8 @@
 import re
 from typing import cast, Optional, Iterator, overload, Union, Any, Type
 from collections import defaultdict
+from array import array
+from bisect import bisect_left, bisect_right
 
 from medcat.tokenizing.tokens import (
     BaseToken, BaseEntity, BaseDocument,
@@ -10,39 +12,37 @@ from medcat.tokenizing.tokenizers import BaseTokenizer
 from medcat.config import Config
 
 
+_FLAG_PUNCT = 1
+_FLAG_SKIP = 2
+
+
 class Token:
+    """A (lightweight) view of a token within a document.
 
-    def __init__(self, document: 'Document',
-                 text: str, _text_with_ws: str,
-                 start_index: int, token_index: int,
-                 is_punct: bool, to_skip: bool) -> None:
+    All the token data is held by the document in parallel arrays (see
+    `Document`). The token just knows its document and index.
+    """
+    __slots__ = ('_doc', '_token_index')
+
+    def __init__(self, document: 'Document', token_index: int) -> None:
         self._doc = document
-        self._text = text
-        self._text_with_ws = _text_with_ws
-        self._start_index = start_index
         self._token_index = token_index
-        self._is_punct = is_punct
-        self._to_skip = to_skip
-        # defaults
-        if self.norm is None:
-            # force spacy to init ''
-            self.norm = ''
 
     @property
     def is_punctuation(self) -> bool:
-        return self._is_punct
+        return bool(self._doc._flags[self._token_index] & _FLAG_PUNCT)
 
     @is_punctuation.setter
     def is_punctuation(self, new_val: bool) -> None:
-        self._is_punct = new_val
+        self._doc._set_flag(self._token_index, _FLAG_PUNCT, new_val)
 
     @property
     def to_skip(self) -> bool:
-        return self._to_skip
+        return bool(self._doc._flags[self._token_index] & _FLAG_SKIP)
 
     @to_skip.setter
     def to_skip(self, new_val: bool) -> None:
-        self._to_skip = new_val
+        self._doc._set_flag(self._token_index, _FLAG_SKIP, new_val)
 
     @property
     def norm(self) -> str:
@@ -58,15 +58,16 @@ class Token:
 
     @property
     def text(self) -> str:
-        return self._text
+        return self._doc._texts[self._token_index]
 
     @property
     def text_versions(self) -> list[str]:
-        return [self.norm, self.lower]
+        lower = self._doc._lowers[self._token_index]
+        return [lower, lower]
 
     @property
     def lower(self) -> str:
-        return self._text.lower()
+        return self._doc._lowers[self._token_index]
 
     @property
     def is_stop(self) -> bool:
@@ -74,11 +75,11 @@ class Token:
 
     @property
     def is_digit(self) -> bool:
-        return self._text.isdigit()
+        return self.text.isdigit()
 
     @property
     def is_upper(self) -> bool:
-        return self._text.isupper()
+        return self.text.isupper()
 
     @property
     def tag(self) -> Optional[str]:
@@ -90,11 +91,13 @@ class Token:
 
     @property
     def text_with_ws(self) -> str:
-        return self._text_with_ws
+        doc = self._doc
+        return doc.text[doc._starts[self._token_index]:
+                        doc._ends_ws[self._token_index]]
 
     @property
     def char_index(self) -> int:
-        return self._start_index
+        return self._doc._starts[self._token_index]
 
     @property
     def index(self) -> int:
@@ -114,8 +117,7 @@ class Token:
             return False
         return (
             self._doc is other._doc and
-            self.text == other.text and
-            self.index == other.index)
+            self._token_index == other._token_index)
 
 
 class Entity:
@@ -168,17 +170,26 @@ class Entity:
     def end_char_index(self) -> int:
         return self._end_char_index
 
-    def set_addon_data(self, path: str, val: Any) -> None:
+    def _get_doc_dict(self, path: str) -> dict:
+        doc_path = f"{self.ENTITY_INFO_PREFIX}{path}"
         # NOTE: doc.get_addon_data will raise if not registered
-        doc_dict = self._doc.get_addon_data(f"{self.ENTITY_INFO_PREFIX}{path}")
+        doc_dict = self._doc.get_addon_data(doc_path)
+        if doc_path not in vars(self._doc):
+            # NOTE: the registered default is shared between all documents
+            #       so each document needs its own copy
+            doc_dict = defaultdict(doc_dict.default_factory)
+            self._doc.set_addon_data(doc_path, doc_dict)
+        return doc_dict
+
+    def set_addon_data(self, path: str, val: Any) -> None:
+        doc_dict = self._get_doc_dict(path)
         doc_dict[(self.start_index, self.end_index)] = val
 
     def has_addon_data(self, path: str) -> bool:
         return bool(self.get_addon_data(path))
 
     def get_addon_data(self, path: str) -> Any:
-        # NOTE: doc.get_addon_data will raise if not registered
-        doc_dict = self._doc.get_addon_data(f"{self.ENTITY_INFO_PREFIX}{path}")
+        doc_dict = self._get_doc_dict(path)
         return doc_dict[(self.start_index, self.end_index)]
 
     def get_available_addon_paths(self) -> list[str]:
@@ -217,15 +228,52 @@ class Entity:
 
 
 class Document:
+    """The document.
+
+    The token data is held in parallel arrays (struct of arrays) rather
+    than separate objects per token:
+    - `_starts`: The start character index of each token
+    - `_ends`: The end character index of each token
+    - `_ends_ws`: The end character index of each token (with whitespace)
+    - `_flags`: The (mutable) flags of each token (punctuation, skip)
+    - `_texts` / `_lowers`: The (precomputed) text and lower case text
+
+    The tokens themselves (see `Token`) are just views into these arrays.
+
+    The mapping from character index to token index (`_char_to_token`)
+    is built upon first use (see `get_aligned_tokens`).
+    """
     _addon_extension_paths: set[str] = set()
 
-    def __init__(self, text: str, tokens: Optional[list[MutableToken]] = None
-                 ) -> None:
+    def __init__(self, text: str) -> None:
         self.text = text
-        self._tokens = tokens or []
+        self._starts: array[int] = array('l')
+        self._ends: array[int] = array('l')
+        self._ends_ws: array[int] = array('l')
+        self._flags = bytearray()
+        self._texts: list[str] = []
+        self._lowers: list[str] = []
+        self._tokens: list[Token] = []
+        self._char_to_token: Optional[array[int]] = None
         self.ner_ents: list[MutableEntity] = []
         self.linked_ents: list[MutableEntity] = []
 
+    def _add_token(self, text: str, start: int, end_ws: int) -> None:
+        self._starts.append(start)
+        self._ends.append(start + len(text))
+        self._ends_ws.append(end_ws)
+        self._flags.append(0)
+        self._texts.append(text)
+        self._lowers.append(text.lower())
+        self._tokens.append(Token(self, len(self._tokens)))
+        self._char_to_token = None
+
+    def _set_flag(self, token_index: int, flag: int, value: bool) -> None:
+        if value:
+            self._flags[token_index] |= flag
+        else:
+            self._flags[token_index] &= ~flag
+
     @property
     def base(self) -> BaseDocument:
         return cast(BaseDocument, self)
@@ -255,12 +303,35 @@ class Document:
 
     def get_tokens(self, start_index: int, end_index: int
                    ) -> list[MutableToken]:
-        tkns = []
-        for tkn in self:
-            if (tkn.base.char_index >= start_index and
-                    tkn.base.char_index <= end_index):
-                tkns.append(tkn)
-        return tkns
+        # NOTE: the tokens that start within the (inclusive) char range
+        first = bisect_left(self._starts, start_index)
+        last = bisect_right(self._starts, end_index, lo=first)
+        return cast(list[MutableToken], self._tokens[first: last])
+
+    def _get_char_to_token(self) -> 'array[int]':
+        if self._char_to_token is None:
+            # NOTE: -1 for characters that aren't part of any token
+            char_to_token = array('l', [-1]) * len(self.text)
+            for tkn_index, (start, end) in enumerate(
+                    zip(self._starts, self._ends)):
+                char_to_token[start: end] = array(
+                    'l', [tkn_index]) * (end - start)
+            self._char_to_token = char_to_token
+        return self._char_to_token
+
+    def get_aligned_tokens(self, start_index: int, end_index: int
+                           ) -> list[MutableToken]:
+        if start_index < 0 or end_index < start_index or end_index >= len(
+                self.text):
+            return []
+        char_to_token = self._get_char_to_token()
+        first = char_to_token[start_index]
+        last = char_to_token[end_index]
+        if (first == -1 or last == -1 or
+                self._starts[first] != start_index or
+                self._ends[last] != end_index + 1):
+            return []
+        return cast(list[MutableToken], self._tokens[first: last + 1])
 
     def __iter__(self) -> Iterator[MutableToken]:
         yield from self._tokens
@@ -306,15 +377,15 @@ def _entity_from_tokens(doc: Document, tokens: list[MutableToken],
     rtokens = cast(list[Token], tokens)
     text = doc.text
     if rtokens:
-        start_char = rtokens[0].char_index
+        start_char = doc._starts[rtokens[0]._token_index]
         # end index should need the length of the last token
-        end_char = rtokens[-1].char_index + len(rtokens[-1].text)
-        text = text[rtokens[0].char_index: end_char]
+        end_char = doc._ends[rtokens[-1]._token_index]
+        text = text[start_char: end_char]
     elif doc._tokens:
         if token_start >= len(doc._tokens):
             start_char = len(doc.text)
         else:
-            start_char = doc._tokens[token_start].base.char_index
+            start_char = doc._starts[token_start]
         end_char = start_char
         text = ''
     else:
@@ -342,25 +413,21 @@ class RegexTokenizer(BaseTokenizer):
     def entity_from_tokens(self, tokens: list[MutableToken]) -> MutableEntity:
         if not tokens:
             raise ValueError("Need at least one token for an entity")
-        doc = cast(Token, tokens[0])._doc
-        start_index = doc._tokens.index(tokens[0])
-        end_index = doc._tokens.index(tokens[-1])
-        return _entity_from_tokens(doc, tokens, start_index, end_index)
+        first_token = cast(Token, tokens[0])
+        # NOTE: the tokens know their own index so no need to look for them
+        start_index = first_token._token_index
+        end_index = cast(Token, tokens[-1])._token_index
+        return _entity_from_tokens(first_token._doc, tokens, start_index,
+                                   end_index)
 
     def _get_tokens_matches(self, text: str) -> list[re.Match[str]]:
         tokens = self.REGEX.finditer(text)
         return list(tokens)
 
     def __call__(self, text: str) -> MutableDocument:
-        tokens = self._get_tokens_matches(text)
         doc = Document(text)
-        for tkn_index, match in enumerate(tokens):
-            start_index = match.start()
-            token_w_ws = match.group(1)
-            token = match.group(2)
-            doc._tokens.append(Token(doc, token, token_w_ws,
-                                     start_index, tkn_index,
-                                     False, False))
+        for match in self.REGEX.finditer(text):
+            doc._add_token(match.group(2), match.start(), match.end())
         return doc
 
     @classmethod
@@ -1,4 +1,4 @@
-from typing import Optional, Callable, cast, Type
+from typing import Optional, Callable, cast, Type, Iterable, Iterator
 import re
 import os
 import shutil
@@ -84,6 +84,28 @@ class SpacyTokenizer(BaseTokenizer):
     def __call__(self, text: str) -> MutableDocument:
         return Document(self._nlp(text))
 
+    def pipe(self, texts: Iterable[str], batch_size: int = 50,
+             n_process: int = 1) -> Iterator[MutableDocument]:
+        """Tokenize a stream of texts using spacy's batching.
+
+        This runs the (enabled) spacy components (e.g the tagger and
+        lemmatizer) over entire batches of texts rather than one text
+        at a time.
+
+        Args:
+            texts (Iterable[str]): The texts to tokenize.
+            batch_size (int): The number of texts to process at once.
+                Defaults to 50.
+            n_process (int): The number of processes spacy uses.
+                Defaults to 1.
+
+        Yields:
+            Iterator[MutableDocument]: The documents (in input order).
+        """
+        for spacy_doc in self._nlp.pipe(texts, batch_size=batch_size,
+                                        n_process=n_process):
+            yield Document(spacy_doc)
+
     @classmethod
     def create_new_tokenizer(cls, config: Config) -> 'SpacyTokenizer':
         nlp_cnf = config.general.nlp
@@ -1,4 +1,5 @@
 from typing import Iterator, Union, Optional, overload, cast, Any
+from array import array
 import logging
 
 from spacy.tokens import Token as SpacyToken
@@ -198,6 +199,8 @@ class Document:
         self._delegate = delegate
         self.ner_ents: list[MutableEntity] = []
         self.linked_ents: list[MutableEntity] = []
+        # NOTE: built upon first use (see `get_aligned_tokens`)
+        self._char_to_token: Optional[array[int]] = None
 
     @property
     def base(self) -> BaseDocument:
@@ -234,6 +237,33 @@ class Document:
                 tkns.append(tkn)
         return tkns
 
+    def _get_char_to_token(self) -> 'array[int]':
+        if self._char_to_token is None:
+            # NOTE: -1 for characters that aren't part of any token
+            char_to_token = array('l', [-1]) * len(self._delegate.text)
+            for tkn in self._delegate:
+                char_to_token[tkn.idx: tkn.idx + len(tkn)] = array(
+                    'l', [tkn.i]) * len(tkn)
+            self._char_to_token = char_to_token
+        return self._char_to_token
+
+    def get_aligned_tokens(self, start_index: int, end_index: int
+                           ) -> list[MutableToken]:
+        if start_index < 0 or end_index < start_index or end_index >= len(
+                self._delegate.text):
+            return []
+        char_to_token = self._get_char_to_token()
+        first = char_to_token[start_index]
+        last = char_to_token[end_index]
+        if first == -1 or last == -1:
+            return []
+        first_tkn = self._delegate[first]
+        last_tkn = self._delegate[last]
+        if (first_tkn.idx != start_index or
+                last_tkn.idx + len(last_tkn) != end_index + 1):
+            return []
+        return [Token(tkn) for tkn in self._delegate[first: last + 1]]
+
     def set_addon_data(self, path: str, val: Any) -> None:
         if not self._delegate.has_extension(path):
             raise UnregisteredDataPathException(self.__class__, path)
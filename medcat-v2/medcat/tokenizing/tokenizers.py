@@ -1,4 +1,5 @@
-from typing import Protocol, Type, Callable, runtime_checkable
+from typing import Protocol, Type, Callable, Iterable, Iterator
+from typing import runtime_checkable
 from typing_extensions import Self
 import logging
 
@@ -70,6 +71,31 @@ class BaseTokenizer(Protocol):
         pass
 
 
+@runtime_checkable
+class BatchableTokenizer(Protocol):
+    """A tokenizer that is able to tokenize a stream of texts in batches.
+
+    Tokenizers that do not implement this are called for one text at a time
+    when processing multiple texts.
+    """
+
+    def pipe(self, texts: Iterable[str], batch_size: int = 50,
+             n_process: int = 1) -> Iterator[MutableDocument]:
+        """Tokenize a stream of texts.
+
+        Args:
+            texts (Iterable[str]): The texts to tokenize.
+            batch_size (int): The number of texts to process at once.
+                Defaults to 50.
+            n_process (int): The number of processes to use.
+                Defaults to 1.
+
+        Yields:
+            Iterator[MutableDocument]: The documents (in input order).
+        """
+        pass
+
+
 @runtime_checkable
 class SaveableTokenizer(Protocol):
 
@@ -421,6 +421,26 @@ class MutableDocument(Protocol):
         """
         pass
 
+    def get_aligned_tokens(self, start_index: int, end_index: int
+                           ) -> list[MutableToken]:
+        """Get the tokens that exactly span the specified character indices.
+
+        Unlike `get_tokens`, this requires the span to start at the start
+        of a token and end at the end of a token. If the span starts or
+        ends in the middle of a token (or outside of any token), no tokens
+        are returned.
+
+        Args:
+            start_index (int): The starting character index.
+            end_index (int): The ending character index (inclusive).
+
+        Returns:
+            list[MutableToken]:
+                The list of tokens, or an empty list if the span is not
+                aligned with the tokens.
+        """
+        pass
+
     def set_addon_data(self, path: str, val: Any) -> None:
         """Used to add arbitrary data to the entity.
 
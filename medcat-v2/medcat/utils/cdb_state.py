@@ -138,6 +138,14 @@ def _reapply_state(cdb, state: CDBState):
         elif isinstance(prev_ver, ModelMeta):
             # just set, shouldn't matter
             _set_attr(cdb, k, v)
+    # NOTE: the subname references (if counted) no longer apply
+    #       and will be recounted if and when needed
+    cdb._subname_refs = None
+    cdb._subnames_built = False
+    # NOTE: the names may have changed altogether
+    cdb._on_names_removed()
+    # NOTE: the token counts may have changed (even if their number didn't)
+    cdb._token_counts_version += 1
 
 
 def load_and_apply_cdb_state(cdb, file_path: str) -> None:
@@ -1,12 +1,14 @@
 from typing import Optional, Any, cast, Union, Literal
 from typing_extensions import TypedDict
 import os
+import json
 import logging
 
 # import dill
 import numpy as np
 
-from medcat.storage.serialisables import AbstractSerialisable
+from medcat.storage.serialisables import (
+    AbstractSerialisable, SerialisingStrategy)
 from medcat.storage.serialisers import (
     deserialise, AvailableSerialisers, serialise)
 from medcat.storage.zip_utils import (
@@ -344,3 +346,225 @@ class Vocab(AbstractSerialisable):
         if not isinstance(vocab, Vocab):
             raise ValueError(f"The path '{path}' is not a Vocab!")
         return vocab
+
+
+class CompactVocabIsReadOnlyError(ValueError):
+
+    def __init__(self, *args):
+        super().__init__(*args)
+
+
+class CompactVocab(Vocab):
+    """A compact, array backed, Vocab.
+
+    The data is stored in 3 parts:
+    - A single `(n_vectors, dim)` float32 matrix with the word vectors
+    - The words (in index order) along with a word to index map and an
+      array mapping each word index to its row in the matrix (or -1 if
+      the word has no vector)
+    - An array of counts
+
+    When serialised, the arrays are stored as raw `.npy` files. So upon
+    load, the vector matrix can be memory mapped rather than read into
+    memory. This way, multiple processes using the same model can share
+    the vectors through the page cache.
+
+    The words, the vectors, and the index can not be changed. The counts
+    can, however, be updated. If one needs to change the vocab, they can
+    use `to_vocab` to get a regular Vocab and `from_vocab` to get the
+    compact version back afterwards.
+
+    Args:
+        words (list[str]): The words in index order.
+        counts (np.ndarray): The count for each word.
+        vec_rows (np.ndarray): The row in the vector matrix for each
+            word (-1 for words without vectors).
+        vectors (np.ndarray): The vector matrix.
+    """
+    VECTORS_FILE = 'vectors.npy'
+    COUNTS_FILE = 'counts.npy'
+    VEC_ROWS_FILE = 'vec_rows.npy'
+    WORDS_FILE = 'words.json'
+
+    def __init__(self, words: list[str], counts: np.ndarray,
+                 vec_rows: np.ndarray, vectors: np.ndarray) -> None:
+        # NOTE: not calling Vocab.__init__ since none of the dict based
+        #       attributes are used
+        self._words = words
+        self._word2index = {word: ind for ind, word in enumerate(words)}
+        self._counts = counts
+        self._vec_rows = vec_rows
+        self._vectors = vectors
+        self.cum_probs = np.array([])
+
+    def get_strategy(self) -> SerialisingStrategy:
+        return SerialisingStrategy.MANUAL
+
+    @classmethod
+    def from_vocab(cls, vocab: Vocab) -> 'CompactVocab':
+        """Create a compact Vocab based on a regular Vocab.
+
+        Args:
+            vocab (Vocab): The regular Vocab.
+
+        Raises:
+            ValueError: If the vectors are of different lengths.
+
+        Returns:
+            CompactVocab: The compact Vocab.
+        """
+        words = [vocab.index2word[ind] for ind in sorted(vocab.index2word)]
+        counts = np.array([vocab.count(word) for word in words],
+                          dtype=np.int64)
+        vec_rows = np.full(len(words), -1, dtype=np.int64)
+        raw_vecs: list[np.ndarray] = []
+        for ind, word in enumerate(words):
+            vec = vocab.vec(word)
+            if vec is None:
+                continue
+            vec_rows[ind] = len(raw_vecs)
+            raw_vecs.append(vec)
+        if len({len(vec) for vec in raw_vecs}) > 1:
+            raise ValueError("Unable to create a compact Vocab since the "
+                             "vectors are not of the same length")
+        if raw_vecs:
+            vectors = np.vstack(raw_vecs).astype(np.float32)
+        else:
+            vectors = np.zeros((0, 0), dtype=np.float32)
+        return cls(words, counts, vec_rows, vectors)
+
+    def to_vocab(self) -> Vocab:
+        """Convert to a regular (mutable) Vocab.
+
+        Returns:
+            Vocab: The regular Vocab.
+        """
+        vocab = Vocab()
+        for word in self._words:
+            vec = self.vec(word)
+            vocab.add_word(word, self.count(word),
+                           None if vec is None else np.array(vec))
+        return vocab
+
+    def _is_read_only(self, *args, **kwargs) -> None:
+        raise CompactVocabIsReadOnlyError(
+            "The words and vectors of a CompactVocab cannot be changed. "
+            "Use `CompactVocab.to_vocab` to get a mutable Vocab.")
+
+    add_word = _is_read_only  # type: ignore
+    add_words = _is_read_only  # type: ignore
+    add_vec = _is_read_only  # type: ignore
+    remove_all_vectors = _is_read_only  # type: ignore
+    remove_words_below_cnt = _is_read_only  # type: ignore
+
+    @property  # type: ignore
+    def vocab(self) -> dict[str, WordDescriptor]:  # type: ignore
+        # NOTE: this is a copy for compatibility only,
+        #       changes to it will not be reflected in the Vocab
+        return {word: self.item(word) for word in self._words}
+
+    @property  # type: ignore
+    def index2word(self) -> dict[int, str]:  # type: ignore
+        return dict(enumerate(self._words))
+
+    @property  # type: ignore
+    def vec_index2word(self) -> dict[int, str]:  # type: ignore
+        return {int(ind): self._words[ind]
+                for ind in np.flatnonzero(self._vec_rows >= 0)}
+
+    def inc_or_add(self, word: str, cnt: int = 1,
+                   vec: Optional[np.ndarray] = None) -> None:
+        if word not in self:
+            self._is_read_only()
+        self.inc_wc(word, cnt)
+
+    def inc_wc(self, word: str, cnt: int = 1) -> None:
+        self._counts[self._word2index[word]] += cnt
+
+    def reset_counts(self, cnt: int = 1) -> None:
+        self._counts[:] = cnt
+
+    def init_cumsums(self) -> None:
+        index_list = np.flatnonzero(self._vec_rows >= 0)
+        freqs = self._counts[index_list].astype(np.float64) ** (3 / 4)
+        freqs /= freqs.sum()
+        self.cum_probs = np.cumsum(freqs)
+        self._index_list = index_list
+
+    def get_negative_samples(self, n: int = 6,
+                             ignore_punct_and_num: bool = False) -> list[int]:
+        if len(self.cum_probs) == 0:
+            self.init_cumsums()
+        random_vals = np.random.rand(n)
+        vec_slots = np.searchsorted(self.cum_probs, random_vals)
+        inds = cast(list[int], self._index_list[vec_slots].tolist())
+        if ignore_punct_and_num:
+            # Do not return anything that does not have letters in it
+            return [ind for ind in inds
+                    if self._words[ind].upper().isupper()]
+        return inds
+
+    def get_vectors(self, indices: list[int]) -> list[np.ndarray]:
+        rows = self._vec_rows[indices]
+        return list(self._vectors[rows[rows >= 0]])
+
+    def vec(self, word: str) -> Optional[np.ndarray]:
+        row = self._vec_rows[self._word2index[word]]
+        if row < 0:
+            return None
+        return self._vectors[row]
+
+    def count(self, word: str) -> int:
+        return int(self._counts[self._word2index[word]])
+
+    def item(self, word: str) -> WordDescriptor:
+        ind = self._word2index[word]
+        return {'vector': self.vec(word), 'count': int(self._counts[ind]),
+                'index': ind}
+
+    def __contains__(self, word: str) -> bool:
+        return word in self._word2index
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, CompactVocab):
+            return isinstance(other, Vocab) and self.to_vocab() == other
+        return (self._words == other._words and
+                np.array_equal(self._counts, other._counts) and
+                np.array_equal(self._vec_rows, other._vec_rows) and
+                np.array_equal(self._vectors, other._vectors))
+
+    # for ManualSerialisable:
+
+    def serialise_to(self, folder_path: str) -> None:
+        os.makedirs(folder_path, exist_ok=True)
+        with open(os.path.join(folder_path, self.WORDS_FILE), 'w') as f:
+            json.dump(self._words, f)
+        np.save(os.path.join(folder_path, self.COUNTS_FILE), self._counts)
+        np.save(os.path.join(folder_path, self.VEC_ROWS_FILE),
+                self._vec_rows)
+        np.save(os.path.join(folder_path, self.VECTORS_FILE),
+                np.ascontiguousarray(self._vectors, dtype=np.float32))
+
+    @classmethod
+    def deserialise_from(cls, folder_path: str, mmap: bool = True,
+                         **init_kwargs) -> 'CompactVocab':
+        """Deserialise the compact vocab from the folder.
+
+        Args:
+            folder_path (str): The folder to load from.
+            mmap (bool): Whether to memory map the vector matrix.
+                Defaults to True.
+
+        Returns:
+            CompactVocab: The loaded Vocab.
+        """
+        with open(os.path.join(folder_path, cls.WORDS_FILE)) as f:
+            words = json.load(f)
+        counts = np.load(os.path.join(folder_path, cls.COUNTS_FILE))
+        vec_rows = np.load(os.path.join(folder_path, cls.VEC_ROWS_FILE))
+        vectors = np.load(os.path.join(folder_path, cls.VECTORS_FILE),
+                          mmap_mode='r' if mmap else None)
+        return cls(words, counts, vec_rows, vectors)
@@ -0,0 +1,125 @@
+import os
+import tempfile
+import unittest
+
+from medcat.benchmarks import synthetic, runner, compare
+from medcat.benchmarks.__main__ import main
+from medcat.cat import CAT
+from medcat.config import Config
+
+
+def get_synthetic_cat() -> CAT:
+    config = Config()
+    config.general.nlp.provider = 'regex'
+    config.components.linking.train = False
+    cdb = synthetic.make_synthetic_cdb(config, num_concepts=100,
+                                       vector_size=10)
+    vocab = synthetic.make_synthetic_vocab(cdb, vector_size=10,
+                                           num_extra_words=10)
+    return CAT(cdb, vocab)
+
+
+class BenchmarkRunnerTests(unittest.TestCase):
+    NUM_DOCS = 5
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cat = get_synthetic_cat()
+        cls.texts = synthetic.make_synthetic_corpus(
+            cls.cat.cdb, num_docs=cls.NUM_DOCS, words_per_doc=60)
+        cls.results = runner.run_benchmarks(cls.cat, cls.texts, warmup=1)
+
+    def test_finds_entities(self):
+        self.assertTrue(self.cat.get_entities(self.texts[0])['entities'])
+
+    def test_has_get_entities_stats(self):
+        stats = self.results.get_entities
+        self.assertEqual(stats.num_docs, self.NUM_DOCS)
+        self.assertEqual(stats.num_chars, sum(map(len, self.texts)))
+        self.assertGreater(stats.docs_per_sec, 0)
+        self.assertLessEqual(stats.latency_p50_ms, stats.latency_p99_ms)
+
+    def test_has_multi_texts_stats(self):
+        self.assertIn("n_process=1", self.results.multi_texts)
+
+    def test_has_component_breakdown(self):
+        comps = self.results.components
+        self.assertEqual(list(comps)[0], runner.TOKENIZER_NAME)
+        self.assertEqual(len(comps),
+                         len(list(self.cat.pipe.iter_all_components())) + 1)
+        self.assertAlmostEqual(sum(comp.share for comp in comps.values()), 1)
+
+    def test_has_peak_rss(self):
+        self.assertGreater(self.results.peak_rss_mb, 0)
+
+    def test_can_save_and_load(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "results.json")
+            compare.save_results(self.results, path)
+            loaded = compare.load_results(path)
+        self.assertEqual(loaded, self.results)
+
+
+class FindRegressionsTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        stats = runner.ThroughputStats.from_timings(
+            ["a" * 10] * 10, 1.0, [0.1] * 10)
+        cls.baseline = runner.BenchmarkResults(
+            settings={}, environment={}, get_entities=stats,
+            multi_texts={"n_process=1": stats},
+            components={"ner": runner.ComponentTiming(
+                total_seconds=1, mean_ms_per_doc=100, share=1)},
+            peak_rss_mb=100, peak_children_rss_mb=None)
+
+    def get_changed(self, time_factor: float, rss_factor: float = 1.0
+                    ) -> runner.BenchmarkResults:
+        stats = runner.ThroughputStats.from_timings(
+            ["a" * 10] * 10, time_factor, [0.1 * time_factor] * 10)
+        return self.baseline.model_copy(update={
+            "get_entities": stats, "multi_texts": {"n_process=1": stats},
+            "peak_rss_mb": self.baseline.peak_rss_mb * rss_factor})
+
+    def test_no_regression_for_same(self):
+        self.assertFalse(compare.find_regressions(
+            self.baseline, self.baseline))
+
+    def test_no_regression_within_threshold(self):
+        self.assertFalse(compare.find_regressions(
+            self.get_changed(1.05, 1.05), self.baseline, threshold=0.1))
+
+    def test_no_regression_for_improvement(self):
+        self.assertFalse(compare.find_regressions(
+            self.get_changed(0.5, 0.5), self.baseline, threshold=0.1))
+
+    def test_finds_throughput_regression(self):
+        regressions = compare.find_regressions(
+            self.get_changed(1.5), self.baseline, threshold=0.1)
+        metrics = {reg.metric for reg in regressions}
+        self.assertIn("get_entities.docs_per_sec", metrics)
+        self.assertIn("get_entities.latency_p99_ms", metrics)
+        self.assertIn("multi_texts[n_process=1].chars_per_sec", metrics)
+        self.assertNotIn("peak_rss_mb", metrics)
+
+    def test_finds_memory_regression(self):
+        regressions = compare.find_regressions(
+            self.get_changed(1.0, 2.0), self.baseline, threshold=0.1)
+        self.assertEqual([reg.metric for reg in regressions], ["peak_rss_mb"])
+
+
+class BenchmarkCLITests(unittest.TestCase):
+    ARGS = ["--num-concepts", "100", "--vector-size", "10",
+            "--num-docs", "3", "--words-per-doc", "40", "--warmup", "1"]
+
+    def test_runs_and_compares(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "results.json")
+            self.assertEqual(main(self.ARGS + ["--output", path]), 0)
+            self.assertTrue(os.path.exists(path))
+            # NOTE: a huge threshold since the timings are noisy
+            self.assertEqual(main(self.ARGS + [
+                "--baseline", path, "--threshold", "100"]), 0)
+            # NOTE: any slowdown is a regression
+            self.assertEqual(main(self.ARGS + [
+                "--baseline", path, "--threshold", "-1"]), 1)
@@ -0,0 +1,63 @@
+from medcat.benchmarks import synthetic
+from medcat.config import Config
+
+import unittest
+
+
+class SyntheticDataTests(unittest.TestCase):
+    NUM_CONCEPTS = 50
+    NAMES_PER_CONCEPT = 2
+    VECTOR_SIZE = 10
+    NUM_DOCS = 4
+
+    @classmethod
+    def setUpClass(cls):
+        cls.config = Config()
+        cls.cdb = synthetic.make_synthetic_cdb(
+            cls.config, num_concepts=cls.NUM_CONCEPTS,
+            names_per_concept=cls.NAMES_PER_CONCEPT,
+            vector_size=cls.VECTOR_SIZE)
+        cls.vocab = synthetic.make_synthetic_vocab(
+            cls.cdb, vector_size=cls.VECTOR_SIZE, num_extra_words=10)
+        cls.corpus = synthetic.make_synthetic_corpus(
+            cls.cdb, num_docs=cls.NUM_DOCS, words_per_doc=50)
+
+    def test_cdb_has_concepts(self):
+        self.assertEqual(len(self.cdb.cui2info), self.NUM_CONCEPTS)
+
+    def test_cdb_has_names(self):
+        self.assertGreater(len(self.cdb.name2info), self.NUM_CONCEPTS)
+        self.assertLessEqual(len(self.cdb.name2info),
+                             self.NUM_CONCEPTS * self.NAMES_PER_CONCEPT)
+
+    def test_cdb_has_subnames(self):
+        for name in self.cdb.name2info:
+            with self.subTest(name):
+                self.assertTrue(self.cdb.has_subname(name))
+
+    def test_cdb_is_trained(self):
+        for cui, info in self.cdb.cui2info.items():
+            with self.subTest(cui):
+                self.assertGreater(info['count_train'], 0)
+                for vec in info['context_vectors'].values():
+                    self.assertEqual(vec.shape, (self.VECTOR_SIZE, ))
+
+    def test_vocab_has_name_tokens(self):
+        for token in self.cdb.token_counts:
+            with self.subTest(token):
+                self.assertIn(token, self.vocab)
+                self.assertEqual(self.vocab.vec(token).shape,
+                                 (self.VECTOR_SIZE, ))
+
+    def test_corpus_has_docs(self):
+        self.assertEqual(len(self.corpus), self.NUM_DOCS)
+
+    def test_is_deterministic(self):
+        cdb = synthetic.make_synthetic_cdb(
+            Config(), num_concepts=self.NUM_CONCEPTS,
+            names_per_concept=self.NAMES_PER_CONCEPT,
+            vector_size=self.VECTOR_SIZE)
+        self.assertEqual(cdb.name2info.keys(), self.cdb.name2info.keys())
+        corpus = synthetic.make_synthetic_corpus(
+            cdb, num_docs=self.NUM_DOCS, words_per_doc=50)
+        self.assertEqual(corpus, self.corpus)
@@ -1,12 +1,14 @@
 from typing import cast
 import os
 
-from medcat.storage.serialisers import deserialise
+from medcat.storage.serialisers import (
+    deserialise, serialise, AvailableSerialisers)
 from medcat.cdb import cdb
 from medcat.utils.cdb_state import captured_state_cdb
 from medcat.preprocessors.cleaners import NameDescriptor
 
 from unittest import TestCase
+import unittest.mock
 import tempfile
 
 from .. import UNPACKED_EXAMPLE_MODEL_PACK_PATH, RESOURCES_PATH
@@ -82,6 +84,47 @@ class CDBTests(TestCase):
                                   f"({list(names.keys())[0]})"):
                     self.assertIn(sname, self.cdb._subnames)
 
+    def test_adding_names_changes_token_counts_version(self):
+        names = {"new~cui": NameDescriptor(tokens=['new', 'cui'],
+                                           snames={'new', 'new~cdb'},
+                                           raw_name='new cdb',
+                                           is_upper=False)}
+        before = self.cdb.token_counts_version
+        with captured_state_cdb(self.cdb):
+            self.cdb.add_names("C-NEW", names)
+            self.assertGreater(self.cdb.token_counts_version, before)
+
+    def test_names_version_changes(self):
+        names = {"new~cui": NameDescriptor(tokens=['new', 'cui'],
+                                           snames={'new', 'new~cdb'},
+                                           raw_name='new cdb',
+                                           is_upper=False)}
+        before = self.cdb.names_version
+        removed_before = self.cdb.names_removed_version
+        with captured_state_cdb(self.cdb):
+            self.cdb.add_names("C-NEW", names)
+            added = self.cdb.names_version
+            self.assertGreater(added, before)
+            self.assertEqual(self.cdb.names_removed_version, removed_before)
+            self.cdb.remove_cui("C-NEW")
+            self.assertGreater(self.cdb.names_version, added)
+            self.assertGreater(self.cdb.names_removed_version,
+                               removed_before)
+
+    def test_names_version_persisted(self):
+        names = {"new~cui": NameDescriptor(tokens=['new', 'cui'],
+                                           snames={'new', 'new~cdb'},
+                                           raw_name='new cdb',
+                                           is_upper=False)}
+        with captured_state_cdb(self.cdb):
+            self.cdb.add_names("C-NEW", names)
+            with tempfile.TemporaryDirectory() as temp_dir:
+                self.cdb.save(temp_dir)
+                loaded = cast(cdb.CDB, deserialise(temp_dir))
+            self.assertEqual(loaded.names_version, self.cdb.names_version)
+            self.assertEqual(loaded.token_counts_version,
+                             self.cdb.token_counts_version)
+
     def test_can_remove_name(self):
         cui = self.CUI_TO_REMOVE
         to_remove = self.NAMES_TO_REMOVE
@@ -143,3 +186,85 @@ class CDBTests(TestCase):
 
     def test_can_remove_cui_non_unique_names(self):
         self.assert_can_remove_cui(self.CUI_TO_REMOVE_NON_UNIQUE_NAMES, False)
+
+
+class IncrementalSubnamesTests(TestCase):
+    CDB_PATH = CDBTests.CDB_PATH
+
+    def setUp(self):
+        self.cdb = cast(cdb.CDB, deserialise(self.CDB_PATH))
+        self.cdb._reset_subnames()
+
+    def get_all_subnames(self) -> set[str]:
+        return set(sname for ci in self.cdb.cui2info.values()
+                   for sname in ci['subnames'])
+
+    def assert_subnames_up_to_date(self):
+        with unittest.mock.patch.object(
+                self.cdb, '_reset_subnames') as reset:
+            self.assertEqual(self.cdb._subnames, self.get_all_subnames())
+            for sname in self.get_all_subnames():
+                self.assertTrue(self.cdb.has_subname(sname))
+        reset.assert_not_called()
+
+    def add_name(self, cui: str, name: str, snames: set[str]):
+        self.cdb.add_names(cui, {name: NameDescriptor(
+            tokens=name.split('~'), snames=snames, raw_name=name,
+            is_upper=False)})
+
+    def test_adds_subnames(self):
+        self.add_name('C-NEW', 'new~concept~name',
+                      {'new', 'new~concept', 'new~concept~name'})
+        self.assertIn('new~concept', self.cdb._subnames)
+        self.assert_subnames_up_to_date()
+
+    def test_removing_cui_removes_unique_subnames(self):
+        self.add_name('C-NEW', 'new~concept', {'new', 'new~concept'})
+        self.cdb.remove_cui('C-NEW')
+        self.assertNotIn('new~concept', self.cdb._subnames)
+        self.assert_subnames_up_to_date()
+
+    def test_removing_cui_keeps_shared_subnames(self):
+        self.add_name('C-NEW1', 'new~concept', {'new', 'new~concept'})
+        self.add_name('C-NEW2', 'new~other', {'new', 'new~other'})
+        self.cdb.remove_cui('C-NEW1')
+        self.assertIn('new', self.cdb._subnames)
+        self.assertNotIn('new~concept', self.cdb._subnames)
+        self.assert_subnames_up_to_date()
+
+    def test_removing_cuis_in_bulk(self):
+        self.cdb.remove_cuis_bulk(list(self.cdb.cui2info)[:2])
+        self.assert_subnames_up_to_date()
+
+    def test_filtering_updates_subnames(self):
+        self.cdb.filter_by_cui(CDBTests.TO_FILTER)
+        self.assert_subnames_up_to_date()
+
+    def test_adding_after_removal(self):
+        self.cdb.remove_cui(list(self.cdb.cui2info)[0])
+        self.add_name('C-NEW', 'new~concept', {'new', 'new~concept'})
+        self.cdb.remove_cui('C-NEW')
+        self.assert_subnames_up_to_date()
+
+    def test_removing_names_keeps_subnames(self):
+        cui = CDBTests.CUI_TO_REMOVE
+        self.cdb._remove_names(cui, CDBTests.NAMES_TO_REMOVE)
+        self.assert_subnames_up_to_date()
+
+    def test_builds_subnames_cleared_before_saving(self):
+        # NOTE: e.g saved after a `reset_training` that used to
+        #       clear the subnames
+        self.cdb._subnames.clear()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            serialise(AvailableSerialisers.dill, self.cdb, temp_dir)
+            self.cdb = cast(cdb.CDB, deserialise(temp_dir))
+        self.assertFalse(self.cdb._subnames)
+        self.add_name('C-NEW', 'new~concept', {'new', 'new~concept'})
+        self.assertTrue(self.cdb.has_subname('new~concept'))
+        self.assert_subnames_up_to_date()
+
+    def test_restored_state_recounts_references(self):
+        with captured_state_cdb(self.cdb):
+            self.cdb.remove_cui(list(self.cdb.cui2info)[0])
+        self.cdb.remove_cui(list(self.cdb.cui2info)[1])
+        self.assert_subnames_up_to_date()
@@ -0,0 +1,136 @@
+from typing import cast
+import os
+
+from medcat.storage.serialisers import deserialise
+from medcat.cdb import cdb
+from medcat.cdb.compact import CompactCDB, CompactCDBIsReadOnlyError
+from medcat.cat import CAT
+from medcat.config import Config
+from medcat.model_creation.cdb_maker import CDBMaker
+from medcat.preprocessors.cleaners import NameDescriptor
+from medcat.vocab import Vocab
+
+import numpy as np
+
+from unittest import TestCase
+import tempfile
+
+from .. import UNPACKED_EXAMPLE_MODEL_PACK_PATH, RESOURCES_PATH
+
+
+class CompactCDBTests(TestCase):
+    CDB_PATH = os.path.join(UNPACKED_EXAMPLE_MODEL_PACK_PATH, "cdb")
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cdb = cast(cdb.CDB, deserialise(cls.CDB_PATH))
+        cls.compact = CompactCDB.from_cdb(cls.cdb)
+
+    def assert_same_info(self, info1: dict, info2: dict):
+        self.assertEqual(set(info1), set(info2))
+        for key, val1 in info1.items():
+            val2 = info2[key]
+            with self.subTest(key):
+                if key == 'context_vectors' and val1:
+                    self.assertEqual(set(val1), set(val2))
+                    for ct, vec in val1.items():
+                        self.assertTrue(np.allclose(vec, val2[ct]))
+                elif key == 'per_cui_status':
+                    self.assertEqual(dict(val1), dict(val2))
+                else:
+                    self.assertEqual(val1, val2)
+
+    def test_has_same_concepts(self):
+        self.assertEqual(list(self.cdb.cui2info), list(self.compact.cui2info))
+        for cui, ci in self.cdb.cui2info.items():
+            with self.subTest(cui):
+                self.assertIn(cui, self.compact.cui2info)
+                self.assert_same_info(ci, self.compact.cui2info[cui])
+
+    def test_has_same_names(self):
+        self.assertEqual(list(self.cdb.name2info),
+                         list(self.compact.name2info))
+        for name, ni in self.cdb.name2info.items():
+            with self.subTest(name):
+                self.assertIn(name, self.compact.name2info)
+                self.assert_same_info(ni, self.compact.name2info[name])
+
+    def test_has_same_subnames(self):
+        for ci in self.cdb.cui2info.values():
+            for sname in ci['subnames']:
+                with self.subTest(sname):
+                    self.assertTrue(self.compact.has_subname(sname))
+        self.assertFalse(self.compact.has_subname("#NOT A SUBNAME#"))
+
+    def test_does_not_have_unknown(self):
+        self.assertNotIn("#NOT A CUI#", self.compact.cui2info)
+        self.assertNotIn("#NOT A NAME#", self.compact.name2info)
+        self.assertIsNone(self.compact.cui2info.get("#NOT A CUI#"))
+
+    def test_has_same_hash(self):
+        self.assertEqual(self.compact.get_hash(), self.cdb.get_hash())
+
+    def test_context_vectors_are_persistent(self):
+        for cui, ci in self.compact.cui2info.items():
+            with self.subTest(cui):
+                self.assertIs(ci['context_vectors'],
+                              self.compact.cui2info[cui]['context_vectors'])
+
+    def test_is_read_only(self):
+        names = {"new~cui": NameDescriptor(tokens=['new', 'cui'],
+                                           snames={'new', 'new~cdb'},
+                                           raw_name='new cdb',
+                                           is_upper=False)}
+        with self.assertRaises(CompactCDBIsReadOnlyError):
+            self.compact.add_names("C-NEW", names)
+        with self.assertRaises(CompactCDBIsReadOnlyError):
+            self.compact.filter_by_cui(list(self.compact.cui2info)[:1])
+        with self.assertRaises(TypeError):
+            self.compact.cui2info[list(self.compact.cui2info)[0]][
+                'count_train'] = 1  # type: ignore
+
+    def test_can_convert_back(self):
+        back = self.compact.to_cdb()
+        self.assertNotIsInstance(back, CompactCDB)
+        self.assertEqual(list(back.cui2info), list(self.cdb.cui2info))
+        for cui, ci in self.cdb.cui2info.items():
+            with self.subTest(cui):
+                self.assert_same_info(ci, back.cui2info[cui])
+        self.assertEqual(back.name2info, self.cdb.name2info)
+
+    def test_can_save_and_load(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self.compact.save(temp_dir, overwrite=True)
+            loaded = cdb.CDB.load(temp_dir)
+        self.assertIsInstance(loaded, CompactCDB)
+        for cui, ci in self.compact.cui2info.items():
+            with self.subTest(cui):
+                self.assert_same_info(ci, loaded.cui2info[cui])
+        self.assertEqual(dict(loaded.name2info), dict(self.compact.name2info))
+
+
+class CompactCDBCATTests(TestCase):
+    VOCAB_DATA_PATH = os.path.join(RESOURCES_PATH, 'vocab_data.txt')
+    CDB_PREPROCESSED_PATH = os.path.join(RESOURCES_PATH,
+                                         'preprocessed4cdb.txt')
+    TEXTS = [
+        "The fittest most fit of chronic kidney failure",
+        "The dog is sitting outside the house.",
+        "Chronic kidney failure and kidney failure",
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        vocab = Vocab()
+        vocab.add_words(cls.VOCAB_DATA_PATH)
+        config = Config()
+        config.general.nlp.provider = 'regex'
+        cdb = CDBMaker(config).prepare_csvs([cls.CDB_PREPROCESSED_PATH])
+        cls.cat = CAT(cdb, vocab)
+        cls.compact_cat = CAT(CompactCDB.from_cdb(cdb), vocab)
+
+    def test_gets_same_entities(self):
+        for text in self.TEXTS:
+            with self.subTest(text):
+                self.assertEqual(self.compact_cat.get_entities(text),
+                                 self.cat.get_entities(text))
@@ -7,14 +7,20 @@ from medcat.storage.serialisers import serialise, AvailableSerialisers
 from medcat.config.config_meta_cat import ConfigMetaCAT
 from medcat.config.config import Config
 from medcat.utils.defaults import COMPONENTS_FOLDER
+from medcat.tokenizing.tokens import MutableDocument
 
 import os
+import math
 import unittest.mock
 import unittest
 import tempfile
 
 from medcat.cat import CAT
 from medcat.tokenizing.spacy_impl.tokenizers import SpacyTokenizer
+from medcat.tokenizing.regex_impl.tokenizer import RegexTokenizer
+from medcat.components.addons.meta_cat.mctokenizers.bpe_tokenizer import (
+    TokenizerWrapperBPE)
+from tokenizers import ByteLevelBPETokenizer
 
 from .... import EXAMPLE_MODEL_PACK_ZIP
 
@@ -146,3 +152,154 @@ class MetaCATWithCATTests(MetaCATBaseTests):
                 self.assertEqual(
                     meta_cat.get_meta_annotations(ent),
                     ents[num]["meta_anns"])
+
+
+def get_bpe_tokenizer(text: str, vocab_size: int) -> TokenizerWrapperBPE:
+    hf_tokenizer = ByteLevelBPETokenizer()
+    hf_tokenizer.train_from_iterator(
+        [text] * 10, vocab_size=vocab_size, show_progress=False)
+    return TokenizerWrapperBPE(hf_tokenizer)
+
+
+class SharedTokensTests(unittest.TestCase):
+    TEXT = "Patient has chronic kidney failure and a fever, no fever today."
+    # (start, end) token indices of the entities
+    ENTS = [(2, 5), (8, 9), (11, 12)]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tokenizer = RegexTokenizer()
+        cls.mc_tokenizer = get_bpe_tokenizer(cls.TEXT, 300)
+        meta_cat.MetaCATAddon._init_data_paths(None, cls.tokenizer)
+
+    def setUp(self):
+        self.doc = self.tokenizer(self.TEXT)
+        for ent_id, (start, end) in enumerate(self.ENTS):
+            ent = self.tokenizer.create_entity(self.doc, start, end, 'L')
+            ent.id = ent_id
+            self.doc.ner_ents.append(ent)
+
+    def create_meta_cat(self, tokenizer: TokenizerWrapperBPE = None,
+                        **general) -> meta_cat.MetaCAT:
+        cnf = ConfigMetaCAT()
+        for key, val in general.items():
+            setattr(cnf.general, key, val)
+        return meta_cat.MetaCAT(tokenizer or self.mc_tokenizer, config=cnf)
+
+    def get_samples(self, *meta_cats: meta_cat.MetaCAT
+                    ) -> tuple[list[tuple[dict, list]], int]:
+        with unittest.mock.patch.object(
+                TokenizerWrapperBPE, '__call__', autospec=True,
+                side_effect=TokenizerWrapperBPE.__call__) as call:
+            samples = [mc._get_samples(self.doc) for mc in meta_cats]
+        # NOTE: excluding replace_center tokenisation
+        num_docs_tokenised = sum(
+            len(cur_call.args[1]) == len(self.TEXT)
+            for cur_call in call.call_args_list)
+        return samples, num_docs_tokenised
+
+    def test_samples_same_as_without_sharing(self):
+        mc = self.create_meta_cat()
+        processed = self.mc_tokenizer(self.TEXT.lower())
+        exp = mc.prepare_document(
+            self.doc, processed['input_ids'], processed['offset_mapping'],
+            lowercase=True)
+        (got, ), _ = self.get_samples(mc)
+        self.assertEqual(got, exp)
+        self.assertEqual(len(got[1]), len(self.ENTS))
+
+    def test_same_tokenizer_tokenises_once(self):
+        mcs = [self.create_meta_cat() for _ in range(3)]
+        samples, num_tokenised = self.get_samples(*mcs)
+        self.assertEqual(num_tokenised, 1)
+        self.assertTrue(all(cur is samples[0] for cur in samples))
+
+    def test_equal_tokenizer_tokenises_once(self):
+        other = get_bpe_tokenizer(self.TEXT, 300)
+        self.assertIsNot(other.hf_tokenizers, self.mc_tokenizer.hf_tokenizers)
+        _, num_tokenised = self.get_samples(
+            self.create_meta_cat(), self.create_meta_cat(other))
+        self.assertEqual(num_tokenised, 1)
+
+    def test_different_tokenizer_tokenises_again(self):
+        other = get_bpe_tokenizer("Some other text.", 280)
+        _, num_tokenised = self.get_samples(
+            self.create_meta_cat(), self.create_meta_cat(other))
+        self.assertEqual(num_tokenised, 2)
+
+    def test_different_lowercase_tokenises_again(self):
+        _, num_tokenised = self.get_samples(
+            self.create_meta_cat(), self.create_meta_cat(lowercase=False))
+        self.assertEqual(num_tokenised, 2)
+
+    def test_different_context_reuses_tokens_only(self):
+        (first, second), num_tokenised = self.get_samples(
+            self.create_meta_cat(cntx_left=1, cntx_right=1),
+            self.create_meta_cat(cntx_left=3, cntx_right=3))
+        self.assertEqual(num_tokenised, 1)
+        self.assertNotEqual(first[1], second[1])
+
+    def test_changed_entities_recomputes_samples(self):
+        mc = self.create_meta_cat()
+        (first, ), _ = self.get_samples(mc)
+        self.doc.ner_ents.pop()
+        (second, ), num_tokenised = self.get_samples(mc)
+        self.assertEqual(num_tokenised, 0)
+        self.assertEqual(len(second[1]), len(self.ENTS) - 1)
+
+
+class BatchedInferenceTests(unittest.TestCase):
+    TEXTS = [
+        "Patient has chronic kidney failure and a fever, no fever today.",
+        "No fever.",
+        "Kidney failure, chronic, with a history of fever and kidney "
+        "failure in the family and a fever again today.",
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tokenizer = RegexTokenizer()
+        cls.mc_tokenizer = get_bpe_tokenizer(" ".join(cls.TEXTS), 300)
+        meta_cat.MetaCATAddon._init_data_paths(None, cls.tokenizer)
+        cnf = ConfigMetaCAT()
+        cnf.general.category_name = 'Status'
+        cnf.general.category_value2id = {'Affirmed': 0, 'Other': 1}
+        cnf.general.batch_size_eval = 2
+        cls.mc = meta_cat.MetaCAT(cls.mc_tokenizer, config=cnf)
+
+    def get_docs(self) -> list[MutableDocument]:
+        docs = []
+        for text in self.TEXTS:
+            doc = self.tokenizer(text)
+            for ent_id, token in enumerate(doc):
+                ent = self.tokenizer.create_entity(
+                    doc, token.base.index, token.base.index + 1, 'L')
+                ent.id = ent_id
+                doc.ner_ents.append(ent)
+            docs.append(doc)
+        return docs
+
+    def get_meta_anns(self, docs: list[MutableDocument]) -> list[list[dict]]:
+        return [[meta_cat.get_meta_annotations(ent)['Status']
+                 for ent in doc.ner_ents] for doc in docs]
+
+    def test_batch_same_as_one_by_one(self):
+        single = [self.mc(doc) for doc in self.get_docs()]
+        batched = self.mc.__call_batch__(self.get_docs())
+        got, exp = self.get_meta_anns(batched), self.get_meta_anns(single)
+        self.assertEqual(len(got), len(exp))
+        for got_doc, exp_doc in zip(got, exp):
+            self.assertEqual(len(got_doc), len(exp_doc))
+            for got_ann, exp_ann in zip(got_doc, exp_doc):
+                self.assertEqual(got_ann['value'], exp_ann['value'])
+                self.assertAlmostEqual(got_ann['confidence'],
+                                       exp_ann['confidence'], places=5)
+
+    def test_batch_runs_model_once_per_batch(self):
+        docs = self.get_docs()
+        num_samples = sum(len(doc.ner_ents) for doc in docs)
+        with unittest.mock.patch.object(
+                self.mc.model, 'forward',
+                wraps=self.mc.model.forward) as forward:
+            self.mc.__call_batch__(docs)
+        self.assertEqual(forward.call_count, math.ceil(num_samples / 2))
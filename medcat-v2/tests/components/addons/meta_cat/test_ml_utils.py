@@ -0,0 +1,74 @@
+from medcat.components.addons.meta_cat import ml_utils
+from medcat.config.config_meta_cat import ConfigMetaCAT
+
+import torch
+from torch import nn
+
+import unittest
+
+
+class FakeModel(nn.Module):
+    """Scores each sample by its (unpadded) length and its center token."""
+    NUM_CLASSES = 20
+
+    def __init__(self):
+        super().__init__()
+        self.widths: list[int] = []
+
+    def forward(self, input_ids, center_positions, attention_mask,
+                ignore_cpos):
+        self.widths.append(input_ids.shape[1])
+        logits = torch.zeros((len(input_ids), self.NUM_CLASSES))
+        lengths = attention_mask.sum(1)
+        for row, (length, cpos) in enumerate(zip(lengths, center_positions)):
+            logits[row, (int(length) + int(input_ids[row, cpos]))
+                   % self.NUM_CLASSES] = 1
+        return logits
+
+
+def get_expected(data: list[tuple[list[int], int]]) -> list[int]:
+    return [(len(ids) + ids[cpos]) % FakeModel.NUM_CLASSES
+            for ids, cpos in data]
+
+
+class PredictTests(unittest.TestCase):
+    PAD_ID = 0
+    DATA = [
+        ([3] * 10, 2),
+        ([4], 0),
+        ([5, 6], 1),
+        ([7] * 9 + [8], 9),
+        ([1], 0),
+        ([2, 9, 9], 0),
+        ([6] * 8, 4),
+    ]
+
+    def setUp(self):
+        self.cnf = ConfigMetaCAT()
+        self.cnf.model.padding_idx = self.PAD_ID
+        self.cnf.general.batch_size_eval = 3
+        self.model = FakeModel()
+
+    def test_predictions_in_original_order(self):
+        predictions, confidences = ml_utils.predict(
+            self.model, self.DATA, self.cnf)
+        self.assertEqual(list(predictions), get_expected(self.DATA))
+        self.assertEqual(len(confidences), len(self.DATA))
+
+    def test_batches_padded_to_longest_in_batch(self):
+        ml_utils.predict(self.model, self.DATA, self.cnf)
+        # lengths: 1, 1, 2 | 3, 8, 10 | 10
+        self.assertEqual(self.model.widths, [2, 10, 10])
+
+    def test_batch_size_does_not_change_predictions(self):
+        self.cnf.general.batch_size_eval = 1
+        predictions, _ = ml_utils.predict(self.model, self.DATA, self.cnf)
+        self.assertEqual(list(predictions), get_expected(self.DATA))
+        self.assertEqual(self.model.widths, sorted(
+            len(ids) for ids, _ in self.DATA))
+
+    def test_empty_data(self):
+        predictions, confidences = ml_utils.predict(self.model, [], self.cnf)
+        self.assertEqual(list(predictions), [])
+        self.assertEqual(list(confidences), [])
+        self.assertEqual(self.model.widths, [])
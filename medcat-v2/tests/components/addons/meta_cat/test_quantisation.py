@@ -0,0 +1,173 @@
+import os
+import json
+import tempfile
+import unittest
+import unittest.mock
+
+import torch
+from torch import nn
+from tokenizers import ByteLevelBPETokenizer
+
+from medcat.components.addons.meta_cat import quantisation
+from medcat.components.addons.meta_cat.meta_cat import (
+    MetaCAT, MetaCATAddon, MisconfiguredMetaCATException)
+from medcat.components.addons.meta_cat.mctokenizers.bpe_tokenizer import (
+    TokenizerWrapperBPE)
+from medcat.components.addons.meta_cat.models import LSTM
+from medcat.config.config_meta_cat import ConfigMetaCAT
+from medcat.tokenizing.regex_impl.tokenizer import RegexTokenizer
+
+from .test_meta_cat2 import RESOURCES_PATH
+
+
+EXPORT_PATH = os.path.join(
+    RESOURCES_PATH, "mct_export_for_meta_cat_full_text.json")
+
+
+def get_lstm(vocab_size: int = 500) -> tuple[LSTM, ConfigMetaCAT]:
+    cnf = ConfigMetaCAT()
+    cnf.general.vocab_size = vocab_size
+    cnf.model.padding_idx = 0
+    cnf.model.input_size = 32
+    cnf.model.hidden_size = 32
+    return LSTM(None, cnf).eval(), cnf
+
+
+def get_random_data(num: int, vocab_size: int = 500, seed: int = 0
+                    ) -> list[tuple[list[int], list[int]]]:
+    generator = torch.Generator().manual_seed(seed)
+    data = []
+    for _ in range(num):
+        length = int(torch.randint(3, 30, (1, ), generator=generator))
+        ids = torch.randint(1, vocab_size, (length, ), generator=generator)
+        data.append((ids.tolist(), [length // 2]))
+    return data
+
+
+class QuantiseModelTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        torch.manual_seed(0)
+        cls.model, cls.cnf = get_lstm()
+        cls.quantised = quantisation.quantise_model(cls.model)
+        cls.data = get_random_data(50)
+
+    def test_quantises_linear_and_lstm(self):
+        self.assertIsInstance(
+            self.quantised.rnn, torch.ao.nn.quantized.dynamic.LSTM)
+        self.assertIsInstance(
+            self.quantised.fc1, torch.ao.nn.quantized.dynamic.Linear)
+
+    def test_keeps_original(self):
+        self.assertIs(type(self.model.rnn), nn.LSTM)
+        self.assertIs(type(self.model.fc1), nn.Linear)
+
+    def test_parity(self):
+        results = quantisation.check_parity(
+            self.model, self.quantised, self.data, self.cnf)
+        self.assertEqual(results['num_samples'], len(self.data))
+        self.assertGreaterEqual(results['agreement'], 0.9)
+        self.assertLess(results['max_confidence_delta'], 0.05)
+
+    def test_parity_no_data(self):
+        results = quantisation.check_parity(
+            self.model, self.quantised, [], self.cnf)
+        self.assertEqual(results['num_samples'], 0)
+
+    def test_can_save_and_load(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            quantisation.save_quantised_model(
+                self.quantised, temp_dir, 1.0, None)
+            model, parity = quantisation.load_quantised_model(
+                self.model, temp_dir, 1.0)
+        self.assertIsNone(parity)
+        x = torch.tensor([ids[:3] for ids, _ in self.data])
+        kwargs = {'center_positions': [[1]] * len(x),
+                  'attention_mask': torch.ones_like(x)}
+        with torch.no_grad():
+            self.assertTrue(torch.equal(
+                model(x, **kwargs), self.quantised(x, **kwargs)))
+
+    def test_does_not_load_outdated(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            quantisation.save_quantised_model(
+                self.quantised, temp_dir, 1.0, None)
+            with self.assertLogs(quantisation.logger, 'WARNING'):
+                loaded = quantisation.load_quantised_model(
+                    self.model, temp_dir, 2.0)
+        self.assertIsNone(loaded)
+
+    def test_does_not_load_missing(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self.assertIsNone(quantisation.load_quantised_model(
+                self.model, temp_dir, 1.0))
+
+
+class MetaCATQuantisedBackendTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open(EXPORT_PATH) as f:
+            texts = [doc['text'] for proj in json.load(f)['projects']
+                     for doc in proj['documents']]
+        hf_tokenizer = ByteLevelBPETokenizer()
+        hf_tokenizer.train_from_iterator(
+            texts, vocab_size=500, show_progress=False)
+        cls.mc_tokenizer = TokenizerWrapperBPE(hf_tokenizer)
+        cls.tokenizer = RegexTokenizer()
+
+    def setUp(self):
+        cnf = ConfigMetaCAT()
+        cnf.general.category_name = 'Status'
+        cnf.general.category_value2id = {'Confirmed': 0, 'Other': 1}
+        cnf.model.input_size = 32
+        cnf.model.hidden_size = 32
+        cnf.train.last_train_on = 1.0
+        self.mc = MetaCAT(self.mc_tokenizer, config=cnf)
+
+    def test_eager_by_default(self):
+        self.assertIs(self.mc._get_inference_model(), self.mc.model)
+
+    def test_uses_quantised(self):
+        self.mc.config.general.inference_backend = 'quantised'
+        model = self.mc._get_inference_model()
+        self.assertIsInstance(model.rnn, torch.ao.nn.quantized.dynamic.LSTM)
+        self.assertIs(self.mc._get_inference_model(), model)
+
+    def test_fails_on_unknown_backend(self):
+        self.mc.config.general.inference_backend = 'onnx'
+        with self.assertRaises(quantisation.UnknownInferenceBackend):
+            self.mc._get_inference_model()
+
+    def test_fails_on_gpu(self):
+        self.mc.config.general.inference_backend = 'quantised'
+        self.mc.config.general.device = 'cuda'
+        with self.assertRaises(MisconfiguredMetaCATException):
+            self.mc._get_inference_model()
+
+    def test_quantise_checks_parity(self):
+        parity = self.mc.quantise(EXPORT_PATH, min_agreement=0.9,
+                                  max_confidence_delta=0.1)
+        self.assertGreater(parity['num_samples'], 0)
+        self.assertIs(self.mc._quantised_parity, parity)
+
+    def test_quantise_fails_parity(self):
+        with self.assertRaises(quantisation.ParityCheckFailed):
+            self.mc.quantise(EXPORT_PATH, max_confidence_delta=-1)
+        self.assertIsNone(self.mc._quantised_model)
+
+    def test_saved_and_loaded_with_addon(self):
+        parity = self.mc.quantise(EXPORT_PATH, min_agreement=0.9)
+        addon = MetaCATAddon(self.mc.config, self.tokenizer, self.mc)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            addon.save(temp_dir)
+            self.assertIn(quantisation.QUANTISED_MODEL_FILE,
+                          os.listdir(temp_dir))
+            loaded = MetaCATAddon.load_existing(
+                self.mc.config, self.tokenizer, temp_dir).mc
+            loaded.config.general.inference_backend = 'quantised'
+            with unittest.mock.patch.object(loaded, 'quantise') as quantise:
+                loaded._get_inference_model()
+        quantise.assert_not_called()
+        self.assertEqual(loaded._quantised_parity, parity)
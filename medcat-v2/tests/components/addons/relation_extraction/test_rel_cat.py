@@ -4,6 +4,8 @@ import unittest
 import json
 import logging
 
+import torch
+from torch import nn
 from transformers.models.auto.tokenization_auto import AutoTokenizer
 
 from medcat.cdb import CDB
@@ -14,8 +16,12 @@ from medcat.components.addons.relation_extraction.bert.tokenizer import (
     BaseTokenizerWrapper)
 from medcat.tokenizing.tokenizers import create_tokenizer
 from medcat.components.addons.relation_extraction.rel_dataset import RelData
+from medcat.components.addons.relation_extraction.base_component import (
+    RelExtrBaseComponent)
+from medcat.tokenizing.regex_impl.tokenizer import RegexTokenizer
 
 from .... import UNPACKED_EXAMPLE_MODEL_PACK_PATH, RESOURCES_PATH
+from .test_rel_dataset import get_tokenizer, get_config, get_cdb, get_doc
 
 
 class RelCATTests(unittest.TestCase):
@@ -167,5 +173,92 @@ class RelCATTests(unittest.TestCase):
             shutil.rmtree(cls.tmp_dir)
 
 
+class FakeRelModel(nn.Module):
+    """Predicts the label based on the (unpadded) length of the input."""
+
+    def __init__(self, pad_id: int, nclasses: int = 3):
+        super().__init__()
+        self.pad_id = pad_id
+        self.nclasses = nclasses
+        self.batch_sizes: list[int] = []
+
+    def forward(self, token_ids, token_type_ids, attention_mask,
+                e1_e2_start):
+        self.batch_sizes.append(len(token_ids))
+        lengths = (token_ids != self.pad_id).sum(1)
+        logits = nn.functional.one_hot(
+            lengths % self.nclasses, self.nclasses).float()
+        return None, logits
+
+
+class RelCATPipeTests(unittest.TestCase):
+    TEXTS = [
+        "fever and cough with rash , then pain , headache and nausea",
+        "rash and dizziness with nausea",
+        "headache with vomiting , fever and cough and much later pain",
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tokenizer = get_tokenizer()
+        cls.base_tokenizer = RegexTokenizer()
+        cls.cdb = get_cdb()
+
+    def setUp(self):
+        self.cnf = get_config(self.tokenizer)
+        self.cnf.general.idx2labels = {0: "A", 1: "B", 2: "C"}
+        self.cnf.train.batch_size = 4
+        self.model = FakeRelModel(self.tokenizer.get_pad_id())
+        self.rel_cat = RelCAT(self.base_tokenizer, self.cdb, self.cnf)
+        self.rel_cat.component = RelExtrBaseComponent(
+            tokenizer=self.tokenizer, model=self.model,  # type: ignore
+            config=self.cnf)
+
+    def get_docs(self):
+        return [get_doc(self.base_tokenizer, text) for text in self.TEXTS]
+
+    def get_expected(self, doc) -> list[tuple[int, int, str]]:
+        rel_data = RelData(self.tokenizer, self.cnf, self.cdb)
+        rels = rel_data.create_base_relations_from_doc(
+            doc, doc_id="0")["output_relations"]
+        return [(rel[8], rel[9], self.cnf.general.idx2labels[
+            len(rel[0]) % 3]) for rel in rels]
+
+    def get_got(self, doc) -> list[tuple[int, int, str]]:
+        return [(rel["start_entity_id"], rel["end_entity_id"],
+                 rel["relation"]) for rel in doc.get_addon_data("relations")]
+
+    def test_predictions_match_relations(self):
+        for doc in self.rel_cat.pipe(self.get_docs()):
+            with self.subTest(doc.base.text):
+                expected = self.get_expected(doc)
+                self.assertTrue(expected)
+                self.assertEqual(self.get_got(doc), expected)
+
+    def test_pools_pairs_across_docs(self):
+        docs = self.get_docs()
+        num_pairs = sum(len(self.get_expected(doc)) for doc in docs)
+        list(self.rel_cat.pipe(docs))
+        self.assertEqual(sum(self.model.batch_sizes), num_pairs)
+        self.assertEqual(len(self.model.batch_sizes),
+                         -(-num_pairs // self.cnf.train.batch_size))
+
+    def test_pipe_same_as_one_by_one(self):
+        self.cnf.general.pipe_batch_size_in_pairs = 1
+        one_by_one = [self.get_got(doc)
+                      for doc in self.rel_cat.pipe(self.get_docs())]
+        self.cnf.general.pipe_batch_size_in_pairs = 1000
+        pooled = [self.get_got(doc)
+                  for doc in self.rel_cat.pipe(self.get_docs())]
+        self.assertEqual(pooled, one_by_one)
+
+    def test_relations_not_shared_between_docs(self):
+        docs = list(self.rel_cat.pipe(self.get_docs()))
+        for doc in docs:
+            with self.subTest(doc.base.text):
+                self.assertEqual(len(self.get_got(doc)),
+                                 len(self.get_expected(doc)))
+
+
 if __name__ == '__main__':
     unittest.main()
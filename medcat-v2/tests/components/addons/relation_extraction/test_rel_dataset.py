@@ -0,0 +1,159 @@
+import os
+import tempfile
+import unittest
+
+from transformers import BertTokenizerFast
+
+from medcat.cdb import CDB
+from medcat.cdb.concepts import get_new_cui_info
+from medcat.config.config import Config
+from medcat.config.config_rel_cat import ConfigRelCAT
+from medcat.components.addons.relation_extraction.rel_dataset import RelData
+from medcat.components.addons.relation_extraction.tokenizer import (
+    BaseTokenizerWrapper)
+from medcat.tokenizing.regex_impl.tokenizer import RegexTokenizer
+from medcat.tokenizing.tokens import MutableDocument
+
+
+TEXT = ("fever and cough with rash , then pain , headache and nausea "
+        "followed much later by fever with vomiting and dizziness and rash")
+SPEC_TAGS = ["[s1]", "[e1]", "[s2]", "[e2]"]
+# cui -> type name
+CUI_TYPES = {
+    "fever": "finding", "cough": "finding", "rash": "disorder",
+    "pain": "finding", "headache": "disorder", "nausea": "finding",
+    "vomiting": "disorder", "dizziness": "disorder",
+}
+
+
+def get_tokenizer() -> BaseTokenizerWrapper:
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + sorted(
+        set(TEXT.split()))
+    with tempfile.TemporaryDirectory() as temp_dir:
+        vocab_path = os.path.join(temp_dir, "vocab.txt")
+        with open(vocab_path, 'w') as f:
+            f.write("\n".join(vocab))
+        hf_tokenizer = BertTokenizerFast(vocab_file=vocab_path)
+    hf_tokenizer.add_tokens(SPEC_TAGS, special_tokens=True)
+    return BaseTokenizerWrapper(hf_tokenizer, add_special_tokens=True)
+
+
+def get_config(tokenizer: BaseTokenizerWrapper) -> ConfigRelCAT:
+    cnf = ConfigRelCAT()
+    cnf.general.annotation_schema_tag_ids = (
+        tokenizer.hf_tokenizers.convert_tokens_to_ids(SPEC_TAGS))
+    cnf.model.padding_idx = tokenizer.get_pad_id()
+    cnf.general.window_size = 40
+    return cnf
+
+
+def get_cdb() -> CDB:
+    cdb = CDB(Config())
+    cdb.addl_info["type_id2name"] = {
+        f"T-{name}": name for name in set(CUI_TYPES.values())}
+    for cui, type_name in CUI_TYPES.items():
+        cdb.cui2info[cui] = get_new_cui_info(
+            cui=cui, preferred_name=cui, type_ids={f"T-{type_name}"})
+    return cdb
+
+
+def get_doc(base_tokenizer: RegexTokenizer, text: str = TEXT
+            ) -> MutableDocument:
+    doc = base_tokenizer(text)
+    for token in doc:
+        if token.base.lower not in CUI_TYPES:
+            continue
+        ent = base_tokenizer.create_entity(
+            doc, token.base.index, token.base.index + 1, token.base.lower)
+        ent.cui = token.base.lower
+        ent.id = len(doc.ner_ents)
+        doc.ner_ents.append(ent)
+    return doc
+
+
+class RelDataCandidatePairsTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tokenizer = get_tokenizer()
+        cls.base_tokenizer = RegexTokenizer()
+        cls.cdb = get_cdb()
+        cls.doc = get_doc(cls.base_tokenizer)
+
+    def setUp(self):
+        self.cnf = get_config(self.tokenizer)
+        self.rel_data = RelData(self.tokenizer, self.cnf, self.cdb)
+
+    def get_rels(self) -> list[list]:
+        return self.rel_data.create_base_relations_from_doc(
+            self.doc, doc_id="0")["output_relations"]
+
+    def get_all_pair_rels(self) -> list[list]:
+        # all pairs, without any pruning
+        tokenized = self.tokenizer(self.doc.base.text, truncation=False)
+        ents = self.doc.ner_ents
+        rels = []
+        for ent1_idx in range(0, len(ents) - 2):
+            for ent2_idx in range(ent1_idx + 1, len(ents) - 1):
+                rel = self.rel_data._create_base_relation_for_ents(
+                    self.doc.base.text, "0", ents[ent1_idx], ents[ent2_idx],
+                    tokenized, "", len(tokenized["tokens"]))
+                # NOTE: duplicates (by start positions) are removed
+                if rel and all(rel[1] != prev[1] for prev in rels):
+                    rels.append(rel)
+        return rels
+
+    def test_pruning_keeps_all_valid_relations(self):
+        got = self.get_rels()
+        self.assertTrue(got)
+        self.assertEqual(got, self.get_all_pair_rels())
+
+    def test_prunes_pairs_outside_window(self):
+        ents = self.doc.ner_ents
+        pairs = self.rel_data._get_candidate_pairs(ents, "0", "")
+        self.assertTrue(pairs)
+        for ent1_idx, ent2_idx in pairs:
+            self.assertLessEqual(
+                abs(ents[ent2_idx].base.start_char_index -
+                    ents[ent1_idx].base.start_char_index),
+                self.cnf.general.window_size)
+        self.assertLess(len(pairs), (len(ents) - 2) * (len(ents) - 1) // 2)
+
+    def test_limits_pairs_per_doc(self):
+        all_pairs = self.rel_data._get_candidate_pairs(
+            self.doc.ner_ents, "0", "")
+        self.cnf.general.max_pairs_per_doc = 3
+        with self.assertLogs(level='WARNING'):
+            pairs = self.rel_data._get_candidate_pairs(
+                self.doc.ner_ents, "0", "")
+        self.assertEqual(len(pairs), 3)
+        self.assertEqual(pairs, sorted(pairs))
+        self.assertTrue(set(pairs) <= set(all_pairs))
+
+    def test_prunes_by_type_pairs(self):
+        self.cnf.general.prune_by_type_pairs = True
+        self.cnf.general.allowed_type_pairs = [("finding", "disorder")]
+        ents = self.doc.ner_ents
+        pairs = self.rel_data._get_candidate_pairs(ents, "0", "")
+        self.assertTrue(pairs)
+        for ent1_idx, ent2_idx in pairs:
+            self.assertEqual(CUI_TYPES[ents[ent1_idx].cui], "finding")
+            self.assertEqual(CUI_TYPES[ents[ent2_idx].cui], "disorder")
+
+    def test_type_pairs_not_used_unless_enabled(self):
+        all_pairs = self.rel_data._get_candidate_pairs(
+            self.doc.ner_ents, "0", "")
+        self.cnf.general.allowed_type_pairs = [("finding", "disorder")]
+        self.assertEqual(self.rel_data._get_candidate_pairs(
+            self.doc.ner_ents, "0", ""), all_pairs)
+
+    def test_gets_allowed_type_pairs(self):
+        rels = [
+            [None] * 4 + ["Treats", 0, ["drug"], ["disorder"]],
+            [None] * 4 + ["Causes", 1, ["disorder", "finding"], ["finding"]],
+            [None] * 4 + ["Other", 2, ["drug"], ["drug"]],
+            [None] * 4 + ["Causes", 1, None, ["finding"]],
+        ]
+        self.assertEqual(RelData.get_allowed_type_pairs(rels), [
+            ("disorder", "finding"), ("drug", "disorder"),
+            ("finding", "finding")])
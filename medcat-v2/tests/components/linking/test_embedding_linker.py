@@ -5,7 +5,12 @@ from medcat.vocab import Vocab
 from medcat.cdb.concepts import CUIInfo, NameInfo
 from medcat.components.types import TrainableComponent
 from medcat.components.types import _DEFAULT_LINKING as DEF_LINKING
+from medcat.storage.serialisers import ExternalArray
+import numpy as np
+import torch
+import zlib
 import unittest
+import unittest.mock
 from ..helper import ComponentInitTests
 
 class FakeDocument:
@@ -24,6 +29,7 @@ class FakeCDB:
         self.config = config
         self.cui2info: dict[str, CUIInfo] = dict()
         self.name2info: dict[str, NameInfo] = dict()
+        self.addl_info: dict = dict()
         self.name_separator: str
 
     def weighted_average_function(self, nr: int) -> float:
@@ -64,4 +70,309 @@ class NonTrainableEmbeddingLinkerTests(unittest.TestCase):
 
     def test_linker_processes_document(self):
         doc = FakeDocument("Test Document")
-        self.linker(doc) 
\ No newline at end of file
+        self.linker(doc) 
+
+
+class FakeEntity:
+    def __init__(self, link_candidates: list[str]):
+        self.link_candidates = link_candidates
+        self.cui = ''
+        self.context_similarity = 0.0
+
+
+class EmbeddingLinkerNameIndexTests(unittest.TestCase):
+    NUM_CUIS = 50
+    NAMES_PER_CUI = 4
+    DIM = 16
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cnf = Config()
+        cls.cnf.components.linking = embedding_linker.EmbeddingLinking()
+        cls.cnf.components.linking.comp_name = embedding_linker.Linker.name
+        cls.cdb = FakeCDB(cls.cnf)
+        for cui_nr in range(cls.NUM_CUIS):
+            cui = f"C{cui_nr}"
+            names = [f"name{cui_nr}~{nr}" for nr in range(cls.NAMES_PER_CUI)]
+            cls.cdb.cui2info[cui] = {"names": set(names)}
+            for name in names:
+                cls.cdb.name2info[name] = {"per_cui_status": {cui: "A"}}
+        generator = torch.Generator().manual_seed(0)
+        cls.cdb.addl_info["name_embeddings"] = torch.nn.functional.normalize(
+            torch.randn((len(cls.cdb.name2info), cls.DIM), generator=generator),
+            dim=1).half()
+        cls.cdb.addl_info["cui_embeddings"] = torch.nn.functional.normalize(
+            torch.randn((cls.NUM_CUIS, cls.DIM), generator=generator),
+            dim=1).half()
+        cls.queries = torch.nn.functional.normalize(
+            torch.randn((10, cls.DIM), generator=generator), dim=1).half()
+
+    def setUp(self):
+        self.cnf.components.linking.name_index = "exact"
+        self.cnf.components.linking.embedding_dtype = "float16"
+        self.cnf.components.linking.filters.cuis = set()
+        self.linker = embedding_linker.Linker(self.cdb, self.cnf)
+        self.linker.device = torch.device("cpu")
+
+    def get_best_cuis(self) -> list[str]:
+        # the (previous) approach of sorting the scores to all the names
+        scores = self.queries @ self.linker.names_context_matrix.T
+        sorted_indices = torch.argsort(scores, dim=1, descending=True)
+        best_cuis = []
+        for row in sorted_indices:
+            for name_idx in row.tolist():
+                if self.linker._valid_names[name_idx]:
+                    name = self.linker._name_keys[name_idx]
+                    best_cuis.extend(self.cdb.name2info[name]["per_cui_status"])
+                    break
+        return best_cuis
+
+    def generate_link_candidates(self) -> list[list[str]]:
+        self.linker._set_filters()
+        entities = [FakeEntity([]) for _ in self.queries]
+        with unittest.mock.patch.object(
+                self.linker, "_get_context_vectors", return_value=self.queries):
+            self.linker._generate_link_candidates(None, entities)
+        return [ent.link_candidates for ent in entities]
+
+    def test_generates_best_candidates(self):
+        self.assertEqual(self.generate_link_candidates(),
+                         [[cui] for cui in self.get_best_cuis()])
+
+    def test_generates_best_candidates_with_filter(self):
+        self.cnf.components.linking.filters.cuis = {"C1", "C2", "C3"}
+        got = self.generate_link_candidates()
+        self.assertEqual(got, [[cui] for cui in self.get_best_cuis()])
+        self.assertTrue(all(cuis[0] in {"C1", "C2", "C3"} for cuis in got))
+
+    def test_generates_best_candidates_with_ivf(self):
+        self.cnf.components.linking.name_index = "ivf"
+        self.cnf.components.linking.ivf_num_lists = 4
+        self.cnf.components.linking.ivf_num_probes = 4
+        self.assertEqual(self.generate_link_candidates(),
+                         [[cui] for cui in self.get_best_cuis()])
+        self.assertEqual(self.cdb.addl_info["name_index"]["type"], "ivf")
+
+    def test_int8_scores_close_to_float16(self):
+        valid = torch.ones(len(self.cdb.name2info), dtype=torch.bool)
+        exp_scores, _ = self.linker.name_index.search(self.queries, 5, valid)
+        self.cnf.components.linking.embedding_dtype = "int8"
+        linker = embedding_linker.Linker(self.cdb, self.cnf)
+        linker.device = torch.device("cpu")
+        self.assertEqual(linker.names_context_matrix.dtype, torch.int8)
+        scores, _ = linker.name_index.search(self.queries, 5, valid)
+        self.assertTrue(torch.allclose(scores, exp_scores, atol=2e-2))
+
+    def test_infers_best_cuis(self):
+        self.linker._set_filters()
+        entities = [FakeEntity([]) for _ in self.queries]
+        with unittest.mock.patch.object(
+                self.linker, "_get_context_vectors", return_value=self.queries):
+            linked = list(self.linker._inference(None, entities))
+        self.assertEqual([ent.cui for ent in linked], self.get_best_cuis())
+
+    def test_infers_from_link_candidates(self):
+        self.linker._set_filters()
+        entities = [FakeEntity(["C1", "C2"]) for _ in self.queries]
+        with unittest.mock.patch.object(
+                self.linker, "_get_context_vectors", return_value=self.queries):
+            linked = list(self.linker._inference(None, entities))
+        self.assertEqual(len(linked), len(self.queries))
+        self.assertTrue(all(ent.cui in {"C1", "C2"} for ent in linked))
+
+
+def fake_embed(texts: list[str], device) -> torch.Tensor:
+    vectors = []
+    for text in texts:
+        generator = torch.Generator().manual_seed(zlib.crc32(text.encode()))
+        vectors.append(torch.randn(8, generator=generator))
+    return torch.nn.functional.normalize(torch.stack(vectors), dim=1).half()
+
+
+class EmbeddingLinkerRefreshTests(unittest.TestCase):
+    NUM_CUIS = 10
+
+    def setUp(self):
+        self.cnf = Config()
+        self.cnf.components.linking = embedding_linker.EmbeddingLinking()
+        self.cnf.components.linking.comp_name = embedding_linker.Linker.name
+        self.cdb = FakeCDB(self.cnf)
+        for cui_nr in range(self.NUM_CUIS):
+            self.add_cui(f"C{cui_nr}", [f"name~{cui_nr}", f"other~{cui_nr}"])
+        self.linker = embedding_linker.Linker(self.cdb, self.cnf)
+        self.linker.device = torch.device("cpu")
+        load_patcher = unittest.mock.patch.object(
+            self.linker, "_load_transformers")
+        load_patcher.start()
+        self.addCleanup(load_patcher.stop)
+        with self.patched() as embed:
+            self.linker.create_embeddings()
+        self.num_embedded = sum(len(call.args[0]) for call in embed.call_args_list)
+        self.cdb.is_dirty = True
+
+    def add_cui(self, cui: str, names: list[str]):
+        self.cdb.cui2info[cui] = {"names": set(names)}
+        for name in names:
+            self.cdb.name2info[name] = {"per_cui_status": {cui: "A"}}
+
+    def patched(self):
+        return unittest.mock.patch.object(
+            self.linker, "_embed", side_effect=fake_embed)
+
+    def refresh(self) -> list[str]:
+        with self.patched() as embed:
+            self.linker.refresh_embeddings()
+        return [text for call in embed.call_args_list for text in call.args[0]]
+
+    def assert_embeddings_up_to_date(self):
+        for kind, info in (("name", self.cdb.name2info),
+                           ("cui", self.cdb.cui2info)):
+            keys = self.cdb.addl_info[f"{kind}_embedding_keys"]
+            self.assertEqual(set(keys), set(info))
+            get_text = (self.linker._get_name_text if kind == "name"
+                        else self.linker._get_cui_text)
+            exp = fake_embed([get_text(key) for key in keys], None)
+            self.assertTrue(torch.equal(
+                torch.from_numpy(self.cdb.addl_info[f"{kind}_embeddings"]), exp))
+        for name, idx in self.linker._name_to_idx.items():
+            self.assertTrue(torch.equal(
+                self.linker.names_context_matrix[idx],
+                fake_embed([self.linker._get_name_text(name)], None)[0]))
+        self.assertFalse(self.cdb.is_dirty)
+
+    def test_created_embeddings_have_fingerprints(self):
+        self.assertEqual(
+            len(self.cdb.addl_info["name_embedding_fingerprints"]),
+            len(self.cdb.name2info))
+        self.assertEqual(self.num_embedded,
+                         len(self.cdb.name2info) + len(self.cdb.cui2info))
+
+    def test_refresh_without_changes_embeds_nothing(self):
+        self.assertEqual(self.refresh(), [])
+        self.assert_embeddings_up_to_date()
+
+    def test_refresh_embeds_only_new(self):
+        self.add_cui("C-NEW", ["new~concept"])
+        self.assertEqual(sorted(self.refresh()), ["new concept"] * 2)
+        self.assert_embeddings_up_to_date()
+
+    def test_refresh_embeds_changed_cui(self):
+        self.add_cui("C1", ["name~1", "other~1", "much~longer~name"])
+        self.assertEqual(sorted(self.refresh()),
+                         ["much longer name", "much longer name"])
+        self.assert_embeddings_up_to_date()
+
+    def test_refresh_removes_rows(self):
+        del self.cdb.cui2info["C2"]
+        del self.cdb.name2info["name~2"]
+        del self.cdb.name2info["other~2"]
+        self.assertEqual(self.refresh(), [])
+        self.assert_embeddings_up_to_date()
+
+    def test_refresh_without_fingerprints_embeds_everything(self):
+        del self.cdb.addl_info["name_embedding_fingerprints"]
+        self.assertEqual(len(self.refresh()), self.num_embedded)
+        self.assert_embeddings_up_to_date()
+
+    def test_context_matrix_uses_stored_array(self):
+        stored = self.cdb.addl_info["name_embeddings"]
+        self.assertEqual(self.linker.names_context_matrix.data_ptr(),
+                         torch.from_numpy(stored).data_ptr())
+
+    def test_only_embeddings_saved_separately(self):
+        for kind in ("name", "cui"):
+            self.assertIsInstance(
+                self.cdb.addl_info[f"{kind}_embeddings"], ExternalArray)
+        for key, val in self.cdb.addl_info.items():
+            if not key.endswith(("_embeddings", "_embedding_scales")):
+                self.assertNotIsInstance(val, ExternalArray, key)
+
+    def test_refresh_converts_to_int8(self):
+        self.cnf.components.linking.embedding_dtype = "int8"
+        self.assertEqual(self.refresh(), [])
+        for kind in ("name", "cui"):
+            data = self.cdb.addl_info[f"{kind}_embeddings"]
+            scales = self.cdb.addl_info[f"{kind}_embedding_scales"]
+            self.assertEqual(data.dtype, np.int8)
+            self.assertEqual(scales.shape, (data.shape[0], ))
+            self.assertIsInstance(scales, ExternalArray)
+        self.add_cui("C-NEW", ["new~concept"])
+        self.assertEqual(sorted(self.refresh()), ["new concept"] * 2)
+        idx = self.linker._name_to_idx["new~concept"]
+        got = self.linker._score_names(
+            [idx], fake_embed(["new concept"], None)[0])
+        self.assertAlmostEqual(got.item(), 1.0, delta=1e-2)
+
+    def test_refresh_keeps_ivf_centroids(self):
+        self.cnf.components.linking.name_index = "ivf"
+        self.cnf.components.linking.ivf_num_lists = 3
+        centroids = self.linker.name_index.centroids
+        self.add_cui("C-NEW", ["new~concept"])
+        self.refresh()
+        self.assertTrue(torch.equal(self.linker.name_index.centroids, centroids))
+        self.assertEqual(len(self.linker.name_index.list_ids),
+                         len(self.cdb.name2info))
+
+
+class EmbeddingLinkerContextCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.cnf = Config()
+        self.cnf.components.linking = embedding_linker.EmbeddingLinking()
+        self.cnf.components.linking.comp_name = embedding_linker.Linker.name
+        self.linker = embedding_linker.Linker(FakeCDB(self.cnf), self.cnf)
+        self.linker.device = torch.device("cpu")
+        context_patcher = unittest.mock.patch.object(
+            self.linker, "_get_context",
+            side_effect=lambda text, doc, size: f"{text}|{size}")
+        context_patcher.start()
+        self.addCleanup(context_patcher.stop)
+
+    def get_vectors(self, texts: list[str], size: int = 0
+                    ) -> tuple[torch.Tensor, list[str]]:
+        with unittest.mock.patch.object(
+                self.linker, "_embed", side_effect=fake_embed) as embed:
+            vectors = self.linker._get_context_vectors(None, texts, size)
+        embedded = [text for call in embed.call_args_list
+                    for text in call.args[0]]
+        return vectors, embedded
+
+    def test_embeds_duplicates_once(self):
+        texts = ["fever", "diabetes", "fever", "fever", "diabetes"]
+        vectors, embedded = self.get_vectors(texts)
+        self.assertEqual(embedded, ["fever|0", "diabetes|0"])
+        self.assertTrue(torch.equal(
+            vectors, fake_embed([f"{text}|0" for text in texts], None)))
+
+    def test_reuses_spans_across_documents(self):
+        self.get_vectors(["fever", "diabetes"])
+        self.linker._doc_contexts.clear()
+        vectors, embedded = self.get_vectors(["diabetes", "cough"])
+        self.assertEqual(embedded, ["cough|0"])
+        self.assertEqual(self.linker.cache_hits, 1)
+        self.assertEqual(self.linker.cache_misses, 3)
+        self.assertTrue(torch.equal(
+            vectors, fake_embed(["diabetes|0", "cough|0"], None)))
+
+    def test_reuses_contexts_within_document_only(self):
+        self.get_vectors(["fever"], 5)
+        self.assertEqual(self.get_vectors(["fever"], 5)[1], [])
+        self.linker._doc_contexts.clear()
+        self.assertEqual(self.get_vectors(["fever"], 5)[1], ["fever|5"])
+        self.assertFalse(self.linker._span_cache)
+
+    def test_span_cache_is_bounded(self):
+        self.cnf.components.linking.context_cache_size = 2
+        self.get_vectors(["a", "b", "c"])
+        self.assertEqual(list(self.linker._span_cache), ["b|0", "c|0"])
+
+    def test_clears_span_cache_upon_model_change(self):
+        doc = FakeDocument("fever")
+        with unittest.mock.patch.object(self.linker, "_load_transformers"):
+            self.linker(doc)
+            self.get_vectors(["fever"])
+            self.linker(doc)
+            self.assertTrue(self.linker._span_cache)
+            self.cnf.components.linking.embedding_model_name = "other-model"
+            self.linker(doc)
+        self.assertFalse(self.linker._span_cache)
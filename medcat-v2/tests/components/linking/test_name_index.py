@@ -0,0 +1,179 @@
+from medcat.components.linking import name_index
+from medcat.components.linking import quantisation
+
+import torch
+
+import unittest
+import unittest.mock
+
+
+def get_random_matrix(num: int, dim: int, seed: int) -> torch.Tensor:
+    generator = torch.Generator().manual_seed(seed)
+    matrix = torch.randn((num, dim), generator=generator)
+    return torch.nn.functional.normalize(matrix, dim=1).half()
+
+
+def search_by_sorting(matrix: torch.Tensor, queries: torch.Tensor, k: int,
+                      valid_mask: torch.Tensor) -> list[list[int]]:
+    scores = (queries @ matrix.T).float()
+    sorted_indices = torch.argsort(scores, dim=1, descending=True)
+    return [[int(idx) for idx in row if valid_mask[idx]][:k]
+            for row in sorted_indices]
+
+
+class ExactNameIndexTests(unittest.TestCase):
+    NUM_NAMES = 1000
+    DIM = 32
+    BLOCK_SIZE = 97
+
+    @classmethod
+    def setUpClass(cls):
+        cls.matrix = get_random_matrix(cls.NUM_NAMES, cls.DIM, 0)
+        cls.queries = get_random_matrix(20, cls.DIM, 1)
+        cls.index = name_index.ExactNameIndex(cls.matrix, cls.BLOCK_SIZE)
+        generator = torch.Generator().manual_seed(2)
+        cls.mask = torch.rand(cls.NUM_NAMES, generator=generator) > 0.3
+
+    def test_is_name_index(self):
+        self.assertIsInstance(self.index, name_index.NameIndex)
+
+    def assert_same_as_sorting(self, k: int, mask: torch.Tensor):
+        scores, indices = self.index.search(self.queries, k, mask)
+        self.assertEqual(indices.shape, (len(self.queries), k))
+        expected = search_by_sorting(self.matrix, self.queries, k, mask)
+        # NOTE: compare scores since ties may be broken differently
+        exp_scores = [[float(self.matrix[idx].float() @ query.float())
+                       for idx in row]
+                      for row, query in zip(expected, self.queries)]
+        for got, exp in zip(scores.tolist(), exp_scores):
+            for got_score, exp_score in zip(got, exp):
+                self.assertAlmostEqual(got_score, exp_score, delta=1e-2)
+        for row in indices.tolist():
+            self.assertTrue(all(mask[idx] for idx in row))
+
+    def test_top_1_same_as_sorting(self):
+        self.assert_same_as_sorting(1, torch.ones(self.NUM_NAMES).bool())
+
+    def test_top_k_same_as_sorting(self):
+        self.assert_same_as_sorting(10, torch.ones(self.NUM_NAMES).bool())
+
+    def test_top_k_same_as_sorting_with_mask(self):
+        self.assert_same_as_sorting(10, self.mask)
+
+    def test_pads_if_too_few_valid(self):
+        mask = torch.zeros(self.NUM_NAMES).bool()
+        mask[[5, 500]] = True
+        scores, indices = self.index.search(self.queries, 4, mask)
+        for row_scores, row in zip(scores.tolist(), indices.tolist()):
+            self.assertEqual(set(row[:2]), {5, 500})
+            self.assertEqual(row[2:], [-1, -1])
+            self.assertEqual(row_scores[2:], [-float('inf')] * 2)
+
+
+class IVFNameIndexTests(unittest.TestCase):
+    NUM_NAMES = 1000
+    DIM = 32
+    NUM_LISTS = 10
+
+    @classmethod
+    def setUpClass(cls):
+        cls.matrix = get_random_matrix(cls.NUM_NAMES, cls.DIM, 0)
+        cls.queries = get_random_matrix(20, cls.DIM, 1)
+        cls.mask = torch.ones(cls.NUM_NAMES).bool()
+        cls.index = name_index.IVFNameIndex.build(
+            cls.matrix, cls.NUM_LISTS, num_probes=3)
+        cls.exact = name_index.ExactNameIndex(cls.matrix)
+
+    def test_is_name_index(self):
+        self.assertIsInstance(self.index, name_index.NameIndex)
+
+    def test_lists_have_all_names(self):
+        self.assertEqual(len(self.index.list_offsets), self.NUM_LISTS + 1)
+        self.assertEqual(sorted(self.index.list_ids.tolist()),
+                         list(range(self.NUM_NAMES)))
+
+    def test_probing_all_lists_is_exact(self):
+        index = name_index.IVFNameIndex.build(
+            self.matrix, self.NUM_LISTS, num_probes=self.NUM_LISTS)
+        scores, _ = index.search(self.queries, 5, self.mask)
+        exp_scores, _ = self.exact.search(self.queries, 5, self.mask)
+        self.assertTrue(torch.allclose(scores, exp_scores))
+
+    def test_finds_names_themselves(self):
+        _, indices = self.index.search(self.matrix[:50], 1, self.mask)
+        self.assertEqual(indices[:, 0].tolist(), list(range(50)))
+
+    def test_falls_back_to_exact_if_no_valid_names_probed(self):
+        mask = torch.zeros(self.NUM_NAMES).bool()
+        mask[123] = True
+        _, indices = self.index.search(self.queries, 1, mask)
+        self.assertEqual(indices[:, 0].tolist(), [123] * len(self.queries))
+
+    def test_can_recreate_from_state(self):
+        state = self.index.get_state()
+        with unittest.mock.patch.object(
+                name_index.IVFNameIndex, 'build') as build:
+            index = name_index.create_name_index(
+                self.matrix, 'ivf', num_probes=3, state=state)
+        build.assert_not_called()
+        got = index.search(self.queries, 5, self.mask)
+        exp = self.index.search(self.queries, 5, self.mask)
+        self.assertTrue(torch.equal(got[1], exp[1]))
+
+    def test_rebuilds_if_state_does_not_match(self):
+        state = self.index.get_state()
+        index = name_index.create_name_index(
+            self.matrix[:500], 'ivf', num_probes=3, state=state)
+        self.assertEqual(len(index.list_ids), 500)
+
+    def test_reuses_centroids_without_lists(self):
+        state = self.index.get_state()
+        del state['list_ids']
+        del state['list_offsets']
+        index = name_index.create_name_index(
+            self.matrix, 'ivf', num_probes=3, state=state)
+        self.assertTrue(torch.equal(index.centroids, self.index.centroids))
+        self.assertTrue(torch.equal(index.list_ids, self.index.list_ids))
+
+
+class Int8NameIndexTests(unittest.TestCase):
+    NUM_NAMES = 1000
+    DIM = 32
+
+    @classmethod
+    def setUpClass(cls):
+        matrix = get_random_matrix(cls.NUM_NAMES, cls.DIM, 0)
+        cls.queries = get_random_matrix(20, cls.DIM, 1)
+        cls.mask = torch.ones(cls.NUM_NAMES).bool()
+        cls.data, cls.scales = quantisation.quantise(matrix, 'int8')
+        cls.exp_scores, _ = name_index.ExactNameIndex(matrix).search(
+            cls.queries, 5, cls.mask)
+
+    def test_exact_scores_int8(self):
+        index = name_index.ExactNameIndex(self.data, 97, self.scales)
+        scores, _ = index.search(self.queries, 5, self.mask)
+        self.assertTrue(torch.allclose(scores, self.exp_scores, atol=2e-2))
+
+    def test_ivf_scores_int8(self):
+        index = name_index.create_name_index(
+            self.data, 'ivf', num_lists=10, num_probes=10,
+            scales=self.scales)
+        self.assertEqual(index.centroids.dtype, torch.float32)
+        scores, _ = index.search(self.queries, 5, self.mask)
+        self.assertTrue(torch.allclose(scores, self.exp_scores, atol=2e-2))
+
+
+class CreateNameIndexTests(unittest.TestCase):
+
+    def test_creates_exact(self):
+        self.assertIsInstance(name_index.create_name_index(
+            get_random_matrix(10, 4, 0), 'exact'), name_index.ExactNameIndex)
+
+    def test_creates_ivf(self):
+        self.assertIsInstance(name_index.create_name_index(
+            get_random_matrix(10, 4, 0), 'ivf'), name_index.IVFNameIndex)
+
+    def test_fails_on_unknown_type(self):
+        with self.assertRaises(name_index.UnknownNameIndexType):
+            name_index.create_name_index(get_random_matrix(10, 4, 0), 'hnsw')
+
@@ -0,0 +1,57 @@
+from medcat.components.linking import quantisation
+
+import torch
+
+import unittest
+
+
+def get_random_matrix(num: int, dim: int, seed: int) -> torch.Tensor:
+    generator = torch.Generator().manual_seed(seed)
+    matrix = torch.randn((num, dim), generator=generator)
+    return torch.nn.functional.normalize(matrix, dim=1)
+
+
+class QuantiseTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.matrix = get_random_matrix(100, 32, 0)
+        cls.queries = get_random_matrix(5, 32, 1)
+        cls.data, cls.scales = quantisation.quantise(cls.matrix, 'int8')
+
+    def test_float16_has_no_scales(self):
+        data, scales = quantisation.quantise(self.matrix, 'float16')
+        self.assertEqual(data.dtype, torch.float16)
+        self.assertIsNone(scales)
+
+    def test_int8_has_scale_per_row(self):
+        self.assertEqual(self.data.dtype, torch.int8)
+        self.assertEqual(self.scales.shape, (len(self.matrix), ))
+
+    def test_int8_close_to_original(self):
+        got = quantisation.dequantise(self.data, self.scales)
+        self.assertTrue(torch.allclose(got, self.matrix, atol=1e-2))
+
+    def test_keeps_zero_rows(self):
+        data, scales = quantisation.quantise(torch.zeros((2, 4)), 'int8')
+        self.assertFalse(quantisation.dequantise(data, scales).any())
+
+    def test_scores_int8_like_original(self):
+        got = quantisation.score_rows(self.queries, self.data, self.scales)
+        exp = self.queries @ self.matrix.T
+        self.assertTrue(torch.allclose(got, exp, atol=2e-2))
+
+    def test_to_same_dtype_keeps_objects(self):
+        data, scales = quantisation.to_dtype(self.data, self.scales, 'int8')
+        self.assertIs(data, self.data)
+        self.assertIs(scales, self.scales)
+
+    def test_to_other_dtype_converts(self):
+        data, scales = quantisation.to_dtype(
+            self.data, self.scales, 'float16')
+        self.assertEqual(data.dtype, torch.float16)
+        self.assertIsNone(scales)
+
+    def test_fails_on_unknown_dtype(self):
+        with self.assertRaises(quantisation.UnknownEmbeddingDtype):
+            quantisation.quantise(self.matrix, 'int4')
@@ -0,0 +1,71 @@
+from medcat.components.linking import vector_context_model
+from medcat.cdb.concepts import get_new_cui_info
+from medcat.config import Config
+
+import numpy as np
+
+import unittest
+
+
+class ContextVectorIndexTests(unittest.TestCase):
+    dims = 20
+    weights = {'long': 0.5, 'short': 0.5}
+    threshold = 1
+
+    @classmethod
+    def _rand_vecs(cls, rng: np.random.Generator,
+                   types: list[str]) -> dict[str, np.ndarray]:
+        return {ct: rng.standard_normal(cls.dims) for ct in types}
+
+    def setUp(self):
+        rng = np.random.default_rng(42)
+        self.cui2info = {}
+        for nr in range(10):
+            cui = f"C{nr}"
+            info = get_new_cui_info(cui, cui.lower())
+            if nr % 3:
+                info['context_vectors'] = self._rand_vecs(
+                    rng, ['long', 'short'] if nr % 2 else ['long'])
+            info['count_train'] = nr % 4
+            self.cui2info[cui] = info
+        self.doc_vecs = self._rand_vecs(rng, ['long', 'short'])
+        cnf = Config()
+        cnf.components.linking.context_vector_weights = self.weights
+        cnf.components.linking.train_count_threshold = self.threshold
+        self.model = vector_context_model.ContextModel(
+            self.cui2info, {}, lambda nr: 1.0, None,
+            cnf.components.linking, '~')
+        self.index = vector_context_model.ContextVectorIndex(
+            self.cui2info, init_capacity=2)
+
+    def assert_same_as_per_cui(self):
+        cuis = list(self.cui2info)
+        expected = [self.model._similarity(cui, self.doc_vecs)
+                    for cui in cuis]
+        got = self.index.get_similarities(
+            cuis, self.doc_vecs, self.weights, self.threshold)
+        self.assertEqual(len(got), len(expected))
+        for cui, exp, val in zip(cuis, expected, got):
+            with self.subTest(cui):
+                self.assertAlmostEqual(val, exp, places=5)
+
+    def test_same_as_per_cui_similarity(self):
+        self.assert_same_as_per_cui()
+
+    def test_only_adds_cuis_with_context_vectors(self):
+        self.index.get_similarities(list(self.cui2info), self.doc_vecs,
+                                    self.weights, self.threshold)
+        self.assertEqual(
+            len(self.index),
+            len([ci for ci in self.cui2info.values()
+                 if ci['context_vectors']]))
+
+    def test_picks_up_updated_vectors(self):
+        self.assert_same_as_per_cui()
+        vector_context_model.update_context_vectors(
+            self.cui2info['C1']['context_vectors'], 'C1', self.doc_vecs,
+            lr=0.5, negative=False)
+        self.cui2info['C3']['context_vectors'] = {}
+        self.cui2info['C0']['context_vectors'] = dict(self.doc_vecs)
+        self.cui2info['C0']['count_train'] = 10
+        self.assert_same_as_per_cui()
@@ -0,0 +1,130 @@
+from medcat.components.ner import dict_based_ner
+from medcat.components import types
+from medcat.config import Config
+from medcat.model_creation.cdb_maker import CDBMaker
+from medcat.pipeline.pipeline import Pipeline
+from medcat.preprocessors.cleaners import NameDescriptor
+from medcat.storage.serialisers import (
+    serialise, deserialise, AvailableSerialisers)
+
+import os
+import json
+import tempfile
+import unittest
+import unittest.mock
+
+from ... import RESOURCES_PATH
+
+
+class DictBasedNERTests(unittest.TestCase):
+    CDB_PREPROCESSED_PATH = os.path.join(RESOURCES_PATH,
+                                         'preprocessed4cdb.txt')
+
+    @classmethod
+    def setUpClass(cls):
+        cls.config = Config()
+        cls.config.general.nlp.provider = 'regex'
+        cls.pipe = Pipeline(
+            CDBMaker(cls.config).prepare_csvs([cls.CDB_PREPROCESSED_PATH]),
+            vocab=None, model_load_path=None)
+
+    def setUp(self):
+        self.cdb = CDBMaker(self.config).prepare_csvs(
+            [self.CDB_PREPROCESSED_PATH])
+        self.ner = dict_based_ner.NER(self.pipe.tokenizer, self.cdb)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.folder = os.path.join(self.temp_dir.name, 'comp')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def get_names(self, ner: dict_based_ner.NER, text: str) -> list[str]:
+        doc = self.pipe.tokenizer(text)
+        for comp in self.pipe._components:
+            if comp.get_type() is types.CoreComponentType.ner:
+                break
+            doc = comp(doc)
+        ner(doc)
+        return [ent.detected_name for ent in doc.ner_ents]
+
+    def load(self) -> dict_based_ner.NER:
+        loaded = deserialise(self.folder, cnf=self.config.components,
+                             tokenizer=self.pipe.tokenizer, cdb=self.cdb,
+                             vocab=None, model_load_path=None)
+        self.assertIsInstance(loaded, dict_based_ner.NER)
+        return loaded
+
+    def test_finds_entities(self):
+        self.assertEqual(
+            self.get_names(self.ner, "Chronic kidney failure and fever"),
+            ["kidney~failure", "fever"])
+
+    def test_ignores_matches_within_tokens(self):
+        self.assertFalse(self.get_names(self.ner, "feverish"))
+        self.assertFalse(self.get_names(self.ner, "nofever"))
+
+    def test_rebuilds_upon_name_change(self):
+        self.cdb.add_names("C06", {"feverish": NameDescriptor(
+            tokens=["feverish"], snames={"feverish"}, raw_name="feverish",
+            is_upper=False)})
+        self.assertEqual(self.get_names(self.ner, "feverish"), ["feverish"])
+
+    def replace_name(self):
+        # NOTE: the number of names stays the same
+        cui = next(iter(self.cdb.name2info["fever"]["per_cui_status"]))
+        self.cdb._remove_names(cui, ["fever"])
+        self.cdb.add_names("C06", {"feverish": NameDescriptor(
+            tokens=["feverish"], snames={"feverish"}, raw_name="feverish",
+            is_upper=False)})
+
+    def test_rebuilds_upon_name_replacement(self):
+        num_names = len(self.cdb.name2info)
+        self.replace_name()
+        self.assertEqual(len(self.cdb.name2info), num_names)
+        self.assertEqual(self.get_names(self.ner, "feverish and fever"),
+                         ["feverish"])
+
+    def test_rebuilds_all_sharing_cdb(self):
+        other = dict_based_ner.NER(self.pipe.tokenizer, self.cdb)
+        self.replace_name()
+        for ner in (self.ner, other):
+            with self.subTest(ner=ner):
+                self.assertEqual(self.get_names(ner, "feverish and fever"),
+                                 ["feverish"])
+
+    def test_saves_automaton(self):
+        serialise(AvailableSerialisers.dill, self.ner, self.folder)
+        self.assertTrue(os.path.exists(os.path.join(
+            self.folder, dict_based_ner.NER.AUTOMATON_FILE)))
+
+    def test_loads_without_rebuilding(self):
+        serialise(AvailableSerialisers.dill, self.ner, self.folder)
+        with unittest.mock.patch.object(
+                dict_based_ner.NER, '_rebuild_automaton') as rebuild:
+            loaded = self.load()
+            names = self.get_names(loaded, "kidney failure and fever")
+        rebuild.assert_not_called()
+        self.assertEqual(names, ["kidney~failure", "fever"])
+
+    def test_rebuilds_upon_load_if_names_replaced(self):
+        serialise(AvailableSerialisers.dill, self.ner, self.folder)
+        self.replace_name()
+        # NOTE: another component sharing the CDB catches up first
+        dict_based_ner.NER(self.pipe.tokenizer, self.cdb)(
+            self.pipe.tokenizer("fever"))
+        self.assertEqual(self.get_names(self.load(), "feverish and fever"),
+                         ["feverish"])
+
+    def test_rebuilds_upon_load_if_stale(self):
+        serialise(AvailableSerialisers.dill, self.ner, self.folder)
+        info_path = os.path.join(self.folder,
+                                 dict_based_ner.NER.AUTOMATON_INFO_FILE)
+        with open(info_path) as f:
+            info = json.load(f)
+        info['num_names'] += 1
+        with open(info_path, 'w') as f:
+            json.dump(info, f)
+        with unittest.mock.patch.object(
+                dict_based_ner.NER, '_rebuild_automaton') as rebuild:
+            self.load()
+        rebuild.assert_called_once()
@@ -1,10 +1,18 @@
 from medcat.components.ner import vocab_based_ner
+from medcat.components.ner.subname_trie import SubnameTrie
+from medcat.components.ner.vocab_based_annotator import maybe_annotate_name
 from medcat.components import types
 from medcat.config import Config
+from medcat.model_creation.cdb_maker import CDBMaker
+from medcat.pipeline.pipeline import Pipeline
+from medcat.preprocessors.cleaners import NameDescriptor
 
+import os
 import unittest
+import unittest.mock
 
 from ..helper import ComponentInitTests
+from ... import RESOURCES_PATH
 
 
 class FakeDocument:
@@ -38,3 +46,229 @@ class NerInitTests(ComponentInitTests, unittest.TestCase):
         cls.cdb_vocab = dict()
         cls.cdb = FakeCDB(Config())
         return super().setUpClass()
+
+
+class StringBasedNER(vocab_based_ner.NER):
+    """The (previous) string concatenation based implementation.
+
+    Used as a reference for the trie based one.
+    """
+
+    def __call__(self, doc):
+        max_skip_tokens = self.config.components.ner.max_skip_tokens
+        _sep = self.config.general.separator
+        _doc = [tkn for tkn in doc if not tkn.to_skip]
+        for i, tkn in enumerate(_doc):
+            tkns = [tkn]
+            name = ""
+            for name_version in tkn.base.text_versions:
+                if self.cdb.has_subname(name_version):
+                    name = name_version
+                    break
+            if name in self.cdb.name2info and not tkn.base.is_stop:
+                maybe_annotate_name(self.tokenizer, name, tkns, doc,
+                                    self.cdb, self.config)
+            if not name:
+                continue
+            for j in range(i + 1, len(_doc)):
+                if (_doc[j].base.index - _doc[j - 1].base.index - 1
+                        > max_skip_tokens):
+                    break
+                tkn = _doc[j]
+                tkns.append(tkn)
+                name_changed = False
+                name_reverse = None
+                for name_version in tkn.base.text_versions:
+                    _name = name + _sep + name_version
+                    if self.cdb.has_subname(_name):
+                        name = _name
+                        name_changed = True
+                        break
+                    if self.config.components.ner.try_reverse_word_order:
+                        _name_reverse = name_version + _sep + name
+                        if self.cdb.has_subname(_name_reverse):
+                            name_reverse = _name_reverse
+                if name_changed:
+                    if name in self.cdb.name2info:
+                        maybe_annotate_name(self.tokenizer, name, tkns, doc,
+                                            self.cdb, self.config)
+                elif name_reverse is not None:
+                    if name_reverse in self.cdb.name2info:
+                        maybe_annotate_name(self.tokenizer, name_reverse, tkns,
+                                            doc, self.cdb, self.config)
+                else:
+                    break
+        return doc
+
+
+class SubnameTrieTests(unittest.TestCase):
+    SUBNAMES = ["kidney", "kidney~failure", "chronic", "chronic~kidney",
+                "chronic~kidney~failure", "a~~b", "a~"]
+    NAMES = ["kidney~failure", "chronic~kidney~failure", "a~~b",
+             "not~a~subname"]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.trie = SubnameTrie(cls.SUBNAMES, cls.NAMES, "~")
+
+    def test_has_all_subnames(self):
+        for subname in self.SUBNAMES:
+            with self.subTest(subname):
+                node = self.trie.walk(self.trie.root, subname)
+                self.assertIsNotNone(node)
+                self.assertTrue(node.is_subname)
+
+    def test_marks_names(self):
+        for name in self.NAMES[:-1]:
+            with self.subTest(name):
+                self.assertTrue(self.trie.walk(self.trie.root, name).is_name)
+
+    def test_only_marks_subnames_as_such(self):
+        for text in ["a", "failure", "kidney~chronic", "not~a~subname"]:
+            with self.subTest(text):
+                node = self.trie.walk(self.trie.root, text)
+                self.assertFalse(node is not None and node.is_subname)
+
+    def test_walk_by_token(self):
+        node = self.trie.walk(self.trie.root, "chronic")
+        node = self.trie.walk(node, "kidney")
+        node = self.trie.walk(node, "failure")
+        self.assertTrue(node.is_name)
+
+    def test_walk_parts(self):
+        node = self.trie.walk_parts(self.trie.root, ["a", "", "b"])
+        self.assertTrue(node.is_name)
+
+    def test_counts_subnames(self):
+        self.assertEqual(self.trie.num_subnames, len(self.SUBNAMES))
+        trie = SubnameTrie(self.SUBNAMES, self.NAMES, "~")
+        trie.add_subname("kidney")
+        trie.add_subname("renal")
+        self.assertEqual(trie.num_subnames, len(self.SUBNAMES) + 1)
+
+
+class TrieBasedNERTests(unittest.TestCase):
+    VOCAB_DATA_PATH = os.path.join(RESOURCES_PATH, 'vocab_data.txt')
+    CDB_PREPROCESSED_PATH = os.path.join(RESOURCES_PATH,
+                                         'preprocessed4cdb.txt')
+    TEXTS = [
+        "The fittest most fit of chronic kidney failure",
+        "The dog is sitting outside the house.",
+        "Chronic kidney failure and kidney failure",
+        "Failure kidney, loss of kidney function and kidney loss",
+        "Mellitus diabetes, with a temperature high and fever",
+        "Loss of  kidney function. Diabetes. mellitus, high  temperature",
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.config = Config()
+        cls.config.general.nlp.provider = 'regex'
+        cls.cdb = CDBMaker(cls.config).prepare_csvs(
+            [cls.CDB_PREPROCESSED_PATH])
+        # allows for reverse word order matches (e.g "failure kidney")
+        cls.cdb.add_names("C06", {"failure": NameDescriptor(
+            tokens=["failure"], snames={"failure"}, raw_name="failure",
+            is_upper=False)})
+        cls.pipe = Pipeline(cls.cdb, vocab=None, model_load_path=None)
+        cls.ner = vocab_based_ner.NER(cls.pipe.tokenizer, cls.cdb)
+        cls.ref_ner = StringBasedNER(cls.pipe.tokenizer, cls.cdb)
+
+    def tearDown(self):
+        self.config.components.ner.try_reverse_word_order = False
+
+    def get_ents(self, ner: vocab_based_ner.NER, text: str):
+        doc = self.pipe.tokenizer(text)
+        for comp in self.pipe._components:
+            if comp.get_type() is types.CoreComponentType.ner:
+                break
+            doc = comp(doc)
+        ner(doc)
+        return [(ent.base.start_index, ent.base.end_index,
+                 ent.detected_name, ent.link_candidates)
+                for ent in doc.ner_ents]
+
+    def assert_same_as_reference(self):
+        for text in self.TEXTS:
+            with self.subTest(text):
+                got = self.get_ents(self.ner, text)
+                self.assertEqual(got, self.get_ents(self.ref_ner, text))
+
+    def test_finds_entities(self):
+        self.assertTrue(self.get_ents(self.ner, self.TEXTS[0]))
+
+    def test_same_as_string_based(self):
+        self.assert_same_as_reference()
+
+    def test_same_as_string_based_reverse_order(self):
+        self.config.components.ner.try_reverse_word_order = True
+        self.assert_same_as_reference()
+
+    def test_finds_reverse_order(self):
+        self.config.components.ner.try_reverse_word_order = True
+        names = [ent[2] for ent in self.get_ents(self.ner, self.TEXTS[3])]
+        self.assertIn("kidney~failure", names)
+
+    def test_rebuilds_upon_name_change(self):
+        cdb = CDBMaker(self.config).prepare_csvs([self.CDB_PREPROCESSED_PATH])
+        ner = vocab_based_ner.NER(self.pipe.tokenizer, cdb)
+        self.assertTrue(self.get_ents(ner, "kidney failure"))
+        cui = cdb.name2info["kidney~failure"]["per_cui_status"]
+        cdb._remove_names(next(iter(cui)), ["kidney~failure"])
+        self.assertFalse(self.get_ents(ner, "kidney failure"))
+
+    def test_rebuilds_all_sharing_cdb(self):
+        cdb = CDBMaker(self.config).prepare_csvs([self.CDB_PREPROCESSED_PATH])
+        ners = [vocab_based_ner.NER(self.pipe.tokenizer, cdb)
+                for _ in range(2)]
+        for ner in ners:
+            self.assertTrue(self.get_ents(ner, "kidney failure"))
+        cui = next(iter(cdb.name2info["kidney~failure"]["per_cui_status"]))
+        num_names = len(cdb.name2info)
+        cdb._remove_names(cui, ["kidney~failure"])
+        # NOTE: neither the number of names nor subnames changes
+        self.add_name(cdb, cui, "kidney", {"kidney"})
+        self.assertEqual(len(cdb.name2info), num_names)
+        for ner in ners:
+            names = [ent[2] for ent in self.get_ents(ner, "kidney failure")]
+            self.assertEqual(names, ["kidney"])
+
+    def add_name(self, cdb, cui: str, name: str, snames: set[str]):
+        cdb.add_names(cui, {name: NameDescriptor(
+            tokens=name.split('~'), snames=snames, raw_name=name,
+            is_upper=False)})
+
+    def test_adds_new_names_without_rebuild(self):
+        cdb = CDBMaker(self.config).prepare_csvs([self.CDB_PREPROCESSED_PATH])
+        ner = vocab_based_ner.NER(self.pipe.tokenizer, cdb)
+        ref_ner = StringBasedNER(self.pipe.tokenizer, cdb)
+        self.assertFalse(self.get_ents(ner, "renal failure"))
+        with unittest.mock.patch.object(
+                SubnameTrie, 'from_cdb') as from_cdb:
+            self.add_name(cdb, "C-NEW", "renal~failure",
+                          {"renal", "renal~failure"})
+            # an existing name for a new concept
+            self.add_name(cdb, "C-NEW2", "kidney~failure",
+                          {"kidney", "kidney~failure"})
+            got = self.get_ents(ner, "renal failure and kidney failure")
+        from_cdb.assert_not_called()
+        self.assertIn("renal~failure", [ent[2] for ent in got])
+        self.assertEqual(
+            got, self.get_ents(ref_ner, "renal failure and kidney failure"))
+
+    def test_rebuilds_upon_new_subnames_for_existing_name(self):
+        cdb = CDBMaker(self.config).prepare_csvs([self.CDB_PREPROCESSED_PATH])
+        ner = vocab_based_ner.NER(self.pipe.tokenizer, cdb)
+        self.assertFalse(self.get_ents(ner, "renal"))
+        cui = next(iter(cdb.name2info["kidney~failure"]["per_cui_status"]))
+        self.add_name(cdb, cui, "kidney~failure", {"renal"})
+        self.assertTrue(ner._get_trie().walk(
+            ner._get_trie().root, "renal").is_subname)
+
+    def test_rebuilds_upon_cui_removal(self):
+        cdb = CDBMaker(self.config).prepare_csvs([self.CDB_PREPROCESSED_PATH])
+        ner = vocab_based_ner.NER(self.pipe.tokenizer, cdb)
+        self.assertTrue(self.get_ents(ner, "kidney failure"))
+        for cui in list(cdb.name2info["kidney~failure"]["per_cui_status"]):
+            cdb.remove_cui(cui)
+        self.assertFalse(self.get_ents(ner, "kidney failure"))
@@ -12,7 +12,10 @@ from medcat.components.ner.trf.transformers_ner import (
     TransformersNER, TransformersNERComponent, _save_component)
 from medcat.config.config_transformers_ner import ConfigTransformersNER
 from medcat.model_creation.cdb_maker import CDBMaker
+from medcat.tokenizing.regex_impl.tokenizer import RegexTokenizer
 from transformers import TrainerCallback
+from transformers import (
+    BertConfig, BertForTokenClassification, BertTokenizerFast)
 
 from unittest import TestCase, skipIf
 import unittest.mock
@@ -320,3 +323,95 @@ class AdditionalTransfromersNERTests(TestCase):
         assert "fn" in examples
         assert dataset["train"].num_rows == 60
         self.assertEqual(tracker.call.call_count, 1)
+
+
+WORDS = ("patient has diabetes and hypertension , "
+         "history of asthma with pain").split()
+
+
+def save_tiny_model(folder: str) -> None:
+    vocab_path = os.path.join(folder, "vocab.txt")
+    with open(vocab_path, 'w') as f:
+        f.write("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] +
+                          sorted(set(WORDS))))
+    # NOTE: a short max length so that longer texts are split into windows
+    tokenizer = BertTokenizerFast(vocab_file=vocab_path, model_max_length=16)
+    labels = ["O", "DIS", "PER"]
+    model = BertForTokenClassification(BertConfig(
+        vocab_size=tokenizer.vocab_size, hidden_size=16,
+        num_hidden_layers=1, num_attention_heads=2, intermediate_size=32,
+        max_position_embeddings=32, num_labels=len(labels),
+        id2label=dict(enumerate(labels)),
+        label2id={label: ind for ind, label in enumerate(labels)}))
+    model.save_pretrained(folder)
+    tokenizer.save_pretrained(folder)
+
+
+class TransformersNERPipeTests(TestCase):
+    TEXTS = [
+        " ".join(WORDS),
+        " ".join(WORDS * 5),
+        "pain",
+        "diabetes and asthma",
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.base_tokenizer = RegexTokenizer()
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        transformers_ner.set_all_seeds(13)
+        save_tiny_model(cls.temp_dir.name)
+        cnf = ConfigTransformersNER()
+        cnf.general.model_name = cls.temp_dir.name
+        cls.ner = TransformersNERComponent(
+            CDB(Config()), cls.base_tokenizer, cnf)
+        cls.ner.create_eval_pipeline()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+
+    def tearDown(self):
+        self.ner.config.general.pipe_batch_size = 8
+
+    def get_ents(self, batch_size: int
+                 ) -> list[list[tuple[int, int, str]]]:
+        self.ner.config.general.pipe_batch_size = batch_size
+        docs = [self.base_tokenizer(text) for text in self.TEXTS]
+        return [[(ent.base.start_char_index, ent.base.end_char_index,
+                  ent.cui) for ent in doc.ner_ents]
+                for doc in self.ner.pipe(docs)]
+
+    def test_batched_same_as_one_by_one(self):
+        self.assertEqual(self.get_ents(8), self.get_ents(1))
+
+    def test_runs_in_batches(self):
+        with unittest.mock.patch.object(
+                self.ner.model, 'forward',
+                wraps=self.ner.model.forward) as forward:
+            self.get_ents(1)
+            one_by_one = forward.call_count
+            forward.reset_mock()
+            self.get_ents(8)
+        self.assertGreater(one_by_one, len(self.TEXTS))
+        self.assertLess(forward.call_count, one_by_one)
+
+    def test_uses_sliding_window(self):
+        ents = self.get_ents(8)[1]
+        window_chars = len(self.TEXTS[0])
+        self.assertTrue(any(start > window_chars for start, _, _ in ents))
+
+    def test_aligns_predictions_to_tokens(self):
+        doc = self.base_tokenizer("patient has diabetes and hypertension")
+        res = [
+            {'start': 12, 'end': 20, 'entity_group': 'DIS', 'score': 0.9},
+            # partial tokens
+            {'start': 14, 'end': 30, 'entity_group': 'DIS', 'score': 0.8},
+            # does not contain the end of any token
+            {'start': 25, 'end': 26, 'entity_group': 'PER', 'score': 0.7},
+        ]
+        self.ner._process_doc(doc, res)
+        self.assertCountEqual(
+            [(ent.base.start_index, ent.base.end_index, ent.base.text)
+             for ent in doc.ner_ents],
+            [(2, 2, "diabetes"), (2, 3, "diabetes and")])
@@ -1,8 +1,20 @@
 from medcat.components.normalizing import normalizer
+from medcat.components.normalizing import symspell
 from medcat.components import types
+from medcat.config import Config
+from medcat.cdb import CDB
 from medcat.vocab import Vocab
+from medcat.preprocessors.cleaners import NameDescriptor
+from medcat.utils.cdb_state import copy_cdb_state, apply_cdb_state
+from medcat.storage.serialisers import (
+    serialise, deserialise, AvailableSerialisers)
 
+from typing import Optional
+import os
+import random
+import tempfile
 import unittest
+import unittest.mock
 
 from ..helper import ComponentInitTests
 
@@ -31,3 +43,326 @@ class NormaliserInitTests(ComponentInitTests, unittest.TestCase):
         cls.cdb_vocab = dict()
         cls.vocab = Vocab()
         return super().setUpClass()
+
+
+class FakeNormTokenizer:
+
+    def __call__(self, text: str) -> list:
+        return [FakeNormToken(text)]
+
+
+class FakeNormToken:
+
+    def __init__(self, text: str):
+        self.lower = text.lower()
+        self.lemma = self.lower
+        self.base = self
+
+
+class BruteForceSpellChecker(normalizer.BasicSpellChecker):
+    """The spell checker using the (original) edits based candidates."""
+
+    def candidates(self, word: str):
+        if self.config.general.spell_check_deep:
+            return (self.known([word]) or
+                    self.known(self.edits1(word)) or
+                    self.known(self.edits2(word)) or
+                    [word])
+        return (self.known([word]) or
+                self.known(self.edits1(word)) or
+                [word])
+
+
+class OneEditTests(unittest.TestCase):
+    WORDS = ['kidney', 'failure', 'fever', 'a-b', 'aab', 'k1dney', '']
+
+    def test_matches_edits1(self):
+        letters = symspell.get_letters(False)
+        for word in self.WORDS:
+            edits = normalizer.BasicSpellChecker.raw_edits1(word)
+            with self.subTest(word):
+                mismatched = [
+                    other for other in self.WORDS + sorted(edits)
+                    if symspell.is_one_edit(word, other, letters) != (
+                        other in edits)]
+                self.assertFalse(mismatched)
+
+    def test_does_not_insert_non_letters(self):
+        self.assertFalse(symspell.is_one_edit("ab", "a-b", "ab"))
+        self.assertTrue(symspell.is_one_edit("a-b", "ab", "ab"))
+
+
+class DeletionIndexTests(unittest.TestCase):
+    VOCAB = ['kidney', 'kidneys', 'failure', 'failures', 'fever',
+             'hypertension', 'hypertensive', 'hypotension', 'diabetes',
+             'diabetic', 'pneumonia', 'pneumonitis', 'abdominal']
+
+    def get_edits(self, word: str, max_dist: int, num: int = 200
+                  ) -> list[str]:
+        edits = normalizer.BasicSpellChecker.raw_edits1(word)
+        if max_dist == 2:
+            edits = set(normalizer.BasicSpellChecker.raw_edits2(word))
+        return random.Random(word).sample(sorted(edits), num)
+
+    def test_finds_all_within_distance(self):
+        for max_dist in (1, 2):
+            index = symspell.DeletionIndex(self.VOCAB, max_dist,
+                                           prefix_length=4)
+            for word in self.VOCAB:
+                with self.subTest(f"{max_dist}: {word}"):
+                    missed = [edited
+                              for edited in self.get_edits(word, max_dist)
+                              if word not in index.lookup(edited)]
+                    self.assertFalse(missed)
+
+    def test_can_save_and_load(self):
+        index = symspell.DeletionIndex(self.VOCAB, 2)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index.save(temp_dir)
+            loaded = symspell.DeletionIndex.load(temp_dir)
+        self.assertIsNotNone(loaded)
+        self.assertEqual(loaded.max_distance, index.max_distance)
+        self.assertEqual(loaded.lookup('hypertensoin'),
+                         index.lookup('hypertensoin'))
+
+    def test_saves_version(self):
+        index = symspell.DeletionIndex(self.VOCAB, 1, version=3)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index.save(temp_dir)
+            loaded = symspell.DeletionIndex.load(temp_dir)
+        self.assertEqual(loaded.version, 3)
+
+    def test_load_without_index_gives_none(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self.assertIsNone(symspell.DeletionIndex.load(temp_dir))
+
+
+class SpellCheckerTests(unittest.TestCase):
+    VOCAB = {word: cnt for cnt, word in enumerate(
+        DeletionIndexTests.VOCAB + ['kidnee', 'fevers', 'hyper-tension'],
+        start=1)}
+    WORDS = ['kidny', 'kidnye', 'kidneyss', 'failur', 'faliure', 'fevre',
+             'hypertensoin', 'hypretensoin', 'hypertension', 'diabetis',
+             'pnuemonia', 'pneumoniaa', 'abdomnial', 'abdominally',
+             'hypertension-', 'hypertension1', 'xyzxyzxyz']
+
+    def setUp(self):
+        self.cnf = Config()
+
+    def assert_same_fixes(self):
+        checker = normalizer.BasicSpellChecker(self.VOCAB, self.cnf)
+        brute = BruteForceSpellChecker(self.VOCAB, self.cnf)
+        for word in self.WORDS:
+            with self.subTest(word):
+                self.assertEqual(set(checker.candidates(word)),
+                                 set(brute.candidates(word)))
+                self.assertEqual(checker.fix(word), brute.fix(word))
+
+    def test_same_fixes_as_edits(self):
+        self.assert_same_fixes()
+
+    def test_same_fixes_as_edits_deep(self):
+        self.cnf.general.spell_check_deep = True
+        self.assert_same_fixes()
+
+    def test_fixes_are_cached(self):
+        checker = normalizer.BasicSpellChecker(self.VOCAB, self.cnf)
+        self.assertEqual(checker.fix('kidny'), 'kidney')
+        with unittest.mock.patch.object(checker, 'candidates') as cands:
+            self.assertEqual(checker.fix('kidny'), 'kidney')
+        cands.assert_not_called()
+
+    def test_cache_is_bounded(self):
+        self.cnf.general.spell_check_cache_size = 2
+        checker = normalizer.BasicSpellChecker(self.VOCAB, self.cnf)
+        for word in self.WORDS:
+            checker.fix(word)
+        self.assertEqual(len(checker._fixes), 2)
+
+    def test_fixes_invalidated_upon_token_counts_change(self):
+        cdb = CDB(self.cnf)
+        cdb.token_counts.update(self.VOCAB)
+        checker = normalizer.BasicSpellChecker(
+            cdb.token_counts, self.cnf, cdb=cdb)
+        self.assertEqual(checker.fix('kidneyz'), 'kidneys')
+        # NOTE: same number of tokens, different counts
+        cdb.token_counts['kidney'] = cdb.token_counts['kidneys'] + 1
+        cdb._token_counts_version += 1
+        self.assertEqual(checker.fix('kidneyz'), 'kidney')
+
+    def test_rebuilds_index_upon_vocab_change(self):
+        vocab = dict(self.VOCAB)
+        checker = normalizer.BasicSpellChecker(vocab, self.cnf)
+        self.assertIsNone(checker.fix('nephrotomy'))
+        vocab['nephrectomy'] = 1
+        vocab['nephrostomy'] = 2
+        self.assertEqual(checker.fix('nephrotomy'), 'nephrostomy')
+
+    def test_rebuilds_index_upon_token_counts_change(self):
+        cdb = CDB(self.cnf)
+        cdb.token_counts.update(self.VOCAB)
+        checker = normalizer.BasicSpellChecker(
+            cdb.token_counts, self.cnf, cdb=cdb)
+        self.assertIsNone(checker.fix('nephrotomy'))
+        # NOTE: same number of tokens, different words
+        del cdb.token_counts['kidnee']
+        cdb.token_counts['nephrostomy'] = 1
+        cdb._token_counts_version += 1
+        self.assertEqual(checker.fix('nephrotomy'), 'nephrostomy')
+
+
+class TokenNormalizerSerialisationTests(unittest.TestCase):
+
+    def setUp(self):
+        self.cnf = Config()
+        self.cdb = CDB(self.cnf)
+        self.cdb.token_counts.update(SpellCheckerTests.VOCAB)
+        self.tokenizer = FakeNormTokenizer()
+        self.normalizer = normalizer.TokenNormalizer.create_new_component(
+            self.cnf.components.token_normalizing, self.tokenizer, self.cdb,
+            Vocab(), None)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.folder = os.path.join(self.temp_dir.name, 'comp')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def load(self) -> normalizer.TokenNormalizer:
+        loaded = deserialise(self.folder, cnf=self.cnf.components,
+                             tokenizer=self.tokenizer, cdb=self.cdb,
+                             vocab=Vocab(), model_load_path=None)
+        self.assertIsInstance(loaded, normalizer.TokenNormalizer)
+        return loaded
+
+    def test_saves_index(self):
+        serialise(AvailableSerialisers.dill, self.normalizer, self.folder)
+        self.assertTrue(os.path.exists(os.path.join(
+            self.folder, symspell.DeletionIndex.DELETES_FILE)))
+
+    def test_loads_index(self):
+        serialise(AvailableSerialisers.dill, self.normalizer, self.folder)
+        loaded = self.load()
+        self.assertIsNotNone(loaded.spell_checker._index)
+        with unittest.mock.patch.object(
+                normalizer, 'DeletionIndex') as index_cls:
+            self.assertEqual(loaded.spell_checker.fix('kidny'), 'kidney')
+        index_cls.assert_not_called()
+
+    def test_rebuilds_stale_loaded_index(self):
+        serialise(AvailableSerialisers.dill, self.normalizer, self.folder)
+        # NOTE: same number of tokens, different words
+        del self.cdb.token_counts['kidnee']
+        self.cdb.token_counts['nephrostomy'] = 1
+        self.cdb._token_counts_version += 1
+        loaded = self.load()
+        self.assertEqual(loaded.spell_checker.fix('nephrotomy'),
+                         'nephrostomy')
+
+    def test_loads_without_index(self):
+        self.cnf.general.spell_check = False
+        serialise(AvailableSerialisers.dill, self.normalizer, self.folder)
+        loaded = self.load()
+        self.assertIsNone(loaded.spell_checker._index)
+        self.assertEqual(loaded.spell_checker.fix('kidny'), 'kidney')
+
+
+class FakeDocToken:
+
+    def __init__(self, text: str, tag: str = 'NN',
+                 lemma: Optional[str] = None):
+        self.text = text
+        self.lower = text.lower()
+        self.tag = tag
+        self.lemma = lemma or self.lower
+        self.is_punctuation = False
+        self.to_skip = False
+        self.norm = ''
+        self.base = self
+
+
+class TokenNormalizerCacheTests(unittest.TestCase):
+    TEXTS = ['kidny', 'failur', 'Kidney', 'failures', 'hypertensoin', 'he']
+
+    def setUp(self):
+        self.cnf = Config()
+        self.cdb = CDB(self.cnf)
+        self.cdb.token_counts.update(SpellCheckerTests.VOCAB)
+        self.normalizer = normalizer.TokenNormalizer.create_new_component(
+            self.cnf.components.token_normalizing, FakeNormTokenizer(),
+            self.cdb, Vocab(), None)
+
+    def add_name(self, name: str, cui: str = 'C1') -> None:
+        self.cdb.add_names(cui, {name: NameDescriptor(
+            tokens=[name], snames={name}, raw_name=name, is_upper=False)})
+
+    def get_doc(self, texts: list[str] = TEXTS) -> list[FakeDocToken]:
+        return [FakeDocToken(text) for text in texts]
+
+    def get_norms(self, texts: list[str] = TEXTS) -> list[str]:
+        return [token.norm for token in self.normalizer(self.get_doc(texts))]
+
+    def test_same_norms_as_uncached(self):
+        self.cnf.preprocessing.normalizing_cache_size = 0
+        expected = self.get_norms()
+        self.cnf.preprocessing.normalizing_cache_size = 1000
+        self.assertEqual(self.get_norms(), expected)
+        self.assertEqual(self.get_norms(), expected)
+
+    def test_counts_hits_and_misses(self):
+        self.get_norms()
+        self.assertEqual(self.normalizer.cache_misses, len(self.TEXTS))
+        self.assertEqual(self.normalizer.cache_hits, 0)
+        self.get_norms()
+        self.assertEqual(self.normalizer.cache_misses, len(self.TEXTS))
+        self.assertEqual(self.normalizer.cache_hits, len(self.TEXTS))
+
+    def test_keys_on_tag_and_lemma(self):
+        self.normalizer([FakeDocToken('running', tag='VBG')])
+        doc = [FakeDocToken('running', tag='NN', lemma='run')]
+        self.normalizer(doc)
+        self.assertEqual(doc[0].norm, 'run')
+        self.assertEqual(self.normalizer.cache_misses, 2)
+
+    def test_keeps_skip_status(self):
+        doc = [FakeDocToken('Themselves', lemma='-PRON-')]
+        self.normalizer(doc)
+        doc = [FakeDocToken('Themselves', lemma='-PRON-')]
+        self.normalizer(doc)
+        self.assertEqual(self.normalizer.cache_hits, 1)
+        self.assertTrue(doc[0].to_skip)
+
+    def test_cache_is_bounded(self):
+        self.cnf.preprocessing.normalizing_cache_size = 2
+        self.get_norms()
+        self.assertEqual(len(self.normalizer._cache), 2)
+
+    def test_invalidates_upon_config_change(self):
+        self.get_norms()
+        self.cnf.general.spell_check = False
+        self.assertEqual(self.get_norms()[0], 'kidny')
+        self.assertEqual(self.normalizer.cache_hits, 0)
+
+    def test_invalidates_upon_token_counts_change(self):
+        self.assertEqual(self.get_norms(['nephrotomy'])[0], 'nephrotomy')
+        self.add_name('nephrostomy')
+        self.assertEqual(self.get_norms(['nephrotomy'])[0], 'nephrostomy')
+
+    def test_invalidates_upon_count_only_change(self):
+        # NOTE: a single edit away from both 'kidney' and 'kidneys'
+        self.assertEqual(self.get_norms(['kidneyz'])[0], 'kidneys')
+        for num in range(2):
+            self.add_name('kidney', cui=f'C{num}')
+        self.assertGreater(self.cdb.token_counts['kidney'],
+                           self.cdb.token_counts['kidneys'])
+        self.assertEqual(self.get_norms(['kidneyz'])[0], 'kidney')
+
+    def test_invalidates_upon_restored_state(self):
+        # NOTE: the counts favour 'kidneys'
+        state = copy_cdb_state(self.cdb)
+        for num in range(2):
+            self.add_name('kidney', cui=f'C{num}')
+        self.assertEqual(self.get_norms(['kidneyz'])[0], 'kidney')
+        num_tokens = len(self.cdb.token_counts)
+        apply_cdb_state(self.cdb, state)
+        self.assertEqual(len(self.cdb.token_counts), num_tokens)
+        self.assertEqual(self.get_norms(['kidneyz'])[0], 'kidneys')
@@ -1,5 +1,6 @@
 from medcat.pipeline import pipeline
 from medcat.vocab import Vocab
+from medcat.cdb import CDB
 from medcat.config import Config
 
 from ..components.ner.test_vocab_based_ner import FakeCDB as BFakeCDB
@@ -30,3 +31,36 @@ class PlatformInitTests(unittest.TestCase):
     def test_can_create_pipeline(self):
         pf = pipeline.Pipeline(self.cdb, self.vocab, None)
         self.assertIsInstance(pf, pipeline.Pipeline)
+
+
+class CountingBatchableTokenizer(pipeline.DelegatingTokenizer):
+
+    def __init__(self, tokenizer):
+        super().__init__(tokenizer, [])
+        self.piped: list[tuple[int, int, int]] = []
+
+    def pipe(self, texts, batch_size: int = 50, n_process: int = 1):
+        texts = list(texts)
+        self.piped.append((len(texts), batch_size, n_process))
+        for text in texts:
+            yield self(text)
+
+
+class PipelineBatchedTokenizingTests(unittest.TestCase):
+    TEXTS = ["Some text", "Some other text", "And a third one"]
+
+    def setUp(self):
+        self.cnf = Config()
+        self.cnf.general.nlp.batch_size = 2
+        self.pipe = pipeline.Pipeline(CDB(self.cnf), Vocab(), None)
+
+    def test_non_batchable_tokenizer(self):
+        docs = self.pipe.get_docs(self.TEXTS)
+        self.assertEqual([doc.base.text for doc in docs], self.TEXTS)
+
+    def test_uses_batchable_tokenizer(self):
+        tokenizer = CountingBatchableTokenizer(self.pipe._tokenizer)
+        self.pipe._tokenizer = tokenizer
+        docs = self.pipe.get_docs(self.TEXTS)
+        self.assertEqual([doc.base.text for doc in docs], self.TEXTS)
+        self.assertEqual(tokenizer.piped, [(len(self.TEXTS), 2, 1)])
@@ -0,0 +1,240 @@
+import os
+import tempfile
+import unittest
+import unittest.mock
+
+import numpy as np
+
+from medcat.storage.serialisers import AvailableSerialisers, get_serialiser
+from medcat.storage.serialisers import serialise, deserialise
+from medcat.storage.numpyserialiser import NumpySerialiser
+from medcat.cdb import CDB
+from medcat.cdb.compact import CompactCDB
+from medcat.cdb.concepts import get_new_cui_info
+from medcat.components.ner.subname_trie import SubnameTrie
+from medcat.config.config import Config
+
+from .test_serialisers import get_slightly_complex_cat
+
+
+def get_test_classes():
+    # NOTE: see the note in test_jsonserialiser
+    from .test_serialisers import (
+        SerialiserWorksTests, SerialiserFailsTests,
+        NestedSameInstanceSerialisableTests,
+        CanSerialiseCATSimple, CanSerialiseCATSlightlyComplex)
+
+    class NumpySerialiserWorksTests(SerialiserWorksTests):
+        SERIALISER_TYPE = AvailableSerialisers.numpy
+
+    class NumpySerialiserFailsTests(SerialiserFailsTests):
+        SERIALISER_TYPE = AvailableSerialisers.numpy
+
+    class NumpyNestedSameInstanceSerialisableTests(
+            NestedSameInstanceSerialisableTests):
+        SERIALISER_TYPE = AvailableSerialisers.numpy
+
+    class NumpyCanSerialiseCAT(CanSerialiseCATSimple):
+        SERIALISER_TYPE = AvailableSerialisers.numpy
+
+    class NumpyCanSerialiseCATSlightlyComplex(
+        CanSerialiseCATSlightlyComplex
+    ):
+        SERIALISER_TYPE = AvailableSerialisers.numpy
+
+    return (NumpySerialiserWorksTests, NumpySerialiserFailsTests,
+            NumpyNestedSameInstanceSerialisableTests,
+            NumpyCanSerialiseCAT, NumpyCanSerialiseCATSlightlyComplex)
+
+
+# NOTE: by "dynamically" getting the classes, we avoid re-running
+#       tests on the original classes.
+CLS1, CLS2, CLS3, CLS4, CLS5 = get_test_classes()
+
+
+class NumpySerialiserRawTests(unittest.TestCase):
+    RAW = {
+        "int_keys": {1: "a", 2: "b"},
+        "tuple_keys": {("a", 1): {1, 2}},
+        "tuple": (1, "2", None),
+        "fset": frozenset(["x"]),
+        "nested": {"arr": np.arange(10, dtype=np.float32)},
+        "large": np.arange(NumpySerialiser.MIN_EXTERNAL_ARRAY_BYTES // 4,
+                           dtype=np.float32),
+        "empty": np.zeros((0, 3), dtype=np.int64),
+        "scalar": np.float32(1.5),
+        "tagged_like": {"__type__": "not really"},
+    }
+
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self._temp_dir.name, "raw.dat")
+        self.ser = get_serialiser(AvailableSerialisers.numpy)
+        self.ser.serialise(self.RAW, self.file_path)
+        self.got = self.ser.deserialise(self.file_path)
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def test_gets_numpy_serialiser(self):
+        self.assertIsInstance(self.ser, NumpySerialiser)
+
+    def test_keeps_keys_and_containers(self):
+        for key in ["int_keys", "tuple_keys", "tuple", "fset", "tagged_like"]:
+            with self.subTest(key):
+                self.assertEqual(self.got[key], self.RAW[key])
+                self.assertIs(type(self.got[key]), type(self.RAW[key]))
+
+    def test_keeps_numpy_scalar(self):
+        self.assertEqual(self.got["scalar"], self.RAW["scalar"])
+        self.assertEqual(self.got["scalar"].dtype, np.float32)
+
+    def test_small_array_inline(self):
+        for key, arr in [("nested", self.got["nested"]["arr"]),
+                         ("empty", self.got["empty"])]:
+            with self.subTest(key):
+                self.assertNotIsInstance(arr, np.memmap)
+                exp = (self.RAW["nested"]["arr"] if key == "nested"
+                       else self.RAW[key])
+                np.testing.assert_array_equal(arr, exp)
+                self.assertEqual(arr.dtype, exp.dtype)
+                self.assertEqual(arr.shape, exp.shape)
+
+    def test_array_memory_mapped(self):
+        arr = self.got["large"]
+        self.assertIsInstance(arr, np.memmap)
+        np.testing.assert_array_equal(arr, self.RAW["large"])
+
+    def test_array_writable_copy_on_write(self):
+        arr = self.got["large"]
+        arr[0] = 100
+        reloaded = self.ser.deserialise(self.file_path)
+        self.assertEqual(reloaded["large"][0], 0)
+
+    def test_fails_unknown_object(self):
+        with self.assertRaises(TypeError):
+            self.ser.serialise({"obj": object()}, self.file_path)
+
+
+class NumpySerialiserSlotsTests(unittest.TestCase):
+    # NOTE: the trie nodes define __slots__ (and have no __dict__)
+    TRIE = SubnameTrie(["a", "a~b"], ["a~b"], "~")
+
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self._temp_dir.name, "raw.dat")
+        self.ser = get_serialiser(AvailableSerialisers.numpy)
+        self.ser.serialise({"trie": self.TRIE}, self.file_path)
+        self.got = self.ser.deserialise(self.file_path)["trie"]
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def test_slots_round_trip(self):
+        node = self.got.root.children["a"]
+        self.assertTrue(node.is_subname)
+        self.assertFalse(node.is_name)
+        self.assertTrue(node.children["b"].is_name)
+        self.assertIsNone(node.children["b"].children)
+
+    def test_dict_and_slots_round_trip(self):
+        self.assertEqual(self.got.separator, self.TRIE.separator)
+        self.assertEqual(self.got.num_subnames, self.TRIE.num_subnames)
+
+
+class NumpySerialiserModelTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # NOTE: write all the (small) arrays as files
+        cls._patcher = unittest.mock.patch.object(
+            NumpySerialiser, "MIN_EXTERNAL_ARRAY_BYTES", 0)
+        cls._patcher.start()
+        cls.cat = get_slightly_complex_cat()
+        cls.cat.config.components.linking.train = False
+        cls._temp_dir = tempfile.TemporaryDirectory()
+        cls.cat.cdb.cui2info["CUI#1"]["context_vectors"] = {
+            "long": np.ones(4, dtype=np.float32)}
+        cls.cdb = CompactCDB.from_cdb(cls.cat.cdb)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._patcher.stop()
+        cls._temp_dir.cleanup()
+
+    def _save_and_load(self, obj, name: str):
+        folder = os.path.join(self._temp_dir.name, name)
+        os.makedirs(folder)
+        serialise(AvailableSerialisers.numpy, obj, folder)
+        return deserialise(folder)
+
+    def test_vocab_vectors_memory_mapped(self):
+        got = self._save_and_load(self.cat.vocab, "vocab")
+        self.assertEqual(got, self.cat.vocab)
+        self.assertIsInstance(got.vec("Word#2"), np.memmap)
+
+    def test_compact_cdb_round_trip(self):
+        got = self._save_and_load(self.cdb, "ccdb")
+        self.assertIsInstance(got, CompactCDB)
+        self.assertEqual(got.cui2info.keys(), self.cdb.cui2info.keys())
+        self.assertEqual(got.name2info.keys(), self.cdb.name2info.keys())
+        self.assertEqual(got.get_hash(), self.cdb.get_hash())
+
+    def test_compact_cdb_arrays_memory_mapped(self):
+        got = self._save_and_load(self.cdb, "ccdb2")
+        self.assertIsInstance(got._store.cui_names, np.memmap)
+
+
+class NumpySerialiserManyArraysTests(unittest.TestCase):
+    NUM_CUIS = 5000
+    VEC_SIZE = 300
+    CNTX_TYPES = ("long", "short")
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cdb = CDB(Config())
+        rng = np.random.default_rng(0)
+        for cui_nr in range(cls.NUM_CUIS):
+            cui = f"C{cui_nr}"
+            cls.cdb.cui2info[cui] = get_new_cui_info(
+                cui=cui, preferred_name=cui, context_vectors={
+                    cntx_type: rng.random(cls.VEC_SIZE, dtype=np.float32)
+                    for cntx_type in cls.CNTX_TYPES})
+        cls._temp_dir = tempfile.TemporaryDirectory()
+        serialise(AvailableSerialisers.numpy, cls.cdb, cls._temp_dir.name)
+        cls.got = deserialise(cls._temp_dir.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._temp_dir.cleanup()
+
+    def test_context_vectors_in_one_file(self):
+        array_files = [file_name
+                       for _, _, files in os.walk(self._temp_dir.name)
+                       for file_name in files
+                       if file_name.endswith(NumpySerialiser.ARRAY_SUFFIX)]
+        # NOTE: all the context vectors have the same dtype and shape
+        self.assertEqual(len(array_files), 1)
+
+    def test_context_vectors_same(self):
+        self.assertEqual(self.got.cui2info.keys(), self.cdb.cui2info.keys())
+        for cui, info in self.cdb.cui2info.items():
+            got_vecs = self.got.cui2info[cui]["context_vectors"]
+            for cntx_type, vec in info["context_vectors"].items():
+                np.testing.assert_array_equal(got_vecs[cntx_type], vec)
+
+    def test_context_vectors_memory_mapped(self):
+        vec = self.got.cui2info["C10"]["context_vectors"]["long"]
+        self.assertIsInstance(vec, np.memmap)
+        self.assertEqual(vec.shape, (self.VEC_SIZE, ))
+
+    def test_context_vector_writable_copy_on_write(self):
+        got = deserialise(self._temp_dir.name)
+        vecs = got.cui2info["C10"]["context_vectors"]
+        vecs["long"][:] = 0
+        self.assertTrue(vecs["short"].any())
+        self.assertTrue(got.cui2info["C11"]["context_vectors"]["long"].any())
+        np.testing.assert_array_equal(
+            deserialise(self._temp_dir.name).cui2info["C10"][
+                "context_vectors"]["long"],
+            self.cdb.cui2info["C10"]["context_vectors"]["long"])
@@ -1,5 +1,7 @@
 from typing import Optional
 import os
+import json
+import pickle
 from datetime import datetime
 
 from medcat.storage.serialisables import (
@@ -273,3 +275,68 @@ class PartlyManuallySerialisableTests(unittest.TestCase):
             loaded = serialisers.deserialise(temp_dir)
         self.assertEqual(self.OBJ, loaded)
         self.assertEqual(self.OBJ.attr1, loaded.attr1)
+
+
+class DillSerialiserArrayTests(unittest.TestCase):
+    LARGE = np.linspace(-1, 1, 1 << 20, dtype=np.float16).reshape(-1, 64)
+    EXTERNAL = LARGE.view(serialisers.ExternalArray)
+    SMALL_EXTERNAL = np.arange(10, dtype=np.float32).view(
+        serialisers.ExternalArray)
+
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self._temp_dir.name, "raw.dat")
+        self.ser = serialisers.get_serialiser(
+            serialisers.AvailableSerialisers.dill)
+        self.ser.serialise({"external": self.EXTERNAL, "large": self.LARGE,
+                            "small_external": self.SMALL_EXTERNAL,
+                            "same": self.EXTERNAL}, self.file_path)
+        self.got = self.ser.deserialise(self.file_path)
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def test_marked_arrays_saved_separately(self):
+        self.assertEqual(
+            sorted(os.listdir(self._temp_dir.name)),
+            ["raw.dat", "raw.dat.arr0.npy", "raw.dat.arr1.npy",
+             "raw.dat.arrays.json"])
+
+    def test_records_format(self):
+        with open(self.file_path + ".arrays.json") as f:
+            self.assertEqual(
+                json.load(f),
+                {"format": serialisers.DillSerialiser.EXTERNAL_ARRAYS_FORMAT,
+                 "num_arrays": 2})
+
+    def test_marked_array_memory_mapped(self):
+        got = self.got["external"]
+        self.assertIsInstance(got, serialisers.ExternalArray)
+        self.assertIsInstance(got.base, np.memmap)
+        np.testing.assert_array_equal(got, self.LARGE)
+        self.assertIs(self.got["same"], got)
+        np.testing.assert_array_equal(self.got["small_external"],
+                                      self.SMALL_EXTERNAL)
+
+    def test_unmarked_array_pickled(self):
+        self.assertIs(type(self.got["large"]), np.ndarray)
+        np.testing.assert_array_equal(self.got["large"], self.LARGE)
+
+    def test_can_overwrite_while_mapped(self):
+        self.ser.serialise({"external": self.got["external"] + 1},
+                           self.file_path)
+        np.testing.assert_array_equal(self.got["external"], self.LARGE)
+        reloaded = self.ser.deserialise(self.file_path)
+        np.testing.assert_array_equal(reloaded["external"], self.LARGE + 1)
+
+    def test_removes_stale_arrays(self):
+        self.ser.serialise({"external": self.EXTERNAL}, self.file_path)
+        self.assertNotIn("raw.dat.arr1.npy", os.listdir(self._temp_dir.name))
+        self.ser.serialise({"large": self.LARGE}, self.file_path)
+        self.assertEqual(os.listdir(self._temp_dir.name), ["raw.dat"])
+
+    def test_fails_newer_format(self):
+        with open(self.file_path + ".arrays.json", 'w') as f:
+            json.dump({"format": 1000, "num_arrays": 2}, f)
+        with self.assertRaises(pickle.UnpicklingError):
+            self.ser.deserialise(self.file_path)
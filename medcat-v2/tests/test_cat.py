@@ -375,6 +375,19 @@ class CATCreationTests(CATIncludingTests):
             with self.subTest(f"Key: {key}"):
                 self.assertIn(key, ModelCard.__annotations__)
 
+    def test_batch_gets_same_entities(self):
+        texts = [
+            "The fittest most fit of chronic kidney failure",
+            "The dog is sitting outside the house.",
+            "Chronic kidney failure and kidney failure",
+        ]
+        exp_ents = [self.cat.get_entities(text) for text in texts]
+        ents = self.cat.get_entities_batch(texts)
+        self.assertEqual(ents, exp_ents)
+
+    def test_batch_can_be_empty(self):
+        self.assertEqual(self.cat.get_entities_batch([]), [])
+
 
 class CatWithMetaCATTests(CATCreationTests):
     EXPECTED_HASH = "8c3de3f171a87132"
@@ -626,6 +639,31 @@ class CATWithDictNERSupTrainingTests(CATSupTrainingTests):
             texts, n_process=3, batch_size=2, batch_size_chars=-1))
         self.assert_ents(ents, texts)
 
+    def test_can_get_multiprocess_with_worker_pool(self):
+        texts = [
+            "The fittest most fit of chronic kidney failure",
+            "The dog is sitting outside the house."
+        ]*10
+        # NOTE: only comparing CUIs since the order of set-based
+        #       output (e.g type IDs) depends on the process' hash seed
+        exp_ents = dict(self.cat.get_entities_multi_texts(
+            texts, only_cui=True, batch_size=2, batch_size_chars=-1))
+        with self.cat.worker_pool(2):
+            # NOTE: the same pool is reused across calls
+            for nr in range(2):
+                with self.subTest(f"Call {nr}"):
+                    ents = list(self.cat.get_entities_multi_texts(
+                        texts, only_cui=True, batch_size=2,
+                        batch_size_chars=-1))
+                    self.assert_ents(ents, texts)
+                    self.assertEqual(dict(ents), exp_ents)
+        self.assertIsNone(self.cat._worker_pool)
+
+    def test_cannot_start_multiple_worker_pools(self):
+        with self.cat.worker_pool(1):
+            with self.assertRaises(cat.WorkerPoolError):
+                self.cat.start_workers(1)
+
     def _do_mp_run_with_save(
             self, save_to: str,
             chars_per_batch: int = 165,
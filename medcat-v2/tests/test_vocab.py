@@ -1,6 +1,6 @@
 import os
 
-from medcat.vocab import Vocab
+from medcat.vocab import Vocab, CompactVocab, CompactVocabIsReadOnlyError
 from medcat.storage.serialisers import get_serialiser, deserialise
 
 import numpy as np
@@ -215,3 +215,69 @@ class DefaultVocabTests(unittest.TestCase):
             # and can load from saved zip
             loaded = Vocab.load(file_name)
             self.assertIsInstance(loaded, Vocab)
+
+
+class CompactVocabTests(unittest.TestCase):
+    all_words = VocabCreationTests.all_words
+
+    @classmethod
+    def setUpClass(cls):
+        cls.vocab = Vocab()
+        for word in cls.all_words:
+            cls.vocab.add_word(**word)
+        cls.compact = CompactVocab.from_vocab(cls.vocab)
+        cls._temp_dir = tempfile.TemporaryDirectory()
+        cls.compact.save(cls._temp_dir.name, overwrite=True)
+        cls.loaded = Vocab.load(cls._temp_dir.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._temp_dir.cleanup()
+
+    def test_has_same_words(self):
+        for word in self.all_words:
+            with self.subTest(word["word"]):
+                self.assertIn(word["word"], self.compact)
+                self.assertEqual(self.compact[word["word"]],
+                                 self.vocab[word["word"]])
+
+    def test_has_same_vectors(self):
+        for word in self.vocab.vocab:
+            with self.subTest(word):
+                vec, cvec = self.vocab.vec(word), self.compact.vec(word)
+                if vec is None:
+                    self.assertIsNone(cvec)
+                else:
+                    self.assertTrue(np.allclose(vec, cvec))
+
+    def test_gets_same_vectors(self):
+        inds = list(self.vocab.index2word)
+        vecs = self.vocab.get_vectors(inds)
+        cvecs = self.compact.get_vectors(inds)
+        self.assertEqual(len(vecs), len(cvecs))
+        for vec, cvec in zip(vecs, cvecs):
+            self.assertTrue(np.allclose(vec, cvec))
+
+    def test_neg_sampling_does_not_include_vectorless(
+            self, num_to_get: int = 30):
+        inds = self.compact.get_negative_samples(num_to_get)
+        self.assertEqual(len(inds), num_to_get)
+        for index in inds:
+            with self.subTest(f"Index: {index}"):
+                self.assertIsInstance(index, int)
+                self.assertIn(index, self.compact.vec_index2word)
+
+    def test_equals_regular_vocab(self):
+        self.assertEqual(self.compact, self.vocab)
+        self.assertEqual(self.compact.to_vocab(), self.vocab)
+
+    def test_cannot_add_words(self):
+        with self.assertRaises(CompactVocabIsReadOnlyError):
+            self.compact.add_word("NEW WORD")
+
+    def test_loaded_is_compact(self):
+        self.assertIsInstance(self.loaded, CompactVocab)
+        self.assertEqual(self.loaded, self.compact)
+
+    def test_loaded_vectors_are_memory_mapped(self):
+        self.assertIsInstance(self.loaded._vectors, np.memmap)
@@ -77,6 +77,13 @@ class EntitySimpleAddonDataTests(TestCase):
                 self.assertEqual(data_val, self._get_expected_data(
                     ent_num, entity))
 
+    def test_addon_data_not_shared_between_docs(self):
+        other = self.tokenizer(self.EXAMPLE_TEXT)
+        for ent_num in range(len(other)):
+            entity = other[ent_num: ent_num + 1]
+            with self.subTest(f"Entity {ent_num}: {entity}"):
+                self.assertFalse(entity.has_addon_data(self.ADDON_PATH))
+
 
 class EntityComplexAddonTests(EntitySimpleAddonDataTests):
     ADDON_PATH = "complex_data_path"
@@ -91,3 +98,96 @@ class EntityComplexAddonTests(EntitySimpleAddonDataTests):
     def _get_expected_data(self, ent_num: int,
                            entity: tokenizer.MutableEntity):
         return {0: ent_num}
+
+
+class DocumentArraysTests(TestCase):
+    TEXT = "Some Text,  with MORE text. And then: 42 numbers!"
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tokenizer = tokenizer.RegexTokenizer()
+
+    def setUp(self):
+        self.doc = self.tokenizer(self.TEXT)
+
+    def test_token_data(self):
+        for tkn in self.doc:
+            with self.subTest(repr(tkn)):
+                start = tkn.base.char_index
+                self.assertEqual(
+                    self.TEXT[start: start + len(tkn.base.text)],
+                    tkn.base.text)
+                self.assertEqual(tkn.base.lower, tkn.base.text.lower())
+                self.assertTrue(tkn.base.text_with_ws.startswith(
+                    tkn.base.text))
+                self.assertIs(self.doc[tkn.base.index], tkn)
+
+    def test_tokens_are_views(self):
+        with self.assertRaises(AttributeError):
+            self.doc[0].some_attribute = 1
+
+    def test_can_set_flags(self):
+        tkn = self.doc[2]
+        tkn.to_skip = True
+        tkn.is_punctuation = True
+        self.assertTrue(self.doc[2].to_skip)
+        self.assertTrue(self.doc[2].is_punctuation)
+        tkn.to_skip = False
+        self.assertFalse(self.doc[2].to_skip)
+        self.assertTrue(self.doc[2].is_punctuation)
+        self.assertFalse(self.doc[3].to_skip)
+
+    def _get_tokens_linear(self, start: int, end: int):
+        return [tkn for tkn in self.doc
+                if start <= tkn.base.char_index <= end]
+
+    def test_get_tokens_same_as_linear(self):
+        for start in range(len(self.TEXT) + 1):
+            for end in range(start, len(self.TEXT) + 2, 3):
+                with self.subTest(f"{start}-{end}"):
+                    self.assertEqual(self.doc.get_tokens(start, end),
+                                     self._get_tokens_linear(start, end))
+
+    def _get_aligned_tokens_linear(self, start: int, end: int):
+        tkns = self._get_tokens_linear(start, end)
+        if (not tkns or tkns[0].base.char_index != start or
+                tkns[-1].base.char_index + len(tkns[-1].base.text) !=
+                end + 1):
+            return []
+        return tkns
+
+    def test_get_aligned_tokens_same_as_linear(self):
+        mismatches = []
+        for start in range(-1, len(self.TEXT) + 1):
+            for end in range(start - 1, len(self.TEXT) + 1):
+                got = self.doc.get_aligned_tokens(start, end)
+                exp = self._get_aligned_tokens_linear(start, end)
+                if got != exp:
+                    mismatches.append((start, end, got, exp))
+        self.assertFalse(mismatches)
+
+    def test_get_aligned_tokens_rejects_mid_token(self):
+        # "Some Text,"
+        self.assertEqual([tkn.base.text
+                          for tkn in self.doc.get_aligned_tokens(0, 8)],
+                         ["Some", "Text"])
+        self.assertFalse(self.doc.get_aligned_tokens(1, 8))
+        self.assertFalse(self.doc.get_aligned_tokens(0, 7))
+
+    def test_entity_from_tokens(self):
+        tkns = self.doc.get_tokens(5, 20)
+        ent = self.tokenizer.entity_from_tokens(tkns)
+        self.assertEqual(ent.base.start_index, tkns[0].base.index)
+        self.assertEqual(ent.base.end_index, tkns[-1].base.index)
+        self.assertEqual(ent.base.start_char_index, tkns[0].base.char_index)
+        self.assertEqual(
+            ent.base.text,
+            self.TEXT[tkns[0].base.char_index: ent.base.end_char_index])
+        self.assertTrue(ent.base.text.endswith(tkns[-1].base.text))
+
+    def test_entity_from_tokens_long_doc(self):
+        doc = self.tokenizer(" ".join([self.TEXT] * 1000))
+        tkns = list(doc)[-5:]
+        ent = self.tokenizer.entity_from_tokens(tkns)
+        self.assertEqual(ent.base.start_index, len(doc) - 5)
+        self.assertEqual(ent.base.end_index, len(doc) - 1)
@@ -1,4 +1,8 @@
 from typing import runtime_checkable
+import os
+import tempfile
+
+import spacy
 
 from medcat.tokenizing import tokenizers
 from medcat.tokenizing.spacy_impl.tokenizers import SpacyTokenizer
@@ -38,3 +42,67 @@ class DefaultTokenizerInitTests2(DefaultTokenizerInitTests):
     default_provider = 'regex'
     default_cls = RegexTokenizer
     default_creator = RegexTokenizer.create_new_tokenizer
+
+
+class SpacyTokenizerPipeTests(unittest.TestCase):
+    TEXTS = [
+        "The patient has chronic kidney failure.",
+        "",
+        "No evidence of diabetes; mild fever (38.5C) noted!",
+    ] * 5
+
+    @classmethod
+    def setUpClass(cls):
+        # NOTE: a blank model since no pretrained model is required
+        cls._temp_dir = tempfile.TemporaryDirectory()
+        model_path = os.path.join(cls._temp_dir.name, "blank_en")
+        spacy.blank("en").to_disk(model_path)
+        cls.tokenizer = SpacyTokenizer(model_path, [], False, 1_000_000)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._temp_dir.cleanup()
+
+    def test_is_batchable(self):
+        self.assertIsInstance(self.tokenizer, tokenizers.BatchableTokenizer)
+
+    def test_regex_tokenizer_not_batchable(self):
+        self.assertNotIsInstance(RegexTokenizer.create_new_tokenizer(Config()),
+                                 tokenizers.BatchableTokenizer)
+
+    def test_pipe_same_as_call(self):
+        docs = list(self.tokenizer.pipe(self.TEXTS, batch_size=4))
+        self.assertEqual(len(docs), len(self.TEXTS))
+        for text, doc in zip(self.TEXTS, docs):
+            with self.subTest(text):
+                self.assertEqual(doc.base.text, text)
+                self.assertEqual([tkn.base.text for tkn in doc],
+                                 [tkn.base.text for tkn in self.tokenizer(text)])
+
+    def test_pipe_is_lazy(self):
+        docs = self.tokenizer.pipe(iter(self.TEXTS))
+        self.assertEqual(next(docs).base.text, self.TEXTS[0])
+
+    def test_get_aligned_tokens(self):
+        text = self.TEXTS[2]
+        doc = self.tokenizer(text)
+        mismatches = []
+        for start in range(len(text)):
+            for end in range(start, len(text)):
+                tkns = doc.get_tokens(start, end)
+                aligned = bool(tkns) and (
+                    tkns[0].base.char_index == start and
+                    tkns[-1].base.char_index + len(tkns[-1].base.text) ==
+                    end + 1)
+                exp = tkns if aligned else []
+                got = doc.get_aligned_tokens(start, end)
+                if got != exp:
+                    mismatches.append((start, end, got, exp))
+        self.assertFalse(mismatches)
+
+    def test_get_aligned_tokens_rejects_mid_token(self):
+        doc = self.tokenizer("mild fever")
+        self.assertEqual([tkn.base.text
+                          for tkn in doc.get_aligned_tokens(5, 9)], ["fever"])
+        self.assertFalse(doc.get_aligned_tokens(5, 7))
+        self.assertFalse(doc.get_aligned_tokens(6, 9))